@@ -1,6 +1,6 @@
-from opengl_light_lab.app_state import AppState, LightType, Projection, Spherical
+from opengl_light_lab.app_state import AppState, LightType, Projection, SceneObject, Spherical
 from opengl_light_lab.control_panel import ControlPanel
 from opengl_light_lab.gl_widget import GLWidget
 from opengl_light_lab.main_window import MainWindow
 
-__all__ = ["AppState", "ControlPanel", "GLWidget", "LightType", "MainWindow", "Projection", "Spherical"]
+__all__ = ["AppState", "ControlPanel", "GLWidget", "LightType", "MainWindow", "Projection", "SceneObject", "Spherical"]
@@ -1,16 +1,44 @@
 """Entry point for the OpenGL Light Lab application."""
 
+import argparse
 import sys
+from pathlib import Path
 
 from PySide6 import QtWidgets
 
 from opengl_light_lab import MainWindow
+from opengl_light_lab.remote import DEFAULT_PORT, RemoteServer
 
 
 def main() -> None:
     """Run the application."""
-    app = QtWidgets.QApplication(sys.argv)
+    parser = argparse.ArgumentParser(description="Interactive OpenGL lighting lab.")
+    parser.add_argument(
+        "--remote-port",
+        type=int,
+        nargs="?",
+        const=DEFAULT_PORT,
+        help=f"Accept JSON-RPC remote control on localhost (default port {DEFAULT_PORT}).",
+    )
+    parser.add_argument("--remote-socket", type=Path, help="Accept JSON-RPC remote control on a Unix socket.")
+    args, qt_args = parser.parse_known_args()
+
+    app = QtWidgets.QApplication([sys.argv[0], *qt_args])
     win = MainWindow()
+    if args.remote_port is not None or args.remote_socket is not None:
+        server = RemoteServer(
+            win.gl,
+            win.updates,
+            port=DEFAULT_PORT if args.remote_port is None else args.remote_port,
+            path=args.remote_socket,
+        )
+        try:
+            server.start()
+        except OSError as e:
+            print(f"Remote control disabled: {e}")
+        else:
+            print(f"Remote control listening on {server.address}")
+            app.aboutToQuit.connect(server.stop)
     win.show()
     sys.exit(app.exec())
 
@@ -1,8 +1,49 @@
+from __future__ import annotations
+
+import dataclasses
+import functools
 import math
+import types
+import typing
 from dataclasses import dataclass, field
 from enum import StrEnum
+from typing import TYPE_CHECKING
+
+from OpenGL.GL import GL_CONSTANT_ATTENUATION, GL_LINEAR_ATTENUATION, GL_QUADRATIC_ATTENUATION  # type: ignore
+
+if TYPE_CHECKING:
+    from collections.abc import Mapping
 
-from OpenGL.GL import GL_CONSTANT_ATTENUATION  # type: ignore
+SHADOW_MAP_SIZES = (512, 1024, 2048)
+"""Shadow map resolutions offered in the control panel."""
+ATTENUATION_MODES = (GL_CONSTANT_ATTENUATION, GL_LINEAR_ATTENUATION, GL_QUADRATIC_ATTENUATION)
+"""OpenGL attenuation mode constants offered in the control panel."""
+POSITION_RANGE = (-10.0, 10.0)
+COLOR_RANGE = (0.0, 1.0)
+FIELD_RANGES: dict[str, tuple[float, float]] = {
+    "camera.distance": (0.1, 50.0),
+    "camera.theta": (-10.0, 10.0),
+    "camera.phi": (-10.0, 10.0),
+    "camera_perspective_fov": (10.0, 120.0),
+    "camera_ortho_half_height": (0.01, 10.0),
+    "light_position": POSITION_RANGE,
+    "light_direction": POSITION_RANGE,
+    "light_diffuse": COLOR_RANGE,
+    "light_ambient": COLOR_RANGE,
+    "light_specular": COLOR_RANGE,
+    "light_attenuation_value": (0.0, 10.0),
+    "rotation_angle": (0.0, 360.0),
+    "cube_distance": (0.0, 10.0),
+    "axis_extent": (1, 100),
+}
+"""Inclusive bounds of numeric fields, of every component for tuples; the control panel widgets use the same."""
+FIELD_CHOICES: dict[str, tuple[object, ...]] = {
+    "light_attenuation_mode": ATTENUATION_MODES,
+    "shadow_map_size": SHADOW_MAP_SIZES,
+}
+"""Values allowed for the fields the control panel offers as a list."""
+UNRENDERED_FIELDS = frozenset({"auto_rotate", "profile_allocations", "selected_object", "show_help", "show_profiler"})
+"""Fields that do not affect the scene image: overlays drawn over it and interaction settings."""
 
 
 @dataclass
@@ -49,6 +90,14 @@ class LightType(StrEnum):
     DIRECTIONAL = "directional"
 
 
+class SceneObject(StrEnum):
+    """Selectable objects of the scene, in drawing order."""
+
+    RED_CYLINDER = "red_cylinder"
+    CUBE = "cube"
+    GREEN_CYLINDER = "green_cylinder"
+
+
 @dataclass
 class AppState:
     """Holds the application state."""
@@ -64,6 +113,8 @@ class AppState:
 
     current_texture: str | None = None
     """Path to the currently loaded texture, or None."""
+    current_mesh: str | None = None
+    """Path to an OBJ, PLY or STL model drawn in place of the center cube, or None."""
 
     light_type: LightType = LightType.POINT
     """Type of the active light source."""
@@ -87,6 +138,10 @@ class AppState:
     """Whether to use local viewer lighting model."""
     light_model_two_side: bool = True
     """Whether to use two-sided lighting model."""
+    shadows_enabled: bool = False
+    """Whether the objects cast shadows."""
+    shadow_map_size: int = 1024
+    """Resolution of the shadow map (edge length in pixels)."""
 
     rotation_angle: float = 0.0
     """Current rotation angle of the scene objects."""
@@ -94,9 +149,20 @@ class AppState:
     """Whether objects should rotate automatically."""
     cube_distance: float = 1.5
     """Distance of side objects from the center."""
+    selected_object: SceneObject | None = None
+    """Object selected by clicking in the view, or None."""
+
+    quad_view: bool = False
+    """Whether to show top, front and right orthographic views next to the camera view."""
 
     show_axis: bool = False
     """Whether to draw coordinate axes."""
+    axis_extent: int = 25
+    """Length of the drawn half-axes and half-size of the ground grid."""
+    show_axis_ticks: bool = False
+    """Whether to draw tick marks at every unit of the axes."""
+    show_grid: bool = False
+    """Whether to draw the ground grid with the axes."""
     show_light_position: bool = True
     """Whether to draw the light source marker."""
     lighting_enabled: bool = True
@@ -105,3 +171,170 @@ class AppState:
     """Whether depth testing is enabled."""
     show_help: bool = True
     """Whether to show the help overlay."""
+    show_profiler: bool = False
+    """Whether to show the frame profiler overlay."""
+    profile_allocations: bool = False
+    """Whether the profiler traces the memory allocations of each frame, which slows rendering down."""
+
+
+def get_field(state: AppState, path: str) -> object:
+    """Return the value of a (possibly nested) AppState field.
+
+    Args:
+        state: The application state.
+        path: Dotted attribute path, e.g. ``"camera.theta"``.
+    """
+    obj: object = state
+    for name in path.split("."):
+        obj = getattr(obj, name)
+    return obj
+
+
+def set_field(state: AppState, path: str, value: object) -> None:
+    """Set the value of a (possibly nested) AppState field.
+
+    Args:
+        state: The application state.
+        path: Dotted attribute path, e.g. ``"camera.theta"``.
+        value: New value of the field.
+    """
+    *parents, name = path.split(".")
+    obj: object = state
+    for parent in parents:
+        obj = getattr(obj, parent)
+    setattr(obj, name, value)
+
+
+@functools.cache
+def _field_types(cls: type) -> dict[str, object]:
+    """Return the resolved annotations of a dataclass' fields."""
+    return typing.get_type_hints(cls)
+
+
+def check_field(path: str, value: object) -> None:
+    """Check that a value is one the control panel allows for a field.
+
+    Args:
+        path: Dotted attribute path, e.g. ``"camera.theta"``.
+        value: Value of the field.
+
+    Raises:
+        ValueError: If the value is not finite, outside FIELD_RANGES or not one of FIELD_CHOICES.
+    """
+    choices = FIELD_CHOICES.get(path)
+    if choices is not None and value not in choices:
+        # The GL constants print as their names; their values are what a client sends
+        allowed = ", ".join(str(int(choice)) if isinstance(choice, int) else str(choice) for choice in choices)
+        msg = f"Invalid value for {path}: {value!r}, expected one of {allowed}"
+        raise ValueError(msg)
+    bounds = FIELD_RANGES.get(path)
+    for number in value if isinstance(value, tuple) else (value,):
+        if isinstance(number, float) and not math.isfinite(number):
+            msg = f"Invalid value for {path}: {value!r} is not finite"
+            raise ValueError(msg)
+        if bounds is not None and isinstance(number, (int, float)) and not bounds[0] <= number <= bounds[1]:
+            msg = f"Invalid value for {path}: {value!r} is outside [{bounds[0]}, {bounds[1]}]"
+            raise ValueError(msg)
+
+
+def parse_field(path: str, data: object) -> object:
+    """Convert JSON-compatible data into a valid value of a (possibly nested) AppState field.
+
+    Enumeration fields raise ValueError for unknown members, and so do values
+    the control panel does not allow, see check_field.
+
+    Args:
+        path: Dotted attribute path, e.g. ``"camera.theta"``.
+        data: Value as produced by value_to_json.
+
+    Raises:
+        KeyError: If the path does not name a field.
+        TypeError: If the data does not match the type of the field.
+    """
+    cls: type = AppState
+    hint: object = None
+    for name in path.split("."):
+        if not dataclasses.is_dataclass(cls) or name not in _field_types(cls):
+            raise KeyError(path)
+        hint = _field_types(cls)[name]
+        cls = hint if isinstance(hint, type) else object
+    options = typing.get_args(hint) if isinstance(hint, types.UnionType) else (hint,)
+    if data is None and types.NoneType in options:
+        return None
+    kind = next(option for option in options if option is not types.NoneType)
+    value: object = data
+    if isinstance(kind, type) and issubclass(kind, StrEnum):
+        return kind(data)
+    if dataclasses.is_dataclass(kind) and isinstance(data, dict):
+        return kind(**{name: parse_field(f"{path}.{name}", item) for name, item in data.items()})
+    if typing.get_origin(kind) is tuple and isinstance(data, (list, tuple)):
+        items = typing.get_args(kind)
+        if len(data) != len(items) or not all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in data):
+            msg = f"Invalid value for {path}: {data!r}"
+            raise TypeError(msg)
+        value = tuple(float(v) for v in data)
+    elif kind is float and isinstance(data, (int, float)) and not isinstance(data, bool):
+        value = float(data)
+    elif not (isinstance(kind, type) and isinstance(data, kind) and (kind is bool or not isinstance(data, bool))):
+        msg = f"Invalid value for {path}: {data!r}"
+        raise TypeError(msg)
+    check_field(path, value)
+    return value
+
+
+def value_to_json(value: object) -> object:
+    """Convert the value of an AppState field into JSON-compatible data.
+
+    Args:
+        value: Field value, as returned by get_field.
+    """
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return {f.name: value_to_json(getattr(value, f.name)) for f in dataclasses.fields(value)}
+    if isinstance(value, tuple):
+        return list(value)
+    if isinstance(value, StrEnum):
+        return value.value
+    return value
+
+
+def state_to_dict(state: AppState) -> dict[str, object]:
+    """Convert the state into JSON-compatible data.
+
+    Args:
+        state: The application state.
+    """
+    data = dataclasses.asdict(state)
+    for name, value in data.items():
+        if isinstance(value, tuple):
+            data[name] = list(value)
+        elif isinstance(value, StrEnum):
+            data[name] = value.value
+    return data
+
+
+def state_from_dict(data: Mapping[str, object]) -> AppState:
+    """Create a state from data produced by state_to_dict.
+
+    Fields missing from the data keep their default values.
+
+    Args:
+        data: Mapping of field names to values.
+
+    Raises:
+        ValueError: If the data contains unknown fields.
+    """
+    state = AppState()
+    unknown = data.keys() - {f.name for f in dataclasses.fields(AppState)}
+    if unknown:
+        msg = f"Unknown AppState fields: {', '.join(sorted(unknown))}"
+        raise ValueError(msg)
+    for name, value in data.items():
+        default = getattr(state, name)
+        if isinstance(default, Spherical):
+            converted: object = Spherical(**value)  # type: ignore[arg-type]
+        elif isinstance(default, (tuple, StrEnum)):
+            converted = type(default)(value)  # type: ignore[call-arg]
+        else:
+            converted = value
+        setattr(state, name, converted)
+    return state
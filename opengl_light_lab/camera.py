@@ -0,0 +1,244 @@
+"""Camera view and projection matrices computed with NumPy.
+
+The matrices follow the OpenGL conventions (column vectors, right-handed eye
+space looking down -Z, clip space in [-1, 1]) and are equivalent to the ones
+built by ``gluLookAt``, ``glFrustum`` and ``glOrtho``. They are cached until
+the camera or projection fields of the AppState change, so the fixed-function
+pipeline, shaders, picking and tiled rendering can all share them cheaply.
+"""
+
+from __future__ import annotations
+
+import ctypes
+import math
+from typing import TYPE_CHECKING
+
+import numpy as np
+from OpenGL.GL import GL_MODELVIEW, GL_PROJECTION, glMatrixMode  # type: ignore
+
+# Unwrapped, so that loading a cached matrix allocates nothing
+from OpenGL.raw.GL.VERSION.GL_1_1 import glLoadMatrixf  # type: ignore
+
+from opengl_light_lab.app_state import Projection
+
+if TYPE_CHECKING:
+    from collections.abc import Hashable
+
+    from opengl_light_lab.app_state import AppState
+
+NEAR_PLANE = 0.1
+FAR_PLANE = 100.0
+FULL_WINDOW = (0.0, 1.0, 0.0, 1.0)
+
+
+def frustum_bounds(app_state: AppState, aspect: float) -> tuple[float, float, float, float, float, float]:
+    """Compute the view volume of the current camera projection.
+
+    Args:
+        app_state: The application state holding the projection settings.
+        aspect: Viewport width divided by height.
+
+    Returns:
+        Tuple (left, right, bottom, top, near, far) as taken by glFrustum/glOrtho.
+    """
+    if app_state.camera_projection == Projection.ORTHOGONAL:
+        half_h = app_state.camera_ortho_half_height
+    else:
+        half_h = NEAR_PLANE * math.tan(math.radians(app_state.camera_perspective_fov) / 2.0)
+    half_w = half_h * aspect
+    return (-half_w, +half_w, -half_h, +half_h, NEAR_PLANE, FAR_PLANE)
+
+
+def window_bounds(
+    bounds: tuple[float, float, float, float, float, float], window: tuple[float, float, float, float]
+) -> tuple[float, float, float, float, float, float]:
+    """Restrict a view volume to a sub-rectangle of the view.
+
+    Args:
+        bounds: Tuple (left, right, bottom, top, near, far).
+        window: Sub-rectangle (x0, x1, y0, y1) of the view as fractions in
+            [0, 1], measured from the bottom-left corner.
+    """
+    left, right, bottom, top, near, far = bounds
+    x0, x1, y0, y1 = window
+    width, height = right - left, top - bottom
+    return (left + width * x0, left + width * x1, bottom + height * y0, bottom + height * y1, near, far)
+
+
+def frustum_matrix(  # noqa: PLR0913, PLR0917
+    left: float, right: float, bottom: float, top: float, near: float, far: float
+) -> np.ndarray:
+    """Return the perspective projection matrix built by glFrustum."""
+    return np.array(
+        [
+            [2 * near / (right - left), 0.0, (right + left) / (right - left), 0.0],
+            [0.0, 2 * near / (top - bottom), (top + bottom) / (top - bottom), 0.0],
+            [0.0, 0.0, -(far + near) / (far - near), -2 * far * near / (far - near)],
+            [0.0, 0.0, -1.0, 0.0],
+        ],
+        dtype=np.float32,
+    )
+
+
+def ortho_matrix(  # noqa: PLR0913, PLR0917
+    left: float, right: float, bottom: float, top: float, near: float, far: float
+) -> np.ndarray:
+    """Return the orthographic projection matrix built by glOrtho."""
+    return np.array(
+        [
+            [2 / (right - left), 0.0, 0.0, -(right + left) / (right - left)],
+            [0.0, 2 / (top - bottom), 0.0, -(top + bottom) / (top - bottom)],
+            [0.0, 0.0, -2 / (far - near), -(far + near) / (far - near)],
+            [0.0, 0.0, 0.0, 1.0],
+        ],
+        dtype=np.float32,
+    )
+
+
+def look_at(eye: np.ndarray, target: np.ndarray, up: np.ndarray) -> np.ndarray:
+    """Return the view matrix built by gluLookAt.
+
+    Args:
+        eye: Camera position.
+        target: Point the camera looks at.
+        up: Up direction; need not be normalized or orthogonal to the view direction.
+    """
+    forward = target - eye
+    forward /= np.linalg.norm(forward)
+    side = np.cross(forward, up)
+    side /= np.linalg.norm(side)
+    true_up = np.cross(side, forward)
+    view = np.identity(4, dtype=np.float32)
+    view[0, :3], view[1, :3], view[2, :3] = side, true_up, -forward
+    view[:3, 3] = -view[:3, :3] @ eye
+    return view
+
+
+def translation_matrix(x: float, y: float, z: float) -> np.ndarray:
+    """Return the matrix built by glTranslatef."""
+    matrix = np.identity(4, dtype=np.float32)
+    matrix[:3, 3] = (x, y, z)
+    return matrix
+
+
+def rotation_matrix(angle: float, x: float, y: float, z: float) -> np.ndarray:
+    """Return the matrix built by glRotatef.
+
+    Args:
+        angle: Rotation angle in degrees.
+        x: X component of the rotation axis.
+        y: Y component of the rotation axis.
+        z: Z component of the rotation axis.
+    """
+    axis = np.array([x, y, z], dtype=np.float64)
+    axis /= np.linalg.norm(axis)
+    radians = math.radians(angle)
+    cross = np.array([[0.0, -axis[2], axis[1]], [axis[2], 0.0, -axis[0]], [-axis[1], axis[0], 0.0]])
+    matrix = np.identity(4, dtype=np.float32)
+    matrix[:3, :3] = np.identity(3) + math.sin(radians) * cross + (1 - math.cos(radians)) * cross @ cross
+    return matrix
+
+
+class Camera:
+    """Cached view and projection matrices of the AppState camera.
+
+    Matrices are stored column-major, ready for ``glLoadMatrixf``; the
+    ``*_matrix`` methods return row-major views of them for NumPy use. The
+    returned arrays are shared with the cache and must not be modified.
+    While the camera does not change, no method allocates memory.
+
+    Attributes:
+        version: Incremented whenever the view-projection matrix changes, for
+            caches keyed on it.
+    """
+
+    def __init__(self, app_state: AppState) -> None:
+        """Initialize the camera.
+
+        Args:
+            app_state: The application state holding the camera settings.
+        """
+        self.app_state = app_state
+        self._view_key: Hashable = None
+        self._view_gl = np.identity(4, dtype=np.float32)
+        self._view = self._view_gl.T
+        self._projection_key: Hashable = None
+        self._projection_gl = np.identity(4, dtype=np.float32)
+        self._projection = self._projection_gl.T
+        # Passed to OpenGL instead of the arrays, whose conversion allocates
+        self._view_pointer = ctypes.c_void_p(self._view_gl.ctypes.data)
+        self._projection_pointer = ctypes.c_void_p(self._projection_gl.ctypes.data)
+        self._view_projection = np.identity(4, dtype=np.float32)
+        self._view_projection_stale = True
+        self.version = 0
+
+    @property
+    def eye(self) -> np.ndarray:
+        """Return the camera position in world space."""
+        camera = self.app_state.camera
+        return np.array([camera.x, camera.y, camera.z], dtype=np.float32)
+
+    def view_matrix(self) -> np.ndarray:
+        """Return the world-to-eye matrix looking from the camera at the origin."""
+        camera = self.app_state.camera
+        key = (camera.distance, camera.theta, camera.phi)
+        if key != self._view_key:
+            # Direction of increasing theta (north on the camera sphere) as the up vector
+            up = np.array([
+                -math.sin(camera.theta) * math.cos(camera.phi),
+                math.cos(camera.theta),
+                -math.sin(camera.theta) * math.sin(camera.phi),
+            ])
+            view = look_at(self.eye.astype(np.float64), np.zeros(3), up)
+            np.copyto(self._view_gl, view.T)
+            self._view_key = key
+            self._view_projection_stale = True
+        return self._view
+
+    def projection_matrix(self, aspect: float, window: tuple[float, float, float, float] = FULL_WINDOW) -> np.ndarray:
+        """Return the projection matrix of the current camera settings.
+
+        Args:
+            aspect: Aspect ratio of the full image (width / height).
+            window: Sub-rectangle of the view, see ``window_bounds``.
+        """
+        state = self.app_state
+        key = (state.camera_projection, state.camera_perspective_fov, state.camera_ortho_half_height, aspect, window)
+        if key != self._projection_key:
+            bounds = window_bounds(frustum_bounds(state, aspect), window)
+            if state.camera_projection == Projection.ORTHOGONAL:
+                projection = ortho_matrix(*bounds)
+            else:
+                projection = frustum_matrix(*bounds)
+            np.copyto(self._projection_gl, projection.T)
+            self._projection_key = key
+            self._view_projection_stale = True
+        return self._projection
+
+    def view_projection_matrix(
+        self, aspect: float, window: tuple[float, float, float, float] = FULL_WINDOW
+    ) -> np.ndarray:
+        """Return the world-to-clip matrix, see ``projection_matrix`` for the arguments."""
+        projection, view = self.projection_matrix(aspect, window), self.view_matrix()
+        if self._view_projection_stale:
+            np.matmul(projection, view, out=self._view_projection)
+            self._view_projection_stale = False
+            self.version += 1
+        return self._view_projection
+
+    def load_view(self) -> None:
+        """Load the view matrix into the modelview matrix stack."""
+        self.view_matrix()
+        glMatrixMode(GL_MODELVIEW)
+        glLoadMatrixf(self._view_pointer)
+
+    def load_projection(self, aspect: float, window: tuple[float, float, float, float] = FULL_WINDOW) -> None:
+        """Load the projection matrix into the projection matrix stack.
+
+        Args:
+            aspect: Aspect ratio of the full image (width / height).
+            window: Sub-rectangle of the view, see ``window_bounds``.
+        """
+        self.projection_matrix(aspect, window)
+        glMatrixMode(GL_PROJECTION)
+        glLoadMatrixf(self._projection_pointer)
@@ -1,14 +1,17 @@
 from pathlib import Path
-from typing import TYPE_CHECKING, cast
+from typing import cast
 
 from OpenGL.GL import GL_CONSTANT_ATTENUATION, GL_LINEAR_ATTENUATION, GL_QUADRATIC_ATTENUATION  # type: ignore
 from PySide6 import QtCore, QtGui, QtWidgets
 
 from opengl_light_lab import AppState, Projection
-from opengl_light_lab.app_state import LightType
-
-if TYPE_CHECKING:
-    from opengl_light_lab.main_window import MainWindow
+from opengl_light_lab.app_state import FIELD_RANGES, SHADOW_MAP_SIZES, LightType, SceneObject
+from opengl_light_lab.history import UndoHistory
+from opengl_light_lab.materials import COLOR_KEYS, MaterialLibrary
+from opengl_light_lab.mesh_io import MESH_SUFFIXES
+from opengl_light_lab.procedural_textures import PATTERNS, SCHEME
+from opengl_light_lab.texture_formats import COMPRESSED_SUFFIXES
+from opengl_light_lab.update_coalescer import PROJECTION_FIELDS, UpdateCoalescer
 
 
 class ControlPanel(QtWidgets.QDockWidget):
@@ -19,15 +22,30 @@ class ControlPanel(QtWidgets.QDockWidget):
     updates the GLWidget.
     """
 
-    def __init__(self, parent: QtWidgets.QWidget | None, app_state: AppState) -> None:  # noqa: PLR0914
+    def __init__(  # noqa: PLR0914
+        self,
+        parent: QtWidgets.QWidget | None,
+        app_state: AppState,
+        history: UndoHistory | None = None,
+        updates: UpdateCoalescer | None = None,
+        materials: MaterialLibrary | None = None,
+    ) -> None:
         """Initialize the control panel.
 
         Args:
             parent: The parent widget.
             app_state: The shared application state object.
+            history: Undo history recording the edits, or None for a private one.
+            updates: Coalescer batching the edits per frame; it must be flushed
+                by the GLWidget sharing it. None creates a private one.
+            materials: Material library of the rendered scene (GLWidget.materials),
+                edited in place by the material controls. None loads a private one.
         """
         super().__init__("Controls", parent)
         self.app_state = app_state
+        self.history = history if history is not None else UndoHistory(app_state)
+        self.updates = updates if updates is not None else UpdateCoalescer(app_state, self.history)
+        self.materials = materials if materials is not None else MaterialLibrary.load()
 
         # Make the dock widget non-closable but allow floating
         self.setFeatures(
@@ -54,11 +72,35 @@ class ControlPanel(QtWidgets.QDockWidget):
         self.auto_rotate_cb.stateChanged.connect(self._on_auto_rotate_changed)
         scene_layout.addWidget(self.auto_rotate_cb)
 
+        self.quad_view_cb = QtWidgets.QCheckBox("Quad View (Top / Front / Right)")
+        self.quad_view_cb.setChecked(self.app_state.quad_view)
+        self.quad_view_cb.stateChanged.connect(self._on_quad_view_changed)
+        scene_layout.addWidget(self.quad_view_cb)
+
         self.show_axis_cb = QtWidgets.QCheckBox("Show Coordinate Axes")
         self.show_axis_cb.setChecked(self.app_state.show_axis)
         self.show_axis_cb.stateChanged.connect(self._on_show_axis_changed)
         scene_layout.addWidget(self.show_axis_cb)
 
+        self.axis_ticks_cb = QtWidgets.QCheckBox("Axis Tick Marks")
+        self.axis_ticks_cb.setChecked(self.app_state.show_axis_ticks)
+        self.axis_ticks_cb.stateChanged.connect(self._on_axis_ticks_changed)
+        scene_layout.addWidget(self.axis_ticks_cb)
+
+        self.grid_cb = QtWidgets.QCheckBox("Ground Grid")
+        self.grid_cb.setChecked(self.app_state.show_grid)
+        self.grid_cb.stateChanged.connect(self._on_grid_changed)
+        scene_layout.addWidget(self.grid_cb)
+
+        self.axis_extent_spin = QtWidgets.QSpinBox()
+        self.axis_extent_spin.setRange(*FIELD_RANGES["axis_extent"])
+        self.axis_extent_spin.setValue(self.app_state.axis_extent)
+        self.axis_extent_spin.valueChanged.connect(self._on_axis_extent_changed)
+        axis_extent_layout = QtWidgets.QHBoxLayout()
+        axis_extent_layout.addWidget(QtWidgets.QLabel("Axis Extent:"))
+        axis_extent_layout.addWidget(self.axis_extent_spin)
+        scene_layout.addLayout(axis_extent_layout)
+
         self.show_light_cb = QtWidgets.QCheckBox("Show Light Marker")
         self.show_light_cb.setChecked(self.app_state.show_light_position)
         self.show_light_cb.stateChanged.connect(self._on_show_light_changed)
@@ -96,7 +138,7 @@ class ControlPanel(QtWidgets.QDockWidget):
 
         # Camera distance
         self.camera_distance_spin = QtWidgets.QDoubleSpinBox()
-        self.camera_distance_spin.setRange(0.1, 50.0)
+        self.camera_distance_spin.setRange(*FIELD_RANGES["camera.distance"])
         self.camera_distance_spin.setSingleStep(0.1)
         self.camera_distance_spin.setValue(self.app_state.camera.distance)
         self.camera_distance_spin.valueChanged.connect(self._on_camera_distance_changed)
@@ -104,7 +146,7 @@ class ControlPanel(QtWidgets.QDockWidget):
 
         # Camera theta
         self.camera_theta_spin = QtWidgets.QDoubleSpinBox()
-        self.camera_theta_spin.setRange(-10.0, 10.0)
+        self.camera_theta_spin.setRange(*FIELD_RANGES["camera.theta"])
         self.camera_theta_spin.setSingleStep(0.1)
         self.camera_theta_spin.setValue(self.app_state.camera.theta)
         self.camera_theta_spin.valueChanged.connect(self._on_camera_theta_changed)
@@ -112,7 +154,7 @@ class ControlPanel(QtWidgets.QDockWidget):
 
         # Camera phi
         self.camera_phi_spin = QtWidgets.QDoubleSpinBox()
-        self.camera_phi_spin.setRange(-10.0, 10.0)
+        self.camera_phi_spin.setRange(*FIELD_RANGES["camera.phi"])
         self.camera_phi_spin.setSingleStep(0.1)
         self.camera_phi_spin.setValue(self.app_state.camera.phi)
         self.camera_phi_spin.valueChanged.connect(self._on_camera_phi_changed)
@@ -120,7 +162,7 @@ class ControlPanel(QtWidgets.QDockWidget):
 
         # Perspective FOV
         self.fov_spin = QtWidgets.QDoubleSpinBox()
-        self.fov_spin.setRange(10.0, 120.0)
+        self.fov_spin.setRange(*FIELD_RANGES["camera_perspective_fov"])
         self.fov_spin.setSingleStep(1.0)
         self.fov_spin.setValue(self.app_state.camera_perspective_fov)
         self.fov_spin.valueChanged.connect(self._on_fov_changed)
@@ -128,7 +170,7 @@ class ControlPanel(QtWidgets.QDockWidget):
 
         # Ortho half height
         self.ortho_height_spin = QtWidgets.QDoubleSpinBox()
-        self.ortho_height_spin.setRange(0.01, 10.0)
+        self.ortho_height_spin.setRange(*FIELD_RANGES["camera_ortho_half_height"])
         self.ortho_height_spin.setSingleStep(0.1)
         self.ortho_height_spin.setValue(self.app_state.camera_ortho_half_height)
         self.ortho_height_spin.valueChanged.connect(self._on_ortho_height_changed)
@@ -155,19 +197,19 @@ class ControlPanel(QtWidgets.QDockWidget):
         # Position controls (for point light)
         self._pos_label = QtWidgets.QLabel("Position:")
         self.pos_x_spin = QtWidgets.QDoubleSpinBox()
-        self.pos_x_spin.setRange(-10.0, 10.0)
+        self.pos_x_spin.setRange(*FIELD_RANGES["light_position"])
         self.pos_x_spin.setSingleStep(0.1)
         self.pos_x_spin.setValue(self.app_state.light_position[0])
         self.pos_x_spin.valueChanged.connect(self._on_pos_x_changed)
 
         self.pos_y_spin = QtWidgets.QDoubleSpinBox()
-        self.pos_y_spin.setRange(-10.0, 10.0)
+        self.pos_y_spin.setRange(*FIELD_RANGES["light_position"])
         self.pos_y_spin.setSingleStep(0.1)
         self.pos_y_spin.setValue(self.app_state.light_position[1])
         self.pos_y_spin.valueChanged.connect(self._on_pos_y_changed)
 
         self.pos_z_spin = QtWidgets.QDoubleSpinBox()
-        self.pos_z_spin.setRange(-10.0, 10.0)
+        self.pos_z_spin.setRange(*FIELD_RANGES["light_position"])
         self.pos_z_spin.setSingleStep(0.1)
         self.pos_z_spin.setValue(self.app_state.light_position[2])
         self.pos_z_spin.valueChanged.connect(self._on_pos_z_changed)
@@ -186,19 +228,19 @@ class ControlPanel(QtWidgets.QDockWidget):
         # Direction controls (for directional light)
         self._dir_label = QtWidgets.QLabel("Direction:")
         self.dir_x_spin = QtWidgets.QDoubleSpinBox()
-        self.dir_x_spin.setRange(-10.0, 10.0)
+        self.dir_x_spin.setRange(*FIELD_RANGES["light_direction"])
         self.dir_x_spin.setSingleStep(0.1)
         self.dir_x_spin.setValue(self.app_state.light_direction[0])
         self.dir_x_spin.valueChanged.connect(self._on_dir_x_changed)
 
         self.dir_y_spin = QtWidgets.QDoubleSpinBox()
-        self.dir_y_spin.setRange(-10.0, 10.0)
+        self.dir_y_spin.setRange(*FIELD_RANGES["light_direction"])
         self.dir_y_spin.setSingleStep(0.1)
         self.dir_y_spin.setValue(self.app_state.light_direction[1])
         self.dir_y_spin.valueChanged.connect(self._on_dir_y_changed)
 
         self.dir_z_spin = QtWidgets.QDoubleSpinBox()
-        self.dir_z_spin.setRange(-10.0, 10.0)
+        self.dir_z_spin.setRange(*FIELD_RANGES["light_direction"])
         self.dir_z_spin.setSingleStep(0.1)
         self.dir_z_spin.setValue(self.app_state.light_direction[2])
         self.dir_z_spin.valueChanged.connect(self._on_dir_z_changed)
@@ -229,7 +271,7 @@ class ControlPanel(QtWidgets.QDockWidget):
         self.atten_mode_combo.currentIndexChanged.connect(self._on_attenuation_mode_changed)
 
         self.atten_value_spin = QtWidgets.QDoubleSpinBox()
-        self.atten_value_spin.setRange(0.0, 10.0)
+        self.atten_value_spin.setRange(*FIELD_RANGES["light_attenuation_value"])
         self.atten_value_spin.setSingleStep(0.01)
         self.atten_value_spin.setDecimals(3)
         self.atten_value_spin.setValue(self.app_state.light_attenuation_value)
@@ -276,6 +318,18 @@ class ControlPanel(QtWidgets.QDockWidget):
         self.two_side_cb.stateChanged.connect(self._on_two_side_changed)
         light_props_layout.addRow("", self.two_side_cb)
 
+        self.shadows_cb = QtWidgets.QCheckBox("Cast Shadows")
+        self.shadows_cb.setChecked(self.app_state.shadows_enabled)
+        self.shadows_cb.stateChanged.connect(self._on_shadows_changed)
+        light_props_layout.addRow("", self.shadows_cb)
+
+        self.shadow_size_combo = QtWidgets.QComboBox()
+        for size in SHADOW_MAP_SIZES:
+            self.shadow_size_combo.addItem(f"{size} x {size}", size)
+        self.shadow_size_combo.setCurrentIndex(self.shadow_size_combo.findData(self.app_state.shadow_map_size))
+        self.shadow_size_combo.currentIndexChanged.connect(self._on_shadow_size_changed)
+        light_props_layout.addRow("Shadow Map:", self.shadow_size_combo)
+
         light_props_group.setLayout(light_props_layout)
         layout.addWidget(light_props_group)
 
@@ -284,7 +338,7 @@ class ControlPanel(QtWidgets.QDockWidget):
         objects_layout = QtWidgets.QFormLayout()
 
         self.cube_distance_spin = QtWidgets.QDoubleSpinBox()
-        self.cube_distance_spin.setRange(0.0, 10.0)
+        self.cube_distance_spin.setRange(*FIELD_RANGES["cube_distance"])
         self.cube_distance_spin.setSingleStep(0.1)
         self.cube_distance_spin.setValue(self.app_state.cube_distance)
         self.cube_distance_spin.valueChanged.connect(self._on_cube_distance_changed)
@@ -296,17 +350,60 @@ class ControlPanel(QtWidgets.QDockWidget):
         self.texture_combo.currentIndexChanged.connect(self._on_texture_changed)
         objects_layout.addRow("Center Cube Texture:", self.texture_combo)
 
+        self.mesh_label = QtWidgets.QLabel()
+        mesh_open_btn = QtWidgets.QPushButton("Open...")
+        mesh_open_btn.clicked.connect(self._open_mesh)
+        mesh_cube_btn = QtWidgets.QPushButton("Cube")
+        mesh_cube_btn.clicked.connect(self._reset_mesh)
+        mesh_layout = QtWidgets.QHBoxLayout()
+        mesh_layout.addWidget(self.mesh_label, 1)
+        mesh_layout.addWidget(mesh_open_btn)
+        mesh_layout.addWidget(mesh_cube_btn)
+        objects_layout.addRow("Center Object:", mesh_layout)
+        self._show_current_mesh()
+
         objects_group.setLayout(objects_layout)
         layout.addWidget(objects_group)
 
+        # ===== Materials Section =====
+        materials_group = QtWidgets.QGroupBox("Materials")
+        materials_layout = QtWidgets.QFormLayout()
+
+        # One entry per object, plus the material the object switches to while a texture is loaded
+        self.material_object_combo = QtWidgets.QComboBox()
+        for obj in SceneObject:
+            label = obj.value.replace("_", " ").title()
+            for textured, suffix in ((False, ""), (True, ", textured")):
+                index = self.materials.for_object(obj, textured=textured)
+                if not textured or index != self.materials.for_object(obj):
+                    self.material_object_combo.addItem(f"{label}{suffix} ({self.materials.names[index]})", index)
+        self.material_object_combo.currentIndexChanged.connect(self._refresh_material_controls)
+        materials_layout.addRow("Object:", self.material_object_combo)
+
+        self.material_color_btns: dict[str, QtWidgets.QPushButton] = {}
+        for key in COLOR_KEYS:
+            btn = QtWidgets.QPushButton("Pick")
+            btn.clicked.connect(lambda _checked=False, key=key: self._pick_material_color(key))
+            self.material_color_btns[key] = btn
+            materials_layout.addRow(f"{key.capitalize()} Color:", btn)
+
+        self.shininess_slider = QtWidgets.QSlider(QtCore.Qt.Orientation.Horizontal)
+        self.shininess_slider.setRange(0, 128)
+        self.shininess_slider.valueChanged.connect(self._on_shininess_changed)
+        self.shininess_label = QtWidgets.QLabel()
+        shininess_layout = QtWidgets.QHBoxLayout()
+        shininess_layout.addWidget(self.shininess_slider)
+        shininess_layout.addWidget(self.shininess_label)
+        materials_layout.addRow("Shininess:", shininess_layout)
+
+        materials_group.setLayout(materials_layout)
+        layout.addWidget(materials_group)
+        self._refresh_material_controls()
+        # Edits made elsewhere (e.g. a second panel) refresh the controls when they happen
+        self.materials.add_listener(self._on_material_changed)
+
         # Initial visibility based on light type
-        is_point = self.app_state.light_type == LightType.POINT
-        self._pos_label.setVisible(is_point)
-        self._pos_widget.setVisible(is_point)
-        self._dir_label.setVisible(not is_point)
-        self._dir_widget.setVisible(not is_point)
-        self._atten_label.setVisible(is_point)
-        self._atten_widget.setVisible(is_point)
+        self._update_light_type_visibility()
 
         # Add stretch to push everything to the top
         layout.addStretch()
@@ -326,111 +423,125 @@ class ControlPanel(QtWidgets.QDockWidget):
 
     def _on_lighting_changed(self, state: int) -> None:
         """Handle lighting enabled checkbox state change."""
-        self.app_state.lighting_enabled = bool(state)
+        self.updates.set("lighting_enabled", bool(state))
 
     def _on_depth_test_changed(self, state: int) -> None:
         """Handle depth test enabled checkbox state change."""
-        self.app_state.depth_test = bool(state)
+        self.updates.set("depth_test", bool(state))
+
+    def _on_quad_view_changed(self, state: int) -> None:
+        """Handle quad view checkbox state change."""
+        self.updates.set("quad_view", bool(state))
 
     def _on_show_axis_changed(self, state: int) -> None:
         """Handle show axis checkbox state change."""
-        self.app_state.show_axis = bool(state)
+        self.updates.set("show_axis", bool(state))
+
+    def _on_axis_ticks_changed(self, state: int) -> None:
+        """Handle axis tick marks checkbox state change."""
+        self.updates.set("show_axis_ticks", bool(state))
+
+    def _on_grid_changed(self, state: int) -> None:
+        """Handle ground grid checkbox state change."""
+        self.updates.set("show_grid", bool(state))
+
+    def _on_axis_extent_changed(self, value: int) -> None:
+        """Handle axis extent spinbox change."""
+        self.updates.set("axis_extent", value, group="axis_extent_spin")
 
     def _on_show_light_changed(self, state: int) -> None:
         """Handle show light marker checkbox state change."""
-        self.app_state.show_light_position = bool(state)
+        self.updates.set("show_light_position", bool(state))
 
     def _on_auto_rotate_changed(self, state: int) -> None:
         """Handle auto-rotate checkbox state change."""
-        self.app_state.auto_rotate = bool(state)
+        self.updates.set("auto_rotate", bool(state))
 
     def _on_projection_changed(self, checked: bool) -> None:
         """Handle projection type radio button toggle."""
-        if checked:
-            self.app_state.camera_projection = Projection.PERSPECTIVE
-        else:
-            self.app_state.camera_projection = Projection.ORTHOGONAL
-        # Notify parent to resize GL viewport
-        if self.parent():
-            self.parent().on_projection_changed()  # type: ignore
+        self.updates.set("camera_projection", Projection.PERSPECTIVE if checked else Projection.ORTHOGONAL)
 
     def _on_camera_distance_changed(self, value: float) -> None:
         """Handle camera distance spinbox change."""
-        self.app_state.camera.distance = value
+        self.updates.set("camera.distance", value, group="camera_distance_spin")
 
     def _on_camera_theta_changed(self, value: float) -> None:
         """Handle camera theta spinbox change."""
-        self.app_state.camera.theta = value
+        self.updates.set("camera.theta", value, group="camera_theta_spin")
 
     def _on_camera_phi_changed(self, value: float) -> None:
         """Handle camera phi spinbox change."""
-        self.app_state.camera.phi = value
+        self.updates.set("camera.phi", value, group="camera_phi_spin")
 
     def _on_fov_changed(self, value: float) -> None:
         """Handle perspective FOV spinbox change."""
-        self.app_state.camera_perspective_fov = value
-        if self.app_state.camera_projection == Projection.PERSPECTIVE and self.parent():
-            cast("MainWindow", self.parent()).on_projection_changed()
+        self.updates.set("camera_perspective_fov", value, group="fov_spin")
 
     def _on_ortho_height_changed(self, value: float) -> None:
         """Handle orthogonal half-height spinbox change."""
-        self.app_state.camera_ortho_half_height = value
-        if self.app_state.camera_projection == Projection.ORTHOGONAL and self.parent():
-            cast("MainWindow", self.parent()).on_projection_changed()
+        self.updates.set("camera_ortho_half_height", value, group="ortho_height_spin")
 
     # Position handlers
     # Position handlers
     def _on_pos_x_changed(self, value: float) -> None:
         """Handle light position X spinbox change."""
-        _x, y, z = self.app_state.light_position
-        self.app_state.light_position = (value, y, z)
+        _x, y, z = cast("tuple[float, float, float]", self.updates.get("light_position"))
+        self.updates.set("light_position", (value, y, z), group="pos_x_spin")
 
     def _on_pos_y_changed(self, value: float) -> None:
         """Handle light position Y spinbox change."""
-        x, _y, z = self.app_state.light_position
-        self.app_state.light_position = (x, value, z)
+        x, _y, z = cast("tuple[float, float, float]", self.updates.get("light_position"))
+        self.updates.set("light_position", (x, value, z), group="pos_y_spin")
 
     def _on_pos_z_changed(self, value: float) -> None:
         """Handle light position Z spinbox change."""
-        x, y, _z = self.app_state.light_position
-        self.app_state.light_position = (x, y, value)
+        x, y, _z = cast("tuple[float, float, float]", self.updates.get("light_position"))
+        self.updates.set("light_position", (x, y, value), group="pos_z_spin")
 
     # Direction handlers
     # Direction handlers
     def _on_dir_x_changed(self, value: float) -> None:
         """Handle light direction X spinbox change."""
-        _dx, dy, dz = self.app_state.light_direction
-        self.app_state.light_direction = (value, dy, dz)
+        _dx, dy, dz = cast("tuple[float, float, float]", self.updates.get("light_direction"))
+        self.updates.set("light_direction", (value, dy, dz), group="dir_x_spin")
 
     def _on_dir_y_changed(self, value: float) -> None:
         """Handle light direction Y spinbox change."""
-        dx, _dy, dz = self.app_state.light_direction
-        self.app_state.light_direction = (dx, value, dz)
+        dx, _dy, dz = cast("tuple[float, float, float]", self.updates.get("light_direction"))
+        self.updates.set("light_direction", (dx, value, dz), group="dir_y_spin")
 
     def _on_dir_z_changed(self, value: float) -> None:
         """Handle light direction Z spinbox change."""
-        dx, dy, _dz = self.app_state.light_direction
-        self.app_state.light_direction = (dx, dy, value)
+        dx, dy, _dz = cast("tuple[float, float, float]", self.updates.get("light_direction"))
+        self.updates.set("light_direction", (dx, dy, value), group="dir_z_spin")
 
     def _on_attenuation_mode_changed(self, index: int) -> None:
         """Handle attenuation mode combo box change."""
-        self.app_state.light_attenuation_mode = self.atten_mode_combo.itemData(index)
+        self.updates.set("light_attenuation_mode", self.atten_mode_combo.itemData(index))
 
     def _on_attenuation_value_changed(self, value: float) -> None:
         """Handle attenuation value spinbox change."""
-        self.app_state.light_attenuation_value = value
+        self.updates.set("light_attenuation_value", value, group="atten_value_spin")
 
     def _on_local_viewer_changed(self, state: int) -> None:
         """Handle local viewer checkbox state change."""
-        self.app_state.light_model_local_viewer = bool(state)
+        self.updates.set("light_model_local_viewer", bool(state))
 
     def _on_two_side_changed(self, state: int) -> None:
         """Handle two-side lighting checkbox state change."""
-        self.app_state.light_model_two_side = bool(state)
+        self.updates.set("light_model_two_side", bool(state))
+
+    def _on_shadows_changed(self, state: int) -> None:
+        """Handle cast shadows checkbox state change."""
+        self.updates.set("shadows_enabled", bool(state))
+
+    def _on_shadow_size_changed(self, index: int) -> None:
+        """Handle shadow map resolution combo box change."""
+        self.updates.set("shadow_map_size", self.shadow_size_combo.itemData(index))
 
     def _on_cube_distance_changed(self, value: float) -> None:
         """Handle side objects distance spinbox change."""
-        self.app_state.cube_distance = value
+        self.updates.set("cube_distance", value, group="cube_distance_spin")
 
     def _populate_texture_combo(self) -> None:
         """Scan textures folder and populate the combo box."""
@@ -441,42 +552,116 @@ class ControlPanel(QtWidgets.QDockWidget):
         self.texture_combo.addItem("(None)")
         self._texture_files["(None)"] = ""
 
-        # Find textures folder relative to this module
-        textures_dir = Path(__file__).parent.parent / "textures"
-        if not textures_dir.exists():
-            return
-
-        # Scan for jpg/jpeg files
-        jpg_files = list(textures_dir.glob("*.jpg")) + list(textures_dir.glob("*.jpeg"))
-        jpg_files.sort()
-
-        current_index = 0
-        for i, jpg_path in enumerate(jpg_files, start=1):
-            # Extract display name (part before underscore)
-            filename = jpg_path.stem  # filename without extension
-            display_name = filename.split("_")[0] if "_" in filename else filename
-
+        # Procedural textures with default parameters
+        for name in PATTERNS:
+            display_name = f"{name.replace('_', ' ').capitalize()} (procedural)"
             self.texture_combo.addItem(display_name)
-            self._texture_files[display_name] = str(jpg_path)
-
-            # Check if this is the currently selected texture
-            if self.app_state.current_texture == str(jpg_path):
-                current_index = i
+            self._texture_files[display_name] = f"{SCHEME}://{name}"
 
-        self.texture_combo.setCurrentIndex(current_index)
+        # Find textures folder relative to this module
+        textures_dir = Path(__file__).parent.parent / "textures"
+        if textures_dir.exists():
+            # Scan for jpg/jpeg files and compressed DDS/KTX2 textures
+            suffixes = (".jpg", ".jpeg", *COMPRESSED_SUFFIXES)
+            texture_paths = sorted(path for path in textures_dir.iterdir() if path.suffix.lower() in suffixes)
+            for texture_path in texture_paths:
+                # Extract display name (part before underscore)
+                filename = texture_path.stem  # filename without extension
+                display_name = filename.split("_")[0] if "_" in filename else filename
+                if texture_path.suffix.lower() in COMPRESSED_SUFFIXES:
+                    display_name += f" ({texture_path.suffix[1:].upper()})"
+
+                self.texture_combo.addItem(display_name)
+                self._texture_files[display_name] = str(texture_path)
+
+        self._select_current_texture()
+
+    def _select_current_texture(self) -> None:
+        """Select the combo box entry of the current texture without emitting signals."""
+        names = [name for name, path in self._texture_files.items() if path == (self.app_state.current_texture or "")]
+        index = self.texture_combo.findText(names[0]) if names else 0
+        self.texture_combo.blockSignals(True)
+        self.texture_combo.setCurrentIndex(max(index, 0))
+        self.texture_combo.blockSignals(False)
 
     def _on_texture_changed(self, _index: int) -> None:
         """Handle texture selection change."""
         display_name = self.texture_combo.currentText()
         texture_path = self._texture_files.get(display_name, "")
-        self.app_state.current_texture = texture_path or None
+        self.updates.set("current_texture", texture_path or None)
+
+    def _show_current_mesh(self) -> None:
+        """Show the file name of the model drawn in place of the center cube."""
+        mesh = self.updates.get("current_mesh")
+        self.mesh_label.setText(Path(mesh).name if isinstance(mesh, str) else "(Cube)")
+
+    def _open_mesh(self) -> None:
+        """Ask for a model file to draw in place of the center cube."""
+        patterns = " ".join(f"*{suffix}" for suffix in MESH_SUFFIXES)
+        path, _ = QtWidgets.QFileDialog.getOpenFileName(self, "Open Model", "", f"Models ({patterns})")
+        if path:
+            self.updates.set("current_mesh", path)
+            self._show_current_mesh()
+
+    def _reset_mesh(self) -> None:
+        """Draw the center cube again instead of a model."""
+        self.updates.set("current_mesh", None)
+        self._show_current_mesh()
+
+    def _selected_material(self) -> int:
+        """Return the row index of the material chosen in the material object combo box."""
+        return cast("int", self.material_object_combo.currentData())
+
+    def _refresh_material_controls(self) -> None:
+        """Show the parameters of the selected material without emitting signals."""
+        material = self.materials.material(self._selected_material())
+        for key, btn in self.material_color_btns.items():
+            self._update_color_button(btn, getattr(material, key)[:3])
+        self.shininess_slider.blockSignals(True)
+        self.shininess_slider.setValue(round(material.shininess))
+        self.shininess_slider.blockSignals(False)
+        self.shininess_label.setText(f"{material.shininess:g}")
+
+    def _on_material_changed(self, index: int) -> None:
+        """Refresh the material controls after an edit of the selected material."""
+        if index == self._selected_material():
+            self._refresh_material_controls()
+
+    def _on_shininess_changed(self, value: int) -> None:
+        """Write the shininess of the selected material into the material table."""
+        self.materials.update(self._selected_material(), shininess=float(value))
+
+    def _pick_material_color(self, key: str) -> None:
+        """Open a color dialog that edits a color of the selected material live.
+
+        Every color the user drags through is written into the material table;
+        cancelling the dialog restores the initial color.
+
+        Args:
+            key: The color to edit, one of COLOR_KEYS.
+        """
+        index = self._selected_material()
+        initial = getattr(self.materials.material(index), key)
+        r, g, b = [int(255 * max(0.0, min(1.0, c))) for c in initial[:3]]
+        dialog = QtWidgets.QColorDialog(QtGui.QColor(r, g, b), self)
+        dialog.setWindowTitle(f"{self.materials.names[index].capitalize()} {key.capitalize()} Color")
+        dialog.setAttribute(QtCore.Qt.WidgetAttribute.WA_DeleteOnClose)
+        dialog.currentColorChanged.connect(
+            lambda color: self.materials.update(index, **{key: (color.redF(), color.greenF(), color.blueF())})
+        )
+        dialog.rejected.connect(lambda: self.materials.update(index, **{key: initial}))
+        dialog.open()
 
     # New light controls handlers
     def _on_light_type_changed(self, index: int) -> None:
         """Handle light type combo box change."""
-        self.app_state.light_type = self.light_type_combo.itemData(index)
+        self.updates.set("light_type", self.light_type_combo.itemData(index))
         # Update visibility/enabled status immediately
-        is_point = self.app_state.light_type == LightType.POINT
+        self._update_light_type_visibility()
+
+    def _update_light_type_visibility(self) -> None:
+        """Show only the controls relevant for the current light type."""
+        is_point = self.updates.get("light_type") == LightType.POINT
         self._pos_label.setVisible(is_point)
         self._pos_widget.setVisible(is_point)
         self._dir_label.setVisible(not is_point)
@@ -484,6 +669,37 @@ class ControlPanel(QtWidgets.QDockWidget):
         self._atten_label.setVisible(is_point)
         self._atten_widget.setVisible(is_point)
 
+    def undo(self) -> None:
+        """Revert the most recent edit and refresh the controls."""
+        self._flush_updates()
+        entry = self.history.undo()
+        if entry is not None:
+            self._on_history_applied(entry.changes)
+
+    def redo(self) -> None:
+        """Re-apply the most recently undone edit and refresh the controls."""
+        self._flush_updates()
+        entry = self.history.redo()
+        if entry is not None:
+            self._on_history_applied(entry.changes)
+
+    def _on_history_applied(self, changes: dict[str, tuple[object, object]]) -> None:
+        """Refresh the controls after an undo/redo step.
+
+        Args:
+            changes: Field changes of the applied history entry.
+        """
+        self._sync_from_app_state()
+        self._select_current_texture()
+        self._show_current_mesh()
+        if PROJECTION_FIELDS & changes.keys():
+            self.updates.invalidate_projection()
+
+    def _flush_updates(self) -> None:
+        """Apply the pending edits so the history sees them before undo/redo."""
+        if self.updates.flush():
+            self.updates.invalidate_projection()
+
     def _sync_from_app_state(self) -> None:
         """Synchronize UI controls with current app state.
 
@@ -491,7 +707,8 @@ class ControlPanel(QtWidgets.QDockWidget):
         changes made to the app state from external sources. Uses signal
         blocking to prevent triggering change handlers during sync.
         """
-        if self._updating_from_state:
+        # Pending edits are newer than the state; syncing now would revert the controls
+        if self._updating_from_state or self.updates.has_pending:
             return
 
         self._updating_from_state = True
@@ -529,11 +746,31 @@ class ControlPanel(QtWidgets.QDockWidget):
                 self.depth_test_cb.setChecked(self.app_state.depth_test)
                 self.depth_test_cb.blockSignals(False)
 
+            if self.quad_view_cb.isChecked() != self.app_state.quad_view:
+                self.quad_view_cb.blockSignals(True)
+                self.quad_view_cb.setChecked(self.app_state.quad_view)
+                self.quad_view_cb.blockSignals(False)
+
             if self.show_axis_cb.isChecked() != self.app_state.show_axis:
                 self.show_axis_cb.blockSignals(True)
                 self.show_axis_cb.setChecked(self.app_state.show_axis)
                 self.show_axis_cb.blockSignals(False)
 
+            if self.axis_ticks_cb.isChecked() != self.app_state.show_axis_ticks:
+                self.axis_ticks_cb.blockSignals(True)
+                self.axis_ticks_cb.setChecked(self.app_state.show_axis_ticks)
+                self.axis_ticks_cb.blockSignals(False)
+
+            if self.grid_cb.isChecked() != self.app_state.show_grid:
+                self.grid_cb.blockSignals(True)
+                self.grid_cb.setChecked(self.app_state.show_grid)
+                self.grid_cb.blockSignals(False)
+
+            if self.axis_extent_spin.value() != self.app_state.axis_extent:
+                self.axis_extent_spin.blockSignals(True)
+                self.axis_extent_spin.setValue(self.app_state.axis_extent)
+                self.axis_extent_spin.blockSignals(False)
+
             if self.show_light_cb.isChecked() != self.app_state.show_light_position:
                 self.show_light_cb.blockSignals(True)
                 self.show_light_cb.setChecked(self.app_state.show_light_position)
@@ -642,6 +879,16 @@ class ControlPanel(QtWidgets.QDockWidget):
                 self.two_side_cb.setChecked(self.app_state.light_model_two_side)
                 self.two_side_cb.blockSignals(False)
 
+            if self.shadows_cb.isChecked() != self.app_state.shadows_enabled:
+                self.shadows_cb.blockSignals(True)
+                self.shadows_cb.setChecked(self.app_state.shadows_enabled)
+                self.shadows_cb.blockSignals(False)
+
+            if self.shadow_size_combo.currentData() != self.app_state.shadow_map_size:
+                self.shadow_size_combo.blockSignals(True)
+                self.shadow_size_combo.setCurrentIndex(self.shadow_size_combo.findData(self.app_state.shadow_map_size))
+                self.shadow_size_combo.blockSignals(False)
+
             # Object spinbox
             if abs(self.cube_distance_spin.value() - self.app_state.cube_distance) > 1e-6:
                 self.cube_distance_spin.blockSignals(True)
@@ -686,19 +933,19 @@ class ControlPanel(QtWidgets.QDockWidget):
         """Open color picker for diffuse color."""
         res = self._pick_color(self.app_state.light_diffuse)
         if res is not None:
-            self.app_state.light_diffuse = res
+            self.updates.set("light_diffuse", res)
             self._update_color_button(self.diffuse_btn, res)
 
     def _pick_ambient(self) -> None:
         """Open color picker for ambient color."""
         res = self._pick_color(self.app_state.light_ambient)
         if res is not None:
-            self.app_state.light_ambient = res
+            self.updates.set("light_ambient", res)
             self._update_color_button(self.ambient_btn, res)
 
     def _pick_specular(self) -> None:
         """Open color picker for specular color."""
         res = self._pick_color(self.app_state.light_specular)
         if res is not None:
-            self.app_state.light_specular = res
+            self.updates.set("light_specular", res)
             self._update_color_button(self.specular_btn, res)
@@ -0,0 +1,283 @@
+"""View-frustum culling of scene objects with a bounding volume hierarchy.
+
+Every object has a bounding sphere and an axis-aligned box computed once from
+its mesh in object space. Each frame they are transformed to world space with
+the object matrices, the hierarchy is refitted to the moved boxes (and rebuilt
+only when refitting has loosened it too much), and the frustum planes extracted
+from the view-projection matrix are tested against whole levels of the
+hierarchy at once with NumPy.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+
+LEAF_SIZE = 4
+"""Maximum number of objects in a leaf of the hierarchy."""
+REBUILD_RATIO = 2.0
+"""Rebuild the hierarchy when refitting grows its total node area by this factor."""
+
+
+@dataclass
+class MeshBounds:
+    """Object-space bounds of meshes.
+
+    Attributes:
+        box_min: Minimum box corners, shape (n, 3).
+        box_max: Maximum box corners, shape (n, 3).
+        center: Bounding sphere centers, shape (n, 3).
+        radius: Bounding sphere radii, shape (n,).
+    """
+
+    box_min: np.ndarray
+    box_max: np.ndarray
+    center: np.ndarray
+    radius: np.ndarray
+
+    @classmethod
+    def from_meshes(cls, meshes: list[np.ndarray]) -> MeshBounds:
+        """Compute the bounds of meshes given as vertex arrays of any shape (..., 3)."""
+        points = [mesh.reshape(-1, 3).astype(np.float64) for mesh in meshes]
+        box_min = np.array([p.min(axis=0) for p in points])
+        box_max = np.array([p.max(axis=0) for p in points])
+        center = (box_min + box_max) / 2
+        radius = np.array([np.linalg.norm(p - c, axis=1).max() for p, c in zip(points, center, strict=True)])
+        return cls(box_min, box_max, center, radius)
+
+    def transformed(self, matrices: np.ndarray) -> MeshBounds:
+        """Return world-space bounds enclosing the meshes moved by model matrices.
+
+        Args:
+            matrices: Object-to-world matrices, shape (n, 4, 4).
+        """
+        linear, offset = matrices[:, :3, :3], matrices[:, :3, 3]
+        box_center = np.einsum("nij,nj->ni", linear, (self.box_min + self.box_max) / 2) + offset
+        # Extent of the transformed box along each world axis (Arvo)
+        extent = np.einsum("nij,nj->ni", np.abs(linear), (self.box_max - self.box_min) / 2)
+        center = np.einsum("nij,nj->ni", linear, self.center) + offset
+        scale = np.linalg.norm(linear, axis=1).max(axis=1)
+        return MeshBounds(box_center - extent, box_center + extent, center, self.radius * scale)
+
+
+def frustum_planes(view_projection: np.ndarray) -> np.ndarray:
+    """Extract the world-space frustum planes from a view-projection matrix.
+
+    Works for perspective and orthographic projections alike.
+
+    Args:
+        view_projection: Matrix mapping world to clip space, shape (4, 4).
+
+    Returns:
+        Array of shape (6, 4) with planes (a, b, c, d) whose normals point
+        inside, normalized so that ``a*x + b*y + c*z + d`` is a distance.
+    """
+    m = view_projection.astype(np.float64)
+    planes = np.stack([m[3] + m[0], m[3] - m[0], m[3] + m[1], m[3] - m[1], m[3] + m[2], m[3] - m[2]])
+    return planes / np.linalg.norm(planes[:, :3], axis=1, keepdims=True)
+
+
+def classify_boxes(planes: np.ndarray, box_min: np.ndarray, box_max: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Classify boxes against the frustum.
+
+    Args:
+        planes: Frustum planes from frustum_planes.
+        box_min: Minimum box corners, shape (n, 3).
+        box_max: Maximum box corners, shape (n, 3).
+
+    Returns:
+        Boolean masks (outside, inside) of shape (n,); boxes in neither
+        intersect the frustum boundary.
+    """
+    normals, offsets = planes[:, :3], planes[:, 3]
+    positive = normals >= 0
+    # Per box and plane, the corner furthest along the plane normal and the one opposite to it
+    far_corner = np.where(positive, box_max[:, None, :], box_min[:, None, :])
+    near_corner = np.where(positive, box_min[:, None, :], box_max[:, None, :])
+    outside = ((far_corner * normals).sum(axis=2) + offsets < 0).any(axis=1)
+    inside = ((near_corner * normals).sum(axis=2) + offsets >= 0).all(axis=1)
+    return outside, inside
+
+
+def spheres_outside(planes: np.ndarray, center: np.ndarray, radius: np.ndarray) -> np.ndarray:
+    """Return a mask of the spheres lying entirely outside the frustum."""
+    return (center @ planes[:, :3].T + planes[:, 3] < -radius[:, None]).any(axis=1)
+
+
+class BoundingVolumeHierarchy:
+    """Binary tree of axis-aligned boxes over a fixed set of objects.
+
+    Nodes are stored in flat arrays in depth-first order; every node covers a
+    contiguous range of ``order``, the object indices sorted by the build.
+    """
+
+    def __init__(self, box_min: np.ndarray, box_max: np.ndarray, leaf_size: int = LEAF_SIZE) -> None:
+        """Build the hierarchy.
+
+        Args:
+            box_min: Minimum object box corners, shape (n, 3).
+            box_max: Maximum object box corners, shape (n, 3).
+            leaf_size: Maximum number of objects in a leaf.
+        """
+        self.leaf_size = leaf_size
+        self.build(box_min, box_max)
+
+    def build(self, box_min: np.ndarray, box_max: np.ndarray) -> None:
+        """Rebuild the tree from scratch by median splits along the longest axis."""
+        self.order = np.arange(len(box_min))
+        centers = (box_min + box_max) / 2
+        starts: list[int] = []
+        counts: list[int] = []
+        children: list[list[int]] = []
+        depths: list[int] = []
+        stack = [(0, len(box_min), -1, 0)]
+        while stack:
+            begin, end, parent, side = stack.pop()
+            node = len(starts)
+            starts.append(begin)
+            counts.append(end - begin)
+            children.append([-1, -1])
+            depths.append(depths[parent] + 1 if parent >= 0 else 0)
+            if parent >= 0:
+                children[parent][side] = node
+            if end - begin <= self.leaf_size:
+                continue
+            indices = self.order[begin:end]
+            axis = int(np.argmax(box_max[indices].max(axis=0) - box_min[indices].min(axis=0)))
+            self.order[begin:end] = indices[np.argsort(centers[indices, axis], kind="stable")]
+            middle = (begin + end) // 2
+            # Right pushed first so the left subtree is numbered right after its parent
+            stack.extend([(middle, end, node, 1), (begin, middle, node, 0)])
+        self._children = np.array(children, dtype=np.int64)
+        self._start = np.array(starts, dtype=np.int64)
+        self._count = np.array(counts, dtype=np.int64)
+        self._is_leaf = self._children[:, 0] < 0
+        self._refit_levels = self._internal_levels(np.array(depths))
+        self.node_min = np.empty((len(starts), 3))
+        self.node_max = np.empty((len(starts), 3))
+        self._refit(box_min, box_max)
+        self._built_area = self._total_area()
+
+    def _internal_levels(self, depth: np.ndarray) -> list[np.ndarray]:
+        """Group the internal nodes by depth, deepest first, for a level-wise bottom-up refit."""
+        internal = np.flatnonzero(~self._is_leaf)
+        return [internal[depth[internal] == d] for d in range(int(depth.max()), -1, -1)]
+
+    def _refit(self, box_min: np.ndarray, box_max: np.ndarray) -> None:
+        """Recompute the node boxes bottom-up for moved objects."""
+        ordered_min, ordered_max = box_min[self.order], box_max[self.order]
+        leaves = np.flatnonzero(self._is_leaf)
+        starts = self._start[leaves]
+        self.node_min[leaves] = np.minimum.reduceat(ordered_min, starts, axis=0)
+        self.node_max[leaves] = np.maximum.reduceat(ordered_max, starts, axis=0)
+        for nodes in self._refit_levels:
+            left, right = self._children[nodes, 0], self._children[nodes, 1]
+            self.node_min[nodes] = np.minimum(self.node_min[left], self.node_min[right])
+            self.node_max[nodes] = np.maximum(self.node_max[left], self.node_max[right])
+
+    def _total_area(self) -> float:
+        """Return the summed surface area of all node boxes."""
+        size = self.node_max - self.node_min
+        return float((size[:, 0] * size[:, 1] + size[:, 1] * size[:, 2] + size[:, 2] * size[:, 0]).sum())
+
+    def update(self, box_min: np.ndarray, box_max: np.ndarray) -> bool:
+        """Adapt the tree to moved objects.
+
+        The tree is refitted, and rebuilt if refitting loosened it too much.
+
+        Returns:
+            True if the tree was rebuilt.
+        """
+        if len(box_min) != len(self.order):
+            self.build(box_min, box_max)
+            return True
+        self._refit(box_min, box_max)
+        if self._total_area() > REBUILD_RATIO * max(self._built_area, 1e-12):
+            self.build(box_min, box_max)
+            return True
+        return False
+
+    def _objects_in(self, nodes: np.ndarray) -> np.ndarray:
+        """Return the indices of all objects covered by the given nodes."""
+        if nodes.size == 0:
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate([
+            self.order[s : s + c] for s, c in zip(self._start[nodes], self._count[nodes], strict=True)
+        ])
+
+    def query(self, planes: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Find the objects whose node boxes are not outside the frustum.
+
+        The tree is traversed level by level, classifying all nodes of a level
+        in one vectorized test. Subtrees fully inside are accepted without
+        descending further.
+
+        Returns:
+            Indices of objects (accepted, candidates): accepted ones are inside
+            the frustum; candidates lie in leaves crossing its boundary and
+            need a per-object test.
+        """
+        accepted, candidates = [], []
+        frontier = np.zeros(1, dtype=np.int64)
+        while frontier.size:
+            outside, inside = classify_boxes(planes, self.node_min[frontier], self.node_max[frontier])
+            accepted.append(self._objects_in(frontier[inside]))
+            crossing = frontier[~outside & ~inside]
+            leaf = self._is_leaf[crossing]
+            candidates.append(self._objects_in(crossing[leaf]))
+            frontier = self._children[crossing[~leaf]].ravel()
+        return np.concatenate(accepted), np.concatenate(candidates)
+
+
+class FrustumCuller:
+    """Selects the objects to draw for a view-projection matrix.
+
+    Attributes:
+        world_bounds: World-space bounds of the objects as of the last cull.
+        drawn: Number of objects visible in the last cull.
+        culled: Number of objects rejected in the last cull.
+    """
+
+    def __init__(self, meshes: list[np.ndarray], leaf_size: int = LEAF_SIZE) -> None:
+        """Compute the object-space bounds of the meshes.
+
+        Args:
+            meshes: Vertex arrays of shape (..., 3), one per object.
+            leaf_size: Maximum number of objects in a leaf of the hierarchy.
+        """
+        self.bounds = MeshBounds.from_meshes(meshes)
+        self.leaf_size = leaf_size
+        self.bvh: BoundingVolumeHierarchy | None = None
+        self._matrices: np.ndarray | None = None
+        self.world_bounds = self.bounds
+        self.drawn = 0
+        self.culled = 0
+
+    def cull(self, matrices: np.ndarray, view_projection: np.ndarray) -> np.ndarray:
+        """Return the visibility mask of the objects.
+
+        Args:
+            matrices: Object-to-world matrices, shape (n, 4, 4).
+            view_projection: World-to-clip matrix, shape (4, 4).
+        """
+        if self._matrices is None or not np.array_equal(matrices, self._matrices):
+            self.world_bounds = self.bounds.transformed(matrices)
+            if self.bvh is None:
+                self.bvh = BoundingVolumeHierarchy(self.world_bounds.box_min, self.world_bounds.box_max, self.leaf_size)
+            else:
+                self.bvh.update(self.world_bounds.box_min, self.world_bounds.box_max)
+            self._matrices = matrices.copy()
+
+        planes = frustum_planes(view_projection)
+        accepted, candidates = self.bvh.query(planes)  # type: ignore[union-attr]
+        world = self.world_bounds
+        candidates = candidates[~spheres_outside(planes, world.center[candidates], world.radius[candidates])]
+        outside, _inside = classify_boxes(planes, world.box_min[candidates], world.box_max[candidates])
+
+        visible = np.zeros(len(matrices), dtype=bool)
+        visible[accepted] = True
+        visible[candidates[~outside]] = True
+        self.drawn = int(visible.sum())
+        self.culled = len(visible) - self.drawn
+        return visible
@@ -0,0 +1,228 @@
+"""Reuse of the last rendered frame while the scene does not change.
+
+With ``auto_rotate`` off and no edits, consecutive frames are identical. The
+frame cache keeps the color and depth buffers of the last rendered frame in a
+framebuffer object, keyed by a version of the AppState fields that affect
+the scene image and the viewport size, see FrameKey. When the key of a new
+frame matches, the cached buffers are blitted back instead of rendering the
+scene again; overlays are then drawn on top as usual.
+
+A frame is only copied into the cache once the scene stayed unchanged for a
+frame, so that a continuous change, such as dragging a slider, does not pay
+for a copy per frame that is never restored. While ``auto_rotate`` is on, the
+view does not use the cache at all.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+from typing import TYPE_CHECKING
+
+from OpenGL.GL import (  # type: ignore
+    GL_COLOR_ATTACHMENT0,
+    GL_COLOR_BUFFER_BIT,
+    GL_DEPTH24_STENCIL8,
+    GL_DEPTH_ATTACHMENT,
+    GL_DEPTH_BUFFER_BIT,
+    GL_DEPTH_COMPONENT24,
+    GL_DEPTH_STENCIL_ATTACHMENT,
+    GL_DRAW_FRAMEBUFFER,
+    GL_FRAMEBUFFER,
+    GL_FRAMEBUFFER_ATTACHMENT_OBJECT_TYPE,
+    GL_FRAMEBUFFER_ATTACHMENT_STENCIL_SIZE,
+    GL_FRAMEBUFFER_COMPLETE,
+    GL_NEAREST,
+    GL_NONE,
+    GL_READ_FRAMEBUFFER,
+    GL_RENDERBUFFER,
+    GL_RGBA8,
+    GL_STENCIL_BUFFER_BIT,
+    glBindFramebuffer,
+    glBindRenderbuffer,
+    glBlitFramebuffer,
+    glCheckFramebufferStatus,
+    glDeleteFramebuffers,
+    glDeleteRenderbuffers,
+    glFramebufferRenderbuffer,
+    glGenFramebuffers,
+    glGenRenderbuffers,
+    glGetFramebufferAttachmentParameteriv,
+    glRenderbufferStorage,
+)
+
+from opengl_light_lab.app_state import UNRENDERED_FIELDS
+
+if TYPE_CHECKING:
+    from opengl_light_lab.app_state import AppState
+
+
+class FrameKey:
+    """Key of the scene image of a view: a version advanced whenever it may have changed.
+
+    The AppState fields that affect the scene image, those of nested
+    dataclasses one by one, are compared in place with their values at the
+    previous call, so that checking an unchanged state allocates nothing.
+    """
+
+    def __init__(self, app_state: AppState) -> None:
+        """Initialize the key at version 0.
+
+        Args:
+            app_state: The application state describing the scene.
+        """
+        self.app_state = app_state
+        self.version = 0
+        fields: list[tuple[str, str | None]] = []
+        for f in dataclasses.fields(app_state):
+            value = getattr(app_state, f.name)
+            if f.name in UNRENDERED_FIELDS:
+                continue
+            if dataclasses.is_dataclass(value):
+                fields.extend((f.name, nested.name) for nested in dataclasses.fields(value))
+            else:
+                fields.append((f.name, None))
+        self._fields = tuple(fields)
+        self._values: list[object] = [None] * len(fields)
+        self._width = self._height = -1
+
+    def update(self, width: int, height: int) -> int:
+        """Return the key of the current scene image, advanced if the state or size changed since the last call.
+
+        Args:
+            width: Viewport width in pixels.
+            height: Viewport height in pixels.
+        """
+        state, values = self.app_state, self._values
+        changed = width != self._width or height != self._height
+        self._width, self._height = width, height
+        for index, (name, nested) in enumerate(self._fields):
+            value = getattr(state, name)
+            if nested is not None:
+                value = getattr(value, nested)
+            # Immutable values, kept by reference
+            if value != values[index]:
+                values[index] = value
+                changed = True
+        if changed:
+            self.version += 1
+        return self.version
+
+
+def _stencil_bits(framebuffer: int) -> int:
+    """Return the stencil size of a framebuffer's depth attachment, read from GL_READ_FRAMEBUFFER."""
+    glBindFramebuffer(GL_READ_FRAMEBUFFER, framebuffer)
+    object_type = glGetFramebufferAttachmentParameteriv(
+        GL_READ_FRAMEBUFFER, GL_DEPTH_ATTACHMENT, GL_FRAMEBUFFER_ATTACHMENT_OBJECT_TYPE
+    )
+    if int(object_type) == GL_NONE:
+        return 0
+    return int(
+        glGetFramebufferAttachmentParameteriv(
+            GL_READ_FRAMEBUFFER, GL_DEPTH_ATTACHMENT, GL_FRAMEBUFFER_ATTACHMENT_STENCIL_SIZE
+        )
+    )
+
+
+class FrameCache:
+    """Last rendered frame of a view, stored in a framebuffer object.
+
+    All methods require a current OpenGL context and leave ``GL_FRAMEBUFFER``
+    bound to the view's framebuffer.
+
+    Attributes:
+        hits: Number of frames restored from the cache.
+        misses: Number of frames that had to be rendered.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty cache; OpenGL objects are created on the first store."""
+        self.hits = 0
+        self.misses = 0
+        self._key: int | None = None
+        self._rendered_key: int | None = None
+        self._fbo = 0
+        self._color_rb = 0
+        self._depth_rb = 0
+        self._size = (0, 0)
+        self._buffers = GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT
+
+    def restore(self, key: int, framebuffer: int) -> bool:
+        """Copy the cached frame into a framebuffer if it was stored under the key.
+
+        Args:
+            key: Key of the frame to draw, from FrameKey.update.
+            framebuffer: Framebuffer of the view.
+
+        Returns:
+            True if the cached frame was copied; False if the frame must be rendered.
+        """
+        if key != self._key:
+            self.misses += 1
+            return False
+        self.hits += 1
+        self._blit(self._fbo, framebuffer)
+        return True
+
+    def store(self, key: int, framebuffer: int, width: int, height: int) -> None:
+        """Copy a rendered frame into the cache if the previous rendered frame had the same key.
+
+        Args:
+            key: Key of the rendered frame, from FrameKey.update.
+            framebuffer: Framebuffer of the view holding the frame.
+            width: Frame width in pixels.
+            height: Frame height in pixels.
+        """
+        if key != self._rendered_key:
+            self._rendered_key = key
+            return
+        if self._size != (width, height):
+            self._allocate(framebuffer, width, height)
+        self._key = key if self._fbo else None
+        if self._fbo:
+            self._blit(framebuffer, self._fbo)
+
+    def _allocate(self, framebuffer: int, width: int, height: int) -> None:
+        """(Re)create the cache framebuffer with buffers matching the view's framebuffer."""
+        self.delete()
+        # Depth blits require identical formats; QOpenGLWidget usually has a packed depth-stencil buffer
+        stencil = _stencil_bits(framebuffer) > 0
+        self._buffers = GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT | (GL_STENCIL_BUFFER_BIT if stencil else 0)
+        self._fbo = glGenFramebuffers(1)
+        self._color_rb, self._depth_rb = glGenRenderbuffers(2)
+        glBindRenderbuffer(GL_RENDERBUFFER, self._color_rb)
+        glRenderbufferStorage(GL_RENDERBUFFER, GL_RGBA8, width, height)
+        glBindRenderbuffer(GL_RENDERBUFFER, self._depth_rb)
+        glRenderbufferStorage(GL_RENDERBUFFER, GL_DEPTH24_STENCIL8 if stencil else GL_DEPTH_COMPONENT24, width, height)
+        glBindRenderbuffer(GL_RENDERBUFFER, 0)
+
+        glBindFramebuffer(GL_FRAMEBUFFER, self._fbo)
+        glFramebufferRenderbuffer(GL_FRAMEBUFFER, GL_COLOR_ATTACHMENT0, GL_RENDERBUFFER, self._color_rb)
+        attachment = GL_DEPTH_STENCIL_ATTACHMENT if stencil else GL_DEPTH_ATTACHMENT
+        glFramebufferRenderbuffer(GL_FRAMEBUFFER, attachment, GL_RENDERBUFFER, self._depth_rb)
+        complete = glCheckFramebufferStatus(GL_FRAMEBUFFER) == GL_FRAMEBUFFER_COMPLETE
+        glBindFramebuffer(GL_FRAMEBUFFER, framebuffer)
+        if not complete:
+            # Caching is an optimization only: without a usable framebuffer every frame is rendered
+            self.delete()
+        self._size = (width, height)
+
+    def _blit(self, source: int, target: int) -> None:
+        """Copy the cached buffers between two framebuffers of the cache size."""
+        width, height = self._size
+        glBindFramebuffer(GL_READ_FRAMEBUFFER, source)
+        glBindFramebuffer(GL_DRAW_FRAMEBUFFER, target)
+        glBlitFramebuffer(0, 0, width, height, 0, 0, width, height, self._buffers, GL_NEAREST)
+        glBindFramebuffer(GL_FRAMEBUFFER, target if target != self._fbo else source)
+
+    def invalidate(self) -> None:
+        """Forget the cached frame, e.g. after a change not reflected in the AppState."""
+        self._key = self._rendered_key = None
+
+    def delete(self) -> None:
+        """Free the OpenGL objects and forget the cached frame."""
+        if self._fbo:
+            glDeleteRenderbuffers(2, [self._color_rb, self._depth_rb])
+            glDeleteFramebuffers(1, [self._fbo])
+            self._fbo = 0
+        self._size = (0, 0)
+        self._key = self._rendered_key = None
@@ -0,0 +1,166 @@
+"""Coordinate axes, tick marks and ground grid drawn from a static vertex buffer.
+
+All lines of the gizmo live in one buffer of interleaved positions and colors,
+built when the extent changes. The parts to show are selected with ranges of
+that buffer and drawn with a single ``glMultiDrawArrays`` call.
+"""
+
+from __future__ import annotations
+
+import ctypes
+
+import numpy as np
+from OpenGL.GL import (  # type: ignore
+    GL_ARRAY_BUFFER,
+    GL_COLOR_ARRAY,
+    GL_CURRENT_BIT,
+    GL_FLOAT,
+    GL_LIGHTING,
+    GL_LIGHTING_BIT,
+    GL_LINE_BIT,
+    GL_LINES,
+    GL_STATIC_DRAW,
+    GL_VERTEX_ARRAY,
+    glBindBuffer,
+    glBufferData,
+    glDeleteBuffers,
+    glDisable,
+    glDisableClientState,
+    glEnableClientState,
+    glGenBuffers,
+    glLineWidth,
+    glPopAttrib,
+    glPushAttrib,
+)
+
+# Unwrapped: buffer offsets and the prebuilt range arrays are passed as they are
+from OpenGL.raw.GL.VERSION.GL_1_1 import glColorPointer, glVertexPointer  # type: ignore
+from OpenGL.raw.GL.VERSION.GL_1_4 import glMultiDrawArrays  # type: ignore
+
+AXIS_COLORS = ((1.0, 0.0, 0.0), (0.0, 1.0, 0.0), (0.0, 0.0, 1.0))
+"""Colors of the X, Y and Z axes."""
+GRID_COLOR = (0.35, 0.35, 0.35)
+TICK_SIZE = 0.1
+"""Length of the tick marks at every unit of the positive half-axes."""
+LINE_WIDTH = 2.0
+VERTEX_STRIDE = 6 * 4
+"""Bytes per vertex: position and color as float32."""
+_POSITIONS, _COLORS = ctypes.c_void_p(0), ctypes.c_void_p(3 * 4)
+
+
+def axis_lines(extent: int) -> np.ndarray:
+    """Return the axis lines as vertices (x, y, z, r, g, b), two per line.
+
+    Each positive half-axis is a solid line up to the extent; each negative
+    half-axis is dashed with unit-length dashes.
+    """
+    lines = []
+    for axis, color in enumerate(AXIS_COLORS):
+        points = np.zeros((2 + 2 * (extent // 2), 3))
+        points[0, axis] = extent
+        points[2:, axis] = -np.arange(1, 2 * (extent // 2) + 1)
+        lines.append(np.hstack([points, np.broadcast_to(color, (len(points), 3))]))
+    return np.concatenate(lines)
+
+
+def tick_lines(extent: int) -> np.ndarray:
+    """Return tick marks at every unit of the positive half-axes, across a neighbouring axis."""
+    lines = []
+    units = np.arange(1, extent + 1)
+    for axis, color in enumerate(AXIS_COLORS):
+        across = 1 if axis == 0 else 0
+        points = np.zeros((len(units), 2, 3))
+        points[:, :, axis] = units[:, None]
+        points[:, :, across] = (-TICK_SIZE / 2, TICK_SIZE / 2)
+        points = points.reshape(-1, 3)
+        lines.append(np.hstack([points, np.broadcast_to(color, (len(points), 3))]))
+    return np.concatenate(lines)
+
+
+def grid_lines(extent: int) -> np.ndarray:
+    """Return a unit grid on the XZ plane covering [-extent, extent] on both axes."""
+    offsets = np.arange(-extent, extent + 1, dtype=np.float64)
+    along_x = np.zeros((len(offsets), 2, 3))
+    along_x[:, :, 0] = (-extent, extent)
+    along_x[:, :, 2] = offsets[:, None]
+    along_z = along_x[:, :, ::-1]
+    points = np.concatenate([along_x, along_z]).reshape(-1, 3)
+    return np.hstack([points, np.broadcast_to(GRID_COLOR, (len(points), 3))])
+
+
+class AxisGizmo:
+    """Axes with optional tick marks and ground grid in a static vertex buffer.
+
+    Requires a current OpenGL context for ``draw`` and ``delete``.
+
+    Attributes:
+        builds: Number of times the vertex buffer was filled.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the gizmo; the buffer is created on the first draw."""
+        self._vbo = 0
+        self._extent: int | None = None
+        self._ranges: dict[str, tuple[int, int]] = {}
+        # First vertices and vertex counts of the shown parts, with their addresses passed to OpenGL
+        self._draw_ranges: dict[tuple[bool, bool], tuple[np.ndarray, np.ndarray, ctypes.c_void_p, ctypes.c_void_p]] = {}
+        self.builds = 0
+
+    def _build(self, extent: int) -> None:
+        """Fill the vertex buffer with all parts for the extent."""
+        # The grid comes first so the axes lying in its plane are drawn over it
+        parts = {"grid": grid_lines(extent), "axes": axis_lines(extent), "ticks": tick_lines(extent)}
+        first = 0
+        self._ranges.clear()
+        self._draw_ranges.clear()
+        for name, vertices in parts.items():
+            self._ranges[name] = (first, len(vertices))
+            first += len(vertices)
+        data = np.ascontiguousarray(np.concatenate(list(parts.values())), dtype=np.float32)
+        if not self._vbo:
+            self._vbo = int(glGenBuffers(1))
+        glBindBuffer(GL_ARRAY_BUFFER, self._vbo)
+        glBufferData(GL_ARRAY_BUFFER, data.nbytes, data, GL_STATIC_DRAW)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        self._extent = extent
+        self.builds += 1
+
+    def draw(self, extent: int, *, ticks: bool = False, grid: bool = False) -> None:
+        """Draw the axes, rebuilding the buffer only if the extent changed.
+
+        Args:
+            extent: Length of the half-axes (and half-size of the grid) in units.
+            ticks: Whether to draw tick marks at every unit.
+            grid: Whether to draw the ground grid.
+        """
+        if extent != self._extent:
+            self._build(extent)
+        ranges = self._draw_ranges.get((ticks, grid))
+        if ranges is None:
+            shown = (["grid"] if grid else []) + ["axes"] + (["ticks"] if ticks else [])
+            firsts = np.array([self._ranges[name][0] for name in shown], dtype=np.int32)
+            counts = np.array([self._ranges[name][1] for name in shown], dtype=np.int32)
+            ranges = (firsts, counts, ctypes.c_void_p(firsts.ctypes.data), ctypes.c_void_p(counts.ctypes.data))
+            self._draw_ranges[ticks, grid] = ranges
+        firsts, _counts, first_pointer, count_pointer = ranges
+
+        glPushAttrib(GL_LIGHTING_BIT | GL_LINE_BIT | GL_CURRENT_BIT)
+        glDisable(GL_LIGHTING)
+        glLineWidth(LINE_WIDTH)
+        glBindBuffer(GL_ARRAY_BUFFER, self._vbo)
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_COLOR_ARRAY)
+        glVertexPointer(3, GL_FLOAT, VERTEX_STRIDE, _POSITIONS)
+        glColorPointer(3, GL_FLOAT, VERTEX_STRIDE, _COLORS)
+        glMultiDrawArrays(GL_LINES, first_pointer, count_pointer, len(firsts))
+        glDisableClientState(GL_COLOR_ARRAY)
+        glDisableClientState(GL_VERTEX_ARRAY)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        glPopAttrib()
+
+    def delete(self) -> None:
+        """Free the vertex buffer."""
+        if self._vbo:
+            glDeleteBuffers(1, [self._vbo])
+            self._vbo = 0
+        self._extent = None
@@ -1,72 +1,29 @@
-import math
+from __future__ import annotations
+
 import time
+from typing import TYPE_CHECKING
 
-from OpenGL.GL import (  # type: ignore
-    GL_AMBIENT,
-    GL_COLOR_BUFFER_BIT,
-    GL_CONSTANT_ATTENUATION,
-    GL_DEPTH_BUFFER_BIT,
-    GL_DEPTH_TEST,
-    GL_DIFFUSE,
-    GL_LEQUAL,
-    GL_LIGHT0,
-    GL_LIGHT_MODEL_LOCAL_VIEWER,
-    GL_LIGHT_MODEL_TWO_SIDE,
-    GL_LIGHTING,
-    GL_LIGHTING_BIT,
-    GL_LINEAR_ATTENUATION,
-    GL_LINES,
-    GL_MODELVIEW,
-    GL_NORMALIZE,
-    GL_POSITION,
-    GL_PROJECTION,
-    GL_QUADRATIC_ATTENUATION,
-    GL_SMOOTH,
-    GL_SPECULAR,
-    GL_TEXTURE_2D,
-    GLfloat,
-    glBegin,
-    glBindTexture,
-    glClear,
-    glClearColor,
-    glColor3f,
-    glDepthFunc,
-    glDisable,
-    glEnable,
-    glEnd,
-    glLightf,
-    glLightfv,
-    glLightModelf,
-    glLightModeli,
-    glLineWidth,
-    glLoadIdentity,
-    glMatrixMode,
-    glOrtho,
-    glPopAttrib,
-    glPopMatrix,
-    glPushAttrib,
-    glPushMatrix,
-    glRotatef,
-    glShadeModel,
-    glTranslatef,
-    glVertex3f,
-    glViewport,
-)
-from OpenGL.GLU import gluDeleteQuadric, gluLookAt, gluNewQuadric, gluPerspective, gluSphere  # type: ignore
+from OpenGL.GL import glViewport  # type: ignore
 from PySide6 import QtCore, QtGui, QtWidgets
 from PySide6.QtOpenGLWidgets import QOpenGLWidget
 
-from opengl_light_lab import AppState, Projection, Spherical
-from opengl_light_lab.app_state import LightType
+from opengl_light_lab.frame_cache import FrameCache, FrameKey
 from opengl_light_lab.input_handler import InputHandler
-from opengl_light_lab.materials import (
-    setup_material_blue,
-    setup_material_green,
-    setup_material_red,
-    setup_material_white,
-)
-from opengl_light_lab.primitives import draw_cube, draw_cylinder, draw_quad, draw_textured_cube
-from opengl_light_lab.textures import TextureManager
+from opengl_light_lab.overlay import TextOverlay
+from opengl_light_lab.picking import Picker, PickResult
+from opengl_light_lab.profiler import FrameProfiler
+from opengl_light_lab.readback import PixelReadback, as_rgb_image
+from opengl_light_lab.scene import FULL_REVOLUTION, ROTATION_SPEED, SceneRenderer
+from opengl_light_lab.update_coalescer import UpdateCoalescer
+from opengl_light_lab.viewports import QUAD_VIEWPORTS, viewport_at
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    import numpy as np
+
+    from opengl_light_lab import AppState
+    from opengl_light_lab.materials import MaterialLibrary
 
 HELP_TEXT = """
 Controls:
@@ -77,8 +34,9 @@ Controls:
   []        - change FOV (perspective)
   ZX        - change cube distance
   ?         - toggle help overlay
+  P         - toggle profiler overlay
+  M         - toggle allocation tracing
 """
-FULL_REVOLUTION = 360.0
 
 
 class GLWidget(QOpenGLWidget):
@@ -86,14 +44,22 @@ class GLWidget(QOpenGLWidget):
 
     Handles OpenGL initialization, resizing, and painting. Also manages
     user input and scene updates.
+
+    Signals:
+        object_picked: Emitted with a PickResult after a left click in the view.
     """
 
-    def __init__(self, parent: QtWidgets.QWidget | None, app_state: AppState) -> None:
+    object_picked = QtCore.Signal(PickResult)
+
+    def __init__(
+        self, parent: QtWidgets.QWidget | None, app_state: AppState, updates: UpdateCoalescer | None = None
+    ) -> None:
         """Initialize the GLWidget.
 
         Args:
             parent: The parent widget.
             app_state: The shared application state object.
+            updates: Coalescer of UI changes flushed before each frame, or None for a private one.
         """
         super().__init__(parent)
         self.setFocusPolicy(QtCore.Qt.FocusPolicy.StrongFocus)
@@ -104,22 +70,30 @@ class GLWidget(QOpenGLWidget):
         self.timer.start(16)  # ~60Hz
         self._dt = 0.0
         self._input_handler = InputHandler(app_state)
-        self._texture_manager = TextureManager()
+        self._scene = SceneRenderer(app_state, background_loading=True)
+        self._scene.materials.add_listener(self._on_material_changed)
+        self.updates = updates if updates is not None else UpdateCoalescer(app_state)
+        self._aspect = 1.0
+        self._frame_listeners: list[Callable[[np.ndarray], None]] = []
+        self._paint_listeners: list[Callable[[], None]] = []
+        self._readback: PixelReadback | None = None
+        self._picker: Picker | None = None
+        self.profiler = FrameProfiler()
+        # Reused by every frame of the overlay
+        self._profiler_font = QtGui.QFont("monospace", 9)
+        self._profiler_painter = QtGui.QPainter()
+        self._frame_cache = FrameCache()
+        self._frame_key = FrameKey(app_state)
+        self._help_overlay = TextOverlay(HELP_TEXT)
+        self._viewport_labels = {viewport.name: TextOverlay(viewport.name, point_size=9) for viewport in QUAD_VIEWPORTS}
 
     def initializeGL(self) -> None:
         """Initialize OpenGL state."""
-        glClearColor(0.15, 0.15, 0.18, 1.0)
-        glEnable(GL_DEPTH_TEST)
-        glDepthFunc(GL_LEQUAL)
-
-        glEnable(GL_LIGHTING)
-        glEnable(GL_LIGHT0)
-        glShadeModel(GL_SMOOTH)
-
-        glEnable(GL_NORMALIZE)
-
-        # Load texture if set
-        self._texture_manager.load_if_changed(self.app_state.current_texture)
+        self._scene.initialize()
+        try:
+            self._picker = Picker(self._scene)
+        except RuntimeError as e:
+            print(f"Object picking disabled: {e}")
 
     def resizeGL(self, w: int, h: int) -> None:
         """Handle widget resize events.
@@ -130,101 +104,172 @@ class GLWidget(QOpenGLWidget):
         """
         if h == 0:
             h = 1
-        aspect = w / h
         glViewport(0, 0, w, h)
-        glMatrixMode(GL_PROJECTION)
-        glLoadIdentity()
-        ohh = self.app_state.camera_ortho_half_height
-        if self.app_state.camera_projection == Projection.ORTHOGONAL:
-            glOrtho(-ohh * aspect, +ohh * aspect, -ohh, +ohh, 0.1, 100.0)
-        else:
-            gluPerspective(self.app_state.camera_perspective_fov, aspect, 0.1, 100.0)
-        glMatrixMode(GL_MODELVIEW)
-        glLoadIdentity()
+        self._aspect = w / h
+        self._scene.set_projection(self._aspect)
 
     def paintGL(self) -> None:
         """Render the scene."""
+        self.profiler.trace_allocations(self.app_state.profile_allocations)
+        self.profiler.begin_frame()
         now = time.time()
         dt = now - self.last_time
         self.last_time = now
 
+        if self.updates.flush():
+            self._scene.set_projection(self._aspect)
+        self.profiler.count("updates submitted", self.updates.last_submitted)
+        self.profiler.count("updates collapsed", self.updates.last_collapsed)
+
         if self.app_state.auto_rotate:
             self._dt += dt
             self.rotation_update(self._dt)
             self._dt = 0.0
 
-        # Check if texture needs to be loaded/updated
-        self._texture_manager.load_if_changed(self.app_state.current_texture)
+        self._render_scene()
+        self._read_back_frame()
 
-        glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
-        glMatrixMode(GL_MODELVIEW)
-        glLoadIdentity()
+        if self.app_state.quad_view:
+            self._draw_viewport_labels()
+        if self.app_state.show_help:
+            self._draw_help_overlay()
+
+        self.profiler.end_frame()
+        if self.app_state.show_profiler:
+            self._draw_profiler_overlay()
+        for callback in list(self._paint_listeners):
+            callback()
+
+    def _render_scene(self) -> None:
+        """Render the scene, or restore it from the frame cache if nothing changed since the last frame."""
+        if self._scene.mesh_manager.load_if_changed(self.app_state.current_mesh):
+            # A mesh loaded in the background replaces the cube of the cached frame
+            self._frame_cache.invalidate()
+        if self.app_state.auto_rotate:
+            # Every frame differs, so keying and copying them would only cost time
+            self._frame_cache.invalidate()
+            self._scene.render()
+        else:
+            ratio = self.devicePixelRatioF()
+            width, height = round(self.width() * ratio), round(self.height() * ratio)
+            key = self._frame_key.update(width, height)
+            framebuffer = self.defaultFramebufferObject()
+            if self._frame_cache.restore(key, framebuffer):
+                self.profiler.count("cached frames")
+                return
+            self._scene.render()
+            self._frame_cache.store(key, framebuffer, width, height)
+        self.profiler.count("objects drawn", self._scene.objects_drawn)
+        self.profiler.count("objects culled", self._scene.objects_culled)
+        self.profiler.count("vertices", self._scene.vertices_drawn)
+        self.profiler.count("shadow passes", self._scene.shadow_passes)
+
+    def _draw_viewport_labels(self) -> None:
+        """Draw the name of each quad view viewport in its top-left corner."""
+        ratio = self.devicePixelRatioF()
+        width, height = round(self.width() * ratio), round(self.height() * ratio)
+        for viewport in QUAD_VIEWPORTS:
+            x0, _x1, _y0, y1 = viewport.rect
+            rect = QtCore.QRect(round(x0 * self.width()) + 4, round((1.0 - y1) * self.height()) + 4, 90, 28)
+            self._viewport_labels[viewport.name].draw(rect, ratio, width, height)
+
+    def _draw_help_overlay(self) -> None:
+        """Draw the cached help panel in the top-left corner."""
+        margin = 8
+        rect = QtCore.QRect(margin, margin, min(300, self.width() - 20), min(220, self.height() - 20))
+        if rect.width() <= 0 or rect.height() <= 0:
+            return
+        ratio = self.devicePixelRatioF()
+        start = time.perf_counter()
+        self._help_overlay.draw(rect, ratio, round(self.width() * ratio), round(self.height() * ratio))
+        elapsed = time.perf_counter() - start
+        self.profiler.count("help overlay us", round(elapsed * 1e6))
+        # Rasterizing the panel is what every frame paid before it was cached
+        self.profiler.count("help overlay saved us", round((self._help_overlay.paint_time - elapsed) * 1e6))
+
+    def _draw_profiler_overlay(self) -> None:
+        """Draw the profiler summary in the bottom-left corner."""
+        painter = self._profiler_painter
+        painter.begin(self)
+        painter.setFont(self._profiler_font)
+        text = self.profiler.summary()
+        margin = 8
+        bounds = painter.fontMetrics().boundingRect(QtCore.QRect(0, 0, 400, 400), 0, text)
+        rect = QtCore.QRect(
+            margin,
+            self.height() - bounds.height() - 3 * margin,
+            bounds.width() + 2 * margin,
+            bounds.height() + 2 * margin,
+        )
+        painter.fillRect(rect, QtGui.QColor(0, 0, 0, 180))
+        painter.setPen(QtGui.QColor(240, 240, 240))
+        painter.drawText(rect.adjusted(margin, margin, -margin, -margin), 0, text)
+        painter.end()
+
+    @property
+    def materials(self) -> MaterialLibrary:
+        """Return the material library of the scene; edits to it show in the next frame."""
+        return self._scene.materials
+
+    def _on_material_changed(self, _index: int) -> None:
+        """Drop the cached frame, whose key does not cover the material table, and schedule a repaint."""
+        self._frame_cache.invalidate()
+        self.update()
 
-        camera = self.app_state.camera
-        north = Spherical(self.app_state.camera.distance, self.app_state.camera.theta + 0.01, self.app_state.camera.phi)
-        gluLookAt(camera.x, camera.y, camera.z, 0.0, 0.0, 0.0, north.x, north.y, north.z)
+    def add_frame_listener(self, callback: Callable[[np.ndarray], None]) -> None:
+        """Register a callback receiving rendered frames.
 
-        if self.app_state.depth_test:
-            glEnable(GL_DEPTH_TEST)
-        else:
-            glDisable(GL_DEPTH_TEST)
+        Frames are read back asynchronously, so a callback receives the frame
+        rendered one paint earlier, without the help overlay. The argument is a
+        zero-copy top-down RGB view valid only during the callback.
 
-        self.setup_light()
+        Args:
+            callback: Function called with each frame.
+        """
+        self._frame_listeners.append(callback)
 
-        if self.app_state.lighting_enabled:
-            glEnable(GL_LIGHTING)
-        else:
-            glDisable(GL_LIGHTING)
-            glColor3f(0.5, 0.5, 0.5)
-
-        if self.app_state.lighting_enabled and self.app_state.show_light_position:
-            self.draw_light_marker()
-
-        if self.app_state.show_axis:
-            self.draw_axis()
-
-        glPushMatrix()
-        glTranslatef(-self.app_state.cube_distance, 0.0, 0.0)
-        glRotatef(self.app_state.rotation_angle, 0, 1, 0)
-        setup_material_red()
-        draw_cylinder(inside=True)
-        glPopMatrix()
-
-        glPushMatrix()
-        glTranslatef(0.0, 0.0, 0.0)
-        glRotatef(self.app_state.rotation_angle, 1, 0, 0)
-        if self._texture_manager.is_loaded:
-            setup_material_white()
-            glEnable(GL_TEXTURE_2D)
-            glBindTexture(GL_TEXTURE_2D, self._texture_manager.texture_id)
-            draw_textured_cube()
-            glBindTexture(GL_TEXTURE_2D, 0)
-            glDisable(GL_TEXTURE_2D)
-        else:
-            setup_material_blue()
-            draw_cube()
-        glPopMatrix()
+    def remove_frame_listener(self, callback: Callable[[np.ndarray], None]) -> None:
+        """Unregister a callback added with add_frame_listener.
 
-        glPushMatrix()
-        glTranslatef(+self.app_state.cube_distance, 0.0, 0.0)
-        glRotatef(self.app_state.rotation_angle, 0, 0, 1)
-        setup_material_green()
-        draw_cylinder(inside=False)
-        glPopMatrix()
+        Args:
+            callback: The callback to remove.
+        """
+        self._frame_listeners.remove(callback)
 
-        if self.app_state.show_help:
-            painter = QtGui.QPainter(self)
-            painter.setRenderHint(QtGui.QPainter.RenderHint.TextAntialiasing)
-            margin = 8
-            w = min(300, self.width() - 20)
-            h = min(200, self.height() - 20)
-            rect = QtCore.QRect(margin, margin, w, h)
-            painter.fillRect(rect, QtGui.QColor(0, 0, 0, 180))
-            painter.setPen(QtGui.QColor(240, 240, 240))
-            font = QtGui.QFont("", 10)
-            painter.setFont(font)
-            painter.drawText(rect.adjusted(8, 8, -8, -8), QtCore.Qt.TextFlag.TextWordWrap, HELP_TEXT)
-            painter.end()
+    def add_paint_listener(self, callback: Callable[[], None]) -> None:
+        """Register a callback called at the end of each paint, after the profiler recorded the frame.
+
+        Args:
+            callback: Function called without arguments.
+        """
+        self._paint_listeners.append(callback)
+
+    def remove_paint_listener(self, callback: Callable[[], None]) -> None:
+        """Unregister a callback added with add_paint_listener.
+
+        Args:
+            callback: The callback to remove.
+        """
+        self._paint_listeners.remove(callback)
+
+    def _read_back_frame(self) -> None:
+        """Queue the readback of the current frame and deliver the previous one to listeners."""
+        ratio = self.devicePixelRatioF()
+        size = (round(self.width() * ratio), round(self.height() * ratio))
+        if self._readback is not None and (
+            not self._frame_listeners or (self._readback.width, self._readback.height) != size
+        ):
+            self._readback.delete()
+            self._readback = None
+        if not self._frame_listeners:
+            return
+        if self._readback is None:
+            self._readback = PixelReadback(*size)
+        pixels = self._readback.read()
+        if pixels is not None:
+            frame = as_rgb_image(pixels)
+            for callback in list(self._frame_listeners):
+                callback(frame)
 
     def rotation_update(self, dt_seconds: float) -> None:
         """Update object rotation based on elapsed time.
@@ -232,109 +277,47 @@ class GLWidget(QOpenGLWidget):
         Args:
             dt_seconds: Time elapsed since last update in seconds.
         """
-        self.app_state.rotation_angle += 20.0 * dt_seconds
+        self.app_state.rotation_angle += ROTATION_SPEED * dt_seconds
         if self.app_state.rotation_angle > FULL_REVOLUTION:
             self.app_state.rotation_angle -= FULL_REVOLUTION
 
-    def draw_axis(self) -> None:
-        """Draw the coordinate axes."""
-        glPushAttrib(GL_LIGHTING_BIT)
-        glDisable(GL_LIGHTING)
-        glLineWidth(2.0)
-        glBegin(GL_LINES)
-
-        glColor3f(1.0, 0.0, 0.0)
-        glVertex3f(25.0, 0.0, 0.0)
-        glVertex3f(0.0, 0.0, 0.0)
-        for i in range(1, 25):
-            glVertex3f(-i, 0.0, 0.0)
-
-        glColor3f(0.0, 1.0, 0.0)
-        glVertex3f(0.0, 25.0, 0.0)
-        glVertex3f(0.0, 0.0, 0.0)
-        for i in range(1, 25):
-            glVertex3f(0.0, -i, 0.0)
-
-        glColor3f(0.0, 0.0, 1.0)
-        glVertex3f(0.0, 0.0, 25.0)
-        glVertex3f(0.0, 0.0, 0.0)
-        for i in range(1, 25):
-            glVertex3f(0.0, 0.0, -i)
-
-        glEnd()
-        glPopAttrib()
-
-    def setup_light(self) -> None:
-        """Configure the OpenGL light source based on app state."""
-        if self.app_state.light_type == LightType.POINT:
-            light_pos = (GLfloat * 4)(*self.app_state.light_position, 1.0)
-        else:
-            light_pos = (GLfloat * 4)(*self.app_state.light_direction, 0.0)
-
-        light_diffuse = (GLfloat * 4)(*self.app_state.light_diffuse, 1.0)
-        light_ambient = (GLfloat * 4)(*self.app_state.light_ambient, 1.0)
-        light_specular = (GLfloat * 4)(*self.app_state.light_specular, 1.0)
-
-        glLightfv(GL_LIGHT0, GL_POSITION, light_pos)
-        glLightfv(GL_LIGHT0, GL_DIFFUSE, light_diffuse)
-        glLightfv(GL_LIGHT0, GL_AMBIENT, light_ambient)
-        glLightfv(GL_LIGHT0, GL_SPECULAR, light_specular)
-
-        # Attenuation: only for point light
-        if self.app_state.light_type == LightType.POINT:
-            glLightf(GL_LIGHT0, GL_CONSTANT_ATTENUATION, 0.0)
-            glLightf(GL_LIGHT0, GL_LINEAR_ATTENUATION, 0.0)
-            glLightf(GL_LIGHT0, GL_QUADRATIC_ATTENUATION, 0.0)
-            glLightf(GL_LIGHT0, self.app_state.light_attenuation_mode, self.app_state.light_attenuation_value)
-        else:
-            # No attenuation for directional
-            glLightf(GL_LIGHT0, GL_CONSTANT_ATTENUATION, 1.0)
-            glLightf(GL_LIGHT0, GL_LINEAR_ATTENUATION, 0.0)
-            glLightf(GL_LIGHT0, GL_QUADRATIC_ATTENUATION, 0.0)
-
-        glLightModelf(GL_LIGHT_MODEL_LOCAL_VIEWER, 1.0 if self.app_state.light_model_local_viewer else 0.0)
-        glLightModeli(GL_LIGHT_MODEL_TWO_SIDE, 1 if self.app_state.light_model_two_side else 0)
-
-    def draw_light_marker(self) -> None:
-        """Draw a visual marker for the light source position/direction."""
-        glPushAttrib(GL_LIGHTING_BIT)
-        glDisable(GL_LIGHTING)
-        if self.app_state.light_type == LightType.POINT:
-            glPushMatrix()
-            x, y, z = self.app_state.light_position
-            glTranslatef(x, y, z)
-            quad = gluNewQuadric()
-            gluSphere(quad, 0.1, 10, 10)
-            gluDeleteQuadric(quad)
-            glPopMatrix()
+    def mousePressEvent(self, ev: QtGui.QMouseEvent) -> None:
+        """Pick the object under the cursor on a left click.
+
+        Args:
+            ev: The mouse event.
+        """
+        if ev.button() != QtCore.Qt.MouseButton.LeftButton or self._picker is None:
+            super().mousePressEvent(ev)
+            return
+        ratio = self.devicePixelRatioF()
+        width, height = round(self.width() * ratio), round(self.height() * ratio)
+        x = min(int(ev.position().x() * ratio), width - 1)
+        y = min(height - 1 - int(ev.position().y() * ratio), height - 1)
+        y = max(y, 0)
+        self.makeCurrent()
+        viewport = viewport_at(QUAD_VIEWPORTS, x / width, y / height) if self.app_state.quad_view else None
+        if viewport is None:
+            self._picker.request(x, y, width, height)
         else:
-            self._draw_directional_light_sun()
-        glPopAttrib()
-
-    def _draw_directional_light_sun(self) -> None:
-        """Draw a 'sun' marker for directional light."""
-        direction = self.app_state.light_direction
-        length = math.sqrt(sum(d * d for d in direction))
-        if length < 0.001:
+            left, bottom, w, h = viewport.pixels(width, height)
+            with self._scene.viewport_camera(viewport):
+                self._picker.request(x - left, y - bottom, w, h)
+        self.doneCurrent()
+        QtCore.QTimer.singleShot(0, self._poll_pick)
+
+    def _poll_pick(self) -> None:
+        """Deliver the pending pick result, or poll again shortly."""
+        if self._picker is None or not self._picker.is_pending:
             return
-
-        sun_dist = self.app_state.camera.distance * 2.0
-        sun_pos = tuple(d / length * sun_dist for d in direction)
-
-        cam = self.app_state.camera
-        to_cam = (cam.x - sun_pos[0], cam.y - sun_pos[1], cam.z - sun_pos[2])
-        dist_to_cam = math.sqrt(sum(t * t for t in to_cam))
-        yaw = math.atan2(to_cam[0], to_cam[2]) if dist_to_cam > 0.001 else 0.0
-        pitch = math.asin(to_cam[1] / dist_to_cam) if dist_to_cam > 0.001 else 0.0
-
-        glPushMatrix()
-        glTranslatef(*sun_pos)
-        glRotatef(yaw * 180.0 / math.pi, 0, 1, 0)
-        glRotatef(-pitch * 180.0 / math.pi, 1, 0, 0)
-
-        glColor3f(1.0, 1.0, 0.0)
-        draw_quad(0.3)
-        glPopMatrix()
+        self.makeCurrent()
+        result = self._picker.poll()
+        self.doneCurrent()
+        if result is None:
+            QtCore.QTimer.singleShot(1, self._poll_pick)
+            return
+        self.app_state.selected_object = result.obj
+        self.object_picked.emit(result)
 
     def keyPressEvent(self, ev: QtGui.QKeyEvent) -> None:
         """Handle key press events.
@@ -349,6 +332,10 @@ class GLWidget(QOpenGLWidget):
             self._input_handler.key_pressed(txt)
         if txt == "?":
             self.app_state.show_help = not self.app_state.show_help
+        elif txt == "p":
+            self.app_state.show_profiler = not self.app_state.show_profiler
+        elif txt == "m":
+            self.app_state.profile_allocations = not self.app_state.profile_allocations
 
         if key == QtCore.Qt.Key.Key_Escape:
             QtWidgets.QApplication.quit()
@@ -368,15 +355,6 @@ class GLWidget(QOpenGLWidget):
 
     def _tick(self) -> None:
         """Timer tick handler for animation and updates."""
-        needs_resize = self._input_handler.update()
-        if needs_resize:
-            self.post_resize_event()
+        if self._input_handler.update():
+            self.updates.invalidate_projection()
         self.update()
-
-    def post_resize_event(self) -> None:
-        """Post a resize event to self to force a layout update."""
-        app_instance = QtCore.QCoreApplication.instance()
-        if app_instance is None:
-            print("No QCoreApplication instance found")
-            return
-        app_instance.postEvent(self, QtGui.QResizeEvent(size := self.size(), size))
@@ -0,0 +1,190 @@
+"""Undo/redo history of AppState edits."""
+
+from __future__ import annotations
+
+import sys
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from opengl_light_lab.app_state import AppState, get_field, set_field
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+DEFAULT_MAX_BYTES = 256 * 1024
+DEFAULT_COALESCE_WINDOW = 0.75
+
+
+@dataclass
+class HistoryEntry:
+    """A single undoable step holding deltas of AppState fields.
+
+    Attributes:
+        changes: Mapping of dotted field path to its (old, new) values.
+        group: Coalescing key (e.g. name of the control), or None to never merge.
+        timestamp: Time of the last change merged into this entry.
+        size: Estimated memory footprint in bytes.
+    """
+
+    changes: dict[str, tuple[object, object]]
+    group: str | None
+    timestamp: float
+    size: int = 0
+
+
+def _estimate_size(changes: dict[str, tuple[object, object]]) -> int:
+    """Estimate the memory footprint of entry changes in bytes."""
+    size = sys.getsizeof(changes)
+    for path, (old, new) in changes.items():
+        size += sys.getsizeof(path) + sys.getsizeof(old) + sys.getsizeof(new)
+    return size
+
+
+class UndoHistory:
+    """Bounded undo/redo stack of coalesced AppState deltas.
+
+    Consecutive edits of the same group within ``coalesce_window`` seconds
+    (e.g. dragging a spinbox) are merged into one entry. Pushing is O(1)
+    amortized, undo/redo are O(k) in the number of fields of the entry. Once
+    the estimated size of both stacks exceeds ``max_bytes``, the oldest undo
+    entries are dropped first, then the redo entries furthest from the
+    current state.
+    """
+
+    def __init__(
+        self,
+        app_state: AppState,
+        *,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        coalesce_window: float = DEFAULT_COALESCE_WINDOW,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize the history.
+
+        Args:
+            app_state: The shared application state object.
+            max_bytes: Memory cap for the undo and redo stacks together.
+            coalesce_window: Max seconds between edits merged into one entry.
+            clock: Monotonic time source.
+        """
+        self.app_state = app_state
+        self.max_bytes = max_bytes
+        self.coalesce_window = coalesce_window
+        self._clock = clock
+        self._undo: deque[HistoryEntry] = deque()
+        # The next entry to redo is at the right end
+        self._redo: deque[HistoryEntry] = deque()
+        self._bytes = 0
+
+    @property
+    def can_undo(self) -> bool:
+        """Return True if there is an entry to undo."""
+        return bool(self._undo)
+
+    @property
+    def can_redo(self) -> bool:
+        """Return True if there is an entry to redo."""
+        return bool(self._redo)
+
+    @property
+    def memory_usage(self) -> int:
+        """Return the estimated size of the stored entries in bytes."""
+        return self._bytes
+
+    def set(self, path: str, value: object, *, group: str | None = None) -> None:
+        """Set an AppState field and record the change.
+
+        Args:
+            path: Dotted field path, e.g. ``"camera.theta"``.
+            value: New value of the field.
+            group: Coalescing key; edits with the same key close in time are merged.
+        """
+        old = get_field(self.app_state, path)
+        if old == value:
+            return
+        set_field(self.app_state, path, value)
+        self.record(path, old, value, group=group)
+
+    def record(self, path: str, old: object, new: object, *, group: str | None = None) -> None:
+        """Record an already applied change of an AppState field.
+
+        Args:
+            path: Dotted field path.
+            old: Value before the change.
+            new: Value after the change.
+            group: Coalescing key; edits with the same key close in time are merged.
+        """
+        self._clear_redo()
+        now = self._clock()
+        top = self._undo[-1] if self._undo else None
+        if top is not None and group is not None and top.group == group and now - top.timestamp <= self.coalesce_window:
+            first_old = top.changes[path][0] if path in top.changes else old
+            top.changes[path] = (first_old, new)
+            top.timestamp = now
+            self._bytes -= top.size
+            top.size = _estimate_size(top.changes)
+            self._bytes += top.size
+        else:
+            changes = {path: (old, new)}
+            entry = HistoryEntry(changes, group, now, _estimate_size(changes))
+            self._undo.append(entry)
+            self._bytes += entry.size
+        self._evict()
+
+    def break_coalescing(self) -> None:
+        """Force the next recorded change into a new entry."""
+        if self._undo:
+            self._undo[-1].group = None
+
+    def undo(self) -> HistoryEntry | None:
+        """Revert the most recent entry.
+
+        Returns:
+            The reverted entry, or None if there was nothing to undo.
+        """
+        if not self._undo:
+            return None
+        entry = self._undo.pop()
+        for path, (old, _new) in entry.changes.items():
+            set_field(self.app_state, path, old)
+        entry.group = None
+        self._redo.append(entry)
+        # The cap may have been lowered since the entry was recorded
+        self._evict()
+        return entry
+
+    def redo(self) -> HistoryEntry | None:
+        """Re-apply the most recently undone entry.
+
+        Returns:
+            The re-applied entry, or None if there was nothing to redo.
+        """
+        if not self._redo:
+            return None
+        entry = self._redo.pop()
+        for path, (_old, new) in entry.changes.items():
+            set_field(self.app_state, path, new)
+        self._undo.append(entry)
+        self._evict()
+        return entry
+
+    def clear(self) -> None:
+        """Drop all entries."""
+        self._undo.clear()
+        self._redo.clear()
+        self._bytes = 0
+
+    def _clear_redo(self) -> None:
+        """Drop the redo stack after a new edit."""
+        for entry in self._redo:
+            self._bytes -= entry.size
+        self._redo.clear()
+
+    def _evict(self) -> None:
+        """Drop the oldest entries until the memory cap is respected."""
+        while self._bytes > self.max_bytes and len(self._undo) > 1:
+            self._bytes -= self._undo.popleft().size
+        while self._bytes > self.max_bytes and self._redo:
+            self._bytes -= self._redo.popleft().size
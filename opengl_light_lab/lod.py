@@ -0,0 +1,186 @@
+"""Level-of-detail meshes for the tessellated primitives.
+
+Every cylinder and the light marker sphere exist in several tessellations,
+prebuilt once as vertex arrays. Each frame the level is picked from the size
+the object covers on screen, with hysteresis around the thresholds so an
+object hovering at a boundary does not flicker between two levels.
+"""
+
+from __future__ import annotations
+
+import ctypes
+import functools
+import math
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+import numpy as np
+from OpenGL.GL import (  # type: ignore
+    GL_FLOAT,
+    GL_NORMAL_ARRAY,
+    GL_TRIANGLES,
+    GL_VERTEX_ARRAY,
+    glDisableClientState,
+    glDrawArrays,
+    glEnableClientState,
+)
+
+# Unwrapped: they take the array addresses as plain integers
+from OpenGL.raw.GL.VERSION.GL_1_1 import glNormalPointer, glVertexPointer  # type: ignore
+
+from opengl_light_lab.app_state import Projection
+from opengl_light_lab.primitives import CYLINDER_BASE_RADIUS, CYLINDER_HEIGHT, CYLINDER_TOP_RADIUS, cylinder_vertices
+
+if TYPE_CHECKING:
+    from collections.abc import Hashable, Sequence
+
+    from opengl_light_lab.app_state import AppState
+
+CYLINDER_LEVELS = ((48, 16), (30, 10), (16, 4), (8, 1))
+"""Cylinder (slices, stacks) from the finest to the coarsest level."""
+SPHERE_LEVELS = ((24, 16), (10, 10), (6, 4), (4, 2))
+"""Sphere (slices, stacks) from the finest to the coarsest level."""
+LEVEL_THRESHOLDS = (400.0, 120.0, 30.0)
+"""Projected diameters in pixels below which the next coarser level is used."""
+HYSTERESIS = 0.15
+"""Relative margin a size must cross beyond a threshold before the level changes."""
+
+
+@dataclass
+class Mesh:
+    """Non-indexed triangle mesh drawn from client-side vertex arrays.
+
+    Attributes:
+        vertices: Vertex positions, shape (n, 3), float32.
+        normals: Vertex normals, shape (n, 3), float32.
+    """
+
+    vertices: np.ndarray
+    normals: np.ndarray
+
+    def __post_init__(self) -> None:
+        """Keep the addresses of the arrays, which are passed to OpenGL on every draw."""
+        self._vertex_pointer = ctypes.c_void_p(self.vertices.ctypes.data)
+        self._normal_pointer = ctypes.c_void_p(self.normals.ctypes.data)
+
+    @property
+    def vertex_count(self) -> int:
+        """Return the number of vertices."""
+        return len(self.vertices)
+
+    def draw(self) -> None:
+        """Draw the mesh with the current material and transformation."""
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_NORMAL_ARRAY)
+        glVertexPointer(3, GL_FLOAT, 0, self._vertex_pointer)
+        glNormalPointer(GL_FLOAT, 0, self._normal_pointer)
+        glDrawArrays(GL_TRIANGLES, 0, len(self.vertices))
+        glDisableClientState(GL_NORMAL_ARRAY)
+        glDisableClientState(GL_VERTEX_ARRAY)
+
+
+def _grid_triangles(grid: np.ndarray, *, flip: bool) -> np.ndarray:
+    """Split a (rows, cols, k) vertex grid into triangles, shape (quads * 6, k)."""
+    v00, v01 = grid[:-1, :-1], grid[:-1, 1:]
+    v10, v11 = grid[1:, :-1], grid[1:, 1:]
+    corners = (v00, v01, v11, v00, v11, v10) if flip else (v00, v10, v11, v00, v11, v01)
+    return np.stack(corners, axis=2).reshape(-1, grid.shape[-1])
+
+
+@functools.cache
+def cylinder_mesh(slices: int, stacks: int, *, inside: bool = False) -> Mesh:
+    """Build the cylinder of draw_cylinder.
+
+    Args:
+        slices: Subdivisions around the Z axis.
+        stacks: Subdivisions along the Z axis.
+        inside: If True, normals point inward and the winding is reversed,
+            as with ``GLU_INSIDE``.
+    """
+    grid = cylinder_vertices(slices, stacks)
+    # Normals as emitted by gluCylinder with GLU_FLAT: the slice side normal, half a slice behind each vertex
+    angle = (np.arange(slices + 1) - 0.5) * 2.0 * np.pi / slices
+    slope = (CYLINDER_BASE_RADIUS - CYLINDER_TOP_RADIUS) / CYLINDER_HEIGHT
+    # GLU_INSIDE only flips the radial part of the normal, the slope term keeps its sign
+    radial = -1.0 if inside else 1.0
+    normal = np.stack([radial * np.sin(angle), radial * np.cos(angle), np.full(slices + 1, slope)], axis=1)
+    normal /= np.linalg.norm(normal, axis=1, keepdims=True)
+    normal_grid = np.broadcast_to(normal, grid.shape)
+    vertices = _grid_triangles(grid, flip=inside)
+    normals = _grid_triangles(normal_grid, flip=inside)
+    return Mesh(np.ascontiguousarray(vertices, dtype=np.float32), np.ascontiguousarray(normals, dtype=np.float32))
+
+
+@functools.cache
+def sphere_mesh(radius: float, slices: int, stacks: int) -> Mesh:
+    """Build a sphere centered at the origin with smooth normals.
+
+    Args:
+        radius: Sphere radius.
+        slices: Subdivisions around the Z axis.
+        stacks: Subdivisions along the Z axis.
+    """
+    polar, azimuth = np.meshgrid(
+        np.linspace(np.pi, 0.0, stacks + 1), np.linspace(0.0, 2.0 * np.pi, slices + 1), indexing="ij"
+    )
+    grid = np.stack([np.sin(polar) * np.sin(azimuth), np.sin(polar) * np.cos(azimuth), np.cos(polar)], axis=2)
+    unit = _grid_triangles(grid, flip=False)
+    return Mesh(np.ascontiguousarray(unit * radius, dtype=np.float32), np.ascontiguousarray(unit, dtype=np.float32))
+
+
+def projected_diameter(
+    app_state: AppState, center: np.ndarray | Sequence[float], radius: float, view_height: float
+) -> float:
+    """Return the on-screen diameter in pixels of a bounding sphere.
+
+    Args:
+        app_state: The application state holding the camera settings.
+        center: World-space sphere center.
+        radius: Sphere radius.
+        view_height: Height of the full view in pixels.
+    """
+    if app_state.camera_projection == Projection.ORTHOGONAL:
+        return radius / app_state.camera_ortho_half_height * view_height
+    camera = app_state.camera
+    distance = math.dist((camera.x, camera.y, camera.z), center)
+    if distance <= radius:
+        return math.inf
+    return radius / (distance * math.tan(math.radians(app_state.camera_perspective_fov) / 2)) * view_height
+
+
+class LodSelector:
+    """Picks a detail level per object from its projected size, with hysteresis."""
+
+    def __init__(self, thresholds: Sequence[float] = LEVEL_THRESHOLDS, hysteresis: float = HYSTERESIS) -> None:
+        """Initialize the selector.
+
+        Args:
+            thresholds: Descending projected sizes in pixels separating the levels;
+                level 0 is used above the first one.
+            hysteresis: Relative margin around each threshold.
+        """
+        self.thresholds = tuple(thresholds)
+        self.hysteresis = hysteresis
+        self._levels: dict[Hashable, int] = {}
+
+    def select(self, key: Hashable, size: float) -> int:
+        """Return the level for an object and remember it.
+
+        Args:
+            key: Identifies the object across frames.
+            size: Projected size of the object in pixels.
+        """
+        level = self._levels.get(key)
+        if level is None:
+            level = sum(size < threshold for threshold in self.thresholds)
+        else:
+            while level > 0 and size > self.thresholds[level - 1] * (1 + self.hysteresis):
+                level -= 1
+            while level < len(self.thresholds) and size < self.thresholds[level] * (1 - self.hysteresis):
+                level += 1
+        self._levels[key] = level
+        return level
+
+    def reset(self) -> None:
+        """Forget the remembered levels."""
+        self._levels.clear()
@@ -1,6 +1,21 @@
-from PySide6 import QtCore, QtWidgets
+from __future__ import annotations
+
+import copy
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from PySide6 import QtCore, QtGui, QtWidgets
 
 from opengl_light_lab import AppState, ControlPanel, GLWidget
+from opengl_light_lab.history import UndoHistory
+from opengl_light_lab.offscreen import OffscreenRenderer
+from opengl_light_lab.tiled_export import TiledRenderer
+from opengl_light_lab.update_coalescer import UpdateCoalescer
+
+if TYPE_CHECKING:
+    from opengl_light_lab.picking import PickResult
+
+EXPORT_SIZES = {"3840x2160 (4K)": (3840, 2160), "7680x4320 (8K)": (7680, 4320), "15360x8640 (16K)": (15360, 8640)}
 
 
 class MainWindow(QtWidgets.QMainWindow):
@@ -14,15 +29,59 @@ class MainWindow(QtWidgets.QMainWindow):
         super().__init__()
         self.setWindowTitle("OpenGL Light Lab")
         self.app_state = AppState()
-        self.gl = GLWidget(self, self.app_state)
+        self.history = UndoHistory(self.app_state)
+        self.updates = UpdateCoalescer(self.app_state, self.history)
+        self.gl = GLWidget(self, self.app_state, self.updates)
         self.gl.makeCurrent()
         self.setCentralWidget(self.gl)
+        self.gl.object_picked.connect(self.on_object_picked)
 
-        self.control_panel = ControlPanel(self, self.app_state)
+        self.control_panel = ControlPanel(self, self.app_state, self.history, self.updates, self.gl.materials)
         self.addDockWidget(QtCore.Qt.DockWidgetArea.RightDockWidgetArea, self.control_panel)
 
+        file_menu = self.menuBar().addMenu("&File")
+        export_action = file_menu.addAction("&Export High-Resolution Image...")
+        export_action.triggered.connect(self.export_high_res_image)
+
+        edit_menu = self.menuBar().addMenu("&Edit")
+        undo_action = edit_menu.addAction("&Undo")
+        undo_action.setShortcut(QtGui.QKeySequence.StandardKey.Undo)
+        undo_action.triggered.connect(self.control_panel.undo)
+        redo_action = edit_menu.addAction("&Redo")
+        redo_action.setShortcut(QtGui.QKeySequence.StandardKey.Redo)
+        redo_action.triggered.connect(self.control_panel.redo)
+
         self.resize(1280, 768)
 
     def on_projection_changed(self) -> None:
-        """Handle projection change events from the control panel."""
-        self.gl.post_resize_event()
+        """Recompute the projection matrix before the next frame."""
+        self.updates.invalidate_projection()
+
+    def on_object_picked(self, result: PickResult) -> None:
+        """Show the object selected by a click in the status bar."""
+        name = result.obj.value.replace("_", " ") if result.obj is not None else "nothing"
+        self.statusBar().showMessage(f"Selected {name} ({result.latency * 1000:.2f} ms)", 3000)
+
+    def export_high_res_image(self) -> None:
+        """Ask for the output file and size, then render the current scene in tiles."""
+        path, _ = QtWidgets.QFileDialog.getSaveFileName(
+            self, "Export Image", "render.png", "Images (*.png *.tif *.tiff)"
+        )
+        if not path:
+            return
+        size_name, ok = QtWidgets.QInputDialog.getItem(self, "Export Image", "Size:", list(EXPORT_SIZES), 1, False)
+        if not ok:
+            return
+        supersample, ok = QtWidgets.QInputDialog.getInt(self, "Export Image", "Supersampling:", 2, 1, 4)
+        if not ok:
+            return
+
+        width, height = EXPORT_SIZES[size_name]
+        QtWidgets.QApplication.setOverrideCursor(QtCore.Qt.CursorShape.WaitCursor)
+        renderer = OffscreenRenderer(copy.deepcopy(self.app_state))
+        renderer.scene.materials.table[:] = self.gl.materials.table
+        try:
+            TiledRenderer(renderer, supersample=supersample).render_to_file(Path(path), width, height)
+        finally:
+            renderer.cleanup()
+            QtWidgets.QApplication.restoreOverrideCursor()
@@ -1,66 +1,271 @@
-from OpenGL.GL import (  # type: ignore
-    GL_AMBIENT,
-    GL_DIFFUSE,
-    GL_FRONT,
-    GL_FRONT_AND_BACK,
-    GL_SHININESS,
-    GL_SPECULAR,
-    GLfloat,
-    glMaterialfv,
-)
-
-
-def setup_material(
-    *,
-    ambient: tuple[float, float, float, float],
-    diffuse: tuple[float, float, float, float],
-    specular: tuple[float, float, float, float],
-    shininess: float,
-    two_sided: bool = False,
-) -> None:
-    """Configure OpenGL material properties.
-
-    Args:
+"""Material library: named OpenGL materials loaded from a data file.
+
+The parameters of all materials are packed into one contiguous float32 table,
+a row per material, laid out like a std140 uniform block array so that it can
+be uploaded unchanged as a uniform or texture buffer::
+
+    vec4 ambient; vec4 diffuse; vec4 specular;
+    vec4 (shininess, two_sided, texture_slot, unused);
+
+Scene objects reference materials by their row index, which lets the scene
+sort its draw calls by material and skip setting a material that is already set.
+Materials edited at runtime are changed in place in their row; listeners are
+told which row changed so that caches of the rendered result can be dropped.
+"""
+
+from __future__ import annotations
+
+import ctypes
+import hashlib
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import numpy as np
+from OpenGL.GL import GL_AMBIENT, GL_DIFFUSE, GL_FRONT, GL_FRONT_AND_BACK, GL_SHININESS, GL_SPECULAR  # type: ignore
+
+# Unwrapped: takes the addresses of the table rows, so that applying a material allocates nothing
+from OpenGL.raw.GL.VERSION.GL_1_1 import glMaterialfv  # type: ignore
+
+from opengl_light_lab.app_state import SceneObject
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Mapping, Sequence
+
+MATERIALS_FILE = Path(__file__).parent / "materials.json"
+ROW_SIZE = 16
+"""Floats per material row (64 bytes, a multiple of the std140 vec4 alignment)."""
+AMBIENT, DIFFUSE, SPECULAR = slice(0, 4), slice(4, 8), slice(8, 12)
+SHININESS, TWO_SIDED, TEXTURE_SLOT = 12, 13, 14
+NO_TEXTURE = -1
+"""Texture slot of untextured materials. Slot 0 is the scene texture (AppState.current_texture)."""
+COLOR_KEYS = ("ambient", "diffuse", "specular")
+
+
+@dataclass
+class Material:
+    """Parameters of a material.
+
+    Attributes:
+        name: Unique name referenced by the object assignments.
         ambient: Ambient color (r, g, b, a).
         diffuse: Diffuse color (r, g, b, a).
         specular: Specular color (r, g, b, a).
         shininess: Shininess exponent.
         two_sided: Whether to apply to both front and back faces.
+        texture_slot: Texture sampled by the material, or NO_TEXTURE.
     """
-    face = GL_FRONT_AND_BACK if two_sided else GL_FRONT
-    glMaterialfv(face, GL_AMBIENT, (GLfloat * 4)(*ambient))
-    glMaterialfv(face, GL_DIFFUSE, (GLfloat * 4)(*diffuse))
-    glMaterialfv(face, GL_SPECULAR, (GLfloat * 4)(*specular))
-    glMaterialfv(face, GL_SHININESS, (GLfloat * 1)(shininess))
-
-
-def setup_material_red() -> None:
-    """Red material with moderate specularity."""
-    setup_material(
-        ambient=(0.3, 0.1, 0.1, 1.0), diffuse=(0.8, 0.3, 0.3, 1.0), specular=(0.8, 0.8, 0.8, 1.0), shininess=50.0
-    )
-
-
-def setup_material_blue() -> None:
-    """Blue material with high specularity."""
-    setup_material(
-        ambient=(0.1, 0.1, 0.3, 1.0), diffuse=(0.2, 0.4, 0.8, 1.0), specular=(1.0, 1.0, 1.0, 1.0), shininess=90.0
-    )
-
-
-def setup_material_green() -> None:
-    """Green matte material (no specularity)."""
-    setup_material(
-        ambient=(0.1, 0.3, 0.1, 1.0),
-        diffuse=(0.3, 0.7, 0.3, 1.0),
-        specular=(0.0, 0.0, 0.0, 1.0),
-        shininess=0.0,
-        two_sided=True,
-    )
-
-
-def setup_material_white() -> None:
-    """White/neutral material for textured surfaces."""
-    setup_material(
-        ambient=(1.0, 1.0, 1.0, 1.0), diffuse=(1.0, 1.0, 1.0, 1.0), specular=(0.3, 0.3, 0.3, 1.0), shininess=20.0
-    )
+
+    name: str
+    ambient: tuple[float, float, float, float]
+    diffuse: tuple[float, float, float, float]
+    specular: tuple[float, float, float, float]
+    shininess: float
+    two_sided: bool = False
+    texture_slot: int = NO_TEXTURE
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, object]) -> Material:
+        """Create a material from an entry of the data file; other keys, such as a description, are ignored.
+
+        Raises:
+            ValueError: If a parameter is missing or invalid.
+        """
+        try:
+            colors = [tuple(float(c) for c in data[key]) for key in COLOR_KEYS]  # type: ignore[attr-defined]
+            material = cls(
+                str(data["name"]),
+                *colors,  # type: ignore[arg-type]
+                shininess=float(data["shininess"]),  # type: ignore[arg-type]
+                two_sided=bool(data.get("two_sided", False)),
+                texture_slot=int(data.get("texture_slot", NO_TEXTURE)),  # type: ignore[call-overload]
+            )
+        except (KeyError, TypeError) as e:
+            msg = f"Invalid material {data.get('name', '?')!r}: {e!r}"
+            raise ValueError(msg) from e
+        if any(len(color) != 4 for color in colors):
+            msg = f"Invalid material {material.name!r}: colors must have 4 components"
+            raise ValueError(msg)
+        return material
+
+    def to_row(self) -> np.ndarray:
+        """Return the table row of the material."""
+        row = np.zeros(ROW_SIZE, dtype=np.float32)
+        row[AMBIENT], row[DIFFUSE], row[SPECULAR] = self.ambient, self.diffuse, self.specular
+        row[SHININESS], row[TWO_SIDED], row[TEXTURE_SLOT] = self.shininess, self.two_sided, self.texture_slot
+        return row
+
+
+class MaterialLibrary:
+    """Named materials in a contiguous parameter table, and their assignment to the scene objects.
+
+    Attributes:
+        names: Material names by row index.
+        table: Parameters, shape (materials, ROW_SIZE), see the module documentation.
+        version: Number of edits made with update, for cheap change detection.
+    """
+
+    def __init__(
+        self,
+        materials: list[Material],
+        objects: Mapping[SceneObject, str],
+        textured_objects: Mapping[SceneObject, str] | None = None,
+    ) -> None:
+        """Build the table.
+
+        Args:
+            materials: The materials, in table order.
+            objects: Name of the material of every scene object.
+            textured_objects: Material used instead while the scene texture is loaded.
+
+        Raises:
+            ValueError: If material names repeat, an object has no material or a name is unknown.
+        """
+        self.names = [m.name for m in materials]
+        self._index = {name: i for i, name in enumerate(self.names)}
+        if len(self._index) != len(materials):
+            msg = "Material names must be unique"
+            raise ValueError(msg)
+        missing = set(SceneObject) - objects.keys()
+        if missing:
+            msg = f"No material assigned to {', '.join(sorted(missing))}"
+            raise ValueError(msg)
+        self.table = np.stack([m.to_row() for m in materials]) if materials else np.zeros((0, ROW_SIZE), np.float32)
+        try:
+            self._objects = {obj: self._index[name] for obj, name in objects.items()}
+            self._textured = {obj: self._index[name] for obj, name in (textured_objects or {}).items()}
+        except KeyError as e:
+            msg = f"Unknown material {e.args[0]!r} assigned to an object"
+            raise ValueError(msg) from e
+        self.version = 0
+        self._listeners: list[Callable[[int], None]] = []
+        # Addresses of the color columns and shininess of every row, edited in place along with the table
+        self._parameters = [
+            tuple(
+                ctypes.c_void_p(row[column].ctypes.data)
+                for column in (AMBIENT, DIFFUSE, SPECULAR, slice(SHININESS, SHININESS + 1))
+            )
+            for row in self.table
+        ]
+
+    @classmethod
+    def load(cls, path: Path = MATERIALS_FILE) -> MaterialLibrary:
+        """Load a library from a JSON data file.
+
+        The file holds a ``materials`` list of Material entries, an ``objects``
+        mapping of SceneObject values to material names and an optional
+        ``textured_objects`` mapping of the same form. Invalid files raise
+        ValueError (or OSError if unreadable).
+
+        Args:
+            path: Path of the data file.
+        """
+        data = json.loads(path.read_text(encoding="utf-8"))
+        return cls(
+            [Material.from_dict(entry) for entry in data["materials"]],
+            {SceneObject(obj): name for obj, name in data["objects"].items()},
+            {SceneObject(obj): name for obj, name in data.get("textured_objects", {}).items()},
+        )
+
+    def __len__(self) -> int:
+        """Return the number of materials."""
+        return len(self.names)
+
+    def index(self, name: str) -> int:
+        """Return the row index of a material; unknown names raise KeyError."""
+        return self._index[name]
+
+    def material(self, index: int) -> Material:
+        """Return the parameters of a material as stored in the table."""
+        row = self.table[index].tolist()
+        return Material(
+            self.names[index],
+            tuple(row[AMBIENT]),  # type: ignore[arg-type]
+            tuple(row[DIFFUSE]),  # type: ignore[arg-type]
+            tuple(row[SPECULAR]),  # type: ignore[arg-type]
+            row[SHININESS],
+            bool(row[TWO_SIDED]),
+            int(row[TEXTURE_SLOT]),
+        )
+
+    def for_object(self, obj: SceneObject, *, textured: bool = False) -> int:
+        """Return the material index of a scene object.
+
+        Args:
+            obj: The scene object.
+            textured: Whether the scene texture is loaded.
+        """
+        if textured and obj in self._textured:
+            return self._textured[obj]
+        return self._objects[obj]
+
+    def texture_slot(self, index: int) -> int:
+        """Return the texture slot of a material, or NO_TEXTURE."""
+        return int(self.table[index, TEXTURE_SLOT])
+
+    def apply(self, index: int) -> None:
+        """Set a material as the current OpenGL material.
+
+        Args:
+            index: Row index of the material.
+        """
+        ambient, diffuse, specular, shininess = self._parameters[index]
+        face = GL_FRONT_AND_BACK if self.table[index, TWO_SIDED] else GL_FRONT
+        glMaterialfv(face, GL_AMBIENT, ambient)
+        glMaterialfv(face, GL_DIFFUSE, diffuse)
+        glMaterialfv(face, GL_SPECULAR, specular)
+        glMaterialfv(face, GL_SHININESS, shininess)
+
+    def update(
+        self,
+        index: int,
+        *,
+        ambient: Sequence[float] | None = None,
+        diffuse: Sequence[float] | None = None,
+        specular: Sequence[float] | None = None,
+        shininess: float | None = None,
+    ) -> None:
+        """Change parameters of a material in place and notify the listeners.
+
+        Only the given parameters are written into the row of the material;
+        the rest of the table is left untouched.
+
+        Args:
+            index: Row index of the material.
+            ambient: New ambient color; (r, g, b) keeps the current alpha.
+            diffuse: New diffuse color, like ambient.
+            specular: New specular color, like ambient.
+            shininess: New shininess exponent.
+        """
+        row = self.table[index]
+        for columns, color in ((AMBIENT, ambient), (DIFFUSE, diffuse), (SPECULAR, specular)):
+            if color is not None:
+                row[columns.start : columns.start + len(color)] = color
+        if shininess is not None:
+            row[SHININESS] = shininess
+        self.version += 1
+        for callback in list(self._listeners):
+            callback(index)
+
+    def add_listener(self, callback: Callable[[int], None]) -> None:
+        """Register a callback called with the row index after every update.
+
+        Args:
+            callback: Function called with the index of the changed material.
+        """
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback: Callable[[int], None]) -> None:
+        """Unregister a callback added with add_listener.
+
+        Args:
+            callback: The callback to remove.
+        """
+        self._listeners.remove(callback)
+
+    def digest(self) -> str:
+        """Return a hash of the table and the assignments, identifying the look of the materials."""
+        digest = hashlib.sha256(self.table.tobytes())
+        digest.update(repr((self.names, sorted(self._objects.items()), sorted(self._textured.items()))).encode())
+        return digest.hexdigest()
@@ -0,0 +1,954 @@
+"""Triangle meshes read from OBJ, PLY and STL files, with an on-disk cache.
+
+The parsers stream the file in large blocks and parse each block with NumPy
+as a whole: line types, tokens and comments are found with vectorized byte
+operations and the numbers are converted in one ``np.fromstring`` call per
+block, so no Python object is created per line. Binary PLY and STL data is
+read directly as structured arrays.
+
+Polygons are split into triangle fans. Vertices at identical positions are
+merged by hashing their coordinates. The welded mesh then goes through the
+processing stage of mesh_processing: meshes above a triangle budget are
+simplified, and the triangles and vertices are reordered for the vertex
+cache. Vertex normals are computed last, either smooth (area-weighted over
+the faces sharing a vertex) or flat (one normal per face, with unshared
+vertices). Texture coordinates and normals stored in the files are ignored.
+
+Processed meshes are saved as ``.npy`` files keyed by the path, size and
+modification time of the source file and the processing options; later
+loads memory-map them instead of parsing and processing the file again.
+
+Run as a script (``benchmark-mesh``), the module times the stages on a mesh
+file and reports the vertex cache miss ratio before and after processing.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import os
+import shutil
+import struct
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, BinaryIO
+
+import numpy as np
+
+from opengl_light_lab.mesh_processing import (
+    CACHE_SIZE,
+    cache_miss_ratio,
+    optimize_overdraw,
+    optimize_vertex_cache,
+    optimize_vertex_fetch,
+    process,
+    simplify,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+DEFAULT_CACHE_DIR = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "opengl-light-lab" / "meshes"
+MESH_SUFFIXES = (".obj", ".ply", ".stl")
+CHUNK_SIZE = 16 * 1024 * 1024
+"""Bytes of a text file parsed at once."""
+CACHE_VERSION = 2
+"""Part of the cache keys; bump it when the parsers or the cached arrays change."""
+KEY_LENGTH = 32
+CACHE_ARRAYS = ("positions", "normals", "indices")
+
+_WHITESPACE = np.zeros(256, dtype=bool)
+_WHITESPACE[list(b" \t\n\v\f\r")] = True
+_PLY_TYPES = {
+    "char": "i1",
+    "int8": "i1",
+    "uchar": "u1",
+    "uint8": "u1",
+    "short": "i2",
+    "int16": "i2",
+    "ushort": "u2",
+    "uint16": "u2",
+    "int": "i4",
+    "int32": "i4",
+    "uint": "u4",
+    "uint32": "u4",
+    "float": "f4",
+    "float32": "f4",
+    "double": "f8",
+    "float64": "f8",
+}
+_PLY_ENDIANNESS = {"ascii": "", "binary_little_endian": "<", "binary_big_endian": ">"}
+_STL_HEADER_SIZE = 84
+_STL_FACET = np.dtype([("normal", "<f4", (3,)), ("vertices", "<f4", (3, 3)), ("attributes", "<u2")])
+
+
+@dataclass
+class TriangleMesh:
+    """Indexed triangle mesh.
+
+    Attributes:
+        positions: Vertex positions, shape (n, 3), float32.
+        normals: Unit vertex normals, shape (n, 3), float32.
+        indices: Vertex indices of the triangles, shape (m, 3), uint32.
+    """
+
+    positions: np.ndarray
+    normals: np.ndarray
+    indices: np.ndarray
+
+    @property
+    def vertex_count(self) -> int:
+        """Return the number of vertices."""
+        return len(self.positions)
+
+    @property
+    def triangle_count(self) -> int:
+        """Return the number of triangles."""
+        return len(self.indices)
+
+    def bounds(self) -> tuple[np.ndarray, np.ndarray]:
+        """Return the minimum and maximum corners of the bounding box."""
+        return self.positions.min(axis=0), self.positions.max(axis=0)
+
+
+# ----- Vectorized text parsing -----
+
+
+def _read_blocks(file: BinaryIO, size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """Yield the rest of a file in blocks of whole lines, each ending with a newline."""
+    rest = b""
+    while block := file.read(size):
+        block = rest + block
+        cut = block.rfind(b"\n") + 1
+        rest = block[cut:]
+        if cut:
+            yield block[:cut]
+    if rest:
+        yield rest + b"\n"
+
+
+def _mark_ranges(length: int, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """Return a mask of the positions covered by sorted, disjoint half-open ranges [start, end)."""
+    bounds = np.empty(2 * len(starts) + 2, dtype=np.int64)
+    bounds[0], bounds[-1] = 0, length
+    bounds[1:-1:2], bounds[2:-1:2] = starts, ends
+    inside = np.zeros(len(bounds) - 1, dtype=bool)
+    inside[1::2] = True
+    return np.repeat(inside, np.diff(bounds))
+
+
+def _first_per_end(starts: np.ndarray, ends: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Merge sorted ranges sharing their end into the one starting first."""
+    first = np.concatenate(([True], ends[1:] != ends[:-1]))
+    return starts[first], ends[first]
+
+
+def _strip_comments(text: np.ndarray, marker: bytes) -> None:
+    """Blank out everything from a comment marker to the end of its line, in place."""
+    markers = np.flatnonzero(text == marker[0])
+    if len(markers):
+        newlines = np.flatnonzero(text == ord("\n"))
+        starts, ends = _first_per_end(markers, newlines[np.searchsorted(newlines, markers)])
+        text[_mark_ranges(len(text), starts, ends)] = ord(" ")
+
+
+def _token_starts(text: np.ndarray) -> np.ndarray:
+    """Return a mask of the first bytes of whitespace-separated tokens."""
+    space = _WHITESPACE[text]
+    return ~space & np.concatenate(([True], space[:-1]))
+
+
+def _blank_token_tails(text: np.ndarray, positions: np.ndarray) -> None:
+    """Blank out, in place, the tokens from the given positions to their end; the text must end with whitespace."""
+    if len(positions):
+        spaces = np.flatnonzero(_WHITESPACE[text])
+        starts, ends = _first_per_end(positions, spaces[np.searchsorted(spaces, positions)])
+        text[_mark_ranges(len(text), starts, ends)] = ord(" ")
+
+
+def _tokens_per_line(text: np.ndarray) -> np.ndarray:
+    """Return the number of whitespace-separated tokens on each line of text ending with a newline."""
+    newlines = np.flatnonzero(text == ord("\n"))
+    lines = np.searchsorted(newlines, np.flatnonzero(_token_starts(text)))
+    return np.bincount(lines, minlength=len(newlines))
+
+
+def _parse_numbers(text: np.ndarray, dtype: type, expected: int) -> np.ndarray:
+    """Convert whitespace-separated numbers.
+
+    Raises:
+        ValueError: If the text does not hold exactly the expected number of numbers.
+    """
+    if expected == 0:
+        return np.zeros(0, dtype=dtype)
+    try:
+        values = np.fromstring(text.tobytes(), dtype=dtype, sep=" ")
+    except ValueError:
+        values = np.zeros(0, dtype=dtype)
+    if len(values) != expected:
+        msg = f"Malformed numbers in mesh file, expected {expected} values"
+        raise ValueError(msg)
+    return values
+
+
+def _first_columns(values: np.ndarray, counts: np.ndarray, columns: int) -> np.ndarray:
+    """Return the first values of each line of flattened rows with varying lengths, shape (lines, columns)."""
+    if np.all(counts == columns):
+        return values.reshape(-1, columns)
+    starts = np.cumsum(counts) - counts
+    return values[starts[:, None] + np.arange(columns)]
+
+
+def _select_lines(text: np.ndarray, newlines: np.ndarray, lines: np.ndarray) -> np.ndarray:
+    """Return the bytes of some lines of a text.
+
+    Args:
+        text: Text ending with a newline.
+        newlines: Positions of the newlines of the text.
+        lines: Indices of the selected lines, ascending.
+    """
+    starts = np.concatenate(([0], newlines[:-1] + 1))
+    return text[_mark_ranges(len(text), starts[lines], newlines[lines] + 1)]
+
+
+def fan_triangles(indices: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """Split polygons into triangle fans.
+
+    Args:
+        indices: Vertex indices of all polygons, concatenated.
+        counts: Number of vertices of each polygon, at least 3.
+
+    Returns:
+        Triangles, shape (sum(counts - 2), 3).
+    """
+    if np.all(counts == 3):
+        return indices.reshape(-1, 3)
+    starts = np.cumsum(counts) - counts
+    fans = counts - 2
+    first = np.repeat(starts, fans)
+    step = np.arange(int(fans.sum())) - np.repeat(np.cumsum(fans) - fans, fans) + 1
+    return np.stack([indices[first], indices[first + step], indices[first + step + 1]], axis=1)
+
+
+def _check_indices(triangles: np.ndarray, vertex_count: int) -> None:
+    """Raise ValueError if a triangle references a missing vertex."""
+    if len(triangles) and (triangles.min() < 0 or triangles.max() >= vertex_count):
+        msg = f"Mesh face references a vertex outside 1..{vertex_count}"
+        raise ValueError(msg)
+
+
+# ----- OBJ -----
+
+
+def _obj_positions(text: np.ndarray) -> np.ndarray:
+    """Return the positions of ``v`` lines with the keyword blanked out, shape (lines, 3).
+
+    Raises:
+        ValueError: If a line is malformed.
+    """
+    counts = _tokens_per_line(text)
+    if np.any(counts < 3):
+        msg = "OBJ vertex with fewer than 3 coordinates"
+        raise ValueError(msg)
+    values = _parse_numbers(text, np.float32, int(counts.sum()))
+    # Extra values are the w coordinate or a vertex color
+    return _first_columns(values, counts, 3)
+
+
+def _obj_polygons(text: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Return the one-based or negative position indices of ``f`` lines with the keyword blanked out.
+
+    Returns:
+        Concatenated indices and the vertex count of each polygon.
+
+    Raises:
+        ValueError: If a line is malformed.
+    """
+    # Keep only the position index of v/vt/vn references
+    _blank_token_tails(text, np.flatnonzero(text == ord("/")))
+    sizes = _tokens_per_line(text)
+    if np.any(sizes < 3):
+        msg = "OBJ face with fewer than 3 vertices"
+        raise ValueError(msg)
+    indices = _parse_numbers(text, np.int64, int(sizes.sum()))
+    if np.any(indices == 0):
+        msg = "OBJ face with vertex index 0"
+        raise ValueError(msg)
+    return indices, sizes
+
+
+def _parse_obj_block(block: bytes, vertex_base: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Parse the ``v`` and ``f`` lines of a block of an OBJ file; malformed lines raise ValueError.
+
+    Args:
+        block: Whole lines of the file.
+        vertex_base: Number of vertices in the preceding blocks, for relative (negative) indices.
+
+    Returns:
+        Vertex positions (n, 3), zero-based polygon indices and the vertex count of each polygon.
+    """
+    text = np.frombuffer(block, dtype=np.uint8).copy()
+    _strip_comments(text, b"#")
+    newlines = np.flatnonzero(text == ord("\n"))
+    line_start = np.concatenate(([0], newlines[:-1] + 1))
+    keyword_end = _WHITESPACE[text[np.minimum(line_start + 1, len(text) - 1)]]
+    vertex_lines = (text[line_start] == ord("v")) & keyword_end
+    face_lines = (text[line_start] == ord("f")) & keyword_end
+    # The keyword is not part of the numbers
+    text[line_start[vertex_lines | face_lines]] = ord(" ")
+
+    positions = _obj_positions(_select_lines(text, newlines, np.flatnonzero(vertex_lines)))
+    indices, sizes = _obj_polygons(_select_lines(text, newlines, np.flatnonzero(face_lines)))
+    # Negative indices count back from the last vertex defined before the face
+    vertices_before = vertex_base + np.cumsum(vertex_lines) - vertex_lines
+    relative_base = np.repeat(vertices_before[face_lines], sizes)
+    indices = np.where(indices < 0, indices + relative_base, indices - 1)
+    return positions, indices, sizes
+
+
+def read_obj(path: Path) -> tuple[np.ndarray, np.ndarray]:
+    """Read the vertex positions and faces of a Wavefront OBJ file.
+
+    All groups and objects of the file are merged. Malformed files raise
+    ValueError.
+
+    Args:
+        path: Path of the file.
+
+    Returns:
+        Positions, shape (n, 3), float32, and triangles, shape (m, 3), int64.
+    """
+    positions, polygons, sizes = [], [], []
+    vertex_count = 0
+    with path.open("rb") as file:
+        for block in _read_blocks(file):
+            block_positions, block_polygons, block_sizes = _parse_obj_block(block, vertex_count)
+            vertex_count += len(block_positions)
+            positions.append(block_positions)
+            polygons.append(block_polygons)
+            sizes.append(block_sizes)
+    all_positions = np.concatenate(positions) if positions else np.zeros((0, 3), np.float32)
+    triangles = (
+        fan_triangles(np.concatenate(polygons), np.concatenate(sizes)) if polygons else np.zeros((0, 3), np.int64)
+    )
+    _check_indices(triangles, vertex_count)
+    return all_positions, triangles
+
+
+# ----- PLY -----
+
+
+@dataclass
+class _PlyElement:
+    """Element declaration of a PLY header; list properties have a (count type, item type) pair as type."""
+
+    name: str
+    count: int
+    properties: list[tuple[str, str | tuple[str, str]]]
+
+
+def _read_ply_header(file: BinaryIO) -> tuple[str, list[_PlyElement]]:
+    """Read the header of a PLY file, leaving the file at the start of the data.
+
+    Raises:
+        ValueError: If the header is malformed or uses unknown types.
+    """
+    if file.readline().strip() != b"ply":
+        msg = "Not a PLY file"
+        raise ValueError(msg)
+    file_format = ""
+    elements: list[_PlyElement] = []
+    while line := file.readline():
+        words = line.decode("ascii", errors="replace").split()
+        if not words or words[0] in {"comment", "obj_info"}:
+            continue
+        try:
+            match words:
+                case ["end_header"]:
+                    if file_format not in _PLY_ENDIANNESS:
+                        msg = f"Unknown PLY format {file_format!r}"
+                        raise ValueError(msg)
+                    return file_format, elements
+                case ["format", name, _version]:
+                    file_format = name
+                case ["element", name, count]:
+                    elements.append(_PlyElement(name, int(count), []))
+                case ["property", "list", count_type, item_type, name]:
+                    elements[-1].properties.append((name, (_PLY_TYPES[count_type], _PLY_TYPES[item_type])))
+                case ["property", value_type, name]:
+                    elements[-1].properties.append((name, _PLY_TYPES[value_type]))
+                case _:
+                    msg = f"Malformed PLY header line {line!r}"
+                    raise ValueError(msg)
+        except (KeyError, IndexError) as e:
+            msg = f"Malformed PLY header line {line!r}"
+            raise ValueError(msg) from e
+    msg = "PLY header without end_header"
+    raise ValueError(msg)
+
+
+def _ply_scalar_dtype(element: _PlyElement, endian: str) -> np.dtype:
+    """Return the structured dtype of an element without list properties."""
+    return np.dtype([(name, endian + value_type) for name, value_type in element.properties])  # type: ignore[operator]
+
+
+def _ply_face_list(element: _PlyElement) -> int:
+    """Return the position of the vertex index list among the properties of the face element.
+
+    Raises:
+        ValueError: If the element has no vertex index list.
+    """
+    for i, (name, value_type) in enumerate(element.properties):
+        if name in {"vertex_indices", "vertex_index"} and isinstance(value_type, tuple):
+            return i
+    msg = "PLY face element without a vertex_indices list"
+    raise ValueError(msg)
+
+
+def _read_binary_lists(data: memoryview, element: _PlyElement, endian: str) -> tuple[np.ndarray, np.ndarray, int]:
+    """Read the vertex index lists of a binary face element.
+
+    When every face has the same number of vertices, which is by far the most
+    common case, the element is read as one structured array. Otherwise the
+    records are walked one by one.
+
+    Returns:
+        Concatenated indices, vertex count of each face and the size of the element in bytes.
+
+    Raises:
+        ValueError: If the data ends before the element.
+    """
+    list_index = _ply_face_list(element)
+    # Guess the list lengths from the first record
+    entries: list[tuple[str, np.dtype] | tuple[str, np.dtype, tuple[int]]] = []
+    offset = 0
+    for name, value_type in element.properties:
+        if isinstance(value_type, tuple):
+            count_type, item_type = np.dtype(endian + value_type[0]), np.dtype(endian + value_type[1])
+            count = int(np.frombuffer(data, count_type, 1, offset)[0]) if offset < len(data) else 0
+            entries.extend([(f"{name}_count", count_type), (name, item_type, (count,))])
+            offset += count_type.itemsize + count * item_type.itemsize
+        else:
+            entries.append((name, np.dtype(endian + value_type)))
+            offset += entries[-1][1].itemsize
+    dtype = np.dtype(entries)
+    if dtype.itemsize * element.count <= len(data):
+        records = np.frombuffer(data, dtype, element.count)
+        lists = [name for name, value_type in element.properties if isinstance(value_type, tuple)]
+        if all(np.all(records[f"{name}_count"] == dtype[name].shape[0]) for name in lists):
+            name = element.properties[list_index][0]
+            sizes = np.full(element.count, dtype[name].shape[0], dtype=np.int64)
+            return records[name].reshape(-1).astype(np.int64), sizes, dtype.itemsize * element.count
+
+    # Faces with different vertex counts
+    index_parts, sizes_list, offset = [], [], 0
+    for _ in range(element.count):
+        for name, value_type in element.properties:
+            if isinstance(value_type, tuple):
+                count_type, item_type = np.dtype(endian + value_type[0]), np.dtype(endian + value_type[1])
+                if offset + count_type.itemsize > len(data):
+                    break
+                count = int(np.frombuffer(data, count_type, 1, offset)[0])
+                offset += count_type.itemsize
+                if name == element.properties[list_index][0]:
+                    index_parts.append(np.frombuffer(data, item_type, count, offset))
+                    sizes_list.append(count)
+                offset += count * item_type.itemsize
+            else:
+                offset += np.dtype(value_type).itemsize
+    if len(sizes_list) != element.count or offset > len(data):
+        msg = "PLY data ends before the face element"
+        raise ValueError(msg)
+    indices = np.concatenate(index_parts).astype(np.int64) if index_parts else np.zeros(0, np.int64)
+    return indices, np.array(sizes_list, dtype=np.int64), offset
+
+
+def _read_binary_ply(
+    file: BinaryIO, elements: list[_PlyElement], endian: str
+) -> tuple[np.ndarray | None, np.ndarray, np.ndarray]:
+    """Read the vertex positions and face lists of binary PLY data.
+
+    Raises:
+        ValueError: If the data is shorter than the header declares.
+    """
+    data = memoryview(file.read())
+    vertices: np.ndarray | None = None
+    indices, sizes = np.zeros(0, np.int64), np.zeros(0, np.int64)
+    offset = 0
+    for element in elements:
+        if element.name == "face":
+            indices, sizes, size = _read_binary_lists(data[offset:], element, endian)
+        elif any(isinstance(value_type, tuple) for _name, value_type in element.properties):
+            msg = f"PLY element {element.name!r} with list properties is not supported"
+            raise ValueError(msg)
+        else:
+            dtype = _ply_scalar_dtype(element, endian)
+            size = dtype.itemsize * element.count
+            if offset + size > len(data):
+                msg = f"PLY data ends before the {element.name} element"
+                raise ValueError(msg)
+            if element.name == "vertex":
+                vertices = np.frombuffer(data, dtype, element.count, offset)
+        offset += size
+    return vertices, indices, sizes
+
+
+def _leading_lists(values: np.ndarray, counts: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Return the lists at the start of lines of integers, each a length followed by the items.
+
+    Args:
+        values: Values of all lines, concatenated.
+        counts: Number of values on each line.
+
+    Returns:
+        Concatenated items and the length of each list.
+
+    Raises:
+        ValueError: If a line is shorter than its list.
+    """
+    starts = np.cumsum(counts) - counts
+    sizes = values[starts]
+    if np.any(sizes + 1 > counts):
+        msg = "PLY face with fewer indices than its vertex count"
+        raise ValueError(msg)
+    # Further values on a line belong to other properties
+    item = np.arange(int(sizes.sum())) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+    return values[np.repeat(starts + 1, sizes) + item], sizes
+
+
+def _read_ascii_ply(file: BinaryIO, elements: list[_PlyElement]) -> tuple[np.ndarray | None, np.ndarray, np.ndarray]:
+    """Read the vertex positions and face lists of ASCII PLY data.
+
+    Raises:
+        ValueError: If the data is malformed or shorter than the header declares.
+    """
+    text = np.frombuffer(file.read() + b"\n", dtype=np.uint8).copy()
+    newlines = np.flatnonzero(text == ord("\n"))
+    counts = _tokens_per_line(text)
+    # Blank lines are not records
+    records = np.flatnonzero(counts > 0)
+    vertices: np.ndarray | None = None
+    indices, sizes = np.zeros(0, np.int64), np.zeros(0, np.int64)
+    first = 0
+    for element in elements:
+        lines = records[first : first + element.count]
+        first += element.count
+        if len(lines) < element.count:
+            msg = f"PLY data ends before the {element.name} element"
+            raise ValueError(msg)
+        if element.name not in {"vertex", "face"}:
+            continue
+        element_text = _select_lines(text, newlines, lines)
+        element_counts = counts[lines]
+        if element.name == "vertex":
+            if np.any(element_counts != len(element.properties)):
+                msg = "PLY vertex with a wrong number of values"
+                raise ValueError(msg)
+            values = _parse_numbers(element_text, np.float64, int(element_counts.sum()))
+            vertices = values.reshape(element.count, -1)
+        else:
+            if _ply_face_list(element) != 0:
+                msg = "ASCII PLY faces must start with the vertex_indices list"
+                raise ValueError(msg)
+            values = _parse_numbers(element_text, np.float64, int(element_counts.sum())).astype(np.int64)
+            indices, sizes = _leading_lists(values, element_counts)
+    return vertices, indices, sizes
+
+
+def read_ply(path: Path) -> tuple[np.ndarray, np.ndarray]:
+    """Read the vertex positions and faces of an ASCII or binary PLY file.
+
+    Malformed files raise ValueError.
+
+    Args:
+        path: Path of the file.
+
+    Returns:
+        Positions, shape (n, 3), float32, and triangles, shape (m, 3), int64.
+    """
+    with path.open("rb") as file:
+        file_format, elements = _read_ply_header(file)
+        if file_format == "ascii":
+            vertices, indices, sizes = _read_ascii_ply(file, elements)
+            vertex_element = next((e for e in elements if e.name == "vertex"), None)
+            names = [name for name, _value_type in vertex_element.properties] if vertex_element else []
+            columns = [names.index(axis) for axis in "xyz" if axis in names]
+            positions = vertices[:, columns] if vertices is not None and len(columns) == 3 else None
+        else:
+            vertices, indices, sizes = _read_binary_ply(file, elements, _PLY_ENDIANNESS[file_format])
+            has_xyz = vertices is not None and {"x", "y", "z"} <= set(vertices.dtype.names or ())
+            positions = np.stack([vertices[axis] for axis in "xyz"], axis=1) if has_xyz else None  # type: ignore[index]
+    if positions is None:
+        msg = "PLY file without x, y and z vertex properties"
+        raise ValueError(msg)
+    if np.any(sizes < 3):
+        msg = "PLY face with fewer than 3 vertices"
+        raise ValueError(msg)
+    triangles = fan_triangles(indices, sizes)
+    _check_indices(triangles, len(positions))
+    return np.ascontiguousarray(positions, dtype=np.float32), triangles
+
+
+# ----- STL -----
+
+
+def _is_binary_stl(path: Path) -> bool:
+    """Return True if an STL file is binary; ASCII files start with ``solid`` and are not sized like binary ones."""
+    with path.open("rb") as file:
+        header = file.read(_STL_HEADER_SIZE)
+    if len(header) < _STL_HEADER_SIZE:
+        return False
+    (count,) = struct.unpack_from("<I", header, 80)
+    return not header.startswith(b"solid") or path.stat().st_size == _STL_HEADER_SIZE + count * _STL_FACET.itemsize
+
+
+def _parse_stl_block(block: bytes) -> np.ndarray:
+    """Return the vertices of the facets in a block of an ASCII STL file, shape (facets, 3, 3).
+
+    Raises:
+        ValueError: If a facet is malformed.
+    """
+    text = np.frombuffer(block, dtype=np.uint8).copy()
+    # The rest of a solid or endsolid line is the name, which may contain digits
+    start = block.find(b"solid")
+    while start >= 0:
+        end = block.find(b"\n", start)
+        text[start:end] = ord(" ")
+        start = block.find(b"solid", end)
+    # Of the remaining words, those starting with a letter are keywords
+    letter = ((text | 0x20) >= ord("a")) & ((text | 0x20) <= ord("z"))
+    _blank_token_tails(text, np.flatnonzero(_token_starts(text) & letter))
+    numbers = _tokens_per_line(text).sum()
+    if numbers % 12:
+        msg = "Malformed ASCII STL facet"
+        raise ValueError(msg)
+    values = _parse_numbers(text, np.float32, int(numbers))
+    # Each facet is a normal followed by three vertices
+    return values.reshape(-1, 4, 3)[:, 1:]
+
+
+def read_stl(path: Path) -> tuple[np.ndarray, np.ndarray]:
+    """Read the triangles of a binary or ASCII STL file.
+
+    STL files store unshared vertices, three per facet; they are returned as
+    such and merged by weld_vertices. Malformed files raise ValueError.
+
+    Args:
+        path: Path of the file.
+
+    Returns:
+        Positions, shape (3m, 3), float32, and triangles, shape (m, 3), int64.
+    """
+    if _is_binary_stl(path):
+        with path.open("rb") as file:
+            file.seek(_STL_HEADER_SIZE)
+            data = file.read()
+        if len(data) % _STL_FACET.itemsize:
+            msg = "Truncated binary STL file"
+            raise ValueError(msg)
+        corners = np.frombuffer(data, _STL_FACET)["vertices"]
+    else:
+        facets = []
+        with path.open("rb") as file:
+            rest = b""
+            # Cut the blocks after complete facets
+            while block := file.read(CHUNK_SIZE):
+                block = rest + block
+                cut = block.rfind(b"endfacet")
+                cut = block.find(b"\n", cut) + 1 if cut >= 0 else 0
+                rest = block[cut:]
+                if cut:
+                    facets.append(_parse_stl_block(block[:cut]))
+            if rest.strip():
+                facets.append(_parse_stl_block(rest + b"\n"))
+        corners = np.concatenate(facets) if facets else np.zeros((0, 3, 3), np.float32)
+    positions = np.ascontiguousarray(corners.reshape(-1, 3), dtype=np.float32)
+    return positions, np.arange(len(positions), dtype=np.int64).reshape(-1, 3)
+
+
+READERS = {".obj": read_obj, ".ply": read_ply, ".stl": read_stl}
+"""Mesh file readers by lowercase suffix."""
+
+
+# ----- Vertex welding and normals -----
+
+
+def weld_vertices(positions: np.ndarray, triangles: np.ndarray, epsilon: float = 0.0) -> tuple[np.ndarray, np.ndarray]:
+    """Merge vertices at the same position and drop the triangles this makes degenerate.
+
+    The three coordinates of each vertex are reduced to one 64-bit hash, so
+    duplicates are found by a one-dimensional unique over the hashes instead
+    of a lexicographic sort of the rows; hash collisions are detected and
+    fall back to comparing the rows. Vertices keep the order of their first
+    occurrence.
+
+    Args:
+        positions: Vertex positions, shape (n, 3).
+        triangles: Vertex indices, shape (m, 3).
+        epsilon: Positions are merged if they round to the same multiple of
+            epsilon; 0 merges bit-identical positions only.
+
+    Returns:
+        The merged positions and the remapped triangles.
+    """
+    if epsilon > 0:
+        keys = np.round(positions / epsilon).astype(np.int64)
+    else:
+        # Adding 0 turns -0.0 into 0.0
+        keys = (np.asarray(positions, dtype=np.float32) + np.float32(0)).view(np.uint32).astype(np.int64)
+    bits = keys.astype(np.uint64)
+    hashes = (
+        (bits[:, 0] * np.uint64(0x9E3779B97F4A7C15))
+        ^ (bits[:, 1] * np.uint64(0xC2B2AE3D27D4EB4F))
+        ^ (bits[:, 2] * np.uint64(0x165667B19E3779F9))
+    )
+    _, first, inverse = np.unique(hashes, return_index=True, return_inverse=True)
+    if np.any(keys[first][inverse] != keys):
+        _, first, inverse = np.unique(keys, axis=0, return_index=True, return_inverse=True)
+    inverse = inverse.reshape(-1)
+    # Number the unique vertices in the order they first appear
+    order = np.argsort(first)
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    welded = rank[inverse][triangles]
+    keep = (welded[:, 0] != welded[:, 1]) & (welded[:, 1] != welded[:, 2]) & (welded[:, 2] != welded[:, 0])
+    return np.ascontiguousarray(positions[first[order]], dtype=np.float32), welded[keep]
+
+
+def face_normals(positions: np.ndarray, triangles: np.ndarray) -> np.ndarray:
+    """Return the normals of triangles scaled by twice their area, shape (m, 3), counter-clockwise front faces."""
+    corners = positions[triangles].astype(np.float64)
+    return np.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0])
+
+
+def _normalized(vectors: np.ndarray) -> np.ndarray:
+    """Return unit vectors as float32; zero vectors become +Z."""
+    length = np.linalg.norm(vectors, axis=1, keepdims=True)
+    unit = np.divide(vectors, length, out=np.zeros_like(vectors), where=length > 0)
+    unit[length[:, 0] == 0] = (0.0, 0.0, 1.0)
+    return unit.astype(np.float32)
+
+
+def vertex_normals(positions: np.ndarray, triangles: np.ndarray) -> np.ndarray:
+    """Return smooth vertex normals: the normalized sum of the area-weighted normals of the adjacent faces."""
+    normals = face_normals(positions, triangles)
+    corners = triangles.reshape(-1)
+    summed = np.stack(
+        [np.bincount(corners, np.repeat(normals[:, axis], 3), minlength=len(positions)) for axis in range(3)], axis=1
+    )
+    return _normalized(summed)
+
+
+def build_mesh(  # noqa: PLR0913
+    positions: np.ndarray,
+    triangles: np.ndarray,
+    *,
+    smooth: bool = True,
+    weld_epsilon: float = 0.0,
+    target_triangles: int | None = None,
+    optimize: bool = True,
+) -> TriangleMesh:
+    """Build a renderable mesh from positions and triangles.
+
+    Args:
+        positions: Vertex positions, shape (n, 3).
+        triangles: Vertex indices, shape (m, 3).
+        smooth: Whether to share vertices between faces with smooth normals;
+            if False, every triangle gets its own vertices with the face normal.
+        weld_epsilon: Distance grid of the vertex merge, see weld_vertices.
+        target_triangles: Simplify meshes with more triangles to about this count, or None to keep all.
+        optimize: Whether to reorder the triangles and vertices for the vertex cache.
+    """
+    positions, triangles = weld_vertices(positions, triangles, weld_epsilon)
+    positions, triangles = process(positions, triangles, target_triangles=target_triangles, optimize=optimize)
+    if smooth:
+        normals = vertex_normals(positions, triangles)
+        indices = triangles
+    else:
+        normals = np.repeat(_normalized(face_normals(positions, triangles)), 3, axis=0)
+        positions = positions[triangles.reshape(-1)]
+        indices = np.arange(len(positions)).reshape(-1, 3)
+    return TriangleMesh(
+        np.ascontiguousarray(positions, dtype=np.float32), normals, np.ascontiguousarray(indices, dtype=np.uint32)
+    )
+
+
+def _read_faces(path: Path) -> tuple[np.ndarray, np.ndarray]:
+    """Read the positions and triangles of a mesh file with the reader of its suffix."""
+    reader = READERS.get(path.suffix.lower())
+    if reader is None:
+        msg = f"Unsupported mesh file {path.name!r}, expected one of {', '.join(MESH_SUFFIXES)}"
+        raise ValueError(msg)
+    positions, triangles = reader(path)
+    if not len(triangles):
+        msg = f"Mesh file {path.name!r} has no faces"
+        raise ValueError(msg)
+    return positions, triangles
+
+
+def read_mesh(
+    path: Path,
+    *,
+    smooth: bool = True,
+    weld_epsilon: float = 0.0,
+    target_triangles: int | None = None,
+    optimize: bool = True,
+) -> TriangleMesh:
+    """Read and build a mesh from an OBJ, PLY or STL file, without the cache.
+
+    Unsupported suffixes and malformed files raise ValueError.
+
+    Args:
+        path: Path of the file.
+        smooth: Whether to compute smooth normals, see build_mesh.
+        weld_epsilon: Distance grid of the vertex merge, see weld_vertices.
+        target_triangles: Triangle budget of the simplification, see build_mesh.
+        optimize: Whether to optimize the draw order, see build_mesh.
+    """
+    positions, triangles = _read_faces(path)
+    return build_mesh(
+        positions,
+        triangles,
+        smooth=smooth,
+        weld_epsilon=weld_epsilon,
+        target_triangles=target_triangles,
+        optimize=optimize,
+    )
+
+
+# ----- Cache -----
+
+
+def cache_key(
+    path: Path,
+    *,
+    smooth: bool = True,
+    weld_epsilon: float = 0.0,
+    target_triangles: int | None = None,
+    optimize: bool = True,
+) -> str:
+    """Return the cache key of a mesh file, which changes when the file is modified.
+
+    Args:
+        path: Path of the file.
+        smooth: Normal mode of the mesh.
+        weld_epsilon: Distance grid of the vertex merge.
+        target_triangles: Triangle budget of the simplification.
+        optimize: Whether the draw order is optimized.
+    """
+    stat = path.stat()
+    text = (
+        f"{CACHE_VERSION}:{path.resolve()}:{stat.st_size}:{stat.st_mtime_ns}:{smooth}:{weld_epsilon!r}"
+        f":{target_triangles}:{optimize}"
+    )
+    return hashlib.sha256(text.encode()).hexdigest()[:KEY_LENGTH]
+
+
+def _save_cached(directory: Path, mesh: TriangleMesh) -> None:
+    """Write the arrays of a mesh to a cache entry, atomically."""
+    temporary = directory.with_name(f"{directory.name}.{os.getpid()}.tmp")
+    temporary.mkdir(parents=True, exist_ok=True)
+    try:
+        for name in CACHE_ARRAYS:
+            np.save(temporary / f"{name}.npy", getattr(mesh, name))
+        temporary.replace(directory)
+    except OSError:
+        # Another process stored the same mesh first
+        shutil.rmtree(temporary, ignore_errors=True)
+
+
+def load_mesh(  # noqa: PLR0913
+    path: Path,
+    *,
+    smooth: bool = True,
+    weld_epsilon: float = 0.0,
+    target_triangles: int | None = None,
+    optimize: bool = True,
+    cache_dir: Path | None = DEFAULT_CACHE_DIR,
+) -> TriangleMesh:
+    """Load a mesh, from the cache if the file was processed before.
+
+    Cached arrays are memory-mapped read-only, so loading a large mesh again
+    takes about as long as opening three files, however long the processing
+    took. Unsupported suffixes and malformed files raise ValueError,
+    unreadable ones OSError.
+
+    Args:
+        path: Path of an OBJ, PLY or STL file.
+        smooth: Whether to compute smooth normals, see build_mesh.
+        weld_epsilon: Distance grid of the vertex merge, see weld_vertices.
+        target_triangles: Triangle budget of the simplification, see build_mesh.
+        optimize: Whether to optimize the draw order, see build_mesh.
+        cache_dir: Directory of the cache, or None to always parse the file.
+    """
+    if cache_dir is None:
+        return read_mesh(
+            path, smooth=smooth, weld_epsilon=weld_epsilon, target_triangles=target_triangles, optimize=optimize
+        )
+    key = cache_key(
+        path, smooth=smooth, weld_epsilon=weld_epsilon, target_triangles=target_triangles, optimize=optimize
+    )
+    directory = cache_dir / key
+    if directory.is_dir():
+        return TriangleMesh(*(np.load(directory / f"{name}.npy", mmap_mode="r") for name in CACHE_ARRAYS))
+    mesh = read_mesh(
+        path, smooth=smooth, weld_epsilon=weld_epsilon, target_triangles=target_triangles, optimize=optimize
+    )
+    _save_cached(directory, mesh)
+    return mesh
+
+
+# ----- Benchmark -----
+
+
+def _report(stage: str, triangle_count: int, start: float) -> None:
+    """Print the time since start taken by a stage and its triangle throughput."""
+    elapsed = time.perf_counter() - start
+    print(f"{stage:>12}: {elapsed:7.3f} s, {triangle_count / max(elapsed, 1e-9) / 1e6:6.2f} M triangles/s")
+
+
+def main() -> None:
+    """Time the loading and processing stages on a mesh file and report the vertex cache miss ratio."""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("mesh", type=Path, help="OBJ, PLY or STL file")
+    parser.add_argument("--target-triangles", type=int, default=None, help="simplify to this many triangles")
+    parser.add_argument("--cache-size", type=int, default=CACHE_SIZE, help="entries of the simulated vertex cache")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    positions, triangles = _read_faces(args.mesh)
+    _report("read", len(triangles), start)
+    start = time.perf_counter()
+    positions, triangles = weld_vertices(positions, triangles)
+    _report("weld", len(triangles), start)
+    print(f"{args.mesh.name}: {len(triangles)} triangles, {len(positions)} vertices")
+    if args.target_triangles is not None and len(triangles) > args.target_triangles:
+        start, count = time.perf_counter(), len(triangles)
+        positions, triangles = simplify(positions, triangles, args.target_triangles)
+        _report("simplify", count, start)
+        print(f"simplified to {len(triangles)} triangles, {len(positions)} vertices")
+
+    count = len(triangles)
+    before = cache_miss_ratio(triangles, args.cache_size)
+    start = time.perf_counter()
+    ordered, clusters = optimize_vertex_cache(positions, triangles, cache_size=args.cache_size)
+    _report("vertex cache", count, start)
+    start = time.perf_counter()
+    ordered = optimize_overdraw(positions, ordered, clusters)
+    _report("overdraw", count, start)
+    start = time.perf_counter()
+    positions, ordered = optimize_vertex_fetch(positions, ordered)
+    _report("fetch", count, start)
+    start = time.perf_counter()
+    vertex_normals(positions, ordered)
+    _report("normals", count, start)
+    after = cache_miss_ratio(ordered, args.cache_size)
+    # ATVR: vertices transformed per vertex, 1 at best
+    ratio = count / len(positions)
+    print(f"ACMR with a cache of {args.cache_size}: {before:.3f} before, {after:.3f} after ({len(clusters)} clusters)")
+    print(f"ATVR: {before * ratio:.3f} before, {after * ratio:.3f} after")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,712 @@
+"""Processing stage run on loaded meshes: decimation and draw order optimization.
+
+The stages work on whole index arrays with NumPy. The classic algorithms are
+sequential, one edge or one triangle at a time, so they are batched here:
+
+- simplify: quadric error metric decimation (Garland and Heckbert). Instead of
+  collapsing the cheapest edge from a priority queue one at a time, every pass
+  collapses a set of edges that are the cheapest edge of both their vertices
+  and share no vertex with each other, so that all of them can be checked
+  (link condition, flipped faces) and applied together.
+- optimize_vertex_cache: Tipsify (Sander, Nehab and Barczak) vertex cache
+  ordering. The triangles are split into spatially compact regions along a
+  Morton curve, and the greedy fan walks of all regions advance in lock-step,
+  one fan per region per step.
+- optimize_overdraw: the clusters the walks started with a cold cache are
+  drawn in the order of their occlusion potential, outward-facing ones first.
+- optimize_vertex_fetch: vertices are renumbered in the order of first use.
+
+cache_miss_ratio measures the result by simulating a FIFO post-transform cache.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+CACHE_SIZE = 32
+"""Entries of the FIFO post-transform vertex cache the draw order is optimized for."""
+REGION_SIZE = 1024
+"""Triangles per region of the vertex cache optimization. Larger regions load fewer
+shared vertices twice but take more lock-step steps."""
+DEAD_END_SIZE = 32
+"""Recently used vertices per region searched for a new fan when the walk is stuck."""
+BOUNDARY_WEIGHT = 10.0
+"""Weight of the quadrics that keep open boundaries in place, relative to the faces."""
+MIN_NORMAL_COSINE = 0.2
+"""Collapses may turn the normal of a remaining triangle by at most about 78 degrees."""
+
+_MORTON_BITS = 10
+_MORTON_SPREAD = np.zeros(1 << _MORTON_BITS, dtype=np.int64)
+for _bit in range(_MORTON_BITS):
+    _MORTON_SPREAD |= ((np.arange(1 << _MORTON_BITS) >> _bit) & 1) << (3 * _bit)
+
+
+def _ranges(starts: np.ndarray, counts: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Return the concatenated index ranges [start, start + count) and the range of every index."""
+    segments = np.repeat(np.arange(len(counts)), counts)
+    return np.arange(len(segments)) - (np.cumsum(counts) - counts)[segments] + starts[segments], segments
+
+
+def _rank_in_segments(mask: np.ndarray, segments: np.ndarray, count: int) -> np.ndarray:
+    """Return for every element the number of set mask elements before it in its segment.
+
+    Args:
+        mask: Boolean mask.
+        segments: Ascending segment of every element.
+        count: Number of segments.
+    """
+    before = np.cumsum(mask) - mask
+    totals = np.bincount(segments, mask, minlength=count).astype(np.int64)
+    return before - (np.cumsum(totals) - totals)[segments]
+
+
+def _face_normals(positions: np.ndarray, triangles: np.ndarray) -> np.ndarray:
+    """Return the normals of triangles scaled by twice their area."""
+    corners = positions[triangles].astype(np.float64)
+    return np.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0])
+
+
+def _morton_order(points: np.ndarray) -> np.ndarray:
+    """Return the indices that sort points along a Morton (Z-order) curve over their bounding box."""
+    low = points.min(axis=0)
+    extent = float((points.max(axis=0) - low).max()) or 1.0
+    cells = ((points - low) * (((1 << _MORTON_BITS) - 1) / extent)).astype(np.int64)
+    codes = _MORTON_SPREAD[cells[:, 0]] | (_MORTON_SPREAD[cells[:, 1]] << 1) | (_MORTON_SPREAD[cells[:, 2]] << 2)
+    return np.argsort(codes, kind="stable")
+
+
+# ----- Quadric error metric simplification -----
+
+
+def _plane_quadrics(normals: np.ndarray, points: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    """Return weighted quadrics of planes through points.
+
+    A quadric is stored as the 10 distinct coefficients of its symmetric 4x4
+    matrix, coefficient-major (shape (10, k)) so that each is contiguous.
+
+    Args:
+        normals: Unit plane normals, shape (k, 3).
+        points: A point on every plane, shape (k, 3).
+        weights: Weight of every plane, shape (k,).
+    """
+    a, b, c = (np.ascontiguousarray(column) for column in normals.T)
+    d = -np.einsum("ij,ij->i", normals, points)
+    return np.stack([a * a, a * b, a * c, a * d, b * b, b * c, b * d, c * c, c * d, d * d]) * weights
+
+
+def _add_to_vertices(quadrics: np.ndarray, vertices: np.ndarray, values: np.ndarray) -> None:
+    """Add quadrics, shape (10, k), to the quadrics of the given vertices, in place."""
+    for coefficient, column in zip(quadrics, values, strict=True):
+        coefficient[:] += np.bincount(vertices, column, minlength=len(coefficient))
+
+
+def _unit(vectors: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Return unit vectors (zero vectors stay zero) and the lengths."""
+    lengths = np.linalg.norm(vectors, axis=1)
+    return np.divide(vectors, lengths[:, None], out=np.zeros_like(vectors), where=lengths[:, None] > 0), lengths
+
+
+def _vertex_quadrics(positions: np.ndarray, triangles: np.ndarray, boundary_weight: float) -> np.ndarray:
+    """Return the error quadric of every vertex: its area-weighted face planes and the boundary planes."""
+    quadrics = np.zeros((10, len(positions)))
+    normals, lengths = _unit(_face_normals(positions, triangles))
+    face = _plane_quadrics(normals, positions[triangles[:, 0]], lengths / 2)
+    _add_to_vertices(quadrics, triangles.reshape(-1), np.repeat(face, 3, axis=1))
+
+    # Planes through boundary edges, perpendicular to their face
+    starts, ends = triangles.reshape(-1), triangles[:, [1, 2, 0]].reshape(-1)
+    keys = np.minimum(starts, ends) * len(positions) + np.maximum(starts, ends)
+    _, inverse, counts = np.unique(keys, return_inverse=True, return_counts=True)
+    boundary = np.flatnonzero(counts[inverse] == 1)
+    edges = positions[ends[boundary]] - positions[starts[boundary]]
+    planes, _ = _unit(np.cross(edges, normals[boundary // 3]))
+    weights = boundary_weight * np.einsum("ij,ij->i", edges, edges)
+    edge = _plane_quadrics(planes, positions[starts[boundary]], weights)
+    _add_to_vertices(quadrics, np.concatenate([starts[boundary], ends[boundary]]), np.concatenate([edge, edge], axis=1))
+    return quadrics
+
+
+def _quadric_error(q: np.ndarray, x: np.ndarray, y: np.ndarray, z: np.ndarray) -> np.ndarray:
+    """Return the error of points, the weighted sum of their squared distances to the planes of the quadrics q."""
+    return (
+        q[0] * x * x
+        + q[4] * y * y
+        + q[7] * z * z
+        + 2 * (q[1] * x * y + q[2] * x * z + q[5] * y * z + q[3] * x + q[6] * y + q[8] * z)
+        + q[9]
+    )
+
+
+def _optimal_points(q: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Return the points of minimal error of quadrics q, shape (3, k), and whether they are well defined.
+
+    The minimum solves a 3x3 linear system, here with the adjugate matrix; it
+    is ill-conditioned on flat and straight parts of the surface.
+    """
+    c00, c01, c02 = q[4] * q[7] - q[5] * q[5], q[2] * q[5] - q[1] * q[7], q[1] * q[5] - q[2] * q[4]
+    c11, c12, c22 = q[0] * q[7] - q[2] * q[2], q[1] * q[2] - q[0] * q[5], q[0] * q[4] - q[1] * q[1]
+    determinant = q[0] * c00 + q[1] * c01 + q[2] * c02
+    solvable = np.abs(determinant) > 1e-9 * (q[0] + q[4] + q[7]) ** 3
+    scale = -1 / np.where(solvable, determinant, 1)
+    points = np.stack([
+        (c00 * q[3] + c01 * q[6] + c02 * q[8]) * scale,
+        (c01 * q[3] + c11 * q[6] + c12 * q[8]) * scale,
+        (c02 * q[3] + c12 * q[6] + c22 * q[8]) * scale,
+    ])
+    return points, solvable
+
+
+def _collapse_targets(q: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Return the positions edges collapse to and the errors of the collapses.
+
+    The position is the point of minimal error of the summed quadrics q if it
+    is well defined and near the edge, otherwise the midpoint.
+    """
+    optimal, solvable = _optimal_points(q)
+    starts, ends = starts.T, ends.T
+    middle = (starts + ends) / 2
+    near = np.sum((optimal - middle) ** 2, axis=0) <= np.sum((ends - starts) ** 2, axis=0)
+    targets = np.where(solvable & near, optimal, middle)
+    return np.ascontiguousarray(targets.T), np.maximum(_quadric_error(q, *targets), 0)
+
+
+def _edges(triangles: np.ndarray, vertex_count: int) -> tuple[np.ndarray, np.ndarray]:
+    """Return the sorted keys (low * vertex_count + high) of the edges and their numbers of faces."""
+    starts, ends = triangles.reshape(-1), triangles[:, [1, 2, 0]].reshape(-1)
+    return np.unique(np.minimum(starts, ends) * vertex_count + np.maximum(starts, ends), return_counts=True)
+
+
+def _adjacency(sources: np.ndarray, targets: np.ndarray, count: int) -> tuple[np.ndarray, np.ndarray]:
+    """Return the targets grouped by source, and the start of every source's group (count + 1 offsets)."""
+    order = np.argsort(sources, kind="stable")
+    offsets = np.zeros(count + 1, dtype=np.int64)
+    np.cumsum(np.bincount(sources, minlength=count), out=offsets[1:])
+    return targets[order], offsets
+
+
+def _tie_breakers(keys: np.ndarray) -> np.ndarray:
+    """Return a pseudo-random but deterministic value for every edge key (the SplitMix64 finalizer).
+
+    Sorting equally cheap edges by their index would make neighbors of one
+    another the cheapest edge of a shared vertex, leaving a flat region with
+    only a handful of local minima per pass; scattered values spread them out.
+    """
+    mixed = keys.astype(np.uint64)
+    mixed = (mixed ^ (mixed >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    mixed = (mixed ^ (mixed >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return mixed ^ (mixed >> np.uint64(31))
+
+
+def _local_minima(order: np.ndarray, lows: np.ndarray, highs: np.ndarray, vertex_count: int) -> np.ndarray:
+    """Return the edges that are the cheapest edge of both their vertices; they share no vertex.
+
+    Args:
+        order: Edges to choose from, cheapest first.
+        lows: First vertex of every edge.
+        highs: Second vertex of every edge.
+        vertex_count: Number of vertices.
+
+    Returns:
+        The chosen edges, cheapest first.
+    """
+    cheapest = np.full(vertex_count, len(order))
+    rank = np.arange(len(order))
+    np.minimum.at(cheapest, lows[order], rank)
+    np.minimum.at(cheapest, highs[order], rank)
+    return order[(cheapest[lows[order]] == rank) & (cheapest[highs[order]] == rank)]
+
+
+def _flipped(
+    positions: np.ndarray, triangles: np.ndarray, normals: np.ndarray, owners: np.ndarray, targets: np.ndarray
+) -> np.ndarray:
+    """Return which triangles a set of collapses turns too far, see MIN_NORMAL_COSINE.
+
+    Args:
+        positions: Vertex positions.
+        triangles: Vertex indices of the triangles around the collapses.
+        normals: Normals of these triangles before the collapses.
+        owners: Collapse moving each vertex, or -1.
+        targets: Position of every collapse, shape (collapses, 3).
+
+    Returns:
+        A mask of the triangles; those removed by a collapse are never flipped.
+    """
+    corner_owners = owners[triangles]
+    moved = corner_owners >= 0
+    removed = (
+        moved[:, 0] & (corner_owners[:, 0] == corner_owners[:, 1])
+        | moved[:, 1] & (corner_owners[:, 1] == corner_owners[:, 2])
+        | moved[:, 2] & (corner_owners[:, 2] == corner_owners[:, 0])
+    )
+    checked = np.flatnonzero(moved.any(axis=1) & ~removed)
+    after = positions[triangles[checked]]
+    moved = moved[checked]
+    after[moved] = targets[corner_owners[checked][moved]]
+    new = np.cross(after[:, 1] - after[:, 0], after[:, 2] - after[:, 0])
+    old = normals[checked]
+    dot = np.einsum("ij,ij->i", old, new)
+    limit = MIN_NORMAL_COSINE**2 * np.einsum("ij,ij->i", old, old) * np.einsum("ij,ij->i", new, new)
+    flipped = np.zeros(len(triangles), dtype=bool)
+    flipped[checked] = (dot <= 0) | (dot * dot <= limit)
+    return flipped
+
+
+class _Collapses:
+    """Edge collapses chosen for one simplification pass.
+
+    The collapses are chosen in rounds. Each round takes the local minima of
+    the edges whose vertices are not used by a collapse yet, and drops those
+    that fail the link condition or that, applied together with all collapses
+    chosen so far, fold a triangle over. Dropped edges are left out of the
+    later rounds instead of blocking their vertices.
+    """
+
+    def __init__(
+        self, positions: np.ndarray, triangles: np.ndarray, quadrics: np.ndarray, edges: tuple[np.ndarray, np.ndarray]
+    ) -> None:
+        """Compute the costs of all edges.
+
+        Args:
+            positions: Vertex positions.
+            triangles: Vertex indices.
+            quadrics: Error quadric of every vertex.
+            edges: Keys and face counts of the edges, see _edges.
+        """
+        self.positions, self.triangles = positions, triangles
+        count = len(positions)
+        self.keys, self.counts = edges
+        self.lows, self.highs = self.keys // count, self.keys % count
+        on_boundary = np.zeros(count, dtype=bool)
+        on_boundary[self.lows[self.counts == 1]] = on_boundary[self.highs[self.counts == 1]] = True
+        self.targets, costs = _collapse_targets(
+            quadrics[:, self.lows] + quadrics[:, self.highs], positions[self.lows], positions[self.highs]
+        )
+        # Non-manifold edges, and inner edges joining two boundaries, would pinch the surface
+        allowed = (self.counts == 1) | ((self.counts == 2) & ~(on_boundary[self.lows] & on_boundary[self.highs]))
+        # Ties, all edges of a flat region, are broken pseudo-randomly, see _tie_breakers
+        self.order = np.flatnonzero(allowed)[np.lexsort((_tie_breakers(self.keys[allowed]), costs[allowed]))]
+        self.neighbors, self.neighbor_offsets = _adjacency(
+            np.concatenate([self.lows, self.highs]), np.concatenate([self.highs, self.lows]), count
+        )
+        self.faces, self.face_offsets = _adjacency(
+            triangles.reshape(-1), np.repeat(np.arange(len(triangles)), 3), count
+        )
+        self.normals = _face_normals(positions, triangles)
+        self.owners = np.full(count, -1)
+        self.chosen = np.zeros(0, dtype=np.int64)
+
+    def choose(self, limit: int, rounds: int = 4) -> np.ndarray:
+        """Choose up to limit collapses and return their edges, cheapest first in each round."""
+        for _ in range(rounds):
+            if len(self.chosen) >= limit or not len(self.order):
+                break
+            self._round(limit - len(self.chosen))
+        return self.chosen
+
+    def _link_condition(self, edges: np.ndarray) -> np.ndarray:
+        """Return which edges keep the mesh manifold when collapsed.
+
+        An edge may collapse only if its end points have no common neighbors
+        other than the opposite vertices of its faces.
+        """
+        low, high = self.lows[edges], self.highs[edges]
+        flat, segments = _ranges(
+            self.neighbor_offsets[low], self.neighbor_offsets[low + 1] - self.neighbor_offsets[low]
+        )
+        others, partners = self.neighbors[flat], high[segments]
+        count = len(self.positions)
+        wanted = np.minimum(others, partners) * count + np.maximum(others, partners)
+        found = self.keys[np.minimum(np.searchsorted(self.keys, wanted), len(self.keys) - 1)] == wanted
+        common = np.bincount(segments, found & (others != partners), minlength=len(edges))
+        return common == self.counts[edges]
+
+    def _faces_around(self, vertices: np.ndarray) -> np.ndarray:
+        """Return the triangles using any of the vertices."""
+        starts = self.face_offsets[vertices]
+        flat, _ = _ranges(starts, self.face_offsets[vertices + 1] - starts)
+        around = np.zeros(len(self.triangles), dtype=bool)
+        around[self.faces[flat]] = True
+        return np.flatnonzero(around)
+
+    def _round(self, limit: int) -> None:
+        """Add the collapses of one round."""
+        used = self.owners >= 0
+        self.order = self.order[~(used[self.lows[self.order]] | used[self.highs[self.order]])]
+        minima = _local_minima(self.order, self.lows, self.highs, len(self.positions))[:limit]
+        manifold = self._link_condition(minima)
+        failed = np.zeros(len(self.keys), dtype=bool)
+        failed[minima[~manifold]] = True
+        candidates = minima[manifold]
+        start = len(self.chosen)
+        chosen = np.concatenate([self.chosen, candidates])
+        self.owners[self.lows[candidates]] = self.owners[self.highs[candidates]] = np.arange(start, len(chosen))
+        targets = self.targets[chosen]
+        # Dropping a collapse can make a triangle it shares with another turn instead, so check those again
+        changed = candidates
+        while len(changed):
+            around = self._faces_around(np.concatenate([self.lows[changed], self.highs[changed]]))
+            corners = self.triangles[around]
+            flipped = _flipped(self.positions, corners, self.normals[around], self.owners, targets)
+            corner_owners = self.owners[corners[flipped]]
+            changed = chosen[np.unique(corner_owners[corner_owners >= start])]
+            failed[changed] = True
+            self.owners[self.lows[changed]] = self.owners[self.highs[changed]] = -1
+        self.order = self.order[~failed[self.order]]
+        kept = np.flatnonzero(self.owners[self.lows[candidates]] >= 0)
+        self.chosen = np.concatenate([self.chosen, candidates[kept]])
+        self.owners[self.lows[candidates[kept]]] = self.owners[self.highs[candidates[kept]]] = start + np.arange(
+            len(kept)
+        )
+
+
+def _collapse(triangles: np.ndarray, kept: np.ndarray, merged: np.ndarray, count: int) -> np.ndarray:
+    """Return the triangles after merging vertices into others, without those that became degenerate."""
+    remap = np.arange(count)
+    remap[merged] = kept
+    triangles = remap[triangles]
+    return triangles[
+        (triangles[:, 0] != triangles[:, 1])
+        & (triangles[:, 1] != triangles[:, 2])
+        & (triangles[:, 2] != triangles[:, 0])
+    ]
+
+
+def _apply(
+    collapses: _Collapses, chosen: np.ndarray, edges: tuple[np.ndarray, np.ndarray]
+) -> tuple[np.ndarray, np.ndarray, tuple[np.ndarray, np.ndarray]]:
+    """Apply collapses to the triangles, leaving out those that together with others pinch an edge.
+
+    Each collapse keeps the mesh manifold by itself (link condition), but
+    neighboring collapses may still join more than two faces at an edge.
+
+    Returns:
+        The collapses applied, the new triangles and their edges.
+    """
+    count = len(collapses.positions)
+    pinched_before = edges[0][edges[1] > 2]
+    while True:
+        kept = collapses.lows[chosen]
+        triangles = _collapse(collapses.triangles, kept, collapses.highs[chosen], count)
+        keys, counts = _edges(triangles, count)
+        pinched = keys[counts > 2]
+        pinched = pinched[~np.isin(pinched, pinched_before)]
+        if not len(pinched):
+            return chosen, triangles, (keys, counts)
+        # Undo the last (most expensive) collapse at either end of each pinched edge
+        order = np.full(count, -1)
+        order[kept] = np.arange(len(chosen))
+        undone = np.maximum(order[pinched // count], order[pinched % count])
+        undone = undone[undone >= 0]
+        # A new pinch always has a kept vertex at one end; stop rather than loop if it does not
+        chosen = np.delete(chosen, undone) if len(undone) else chosen[:0]
+
+
+def simplify(
+    positions: np.ndarray, triangles: np.ndarray, target_triangles: int, *, boundary_weight: float = BOUNDARY_WEIGHT
+) -> tuple[np.ndarray, np.ndarray]:
+    """Reduce a mesh to about a target number of triangles by quadric error edge collapses.
+
+    Every vertex carries the sum of the plane quadrics of its faces; collapsing
+    an edge merges its vertices at the point of least squared distance to the
+    planes of both. Each pass collapses an independent set of locally cheapest
+    edges, see the module documentation, so a pass removes a large fraction of
+    the triangles at once. Collapses that would make the surface non-manifold
+    or fold a triangle over are skipped; the mesh may stay above the target if
+    no allowed collapse is left.
+
+    Args:
+        positions: Vertex positions, shape (n, 3).
+        triangles: Vertex indices of a welded mesh, shape (m, 3).
+        target_triangles: Number of triangles to stop at.
+        boundary_weight: Weight of keeping open boundaries in place, see BOUNDARY_WEIGHT.
+
+    Returns:
+        The positions of the remaining vertices and the triangles, in the original order.
+    """
+    positions = np.array(positions, dtype=np.float64)
+    triangles = np.asarray(triangles, dtype=np.int64)
+    quadrics = _vertex_quadrics(positions, triangles, boundary_weight)
+    edges = _edges(triangles, len(positions))
+    while len(triangles) > target_triangles:
+        collapses = _Collapses(positions, triangles, quadrics, edges)
+        # An inner collapse removes two triangles
+        chosen = collapses.choose((len(triangles) - target_triangles + 1) // 2)
+        chosen, triangles, edges = _apply(collapses, chosen, edges)
+        if not len(chosen):
+            break
+        kept, merged = collapses.lows[chosen], collapses.highs[chosen]
+        positions[kept] = collapses.targets[chosen]
+        quadrics[:, kept] += quadrics[:, merged]
+    used = np.unique(triangles)
+    return positions[used].astype(np.float32), np.searchsorted(used, triangles)
+
+
+# ----- Draw order -----
+
+
+class _FanWalk:
+    """Tipsify fan walks of all regions of a mesh, advanced together.
+
+    Vertices shared by regions are split into a local copy per region, so
+    that the walks are independent: every region has its own cache clock,
+    dead-end buffer and cursor.
+    """
+
+    def __init__(self, triangles: np.ndarray, region_size: int, cache_size: int) -> None:
+        """Set up the walks.
+
+        Args:
+            triangles: Vertex indices, in region order.
+            region_size: Triangles per region.
+            cache_size: Entries of the simulated FIFO cache.
+        """
+        self.cache_size = cache_size
+        regions = np.arange(len(triangles)) // region_size
+        self.region_count = int(regions[-1]) + 1
+        keys = (regions[:, None] * (int(triangles.max()) + 1) + triangles).reshape(-1)
+        by_key = np.argsort(keys, kind="stable")
+        sorted_keys = keys[by_key]
+        self.offsets = np.flatnonzero(np.concatenate(([True], sorted_keys[1:] != sorted_keys[:-1], [True])))
+        self.corners = np.empty(len(keys), dtype=np.int64)
+        self.corners[by_key] = np.repeat(np.arange(len(self.offsets) - 1), np.diff(self.offsets))
+        self.corners = self.corners.reshape(-1, 3)
+        self.adjacent = by_key // 3
+        vertex_regions = regions[self.adjacent[self.offsets[:-1]]]
+        self.region_ends = np.searchsorted(vertex_regions, np.arange(1, self.region_count + 1))
+
+        self.live = np.diff(self.offsets)
+        self.stamps = np.full(len(self.live), -cache_size - 1)
+        self.clocks = np.zeros(self.region_count, dtype=np.int64)
+        self.emitted = np.zeros(len(triangles), dtype=bool)
+        self.emit_order = np.zeros(len(triangles), dtype=np.int64)
+        self.emit_count = 0
+        self.cluster_starts = np.zeros(len(triangles), dtype=bool)
+        self.dead_ends = np.zeros((self.region_count, DEAD_END_SIZE), dtype=np.int64)
+        self.dead_end_count = np.zeros(self.region_count, dtype=np.int64)
+        self.cursors = np.searchsorted(vertex_regions, np.arange(self.region_count))
+        self.fans = self.cursors.copy()
+        self.jumped = np.ones(self.region_count, dtype=bool)
+
+    def advance(self, active: np.ndarray) -> np.ndarray:
+        """Emit the current fan of the active regions and choose their next fans.
+
+        Args:
+            active: Regions not finished yet, ascending.
+
+        Returns:
+            The regions that are still not finished.
+        """
+        vertices, segments = self._emit(active)
+        fans = self._next_fans(active, vertices, segments)
+        self.fans[active] = fans
+        return active[fans >= 0]
+
+    def _emit(self, active: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Emit the triangles of the fans not emitted yet, load their vertices and return them by region."""
+        fans = self.fans[active]
+        flat, segments = _ranges(self.offsets[fans], self.offsets[fans + 1] - self.offsets[fans])
+        fresh = ~self.emitted[self.adjacent[flat]]
+        triangles, segments = self.adjacent[flat[fresh]], segments[fresh]
+        self.emitted[triangles] = True
+        self.emit_order[triangles] = self.emit_count + np.arange(len(triangles))
+        self.emit_count += len(triangles)
+        first = np.concatenate(([True], segments[1:] != segments[:-1]))
+        self.cluster_starts[triangles[first & self.jumped[active[segments]]]] = True
+
+        corners = self.corners[triangles].reshape(-1)
+        vertices, first_use, uses = np.unique(corners, return_index=True, return_counts=True)
+        self.live[vertices] -= uses
+        first_use.sort()
+        vertices, segments = corners[first_use], segments[first_use // 3]
+        regions = active[segments]
+        missed = self.clocks[regions] - self.stamps[vertices] > self.cache_size
+        self.stamps[vertices[missed]] = (self.clocks[regions] + _rank_in_segments(missed, segments, len(active)))[
+            missed
+        ]
+        self.clocks[active] += np.bincount(segments, missed, minlength=len(active)).astype(np.int64)
+        slots = (self.dead_end_count[regions] + _rank_in_segments(np.ones_like(missed), segments, len(active))) % (
+            DEAD_END_SIZE
+        )
+        self.dead_ends[regions, slots] = vertices
+        self.dead_end_count[active] += np.bincount(segments, minlength=len(active))
+        return vertices, segments
+
+    def _next_fans(self, active: np.ndarray, vertices: np.ndarray, segments: np.ndarray) -> np.ndarray:
+        """Choose the next fan of every active region among the vertices just used, or -1 if it is finished.
+
+        The preferred vertex has unemitted triangles and stays in the cache
+        while they are emitted, and is the oldest in the cache among those.
+        """
+        live = self.live[vertices]
+        age = self.clocks[active[segments]] - self.stamps[vertices]
+        priority = np.where(live > 0, np.where(age + 2 * live <= self.cache_size, age, 0), -1)
+        order = np.lexsort((-priority, segments))
+        best = order[np.searchsorted(segments[order], np.arange(len(active)))]
+        fans = np.where(priority[best] >= 0, vertices[best], -1)
+        stuck = np.flatnonzero(fans < 0)
+        self.jumped[active] = False
+        self.jumped[active[stuck]] = True
+        if len(stuck):
+            fans[stuck] = self._dead_end(active[stuck])
+            stuck = stuck[fans[stuck] < 0]
+            fans[stuck] = self._cursor(active[stuck])
+        return fans
+
+    def _dead_end(self, regions: np.ndarray) -> np.ndarray:
+        """Return the most recently used vertex with unemitted triangles of every region, or -1."""
+        recent = self.dead_end_count[regions][:, None] - 1 - np.arange(DEAD_END_SIZE)
+        candidates = np.take_along_axis(self.dead_ends[regions], recent % DEAD_END_SIZE, axis=1)
+        alive = (recent >= 0) & (self.live[candidates] > 0)
+        found = alive.any(axis=1)
+        return np.where(found, candidates[np.arange(len(regions)), alive.argmax(axis=1)], -1)
+
+    def _cursor(self, regions: np.ndarray, window: int = 64) -> np.ndarray:
+        """Return the next vertex in index order with unemitted triangles of every region, or -1 if none is left."""
+        fans = np.full(len(regions), -1)
+        pending = np.arange(len(regions))
+        while len(pending):
+            cursors, ends = self.cursors[regions[pending]], self.region_ends[regions[pending]]
+            scan = cursors[:, None] + np.arange(window)
+            alive = (scan < ends[:, None]) & (self.live[np.minimum(scan, len(self.live) - 1)] > 0)
+            found = alive.any(axis=1)
+            done = found | (scan[:, -1] >= ends - 1)
+            cursors = np.where(found, cursors + alive.argmax(axis=1), np.minimum(cursors + window, ends))
+            self.cursors[regions[pending]] = cursors
+            fans[pending[found]] = cursors[found]
+            pending = pending[~done]
+        return fans
+
+
+def optimize_vertex_cache(
+    positions: np.ndarray, triangles: np.ndarray, *, cache_size: int = CACHE_SIZE, region_size: int = REGION_SIZE
+) -> tuple[np.ndarray, np.ndarray]:
+    """Reorder triangles to reuse the vertices in the post-transform cache.
+
+    Implements Tipsify: a walk emits all triangles around a fan vertex, then
+    continues with a vertex of the fan that is still in the cache, or else
+    with a recently used one. The triangles are first sorted along a Morton
+    curve and split into regions of region_size, whose walks run together;
+    see the module documentation.
+
+    Args:
+        positions: Vertex positions, shape (n, 3).
+        triangles: Vertex indices, shape (m, 3).
+        cache_size: Entries of the FIFO cache optimized for.
+        region_size: Triangles per region, see REGION_SIZE.
+
+    Returns:
+        The reordered triangles and the start indices of the clusters, runs
+        of triangles that the walk started with a cold cache.
+    """
+    triangles = np.asarray(triangles, dtype=np.int64)
+    if not len(triangles):
+        return triangles, np.zeros(0, dtype=np.int64)
+    centers = positions[triangles[:, 0]] + positions[triangles[:, 1]] + positions[triangles[:, 2]]
+    triangles = triangles[_morton_order(centers)]
+    walk = _FanWalk(triangles, region_size, cache_size)
+    active = np.arange(walk.region_count)
+    while len(active):
+        active = walk.advance(active)
+    order = np.argsort(np.arange(len(triangles)) // region_size * len(triangles) + walk.emit_order)
+    return triangles[order], np.flatnonzero(walk.cluster_starts[order])
+
+
+def optimize_overdraw(positions: np.ndarray, triangles: np.ndarray, clusters: np.ndarray) -> np.ndarray:
+    """Reorder clusters of triangles so that those likely to occlude others are drawn first.
+
+    A cluster's occlusion potential is the distance of its center in front
+    of the mesh center along its average normal: clusters facing outwards
+    are more likely to cover the rest of the mesh. Triangles keep their order
+    within a cluster, so the vertex cache efficiency is mostly unchanged.
+
+    Args:
+        positions: Vertex positions, shape (n, 3).
+        triangles: Vertex indices, shape (m, 3).
+        clusters: Start index of every cluster, ascending, the first 0.
+
+    Returns:
+        The reordered triangles.
+    """
+    if len(clusters) < 2:
+        return triangles
+    normals = _face_normals(positions, triangles)
+    areas = np.linalg.norm(normals, axis=1)
+    centers = positions[triangles].astype(np.float64).mean(axis=1) * areas[:, None]
+    mesh_center = centers.sum(axis=0) / max(areas.sum(), np.finfo(np.float64).tiny)
+    cluster_areas = np.maximum(np.add.reduceat(areas, clusters), np.finfo(np.float64).tiny)
+    cluster_centers = np.add.reduceat(centers, clusters) / cluster_areas[:, None]
+    cluster_normals, _ = _unit(np.add.reduceat(normals, clusters))
+    potential = np.einsum("ij,ij->i", cluster_centers - mesh_center, cluster_normals)
+    order = np.argsort(-potential, kind="stable")
+    sizes = np.diff(np.append(clusters, len(triangles)))
+    flat, _ = _ranges(clusters[order], sizes[order])
+    return triangles[flat]
+
+
+def optimize_vertex_fetch(positions: np.ndarray, triangles: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Renumber the vertices in the order the triangles first use them, and drop unused vertices.
+
+    Args:
+        positions: Vertex positions, shape (n, 3).
+        triangles: Vertex indices, shape (m, 3).
+
+    Returns:
+        The reordered positions and the renumbered triangles.
+    """
+    used, first_use = np.unique(triangles, return_index=True)
+    order = used[np.argsort(first_use)]
+    numbers = np.zeros(len(positions), dtype=np.int64)
+    numbers[order] = np.arange(len(order))
+    return positions[order], numbers[triangles]
+
+
+def process(
+    positions: np.ndarray,
+    triangles: np.ndarray,
+    *,
+    target_triangles: int | None = None,
+    optimize: bool = True,
+    cache_size: int = CACHE_SIZE,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Run the processing stage: simplification, then the draw order optimizations.
+
+    Args:
+        positions: Vertex positions, shape (n, 3).
+        triangles: Vertex indices of a welded mesh, shape (m, 3).
+        target_triangles: Simplify meshes with more triangles to this count, or None to keep all.
+        optimize: Whether to optimize the draw order.
+        cache_size: Entries of the vertex cache optimized for.
+
+    Returns:
+        The processed positions and triangles.
+    """
+    if target_triangles is not None and len(triangles) > target_triangles:
+        positions, triangles = simplify(positions, triangles, target_triangles)
+    if optimize and len(triangles):
+        triangles, clusters = optimize_vertex_cache(positions, triangles, cache_size=cache_size)
+        triangles = optimize_overdraw(positions, triangles, clusters)
+        positions, triangles = optimize_vertex_fetch(positions, triangles)
+    return positions, triangles
+
+
+def cache_miss_ratio(triangles: np.ndarray, cache_size: int = CACHE_SIZE) -> float:
+    """Return the average number of vertices transformed per triangle (ACMR) with a FIFO post-transform cache.
+
+    The result ranges from about 0.5 (every vertex transformed once, on a
+    large regular mesh) to 3. The simulation is a Python loop over the
+    indices, meant for benchmarks rather than for every load.
+
+    Args:
+        triangles: Vertex indices, shape (m, 3).
+        cache_size: Entries of the simulated cache.
+    """
+    if not len(triangles):
+        return 0.0
+    indices = np.asarray(triangles).reshape(-1)
+    loaded = [-cache_size] * (int(indices.max()) + 1)
+    misses = 0
+    for vertex in indices.tolist():
+        if misses - loaded[vertex] >= cache_size:
+            loaded[vertex] = misses
+            misses += 1
+    return misses / len(triangles)
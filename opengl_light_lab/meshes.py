@@ -0,0 +1,235 @@
+"""Vertex buffers of a mesh loaded from a model file, drawn in place of a scene object."""
+
+from __future__ import annotations
+
+import ctypes
+import threading
+from concurrent.futures import Future
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import numpy as np
+from OpenGL.GL import (  # type: ignore
+    GL_ARRAY_BUFFER,
+    GL_ELEMENT_ARRAY_BUFFER,
+    GL_FLOAT,
+    GL_NORMAL_ARRAY,
+    GL_STATIC_DRAW,
+    GL_TRIANGLES,
+    GL_UNSIGNED_INT,
+    GL_VERTEX_ARRAY,
+    glBindBuffer,
+    glBufferData,
+    glBufferSubData,
+    glDeleteBuffers,
+    glDisableClientState,
+    glEnableClientState,
+    glGenBuffers,
+    glPopMatrix,
+    glPushMatrix,
+    glScalef,
+    glTranslatef,
+)
+
+# Unwrapped: buffer offsets are passed as preallocated pointers, so that drawing allocates nothing
+from OpenGL.raw.GL.VERSION.GL_1_1 import glDrawElements, glNormalPointer, glVertexPointer  # type: ignore
+
+from opengl_light_lab.mesh_io import DEFAULT_CACHE_DIR, TriangleMesh, load_mesh
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+FIT_SIZE = 1.0
+"""Edge of the cube a loaded mesh is scaled to fit, the size of the scene cube."""
+DEFAULT_TARGET_TRIANGLES = 200_000
+"""Triangle budget of loaded meshes; larger meshes are simplified when first loaded.
+
+Simplification is slow, about 0.08 M triangles/s on a desktop CPU (13 s from
+1 M to 100 k triangles of a curved surface, 9 s of a flat one) and several
+times slower on older ones, so the GUI
+loads meshes in the background, see MeshManager.
+"""
+_BUFFER_START = ctypes.c_void_p(0)
+
+
+class MeshManager:
+    """Manages the vertex buffers of a mesh file and its lifecycle.
+
+    The mesh is loaded simplified to the triangle budget and in vertex cache
+    order, then uploaded once into a vertex buffer holding the positions
+    followed by the normals, and an index buffer. It is drawn centered at the
+    origin and uniformly scaled to fit into a cube of FIT_SIZE.
+
+    With background loading, the file is read and processed by a daemon
+    thread so that frames keep being drawn, and the first load_if_changed
+    after it is done uploads the mesh on the OpenGL thread. Until then
+    nothing is loaded and the scene cube is drawn instead.
+
+    Attributes:
+        version: Incremented whenever a mesh is uploaded or unloaded, for caches of the drawn geometry.
+    """
+
+    def __init__(
+        self,
+        *,
+        smooth: bool = True,
+        target_triangles: int | None = DEFAULT_TARGET_TRIANGLES,
+        cache_dir: Path | None = DEFAULT_CACHE_DIR,
+        background: bool = False,
+    ) -> None:
+        """Initialize the manager without loading a mesh.
+
+        Args:
+            smooth: Whether meshes get smooth or flat normals, see mesh_io.build_mesh.
+            target_triangles: Triangle budget of the meshes, or None to draw them in full.
+            cache_dir: Directory of the processed mesh cache, or None to always parse the files.
+            background: Whether meshes are loaded and processed off the calling thread.
+        """
+        self.smooth = smooth
+        self.target_triangles = target_triangles
+        self.cache_dir = cache_dir
+        self.background = background
+        self.version = 0
+        self._loaded_path: str | None = None
+        self._pending: Future[TriangleMesh] | None = None
+        self._buffers: tuple[int, int] | None = None
+        self._normals_offset = ctypes.c_void_p(0)
+        self._index_count = 0
+        self._center = np.zeros(3, dtype=np.float32)
+        self._translation = (0.0, 0.0, 0.0)
+        self._scale = 1.0
+
+    @property
+    def is_loaded(self) -> bool:
+        """Return True if a mesh is currently loaded."""
+        return self._buffers is not None
+
+    @property
+    def vertex_count(self) -> int:
+        """Return the number of vertices drawn per mesh draw, three per triangle."""
+        return self._index_count
+
+    @property
+    def is_loading(self) -> bool:
+        """Return True if a mesh is being loaded in the background."""
+        return self._pending is not None
+
+    def load_if_changed(self, mesh_path: str | None) -> bool:
+        """Load a mesh if the path has changed, or upload a mesh loaded in the background.
+
+        Args:
+            mesh_path: Path to an OBJ, PLY or STL file, or None to unload.
+
+        Returns:
+            True if the mesh was loaded/changed, False otherwise.
+        """
+        if mesh_path == self._loaded_path:
+            return self._finish_pending()
+
+        self._unload()
+        self._loaded_path = mesh_path
+
+        if mesh_path is None:
+            return True
+
+        if not Path(mesh_path).exists():
+            return False
+
+        if self.background:
+            self._pending = self._load_in_background(Path(mesh_path))
+            return True
+        return self._upload_loaded(lambda: self._load(Path(mesh_path)))
+
+    def _load(self, path: Path) -> TriangleMesh:
+        """Load and process a mesh file with the settings of the manager."""
+        return load_mesh(path, smooth=self.smooth, target_triangles=self.target_triangles, cache_dir=self.cache_dir)
+
+    def _load_in_background(self, path: Path) -> Future[TriangleMesh]:
+        """Start loading a mesh in a daemon thread, which does not keep the application from exiting."""
+        future: Future[TriangleMesh] = Future()
+
+        def run() -> None:
+            try:
+                future.set_result(self._load(path))
+            except Exception as e:
+                future.set_exception(e)
+
+        threading.Thread(target=run, name="mesh-loader", daemon=True).start()
+        return future
+
+    def _finish_pending(self) -> bool:
+        """Upload the mesh loaded in the background if it is done, returning True if it was."""
+        if self._pending is None or not self._pending.done():
+            return False
+        future, self._pending = self._pending, None
+        return self._upload_loaded(future.result)
+
+    def _upload_loaded(self, load: Callable[[], TriangleMesh]) -> bool:
+        """Upload the mesh returned by load, reporting files that fail to load and leaving them unloaded."""
+        try:
+            self._upload(load())
+        except Exception as e:
+            print(f"Failed to load mesh: {e}")
+            self._unload()
+            return False
+        else:
+            return True
+
+    def _upload(self, mesh: TriangleMesh) -> None:
+        """Create the buffers of a mesh and its fitting transformation."""
+        box_min, box_max = mesh.bounds()
+        self._center = (box_min + box_max) / 2
+        self._translation = tuple(-float(c) for c in self._center)
+        extent = float(np.max(box_max - box_min))
+        self._scale = FIT_SIZE / extent if extent > 0 else 1.0
+
+        vertex_buffer, index_buffer = (int(buffer) for buffer in glGenBuffers(2))
+        self._buffers = (vertex_buffer, index_buffer)
+        positions, normals = np.ascontiguousarray(mesh.positions), np.ascontiguousarray(mesh.normals)
+        glBindBuffer(GL_ARRAY_BUFFER, vertex_buffer)
+        glBufferData(GL_ARRAY_BUFFER, positions.nbytes + normals.nbytes, None, GL_STATIC_DRAW)
+        glBufferSubData(GL_ARRAY_BUFFER, 0, positions.nbytes, positions)
+        glBufferSubData(GL_ARRAY_BUFFER, positions.nbytes, normals.nbytes, normals)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        indices = np.ascontiguousarray(mesh.indices)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, index_buffer)
+        glBufferData(GL_ELEMENT_ARRAY_BUFFER, indices.nbytes, indices, GL_STATIC_DRAW)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+        self._normals_offset = ctypes.c_void_p(positions.nbytes)
+        self._index_count = indices.size
+        self.version += 1
+
+    def draw(self) -> None:
+        """Draw the mesh with the current material and transformation."""
+        if self._buffers is None:
+            return
+        vertex_buffer, index_buffer = self._buffers
+        glPushMatrix()
+        glScalef(self._scale, self._scale, self._scale)
+        glTranslatef(*self._translation)
+        glBindBuffer(GL_ARRAY_BUFFER, vertex_buffer)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, index_buffer)
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_NORMAL_ARRAY)
+        glVertexPointer(3, GL_FLOAT, 0, _BUFFER_START)
+        glNormalPointer(GL_FLOAT, 0, self._normals_offset)
+        glDrawElements(GL_TRIANGLES, self._index_count, GL_UNSIGNED_INT, _BUFFER_START)
+        glDisableClientState(GL_NORMAL_ARRAY)
+        glDisableClientState(GL_VERTEX_ARRAY)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        glPopMatrix()
+
+    def _unload(self) -> None:
+        """Delete the buffers of the current mesh if any, dropping a mesh still loading."""
+        self._pending = None
+        if self._buffers is not None:
+            glDeleteBuffers(2, list(self._buffers))
+            self._buffers = None
+            self.version += 1
+        self._index_count = 0
+
+    def cleanup(self) -> None:
+        """Clean up OpenGL resources."""
+        self._unload()
+        self._loaded_path = None
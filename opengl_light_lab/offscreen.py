@@ -0,0 +1,286 @@
+"""Headless rendering of the scene into framebuffer objects."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+from OpenGL.GL import (  # type: ignore
+    GL_COLOR_ATTACHMENT0,
+    GL_DEPTH_ATTACHMENT,
+    GL_DEPTH_COMPONENT24,
+    GL_FRAMEBUFFER,
+    GL_FRAMEBUFFER_COMPLETE,
+    GL_MAX_RENDERBUFFER_SIZE,
+    GL_MAX_VIEWPORT_DIMS,
+    GL_RENDERBUFFER,
+    GL_RENDERER,
+    GL_RGBA8,
+    glBindFramebuffer,
+    glBindRenderbuffer,
+    glCheckFramebufferStatus,
+    glDeleteFramebuffers,
+    glDeleteRenderbuffers,
+    glFramebufferRenderbuffer,
+    glGenFramebuffers,
+    glGenRenderbuffers,
+    glGetIntegerv,
+    glGetString,
+    glRenderbufferStorage,
+    glViewport,
+)
+from PySide6 import QtGui
+
+from opengl_light_lab.camera import FULL_WINDOW
+from opengl_light_lab.readback import PixelReadback, as_rgb_image
+from opengl_light_lab.scene import SceneRenderer
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from opengl_light_lab.app_state import AppState
+    from opengl_light_lab.render_cache import ImageCache
+
+
+def ensure_application() -> QtGui.QGuiApplication:
+    """Return the running Qt application, creating a GUI application if needed."""
+    app = QtGui.QGuiApplication.instance()
+    if app is None:
+        app = QtGui.QGuiApplication([])
+    return app  # type: ignore[return-value]
+
+
+class OffscreenContext:
+    """OpenGL compatibility context bound to an offscreen surface."""
+
+    def __init__(self) -> None:
+        """Create the context and make it current.
+
+        Raises:
+            RuntimeError: If the OpenGL context cannot be created.
+        """
+        ensure_application()
+        fmt = QtGui.QSurfaceFormat()
+        fmt.setVersion(2, 1)
+        fmt.setProfile(QtGui.QSurfaceFormat.OpenGLContextProfile.CompatibilityProfile)
+        fmt.setDepthBufferSize(24)
+
+        self._surface = QtGui.QOffscreenSurface()
+        self._surface.setFormat(fmt)
+        self._surface.create()
+        self._context = QtGui.QOpenGLContext()
+        self._context.setFormat(fmt)
+        if not self._context.create():
+            msg = "Failed to create an offscreen OpenGL context"
+            raise RuntimeError(msg)
+        self.make_current()
+
+    def make_current(self) -> None:
+        """Make the context current on the calling thread.
+
+        Raises:
+            RuntimeError: If the context cannot be made current.
+        """
+        if not self._context.makeCurrent(self._surface):
+            msg = "Failed to make the offscreen OpenGL context current"
+            raise RuntimeError(msg)
+
+    def done_current(self) -> None:
+        """Release the context from the calling thread."""
+        self._context.doneCurrent()
+
+
+class Framebuffer:
+    """Framebuffer object with RGBA color and depth renderbuffers."""
+
+    def __init__(self, width: int, height: int) -> None:
+        """Allocate the framebuffer in the current context.
+
+        Args:
+            width: Width in pixels.
+            height: Height in pixels.
+
+        Raises:
+            RuntimeError: If the framebuffer is incomplete.
+        """
+        self.width = width
+        self.height = height
+        self.fbo = glGenFramebuffers(1)
+        self._color_rb, self._depth_rb = glGenRenderbuffers(2)
+
+        glBindRenderbuffer(GL_RENDERBUFFER, self._color_rb)
+        glRenderbufferStorage(GL_RENDERBUFFER, GL_RGBA8, width, height)
+        glBindRenderbuffer(GL_RENDERBUFFER, self._depth_rb)
+        glRenderbufferStorage(GL_RENDERBUFFER, GL_DEPTH_COMPONENT24, width, height)
+        glBindRenderbuffer(GL_RENDERBUFFER, 0)
+
+        glBindFramebuffer(GL_FRAMEBUFFER, self.fbo)
+        glFramebufferRenderbuffer(GL_FRAMEBUFFER, GL_COLOR_ATTACHMENT0, GL_RENDERBUFFER, self._color_rb)
+        glFramebufferRenderbuffer(GL_FRAMEBUFFER, GL_DEPTH_ATTACHMENT, GL_RENDERBUFFER, self._depth_rb)
+        status = glCheckFramebufferStatus(GL_FRAMEBUFFER)
+        glBindFramebuffer(GL_FRAMEBUFFER, 0)
+        if status != GL_FRAMEBUFFER_COMPLETE:
+            self.delete()
+            msg = f"Framebuffer {width}x{height} is incomplete (status 0x{status:x})"
+            raise RuntimeError(msg)
+
+    def bind(self) -> None:
+        """Bind the framebuffer and set the viewport to cover it."""
+        glBindFramebuffer(GL_FRAMEBUFFER, self.fbo)
+        glViewport(0, 0, self.width, self.height)
+
+    @staticmethod
+    def release() -> None:
+        """Bind the default framebuffer."""
+        glBindFramebuffer(GL_FRAMEBUFFER, 0)
+
+    def delete(self) -> None:
+        """Free the OpenGL objects."""
+        glDeleteRenderbuffers(2, [self._color_rb, self._depth_rb])
+        glDeleteFramebuffers(1, [self.fbo])
+
+
+def max_framebuffer_size() -> int:
+    """Return the largest framebuffer edge supported by the current context."""
+    max_renderbuffer = int(glGetIntegerv(GL_MAX_RENDERBUFFER_SIZE))
+    max_viewport = min(int(v) for v in np.ravel(glGetIntegerv(GL_MAX_VIEWPORT_DIMS)))
+    return min(max_renderbuffer, max_viewport)
+
+
+class OffscreenRenderer:
+    """Renders the scene described by an AppState without a window."""
+
+    def __init__(self, app_state: AppState, cache: ImageCache | None = None) -> None:
+        """Create the offscreen context and initialize the scene.
+
+        Args:
+            app_state: The application state describing the scene.
+            cache: Cache of rendered images consulted by ``render``, or None.
+        """
+        self.app_state = app_state
+        self.cache = cache
+        self.context = OffscreenContext()
+        self.renderer_name = (glGetString(GL_RENDERER) or b"").decode(errors="replace")
+        self.scene = SceneRenderer(app_state)
+        self.scene.initialize()
+        self.max_size = max_framebuffer_size()
+        self._framebuffer: Framebuffer | None = None
+        self._readback: PixelReadback | None = None
+
+    def _targets_for(self, width: int, height: int) -> tuple[Framebuffer, PixelReadback]:
+        """Return a framebuffer and readback of the given size, reusing the previous ones if possible."""
+        fb, readback = self._framebuffer, self._readback
+        if fb is None or readback is None or (fb.width, fb.height) != (width, height):
+            self._delete_targets()
+            fb = self._framebuffer = Framebuffer(width, height)
+            readback = self._readback = PixelReadback(width, height)
+        return fb, readback
+
+    def _delete_targets(self) -> None:
+        """Free the framebuffer and readback buffers."""
+        if self._readback is not None:
+            self._readback.delete()
+            self._readback = None
+        if self._framebuffer is not None:
+            self._framebuffer.delete()
+            self._framebuffer = None
+
+    def _draw(
+        self, width: int, height: int, aspect: float | None, window: tuple[float, float, float, float]
+    ) -> PixelReadback:
+        """Draw the scene into the framebuffer, leaving it bound.
+
+        Raises:
+            ValueError: If the requested size exceeds the framebuffer limits.
+        """
+        if max(width, height) > self.max_size:
+            msg = f"Image {width}x{height} exceeds the maximum framebuffer size {self.max_size}"
+            raise ValueError(msg)
+        self.context.make_current()
+        fb, readback = self._targets_for(width, height)
+        fb.bind()
+        self.scene.set_projection(aspect if aspect is not None else width / height, window)
+        self.scene.render()
+        return readback
+
+    def render(
+        self,
+        width: int,
+        height: int,
+        *,
+        aspect: float | None = None,
+        window: tuple[float, float, float, float] = FULL_WINDOW,
+    ) -> np.ndarray:
+        """Render the scene and read it back.
+
+        Args:
+            width: Width of the rendered image in pixels.
+            height: Height of the rendered image in pixels.
+            aspect: Aspect ratio of the full view; defaults to width / height.
+            window: Sub-rectangle of the view to render, see SceneRenderer.set_projection.
+
+        If the renderer has a cache, an image of an identical scene rendered
+        before is returned without drawing.
+
+        Returns:
+            Array of shape (height, width, 3) with the top row first.
+        """
+        key = None
+        if self.cache is not None:
+            view = [aspect, list(window), self.scene.materials.digest()]
+            key = self.cache.key(self.app_state, width, height, view=view, renderer=self.renderer_name)
+            image = self.cache.get(key)
+            if image is not None:
+                return image
+        readback = self._draw(width, height, aspect, window)
+        image = np.ascontiguousarray(as_rgb_image(readback.read_now()))
+        Framebuffer.release()
+        if self.cache is not None and key is not None:
+            self.cache.put(key, image)
+        return image
+
+    def draw(self, width: int, height: int) -> None:
+        """Draw the scene into the offscreen framebuffer without reading it back, bypassing the cache.
+
+        Args:
+            width: Width of the framebuffer in pixels.
+            height: Height of the framebuffer in pixels.
+        """
+        self._draw(width, height, None, FULL_WINDOW)
+        Framebuffer.release()
+
+    def render_async(
+        self,
+        width: int,
+        height: int,
+        *,
+        aspect: float | None = None,
+        window: tuple[float, float, float, float] = FULL_WINDOW,
+    ) -> np.ndarray | None:
+        """Render the scene and queue its readback without waiting for it.
+
+        Takes the same arguments as ``render``. Consecutive calls must use the
+        same size; call ``flush`` before changing it.
+
+        Returns:
+            Zero-copy top-down RGB view of a frame rendered ``latency`` calls
+            earlier (valid until the next call), or None while the pipeline fills up.
+        """
+        readback = self._draw(width, height, aspect, window)
+        pixels = readback.read()
+        Framebuffer.release()
+        return None if pixels is None else as_rgb_image(pixels)
+
+    def flush(self) -> Iterator[np.ndarray]:
+        """Yield the frames queued by ``render_async`` that were not returned yet."""
+        if self._readback is not None:
+            self.context.make_current()
+            for pixels in self._readback.flush():
+                yield as_rgb_image(pixels)
+
+    def cleanup(self) -> None:
+        """Free OpenGL resources."""
+        self.context.make_current()
+        self._delete_targets()
+        self.scene.cleanup()
+        self.context.done_current()
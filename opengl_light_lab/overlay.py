@@ -0,0 +1,187 @@
+"""Text overlays pre-rendered into textures.
+
+Laying out and rasterizing text with QPainter on every frame is expensive, and
+mixing QPainter into a raw OpenGL frame makes Qt save and restore the GL
+state. A TextOverlay renders its panel into a QImage once per size, device
+pixel ratio and text, uploads it as a texture, and then draws a single
+textured quad per frame.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import TYPE_CHECKING
+
+from OpenGL.GL import (  # type: ignore
+    GL_BLEND,
+    GL_COLOR_BUFFER_BIT,
+    GL_CULL_FACE,
+    GL_CURRENT_BIT,
+    GL_DEPTH_TEST,
+    GL_ENABLE_BIT,
+    GL_LIGHTING,
+    GL_LINEAR,
+    GL_MODELVIEW,
+    GL_ONE,
+    GL_ONE_MINUS_SRC_ALPHA,
+    GL_PROJECTION,
+    GL_QUADS,
+    GL_RGBA,
+    GL_RGBA8,
+    GL_TEXTURE_2D,
+    GL_TEXTURE_BIT,
+    GL_TEXTURE_MAG_FILTER,
+    GL_TEXTURE_MIN_FILTER,
+    GL_UNPACK_ALIGNMENT,
+    GL_UNSIGNED_BYTE,
+    GL_VIEWPORT_BIT,
+    glBegin,
+    glBindTexture,
+    glBlendFunc,
+    glColor4f,
+    glDeleteTextures,
+    glDisable,
+    glEnable,
+    glEnd,
+    glGenTextures,
+    glLoadIdentity,
+    glMatrixMode,
+    glOrtho,
+    glPixelStorei,
+    glPopAttrib,
+    glPopMatrix,
+    glPushAttrib,
+    glPushMatrix,
+    glTexCoord2f,
+    glTexImage2D,
+    glTexParameteri,
+    glVertex2f,
+    glViewport,
+)
+from PySide6 import QtCore, QtGui
+
+if TYPE_CHECKING:
+    from collections.abc import Hashable
+
+PANEL_COLOR = QtGui.QColor(0, 0, 0, 180)
+TEXT_COLOR = QtGui.QColor(240, 240, 240)
+PADDING = 8
+
+
+class TextOverlay:
+    """Word-wrapped text on a translucent panel, cached as a texture.
+
+    Attributes:
+        paint_time: Seconds the last QPainter rasterization of the panel took,
+            i.e. what drawing it with QPainter costs on every frame.
+        renders: Number of times the panel was rasterized.
+    """
+
+    def __init__(self, text: str, point_size: int = 10) -> None:
+        """Initialize the overlay; the texture is created on the first draw.
+
+        Args:
+            text: Text shown on the panel.
+            point_size: Font size in points.
+        """
+        self.text = text
+        self.point_size = point_size
+        self.paint_time = 0.0
+        self.renders = 0
+        self._texture = 0
+        self._key: Hashable = None
+
+    def _render_image(self, width: int, height: int, ratio: float) -> QtGui.QImage:
+        """Rasterize the panel at its size in logical pixels, scaled by the device pixel ratio."""
+        start = time.perf_counter()
+        image = QtGui.QImage(
+            round(width * ratio), round(height * ratio), QtGui.QImage.Format.Format_RGBA8888_Premultiplied
+        )
+        image.setDevicePixelRatio(ratio)
+        image.fill(QtCore.Qt.GlobalColor.transparent)
+        painter = QtGui.QPainter(image)
+        painter.setRenderHint(QtGui.QPainter.RenderHint.TextAntialiasing)
+        rect = QtCore.QRect(0, 0, width, height)
+        painter.fillRect(rect, PANEL_COLOR)
+        painter.setPen(TEXT_COLOR)
+        painter.setFont(QtGui.QFont("", self.point_size))
+        painter.drawText(
+            rect.adjusted(PADDING, PADDING, -PADDING, -PADDING), QtCore.Qt.TextFlag.TextWordWrap, self.text
+        )
+        painter.end()
+        self.paint_time = time.perf_counter() - start
+        self.renders += 1
+        return image
+
+    def _upload(self, image: QtGui.QImage) -> None:
+        """Replace the texture with the image."""
+        if not self._texture:
+            self._texture = glGenTextures(1)
+        glBindTexture(GL_TEXTURE_2D, self._texture)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
+        glPixelStorei(GL_UNPACK_ALIGNMENT, 4)
+        pixels = bytes(image.constBits())  # type: ignore[arg-type]
+        glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA8, image.width(), image.height(), 0, GL_RGBA, GL_UNSIGNED_BYTE, pixels)
+        glBindTexture(GL_TEXTURE_2D, 0)
+
+    def draw(self, rect: QtCore.QRect, ratio: float, view_width: int, view_height: int) -> None:
+        """Draw the panel over the current frame, rasterizing it first if its size or text changed.
+
+        Args:
+            rect: Panel rectangle in logical pixels from the top-left corner of the view.
+            ratio: Device pixel ratio of the view.
+            view_width: View width in device pixels.
+            view_height: View height in device pixels.
+        """
+        key = (rect.width(), rect.height(), ratio, self.text, self.point_size)
+        if key != self._key:
+            self._upload(self._render_image(rect.width(), rect.height(), ratio))
+            self._key = key
+
+        left, right = rect.left() * ratio, (rect.left() + rect.width()) * ratio
+        top, bottom = view_height - rect.top() * ratio, view_height - (rect.top() + rect.height()) * ratio
+        glPushAttrib(GL_ENABLE_BIT | GL_TEXTURE_BIT | GL_COLOR_BUFFER_BIT | GL_CURRENT_BIT | GL_VIEWPORT_BIT)
+        glMatrixMode(GL_PROJECTION)
+        glPushMatrix()
+        glLoadIdentity()
+        glOrtho(0, view_width, 0, view_height, -1, 1)
+        glMatrixMode(GL_MODELVIEW)
+        glPushMatrix()
+        glLoadIdentity()
+        try:
+            glViewport(0, 0, view_width, view_height)
+            glDisable(GL_DEPTH_TEST)
+            glDisable(GL_LIGHTING)
+            glDisable(GL_CULL_FACE)
+            glEnable(GL_BLEND)
+            # The image is premultiplied, as QPainter composites it
+            glBlendFunc(GL_ONE, GL_ONE_MINUS_SRC_ALPHA)
+            glEnable(GL_TEXTURE_2D)
+            glBindTexture(GL_TEXTURE_2D, self._texture)
+            glColor4f(1.0, 1.0, 1.0, 1.0)
+            # Image rows run top-down
+            glBegin(GL_QUADS)
+            glTexCoord2f(0.0, 1.0)
+            glVertex2f(left, bottom)
+            glTexCoord2f(1.0, 1.0)
+            glVertex2f(right, bottom)
+            glTexCoord2f(1.0, 0.0)
+            glVertex2f(right, top)
+            glTexCoord2f(0.0, 0.0)
+            glVertex2f(left, top)
+            glEnd()
+            glBindTexture(GL_TEXTURE_2D, 0)
+        finally:
+            glMatrixMode(GL_PROJECTION)
+            glPopMatrix()
+            glMatrixMode(GL_MODELVIEW)
+            glPopMatrix()
+            glPopAttrib()
+
+    def delete(self) -> None:
+        """Free the texture."""
+        if self._texture:
+            glDeleteTextures(1, [self._texture])
+            self._texture = 0
+        self._key = None
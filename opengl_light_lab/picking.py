@@ -0,0 +1,282 @@
+"""Object picking through an integer ID buffer.
+
+On a click, the scene is rendered once more into a tiny framebuffer with an
+unsigned integer color attachment, each object writing its ID. Only the few
+pixels around the cursor are rasterized: the projection is narrowed to that
+region with the same sub-frustum used by tiled rendering. The IDs are read
+into a pixel buffer object guarded by a fence, so the request returns
+immediately and the result is collected on the next poll, usually within a
+millisecond.
+"""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+import numpy as np
+from OpenGL.GL import (  # type: ignore
+    GL_ALREADY_SIGNALED,
+    GL_COLOR,
+    GL_COLOR_ATTACHMENT0,
+    GL_CONDITION_SATISFIED,
+    GL_DEPTH_ATTACHMENT,
+    GL_DEPTH_BUFFER_BIT,
+    GL_DEPTH_COMPONENT24,
+    GL_DEPTH_TEST,
+    GL_ENABLE_BIT,
+    GL_FRAGMENT_SHADER,
+    GL_FRAMEBUFFER,
+    GL_FRAMEBUFFER_BINDING,
+    GL_FRAMEBUFFER_COMPLETE,
+    GL_MODELVIEW,
+    GL_PACK_ALIGNMENT,
+    GL_PIXEL_PACK_BUFFER,
+    GL_PROJECTION,
+    GL_R32UI,
+    GL_RED_INTEGER,
+    GL_RENDERBUFFER,
+    GL_STREAM_READ,
+    GL_SYNC_GPU_COMMANDS_COMPLETE,
+    GL_UNSIGNED_INT,
+    GL_VERTEX_SHADER,
+    GL_VIEWPORT_BIT,
+    glBindBuffer,
+    glBindFramebuffer,
+    glBindRenderbuffer,
+    glBufferData,
+    glCheckFramebufferStatus,
+    glClear,
+    glClearBufferuiv,
+    glClientWaitSync,
+    glDeleteBuffers,
+    glDeleteFramebuffers,
+    glDeleteProgram,
+    glDeleteRenderbuffers,
+    glDeleteSync,
+    glEnable,
+    glFenceSync,
+    glFinish,
+    glFlush,
+    glFramebufferRenderbuffer,
+    glGenBuffers,
+    glGenFramebuffers,
+    glGenRenderbuffers,
+    glGetBufferSubData,
+    glGetIntegerv,
+    glGetUniformLocation,
+    glMatrixMode,
+    glPixelStorei,
+    glPopAttrib,
+    glPopMatrix,
+    glPushAttrib,
+    glPushMatrix,
+    glReadPixels,
+    glRenderbufferStorage,
+    glUniform1ui,
+    glUseProgram,
+    glViewport,
+)
+from OpenGL.GL.shaders import compileProgram, compileShader  # type: ignore
+
+from opengl_light_lab.app_state import SceneObject
+
+if TYPE_CHECKING:
+    from opengl_light_lab.scene import SceneRenderer
+
+PICK_RADIUS = 2
+"""Pixels around the cursor searched for an object when the cursor itself misses."""
+NO_OBJECT = 0
+
+VERTEX_SHADER = """
+#version 130
+void main() {
+    gl_Position = gl_ModelViewProjectionMatrix * gl_Vertex;
+}
+"""
+
+FRAGMENT_SHADER = """
+#version 130
+uniform uint object_id;
+out uvec4 frag_id;
+void main() {
+    frag_id = uvec4(object_id, 0u, 0u, 0u);
+}
+"""
+
+
+def object_id(obj: SceneObject) -> int:
+    """Return the non-zero ID written to the ID buffer for an object."""
+    return list(SceneObject).index(obj) + 1
+
+
+@dataclass
+class PickResult:
+    """Outcome of a pick request.
+
+    Attributes:
+        obj: The picked object, or None if the click hit the background.
+        x: Cursor x in framebuffer pixels from the left.
+        y: Cursor y in framebuffer pixels from the bottom.
+        latency: Seconds from the request to the available result.
+    """
+
+    obj: SceneObject | None
+    x: int
+    y: int
+    latency: float
+
+
+class Picker:
+    """Renders object IDs around the cursor and reads them back asynchronously.
+
+    All methods require the context the picker was created in to be current.
+    Only one request is in flight at a time; a new request replaces it.
+    """
+
+    def __init__(self, scene: SceneRenderer, radius: int = PICK_RADIUS) -> None:
+        """Allocate the ID framebuffer, readback buffer and shader.
+
+        Args:
+            scene: Scene renderer drawing the objects.
+            radius: Pixels around the cursor rendered and searched.
+
+        Raises:
+            RuntimeError: If the ID framebuffer is not supported.
+        """
+        self.scene = scene
+        self.size = 2 * radius + 1
+        self._program = compileProgram(
+            compileShader(VERTEX_SHADER, GL_VERTEX_SHADER), compileShader(FRAGMENT_SHADER, GL_FRAGMENT_SHADER)
+        )
+        self._id_location = glGetUniformLocation(self._program, "object_id")
+
+        self._pbo = int(glGenBuffers(1))
+        glBindBuffer(GL_PIXEL_PACK_BUFFER, self._pbo)
+        glBufferData(GL_PIXEL_PACK_BUFFER, self.size * self.size * 4, None, GL_STREAM_READ)
+        glBindBuffer(GL_PIXEL_PACK_BUFFER, 0)
+        self._fence = None
+        self._pending: tuple[int, int, float] | None = None
+
+        self._fbo = glGenFramebuffers(1)
+        self._id_rb, self._depth_rb = glGenRenderbuffers(2)
+        glBindRenderbuffer(GL_RENDERBUFFER, self._id_rb)
+        glRenderbufferStorage(GL_RENDERBUFFER, GL_R32UI, self.size, self.size)
+        glBindRenderbuffer(GL_RENDERBUFFER, self._depth_rb)
+        glRenderbufferStorage(GL_RENDERBUFFER, GL_DEPTH_COMPONENT24, self.size, self.size)
+        glBindRenderbuffer(GL_RENDERBUFFER, 0)
+
+        previous = int(glGetIntegerv(GL_FRAMEBUFFER_BINDING))
+        glBindFramebuffer(GL_FRAMEBUFFER, self._fbo)
+        glFramebufferRenderbuffer(GL_FRAMEBUFFER, GL_COLOR_ATTACHMENT0, GL_RENDERBUFFER, self._id_rb)
+        glFramebufferRenderbuffer(GL_FRAMEBUFFER, GL_DEPTH_ATTACHMENT, GL_RENDERBUFFER, self._depth_rb)
+        status = glCheckFramebufferStatus(GL_FRAMEBUFFER)
+        glBindFramebuffer(GL_FRAMEBUFFER, previous)
+        if status != GL_FRAMEBUFFER_COMPLETE:
+            self.delete()
+            msg = f"ID framebuffer is incomplete (status 0x{status:x})"
+            raise RuntimeError(msg)
+
+        # Let the driver compile the shader now rather than on the first click
+        self.request(0, 0, 1, 1)
+        glFinish()
+        self.poll()
+
+    def request(self, x: int, y: int, width: int, height: int) -> None:
+        """Render the IDs around a pixel and queue their readback.
+
+        Args:
+            x: Cursor x in framebuffer pixels from the left.
+            y: Cursor y in framebuffer pixels from the bottom.
+            width: Width of the view in framebuffer pixels.
+            height: Height of the view in framebuffer pixels.
+        """
+        start = time.perf_counter()
+        half = self.size // 2
+        window = ((x - half) / width, (x + half + 1) / width, (y - half) / height, (y + half + 1) / height)
+
+        previous = int(glGetIntegerv(GL_FRAMEBUFFER_BINDING))
+        glPushAttrib(GL_ENABLE_BIT | GL_VIEWPORT_BIT)
+        glMatrixMode(GL_PROJECTION)
+        glPushMatrix()
+        glMatrixMode(GL_MODELVIEW)
+        glPushMatrix()
+        try:
+            glBindFramebuffer(GL_FRAMEBUFFER, self._fbo)
+            glViewport(0, 0, self.size, self.size)
+            glClearBufferuiv(GL_COLOR, 0, np.zeros(4, dtype=np.uint32))
+            glClear(GL_DEPTH_BUFFER_BIT)
+            glEnable(GL_DEPTH_TEST)
+            self.scene.camera.load_projection(width / height, window)
+            self.scene.camera.load_view()
+            glUseProgram(self._program)
+            for obj in SceneObject:
+                glUniform1ui(self._id_location, object_id(obj))
+                self.scene.draw_object(obj, shaded=False)
+            glUseProgram(0)
+
+            glPixelStorei(GL_PACK_ALIGNMENT, 4)
+            glBindBuffer(GL_PIXEL_PACK_BUFFER, self._pbo)
+            glReadPixels(0, 0, self.size, self.size, GL_RED_INTEGER, GL_UNSIGNED_INT, 0)
+            glBindBuffer(GL_PIXEL_PACK_BUFFER, 0)
+        finally:
+            glBindFramebuffer(GL_FRAMEBUFFER, previous)
+            glMatrixMode(GL_PROJECTION)
+            glPopMatrix()
+            glMatrixMode(GL_MODELVIEW)
+            glPopMatrix()
+            glPopAttrib()
+
+        if self._fence is not None:
+            glDeleteSync(self._fence)
+        self._fence = glFenceSync(GL_SYNC_GPU_COMMANDS_COMPLETE, 0)
+        glFlush()
+        self._pending = (x, y, start)
+
+    @property
+    def is_pending(self) -> bool:
+        """Return True if a request waits for its result."""
+        return self._pending is not None
+
+    def poll(self) -> PickResult | None:
+        """Collect the result of the pending request if the GPU has finished it.
+
+        Returns:
+            The pick result, or None if there is no request or it is not done yet.
+        """
+        if self._pending is None or self._fence is None:
+            return None
+        if glClientWaitSync(self._fence, 0, 0) not in {GL_ALREADY_SIGNALED, GL_CONDITION_SATISFIED}:
+            return None
+        glDeleteSync(self._fence)
+        self._fence = None
+
+        glBindBuffer(GL_PIXEL_PACK_BUFFER, self._pbo)
+        data = glGetBufferSubData(GL_PIXEL_PACK_BUFFER, 0, self.size * self.size * 4)
+        glBindBuffer(GL_PIXEL_PACK_BUFFER, 0)
+        ids = np.frombuffer(data, dtype=np.uint32).reshape(self.size, self.size)
+
+        x, y, start = self._pending
+        self._pending = None
+        return PickResult(self._nearest_object(ids), x, y, time.perf_counter() - start)
+
+    @staticmethod
+    def _nearest_object(ids: np.ndarray) -> SceneObject | None:
+        """Return the object covering the pixel closest to the region center."""
+        rows, cols = np.nonzero(ids != NO_OBJECT)
+        if rows.size == 0:
+            return None
+        center = ids.shape[0] // 2
+        nearest = np.argmin((rows - center) ** 2 + (cols - center) ** 2)
+        return list(SceneObject)[int(ids[rows[nearest], cols[nearest]]) - 1]
+
+    def delete(self) -> None:
+        """Free the OpenGL objects."""
+        if self._fence is not None:
+            glDeleteSync(self._fence)
+            self._fence = None
+        glDeleteBuffers(1, [self._pbo])
+        glDeleteRenderbuffers(2, [self._id_rb, self._depth_rb])
+        glDeleteFramebuffers(1, [self._fbo])
+        glDeleteProgram(self._program)
@@ -1,3 +1,4 @@
+import numpy as np
 from OpenGL.GL import GL_QUADS, glBegin, glColor3f, glEnd, glNormal3f, glTexCoord2f, glVertex3f  # type: ignore
 from OpenGL.GLU import (  # type: ignore
     GLU_FLAT,
@@ -10,6 +11,12 @@ from OpenGL.GLU import (  # type: ignore
     gluQuadricOrientation,
 )
 
+CYLINDER_BASE_RADIUS = 0.5
+CYLINDER_TOP_RADIUS = 0.2
+CYLINDER_HEIGHT = 1.0
+CYLINDER_SLICES = 30
+CYLINDER_STACKS = 10
+
 # Cube vertex data: (normal, vertices for quad)
 CUBE_FACES = [
     # front (+Z)
@@ -47,10 +54,45 @@ CUBE_TEX_COORDS = [
 ]
 
 
+CUBE_VERTICES = np.array([vertex for _normal, vertices in CUBE_FACES for vertex in vertices], dtype=np.float32)
+"""Vertex positions of the cube quads, shape (24, 3)."""
+
+# Faces with their color or texture coordinates, zipped once instead of on every draw
+_COLORED_FACES = tuple(
+    (color, normal, tuple(vertices)) for (normal, vertices), color in zip(CUBE_FACES, CUBE_FACE_COLORS, strict=True)
+)
+_TEXTURED_FACES = tuple(
+    (normal, tuple(zip(tex_coords, vertices, strict=True)))
+    for (normal, vertices), tex_coords in zip(CUBE_FACES, CUBE_TEX_COORDS, strict=True)
+)
+
+
+def cylinder_vertices(slices: int = CYLINDER_SLICES, stacks: int = CYLINDER_STACKS) -> np.ndarray:
+    """Return the vertex grid of the cylinder drawn by draw_cylinder.
+
+    The cylinder stands on the XY plane along +Z, as generated by gluCylinder.
+
+    Args:
+        slices: Subdivisions around the Z axis.
+        stacks: Subdivisions along the Z axis.
+
+    Returns:
+        Array of shape (stacks + 1, slices + 1, 3).
+    """
+    z = np.linspace(0.0, CYLINDER_HEIGHT, stacks + 1, dtype=np.float32)
+    radius = CYLINDER_BASE_RADIUS + (CYLINDER_TOP_RADIUS - CYLINDER_BASE_RADIUS) * z / CYLINDER_HEIGHT
+    angle = np.linspace(0.0, 2.0 * np.pi, slices + 1, dtype=np.float32)
+    grid = np.empty((stacks + 1, slices + 1, 3), dtype=np.float32)
+    grid[..., 0] = radius[:, None] * np.sin(angle)
+    grid[..., 1] = radius[:, None] * np.cos(angle)
+    grid[..., 2] = z[:, None]
+    return grid
+
+
 def draw_cube() -> None:
     """Draw a colored cube centered at the origin."""
     glBegin(GL_QUADS)
-    for (normal, vertices), color in zip(CUBE_FACES, CUBE_FACE_COLORS, strict=True):
+    for color, normal, vertices in _COLORED_FACES:
         glColor3f(*color)
         glNormal3f(*normal)
         for vertex in vertices:
@@ -62,9 +104,9 @@ def draw_textured_cube() -> None:
     """Draw a textured cube centered at the origin."""
     glColor3f(1.0, 1.0, 1.0)  # White to show texture colors properly
     glBegin(GL_QUADS)
-    for (normal, vertices), tex_coords in zip(CUBE_FACES, CUBE_TEX_COORDS, strict=True):
+    for normal, vertices in _TEXTURED_FACES:
         glNormal3f(*normal)
-        for vertex, tex_coord in zip(vertices, tex_coords, strict=True):
+        for tex_coord, vertex in vertices:
             glTexCoord2f(*tex_coord)
             glVertex3f(*vertex)
     glEnd()
@@ -80,7 +122,7 @@ def draw_cylinder(*, inside: bool = False) -> None:
     quad = gluNewQuadric()
     gluQuadricOrientation(quad, GLU_INSIDE if inside else GLU_OUTSIDE)
     gluQuadricNormals(quad, GLU_FLAT)
-    gluCylinder(quad, 0.5, 0.2, 1.0, 30, 10)
+    gluCylinder(quad, CYLINDER_BASE_RADIUS, CYLINDER_TOP_RADIUS, CYLINDER_HEIGHT, CYLINDER_SLICES, CYLINDER_STACKS)
     gluDeleteQuadric(quad)
 
 
@@ -0,0 +1,278 @@
+"""Procedural textures generated with vectorized NumPy.
+
+A procedural texture is named by a URI usable wherever a texture path is
+accepted, e.g. in ``AppState.current_texture``::
+
+    proc://checker?size=1024&squares=16
+    proc://uv_grid
+    proc://noise?scale=4&octaves=6&seed=7
+
+The URI names one of PATTERNS; its query sets the keyword arguments of the
+pattern function, and missing ones keep their defaults. Generated images are
+memoized by their canonical URI, so switching back to a texture does not
+compute it again.
+"""
+
+from __future__ import annotations
+
+import functools
+import inspect
+import math
+from typing import TYPE_CHECKING
+from urllib.parse import parse_qsl, urlsplit
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+SCHEME = "proc"
+MAX_SIZE = 8192
+"""Largest edge of a generated texture in pixels."""
+CACHE_SIZE = 8
+"""Number of generated textures kept in memory."""
+COUNT_ARGUMENTS = frozenset({"squares", "cells", "scale", "octaves", "rows", "columns", "bumps"})
+"""Arguments counting cells, bricks or octaves, which must be between 1 and the texture size."""
+
+
+def _color(hex_color: str) -> np.ndarray:
+    """Return the RGB components of a ``rrggbb`` color.
+
+    Raises:
+        ValueError: If the color is not six hexadecimal digits.
+    """
+    if len(hex_color) != 6:
+        msg = f"Invalid color {hex_color!r}, expected rrggbb"
+        raise ValueError(msg)
+    return np.array([int(hex_color[i : i + 2], 16) for i in (0, 2, 4)], dtype=np.float32)
+
+
+def _cell_coordinates(size: int, cells: float) -> tuple[np.ndarray, np.ndarray]:
+    """Return the cell index and the position within the cell of pixel centers along an edge."""
+    position = (np.arange(size, dtype=np.float32) + 0.5) * (cells / size)
+    index = np.floor(position)
+    return index.astype(np.int64), position - index
+
+
+def _to_image(rgb: np.ndarray) -> np.ndarray:
+    """Round float RGB values in [0, 255] to an 8-bit image."""
+    return np.clip(rgb + 0.5, 0, 255).astype(np.uint8)
+
+
+def checker(size: int = 512, squares: int = 8, color_a: str = "f0f0f0", color_b: str = "303030") -> np.ndarray:
+    """Return a checkerboard.
+
+    Args:
+        size: Edge of the texture in pixels.
+        squares: Number of squares along an edge.
+        color_a: Color of the top-left square, as ``rrggbb``.
+        color_b: Color of the other squares.
+    """
+    index, _ = _cell_coordinates(size, squares)
+    palette = _to_image(np.stack([_color(color_a), _color(color_b)]))
+    return palette[(index[:, None] + index[None, :]) % 2]
+
+
+def uv_grid(size: int = 1024, cells: int = 8) -> np.ndarray:
+    """Return a UV test grid: red grows with u, green with v, with lines between cells.
+
+    Every texel is distinct and the image is deterministic, which makes it a
+    cheap input for checking texture coordinates and for image regression tests.
+
+    Args:
+        size: Edge of the texture in pixels.
+        cells: Number of grid cells along an edge.
+    """
+    u = (np.arange(size, dtype=np.float32) + 0.5) / size
+    rgb = np.empty((size, size, 3), dtype=np.float32)
+    rgb[..., 0] = u[None, :] * 255
+    rgb[..., 1] = u[::-1, None] * 255
+    index, fraction = _cell_coordinates(size, cells)
+    rgb[..., 2] = np.where((index[:, None] + index[None, :]) % 2 == 1, 160.0, 64.0)
+    line = max(size // cells // 32, 1) * cells / size
+    on_line = (fraction < line)[:, None] | (fraction < line)[None, :]
+    rgb[on_line] = 255.0
+    return _to_image(rgb)
+
+
+def _perlin_octave(size: int, cells: int, rng: np.random.Generator) -> np.ndarray:
+    """Return one octave of tileable Perlin gradient noise, roughly in [-0.7, 0.7]."""
+    angles = rng.uniform(0.0, 2 * math.pi, (cells, cells)).astype(np.float32)
+    gradient_x, gradient_y = np.cos(angles), np.sin(angles)
+    index, fraction = _cell_coordinates(size, cells)
+    x0, y0 = index[None, :], index[:, None]
+    x1, y1 = (x0 + 1) % cells, (y0 + 1) % cells
+    fx, fy = fraction[None, :], fraction[:, None]
+
+    def corner(y: np.ndarray, x: np.ndarray, dx: np.ndarray, dy: np.ndarray) -> np.ndarray:
+        return gradient_x[y, x] * dx + gradient_y[y, x] * dy
+
+    sx = fx * fx * fx * (fx * (fx * 6 - 15) + 10)
+    sy = fy * fy * fy * (fy * (fy * 6 - 15) + 10)
+    top = corner(y0, x0, fx, fy) * (1 - sx) + corner(y0, x1, fx - 1, fy) * sx
+    bottom = corner(y1, x0, fx, fy - 1) * (1 - sx) + corner(y1, x1, fx - 1, fy - 1) * sx
+    return top * (1 - sy) + bottom * sy
+
+
+def noise(size: int = 512, scale: int = 8, octaves: int = 4, persistence: float = 0.5, seed: int = 0) -> np.ndarray:
+    """Return grayscale fractal Perlin noise that tiles seamlessly.
+
+    Args:
+        size: Edge of the texture in pixels.
+        scale: Number of noise cells along an edge in the first octave.
+        octaves: Number of octaves, each with twice the cells of the previous one.
+        persistence: Amplitude ratio of consecutive octaves.
+        seed: Seed of the random gradients.
+    """
+    rng = np.random.default_rng(seed)
+    value = np.zeros((size, size), dtype=np.float32)
+    amplitude, total = 1.0, 0.0
+    for octave in range(octaves):
+        value += amplitude * _perlin_octave(size, scale << octave, rng)
+        total += amplitude
+        amplitude *= persistence
+    gray = (value / total / math.sqrt(0.5) * 0.5 + 0.5) * 255
+    return _to_image(np.repeat(gray[..., None], 3, axis=2))
+
+
+def brick(  # noqa: PLR0913, PLR0917
+    size: int = 512,
+    rows: int = 8,
+    columns: int = 4,
+    mortar: float = 0.08,
+    color: str = "a0452e",
+    mortar_color: str = "c8c0b0",
+    seed: int = 0,
+) -> np.ndarray:
+    """Return a running bond brick wall with slightly varying brick colors.
+
+    Args:
+        size: Edge of the texture in pixels.
+        rows: Number of brick courses along the height.
+        columns: Number of bricks in a course.
+        mortar: Thickness of the mortar joints as a fraction of the brick height.
+        color: Mean brick color, as ``rrggbb``.
+        mortar_color: Color of the joints.
+        seed: Seed of the brick color variation.
+    """
+    row, fy = _cell_coordinates(size, rows)
+    x = (np.arange(size, dtype=np.float32) + 0.5) * (columns / size) + 0.5 * (row[:, None] % 2)
+    column = np.floor(x)
+    fx = x - column
+    shade = np.random.default_rng(seed).uniform(0.8, 1.15, (rows, columns)).astype(np.float32)
+    bricks = shade[row[:, None], column.astype(np.int64) % columns][..., None] * _color(color)
+    joint = (fy < mortar)[:, None] | (fx < mortar * columns / rows)
+    return _to_image(np.where(joint[..., None], _color(mortar_color), bricks))
+
+
+def normal_test(size: int = 512, bumps: int = 4) -> np.ndarray:
+    """Return a tangent-space normal map of hemispherical bumps on a flat surface.
+
+    Normals are encoded as ``(n + 1) / 2``, with x to the right and y up.
+
+    Args:
+        size: Edge of the texture in pixels.
+        bumps: Number of bumps along an edge.
+    """
+    _, fraction = _cell_coordinates(size, bumps)
+    x = fraction[None, :] * 2 - 1
+    y = 1 - fraction[:, None] * 2
+    radius2 = np.broadcast_to(x * x + y * y, (size, size))
+    inside = radius2 < 1
+    normal = np.empty((size, size, 3), dtype=np.float32)
+    normal[..., 0] = np.where(inside, x, 0.0)
+    normal[..., 1] = np.where(inside, y, 0.0)
+    normal[..., 2] = np.where(inside, np.sqrt(np.maximum(1 - radius2, 0.0)), 1.0)
+    return _to_image((normal + 1) * 127.5)
+
+
+PATTERNS: dict[str, Callable[..., np.ndarray]] = {
+    "checker": checker,
+    "uv_grid": uv_grid,
+    "noise": noise,
+    "brick": brick,
+    "normal_test": normal_test,
+}
+"""Pattern functions by their URI name. Each returns a top-down RGB image of shape (size, size, 3)."""
+
+
+def is_procedural(path: str) -> bool:
+    """Return True if a texture path is a procedural texture URI."""
+    return path.startswith(f"{SCHEME}://")
+
+
+def _parse(uri: str) -> tuple[str, tuple[tuple[str, object], ...]]:
+    """Return the pattern name and all its arguments, sorted by name.
+
+    Raises:
+        ValueError: If the URI names an unknown pattern or argument, or an argument value is invalid.
+    """
+    parts = urlsplit(uri)
+    if parts.scheme != SCHEME or parts.netloc not in PATTERNS:
+        msg = f"Unknown procedural texture {uri!r}, expected {SCHEME}://<{'|'.join(PATTERNS)}>?<arguments>"
+        raise ValueError(msg)
+    parameters = inspect.signature(PATTERNS[parts.netloc]).parameters
+    arguments: dict[str, object] = {name: p.default for name, p in parameters.items()}
+    for name, text in parse_qsl(parts.query, strict_parsing=bool(parts.query)):
+        if name not in parameters:
+            msg = f"Unknown argument {name!r} of procedural texture {parts.netloc!r}"
+            raise ValueError(msg)
+        arguments[name] = type(parameters[name].default)(text)
+    _check_arguments(parts.netloc, arguments)
+    return parts.netloc, tuple(sorted(arguments.items()))
+
+
+def _check_arguments(name: str, arguments: dict[str, object]) -> None:
+    """Check the argument values of a pattern.
+
+    Raises:
+        ValueError: If the size or a count is out of range, or a float argument is invalid.
+    """
+    size = int(arguments["size"])  # type: ignore[call-overload]
+    if not 1 <= size <= MAX_SIZE:
+        msg = f"Procedural texture size must be between 1 and {MAX_SIZE}"
+        raise ValueError(msg)
+    for key, value in arguments.items():
+        if key in COUNT_ARGUMENTS and not 1 <= int(value) <= size:  # type: ignore[call-overload]
+            msg = f"Argument {key!r} of procedural texture {name!r} must be between 1 and the size {size}"
+            raise ValueError(msg)
+        if isinstance(value, float) and not (math.isfinite(value) and value >= 0):
+            msg = f"Argument {key!r} of procedural texture {name!r} must be a finite non-negative number"
+            raise ValueError(msg)
+    # Every octave doubles the noise cells, which must still fit into the texture
+    if name == "noise" and int(arguments["scale"]) << (int(arguments["octaves"]) - 1) > size:  # type: ignore[call-overload]
+        msg = f"Noise cells of the last octave, scale << (octaves - 1), must not exceed the size {size}"
+        raise ValueError(msg)
+
+
+def canonical_uri(uri: str) -> str:
+    """Return the URI with all arguments of the pattern, in a fixed order.
+
+    URIs of the same texture have the same canonical form, e.g.
+    ``proc://checker`` and ``proc://checker?squares=8&size=512``.
+
+    Args:
+        uri: Procedural texture URI; invalid URIs raise ValueError.
+    """
+    name, arguments = _parse(uri)
+    return f"{SCHEME}://{name}?" + "&".join(f"{key}={value}" for key, value in arguments)
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def _generate(name: str, arguments: tuple[tuple[str, object], ...]) -> np.ndarray:
+    """Generate a pattern, memoized by its arguments."""
+    image = PATTERNS[name](**dict(arguments))
+    image.flags.writeable = False
+    return image
+
+
+def generate(uri: str) -> np.ndarray:
+    """Return the image of a procedural texture.
+
+    Args:
+        uri: Procedural texture URI; invalid URIs raise ValueError.
+
+    Returns:
+        Read-only top-down RGB image of shape (size, size, 3), shared by all callers.
+    """
+    return _generate(*_parse(uri))
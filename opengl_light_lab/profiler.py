@@ -0,0 +1,214 @@
+"""Lightweight per-frame profiler shown as an overlay in the GL view.
+
+Besides frame times and counters, the profiler can trace the memory
+allocations of every frame with tracemalloc (AllocationTracker). Tracing
+slows rendering down considerably, so it is a separate mode for finding
+allocations in the rendering hot path, which should allocate nothing once
+the scene is loaded.
+"""
+
+from __future__ import annotations
+
+import linecache
+import time
+import tracemalloc
+from collections import defaultdict, deque
+from dataclasses import dataclass
+from pathlib import Path
+
+DEFAULT_WINDOW = 120
+"""Number of frames averaged by the profiler."""
+TOP_SITES = 5
+"""Number of allocation call sites listed in the summary."""
+TRACEBACK_DEPTH = 16
+"""Frames stored per traced allocation, enough to reach the calling code of the package from within PyOpenGL."""
+
+_PACKAGE_DIR = str(Path(__file__).parent)
+
+_IGNORED = (
+    tracemalloc.Filter(inclusive=False, filename_pattern=tracemalloc.__file__),
+    tracemalloc.Filter(inclusive=False, filename_pattern=linecache.__file__),
+    tracemalloc.Filter(inclusive=False, filename_pattern=__file__, all_frames=True),
+)
+"""Allocations of the tracing itself, left out of the reports."""
+
+
+@dataclass
+class AllocationSite:
+    """Memory allocated from one line of the package and still held at the end of the frames.
+
+    Attributes:
+        location: ``file:line`` of the innermost call in the package that led to the allocation.
+        blocks: Memory blocks allocated per frame, averaged over the window.
+        size: Bytes allocated per frame, averaged over the window.
+    """
+
+    location: str
+    blocks: float
+    size: float
+
+
+def _call_site(traceback: tracemalloc.Traceback) -> str:
+    """Return ``file:line`` of the innermost frame of the package in a traceback, or of the innermost frame."""
+    frames = list(traceback)
+    # Tracebacks are stored from the oldest frame to the most recent one
+    frame = next((f for f in reversed(frames) if f.filename.startswith(_PACKAGE_DIR)), frames[-1])
+    return f"{Path(frame.filename).name}:{frame.lineno}"
+
+
+class AllocationTracker:
+    """Allocations of each frame by call site, traced with tracemalloc.
+
+    A snapshot of the traced memory is taken at the start and end of every
+    frame; their difference is what the frame allocated and kept, grouped
+    by call site: the innermost line of this package on the stack of the
+    allocation, so that allocations within PyOpenGL or NumPy are attributed
+    to the code calling them. Memory allocated and freed within the
+    frame is not in the snapshots, so the peak of the traced memory above
+    its level at the frame start is recorded as well.
+
+    Attributes:
+        frames: Number of frames traced.
+        last_blocks: Blocks the last frame allocated and kept.
+        last_size: Bytes the last frame allocated and kept.
+        last_peak: Peak bytes of the last frame above the memory at its start.
+    """
+
+    def __init__(self, window: int = DEFAULT_WINDOW) -> None:
+        """Start tracing, unless tracemalloc already traces.
+
+        Args:
+            window: Number of recent frames kept for the per-site averages.
+        """
+        self._started = not tracemalloc.is_tracing()
+        if self._started:
+            tracemalloc.start(TRACEBACK_DEPTH)
+        self.frames = 0
+        self.last_blocks = 0
+        self.last_size = 0
+        self.last_peak = 0
+        self._history: deque[dict[str, tuple[int, int]]] = deque(maxlen=window)
+        self._snapshot: tracemalloc.Snapshot | None = None
+        self._start_memory = 0
+
+    def begin_frame(self) -> None:
+        """Take the snapshot the frame is compared to."""
+        self._snapshot = tracemalloc.take_snapshot().filter_traces(_IGNORED)
+        tracemalloc.reset_peak()
+        self._start_memory = tracemalloc.get_traced_memory()[0]
+
+    def end_frame(self) -> None:
+        """Record the allocations of a frame started with begin_frame."""
+        if self._snapshot is None:
+            return
+        self.last_peak = tracemalloc.get_traced_memory()[1] - self._start_memory
+        snapshot = tracemalloc.take_snapshot().filter_traces(_IGNORED)
+        sites: dict[str, tuple[int, int]] = {}
+        for stat in snapshot.compare_to(self._snapshot, "traceback"):
+            if stat.count_diff > 0 or stat.size_diff > 0:
+                location = _call_site(stat.traceback)
+                blocks, size = sites.get(location, (0, 0))
+                sites[location] = (blocks + max(stat.count_diff, 0), size + max(stat.size_diff, 0))
+        self.last_blocks = sum(blocks for blocks, _ in sites.values())
+        self.last_size = sum(size for _, size in sites.values())
+        self._history.append(sites)
+        self._snapshot = None
+        self.frames += 1
+
+    def top_sites(self, limit: int = TOP_SITES) -> list[AllocationSite]:
+        """Return the call sites that allocated the most bytes per frame over the window.
+
+        Args:
+            limit: Maximum number of sites returned.
+        """
+        blocks: dict[str, int] = defaultdict(int)
+        sizes: dict[str, int] = defaultdict(int)
+        for sites in self._history:
+            for location, (count, size) in sites.items():
+                blocks[location] += count
+                sizes[location] += size
+        frames = max(len(self._history), 1)
+        ranked = sorted(sizes, key=lambda location: (-sizes[location], location))[:limit]
+        return [AllocationSite(location, blocks[location] / frames, sizes[location] / frames) for location in ranked]
+
+    def close(self) -> None:
+        """Stop tracing if the tracker started it."""
+        if self._started and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self._started = False
+
+
+class FrameProfiler:
+    """Collects frame times and per-frame counters over a sliding window."""
+
+    def __init__(self, window: int = DEFAULT_WINDOW) -> None:
+        """Initialize the profiler.
+
+        Args:
+            window: Number of recent frames kept for the averages.
+        """
+        self.window = window
+        self.frame_times: deque[float] = deque(maxlen=window)
+        self.counters: dict[str, int] = defaultdict(int)
+        self.last_counters: dict[str, int] = {}
+        self.allocations: AllocationTracker | None = None
+        self._frame_start: float | None = None
+
+    def trace_allocations(self, enabled: bool) -> None:
+        """Switch the allocation tracing mode on or off.
+
+        Args:
+            enabled: Whether to trace the allocations of the following frames.
+        """
+        if enabled and self.allocations is None:
+            self.allocations = AllocationTracker(self.window)
+        elif not enabled and self.allocations is not None:
+            self.allocations.close()
+            self.allocations = None
+
+    def begin_frame(self) -> None:
+        """Mark the start of a frame and reset the per-frame counters."""
+        self.counters.clear()
+        if self.allocations is not None:
+            self.allocations.begin_frame()
+        self._frame_start = time.perf_counter()
+
+    def end_frame(self) -> None:
+        """Mark the end of a frame started with begin_frame."""
+        if self._frame_start is None:
+            return
+        elapsed = time.perf_counter() - self._frame_start
+        if self.allocations is not None:
+            # Before the bookkeeping below, which would be counted as allocated by the frame
+            self.allocations.end_frame()
+            self.counters["allocated blocks"] = self.allocations.last_blocks
+            self.counters["allocated bytes"] = self.allocations.last_size
+            self.counters["allocation peak bytes"] = self.allocations.last_peak
+        self.frame_times.append(elapsed)
+        self.last_counters = dict(self.counters)
+        self._frame_start = None
+
+    def count(self, name: str, value: int = 1) -> None:
+        """Add to a counter of the current frame.
+
+        Args:
+            name: Counter name.
+            value: Amount to add.
+        """
+        self.counters[name] += value
+
+    @property
+    def mean_frame_time(self) -> float:
+        """Return the mean frame time in seconds over the window."""
+        return sum(self.frame_times) / len(self.frame_times) if self.frame_times else 0.0
+
+    def summary(self) -> str:
+        """Return a multi-line report of the frame time, the last frame's counters and the allocation sites."""
+        lines = [f"frame  {self.mean_frame_time * 1000:.2f} ms"]
+        lines.extend(f"{name}  {value}" for name, value in sorted(self.last_counters.items()))
+        if self.allocations is not None:
+            lines.extend(
+                f"  {site.location}  {site.blocks:.1f} blocks  {site.size:.0f} B"
+                for site in self.allocations.top_sites()
+            )
+        return "\n".join(lines)
@@ -0,0 +1,171 @@
+"""Asynchronous pixel readback through double-buffered pixel buffer objects.
+
+``glReadPixels`` into client memory stalls until the GPU has finished the
+frame. Reading into a pixel buffer object instead returns immediately, and the
+buffer is mapped one or more frames later, when the copy has completed. On
+software renderers the copy is done by the CPU anyway, so a plain synchronous
+read into a preallocated array is used there.
+"""
+
+from __future__ import annotations
+
+import ctypes
+from collections import deque
+from typing import TYPE_CHECKING
+
+import numpy as np
+from OpenGL.GL import (  # type: ignore
+    GL_MAP_READ_BIT,
+    GL_PACK_ALIGNMENT,
+    GL_PIXEL_PACK_BUFFER,
+    GL_RENDERER,
+    GL_RGBA,
+    GL_STREAM_READ,
+    GL_UNSIGNED_BYTE,
+    glBindBuffer,
+    glBufferData,
+    glDeleteBuffers,
+    glGenBuffers,
+    glGetString,
+    glMapBufferRange,
+    glPixelStorei,
+    glReadPixels,
+    glUnmapBuffer,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+SOFTWARE_RENDERERS = ("llvmpipe", "softpipe", "swrast", "software")
+DEFAULT_BUFFER_COUNT = 2
+
+
+def is_software_renderer() -> bool:
+    """Return True if the current context is a software rasterizer."""
+    renderer = (glGetString(GL_RENDERER) or b"").decode(errors="replace").lower()
+    return any(name in renderer for name in SOFTWARE_RENDERERS)
+
+
+def as_rgb_image(pixels: np.ndarray) -> np.ndarray:
+    """Return a zero-copy top-down RGB view of bottom-up RGBA pixels.
+
+    Args:
+        pixels: Array of shape (height, width, 4) as read by OpenGL.
+    """
+    return pixels[::-1, :, :3]
+
+
+class PixelReadback:
+    """Reads the bound framebuffer with a latency of ``buffer_count - 1`` frames.
+
+    Arrays returned by ``read`` and ``flush`` are views of mapped buffer memory
+    (or of a reused array in CPU mode). They stay valid only until the next
+    call on this object; copy them if they must outlive it.
+    """
+
+    def __init__(
+        self, width: int, height: int, *, buffer_count: int = DEFAULT_BUFFER_COUNT, use_pbo: bool | None = None
+    ) -> None:
+        """Allocate the readback buffers in the current context.
+
+        Args:
+            width: Width of the framebuffer in pixels.
+            height: Height of the framebuffer in pixels.
+            buffer_count: Number of pixel buffer objects used round-robin.
+            use_pbo: Force PBO or CPU mode; by default PBOs are used unless the
+                context is a software renderer.
+        """
+        self.width = width
+        self.height = height
+        self.size = width * height * 4
+        self.use_pbo = not is_software_renderer() if use_pbo is None else use_pbo
+        self._pending: deque[int] = deque()
+        self._mapped: int | None = None
+        if self.use_pbo:
+            self._buffers = [int(b) for b in np.atleast_1d(glGenBuffers(buffer_count))]
+            for buffer in self._buffers:
+                glBindBuffer(GL_PIXEL_PACK_BUFFER, buffer)
+                glBufferData(GL_PIXEL_PACK_BUFFER, self.size, None, GL_STREAM_READ)
+            glBindBuffer(GL_PIXEL_PACK_BUFFER, 0)
+            self._next = 0
+        else:
+            self._buffers = []
+        self._pixels: np.ndarray | None = None
+
+    @property
+    def latency(self) -> int:
+        """Return by how many ``read`` calls the returned frames lag behind."""
+        return len(self._buffers) - 1 if self.use_pbo else 0
+
+    def read(self) -> np.ndarray | None:
+        """Queue a readback of the bound framebuffer.
+
+        Returns:
+            Bottom-up RGBA pixels of shape (height, width, 4) of the frame read
+            ``latency`` calls earlier, or None while the pipeline fills up.
+        """
+        if not self.use_pbo:
+            return self.read_now()
+
+        glPixelStorei(GL_PACK_ALIGNMENT, 4)
+        self._unmap()
+        buffer = self._buffers[self._next]
+        self._next = (self._next + 1) % len(self._buffers)
+        glBindBuffer(GL_PIXEL_PACK_BUFFER, buffer)
+        glReadPixels(0, 0, self.width, self.height, GL_RGBA, GL_UNSIGNED_BYTE, 0)
+        glBindBuffer(GL_PIXEL_PACK_BUFFER, 0)
+        self._pending.append(buffer)
+        if len(self._pending) < len(self._buffers):
+            return None
+        return self._map(self._pending.popleft())
+
+    def read_now(self) -> np.ndarray:
+        """Synchronously read the bound framebuffer into a reused client array.
+
+        Returns:
+            Bottom-up RGBA pixels of shape (height, width, 4).
+        """
+        if self._pixels is None:
+            self._pixels = np.empty((self.height, self.width, 4), dtype=np.uint8)
+        glPixelStorei(GL_PACK_ALIGNMENT, 4)
+        glReadPixels(0, 0, self.width, self.height, GL_RGBA, GL_UNSIGNED_BYTE, self._pixels)
+        return self._pixels
+
+    def flush(self) -> Iterator[np.ndarray]:
+        """Yield the frames still in flight, oldest first."""
+        while self._pending:
+            yield self._map(self._pending.popleft())
+        self._unmap()
+
+    def _map(self, buffer: int) -> np.ndarray:
+        """Map a buffer for reading and wrap it in a NumPy view.
+
+        Raises:
+            RuntimeError: If the buffer cannot be mapped.
+        """
+        self._unmap()
+        glBindBuffer(GL_PIXEL_PACK_BUFFER, buffer)
+        address = ctypes.cast(glMapBufferRange(GL_PIXEL_PACK_BUFFER, 0, self.size, GL_MAP_READ_BIT), ctypes.c_void_p)
+        glBindBuffer(GL_PIXEL_PACK_BUFFER, 0)
+        if not address.value:
+            msg = f"Pixel buffer {buffer} cannot be mapped for reading"
+            raise RuntimeError(msg)
+        self._mapped = buffer
+        data = (ctypes.c_ubyte * self.size).from_address(address.value)
+        return np.ctypeslib.as_array(data).reshape(self.height, self.width, 4)
+
+    def _unmap(self) -> None:
+        """Unmap the currently mapped buffer, invalidating views of it."""
+        if self._mapped is not None:
+            glBindBuffer(GL_PIXEL_PACK_BUFFER, self._mapped)
+            glUnmapBuffer(GL_PIXEL_PACK_BUFFER)
+            glBindBuffer(GL_PIXEL_PACK_BUFFER, 0)
+            self._mapped = None
+
+    def delete(self) -> None:
+        """Free the OpenGL buffers."""
+        self._unmap()
+        self._pending.clear()
+        if self._buffers:
+            glDeleteBuffers(len(self._buffers), self._buffers)
+            self._buffers = []
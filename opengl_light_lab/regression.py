@@ -0,0 +1,374 @@
+"""Golden-image regression testing of the scene lighting.
+
+Canonical AppState presets are rendered offscreen and compared against golden
+PNG files with vectorized NumPy metrics. Presets are rendered in parallel by
+worker processes, each holding its own offscreen context.
+
+With ``--allocations``, the presets are drawn unchanged for a number of
+frames instead, and the peak memory each frame allocates, including what it
+frees before it ends, is checked against ALLOCATION_BUDGET: drawing an
+unchanged scene should allocate next to nothing. Frames in which the objects
+or the camera move do allocate, as NumPy recomputes the bounds, the culling
+and the shadow maps.
+"""
+
+from __future__ import annotations
+
+import argparse
+import dataclasses
+import functools
+import multiprocessing as mp
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import numpy as np
+from OpenGL.GL import GL_LINEAR_ATTENUATION  # type: ignore
+from PIL import Image
+
+from opengl_light_lab.app_state import AppState, LightType, Projection, Spherical
+from opengl_light_lab.offscreen import OffscreenRenderer
+from opengl_light_lab.profiler import FrameProfiler
+from opengl_light_lab.render_cache import DEFAULT_CACHE_DIR, ImageCache
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+GOLDEN_DIR = Path(__file__).parent.parent / "golden"
+IMAGE_SIZE = (256, 192)
+SSIM_WINDOW = 7
+SSIM_C1 = (0.01 * 255) ** 2
+SSIM_C2 = (0.03 * 255) ** 2
+TEXTURES_DIR = Path(__file__).parent.parent / "textures"
+ALLOCATION_FRAMES = 60
+"""Frames traced per preset by the allocation check."""
+ALLOCATION_WARMUP_FRAMES = 3
+"""Untraced frames drawn first, which load the textures, meshes and shader programs and fill the caches."""
+ALLOCATION_BUDGET = 1024
+"""Peak bytes a frame of an unchanged scene may allocate: the ctypes arguments of the OpenGL calls in progress.
+
+ctypes creates an object of about 50 bytes per argument, so the blit of the
+ten arguments restoring a frame of the GUI frame cache alone takes 500.
+"""
+
+
+def _base_state() -> AppState:
+    """Return the state shared by all presets: static objects and no overlay."""
+    return AppState(rotation_angle=30.0, auto_rotate=False, show_help=False)
+
+
+PRESETS: dict[str, Callable[[], AppState]] = {
+    "point_default": _base_state,
+    "point_linear_attenuation": lambda: dataclasses.replace(
+        _base_state(), light_attenuation_mode=GL_LINEAR_ATTENUATION, light_attenuation_value=0.5
+    ),
+    "point_colored": lambda: dataclasses.replace(
+        _base_state(), light_diffuse=(1.0, 0.6, 0.2), light_ambient=(0.05, 0.05, 0.2), light_specular=(0.2, 0.2, 1.0)
+    ),
+    "directional": lambda: dataclasses.replace(_base_state(), light_type=LightType.DIRECTIONAL),
+    "directional_one_sided": lambda: dataclasses.replace(
+        _base_state(), light_type=LightType.DIRECTIONAL, light_model_two_side=False, light_model_local_viewer=False
+    ),
+    "orthogonal_top": lambda: dataclasses.replace(
+        _base_state(),
+        camera=Spherical(5.0, 1.2, 0.8),
+        camera_projection=Projection.ORTHOGONAL,
+        camera_ortho_half_height=2.0,
+    ),
+    "unlit_with_axis": lambda: dataclasses.replace(_base_state(), lighting_enabled=False, show_axis=True),
+    "quad_view": lambda: dataclasses.replace(_base_state(), quad_view=True, show_axis=True),
+    "point_shadows": lambda: dataclasses.replace(_base_state(), shadows_enabled=True),
+    "directional_shadows": lambda: dataclasses.replace(
+        _base_state(), light_type=LightType.DIRECTIONAL, light_direction=(0.3, 1.0, 0.2), shadows_enabled=True
+    ),
+    "textured_cube": lambda: dataclasses.replace(
+        _base_state(), current_texture=str(TEXTURES_DIR / "Wood026_1K-JPG_Color.jpg")
+    ),
+    "uv_grid_cube": lambda: dataclasses.replace(_base_state(), current_texture="proc://uv_grid?size=256"),
+}
+"""Canonical scenes covering the light types, light model, shadows, materials, textures and the quad view."""
+
+
+@dataclass
+class Thresholds:
+    """Pass criteria of an image comparison.
+
+    Attributes:
+        channel_tolerance: Per-channel difference ignored entirely.
+        max_mismatch_fraction: Max fraction of pixels exceeding the tolerance.
+        min_ssim: Min mean structural similarity.
+    """
+
+    channel_tolerance: int = 8
+    max_mismatch_fraction: float = 0.002
+    min_ssim: float = 0.98
+
+
+@dataclass
+class ImageDiff:
+    """Result of comparing a rendered image with its golden image.
+
+    Attributes:
+        max_delta: Largest per-channel difference.
+        mean_delta: Mean per-channel difference.
+        mismatch_fraction: Fraction of pixels with any channel beyond the tolerance.
+        ssim: Mean structural similarity of the luminance.
+        heatmap: Per-pixel max-channel difference, shape (height, width).
+    """
+
+    max_delta: int
+    mean_delta: float
+    mismatch_fraction: float
+    ssim: float
+    heatmap: np.ndarray
+
+    def passed(self, thresholds: Thresholds) -> bool:
+        """Return True if the difference is within the thresholds."""
+        return self.mismatch_fraction <= thresholds.max_mismatch_fraction and self.ssim >= thresholds.min_ssim
+
+
+def _box_mean(image: np.ndarray, size: int) -> np.ndarray:
+    """Mean over all size x size windows, computed with an integral image."""
+    integral = np.pad(image, ((1, 0), (1, 0))).cumsum(axis=0).cumsum(axis=1)
+    window_sum = integral[size:, size:] - integral[:-size, size:] - integral[size:, :-size] + integral[:-size, :-size]
+    return window_sum / (size * size)
+
+
+def structural_similarity(a: np.ndarray, b: np.ndarray, window: int = SSIM_WINDOW) -> float:
+    """Compute the mean SSIM of two grayscale images with a box window.
+
+    Args:
+        a: First image, float array of shape (height, width) in [0, 255].
+        b: Second image of the same shape.
+        window: Edge of the square window of the local statistics.
+    """
+    mu_a, mu_b = _box_mean(a, window), _box_mean(b, window)
+    var_a = _box_mean(a * a, window) - mu_a * mu_a
+    var_b = _box_mean(b * b, window) - mu_b * mu_b
+    cov = _box_mean(a * b, window) - mu_a * mu_b
+    ssim_map = ((2 * mu_a * mu_b + SSIM_C1) * (2 * cov + SSIM_C2)) / (
+        (mu_a * mu_a + mu_b * mu_b + SSIM_C1) * (var_a + var_b + SSIM_C2)
+    )
+    return float(ssim_map.mean())
+
+
+def compare_images(actual: np.ndarray, expected: np.ndarray, channel_tolerance: int) -> ImageDiff:
+    """Compare two RGB images.
+
+    Args:
+        actual: Rendered image of shape (height, width, 3).
+        expected: Golden image of the same shape.
+        channel_tolerance: Per-channel difference not counted as a mismatch.
+
+    Raises:
+        ValueError: If the image shapes differ.
+    """
+    if actual.shape != expected.shape:
+        msg = f"Image shape {actual.shape} differs from the golden image shape {expected.shape}"
+        raise ValueError(msg)
+    delta = np.abs(actual.astype(np.int16) - expected.astype(np.int16))
+    heatmap = delta.max(axis=2).astype(np.uint8)
+    luma = np.array([0.299, 0.587, 0.114])
+    return ImageDiff(
+        max_delta=int(heatmap.max()),
+        mean_delta=float(delta.mean()),
+        mismatch_fraction=float((heatmap > channel_tolerance).mean()),
+        ssim=structural_similarity(actual @ luma, expected @ luma),
+        heatmap=heatmap,
+    )
+
+
+@functools.cache
+def _worker_renderer(cache_dir: Path | None) -> OffscreenRenderer:
+    """Return the offscreen renderer of the current worker process."""
+    return OffscreenRenderer(AppState(), None if cache_dir is None else ImageCache(cache_dir))
+
+
+def _load_preset(name: str, cache_dir: Path | None) -> OffscreenRenderer:
+    """Set the state of a preset on the renderer of the worker process and return the renderer."""
+    renderer = _worker_renderer(cache_dir)
+    state = PRESETS[name]()
+    for f in dataclasses.fields(AppState):
+        setattr(renderer.app_state, f.name, getattr(state, f.name))
+    # Detail levels must not depend on the previously rendered preset
+    renderer.scene.lod.reset()
+    return renderer
+
+
+def _render_preset(name: str, cache_dir: Path | None) -> np.ndarray:
+    """Render a preset in a worker process."""
+    return _load_preset(name, cache_dir).render(*IMAGE_SIZE)
+
+
+def allocation_peak(draw: Callable[[], object], frames: int = ALLOCATION_FRAMES) -> int:
+    """Return the most memory a frame of an unchanged scene allocated at once, in bytes.
+
+    The peak of the traced memory above its level at the frame start also
+    counts the memory freed within the frame, which a comparison of the
+    memory before and after the frame misses.
+
+    Args:
+        draw: Function drawing a frame, such as OffscreenRenderer.draw or GLWidget.paintGL.
+        frames: Number of frames traced after ALLOCATION_WARMUP_FRAMES.
+    """
+    for _ in range(ALLOCATION_WARMUP_FRAMES):
+        draw()
+    profiler = FrameProfiler(frames)
+    profiler.trace_allocations(True)
+    peak = 0
+    try:
+        for _ in range(frames):
+            profiler.begin_frame()
+            draw()
+            profiler.end_frame()
+            peak = max(peak, profiler.last_counters["allocation peak bytes"])
+    finally:
+        profiler.trace_allocations(False)
+    return peak
+
+
+def _measure_allocations(name: str, frames: int) -> int:
+    """Return the allocation peak of the frames of a preset in a worker process."""
+    renderer = _load_preset(name, None)
+    return allocation_peak(lambda: renderer.draw(*IMAGE_SIZE), frames)
+
+
+def measure_allocations(names: list[str], frames: int = ALLOCATION_FRAMES, jobs: int | None = None) -> dict[str, int]:
+    """Measure the memory the drawing of unchanged presets allocates per frame, in parallel worker processes.
+
+    Args:
+        names: Names of the presets to draw.
+        frames: Number of frames traced per preset.
+        jobs: Number of worker processes; defaults to the CPU count.
+
+    Returns:
+        Mapping of preset name to the largest allocation peak of its frames in bytes, see allocation_peak.
+    """
+    with ProcessPoolExecutor(max_workers=jobs, mp_context=mp.get_context("spawn")) as pool:
+        sizes = pool.map(_measure_allocations, names, [frames] * len(names))
+        return dict(zip(names, sizes, strict=True))
+
+
+def render_presets(names: list[str], jobs: int | None = None, cache_dir: Path | None = None) -> dict[str, np.ndarray]:
+    """Render presets in parallel worker processes.
+
+    Args:
+        names: Names of the presets to render.
+        jobs: Number of worker processes; defaults to the CPU count.
+        cache_dir: Directory of an ImageCache reused across runs, or None to always render.
+    """
+    with ProcessPoolExecutor(max_workers=jobs, mp_context=mp.get_context("spawn")) as pool:
+        images = pool.map(_render_preset, names, [cache_dir] * len(names))
+        return dict(zip(names, images, strict=True))
+
+
+def run(
+    names: list[str],
+    *,
+    golden_dir: Path = GOLDEN_DIR,
+    thresholds: Thresholds | None = None,
+    jobs: int | None = None,
+    cache_dir: Path | None = None,
+) -> dict[str, ImageDiff | None]:
+    """Render presets and compare them with their golden images.
+
+    Heatmaps of failed comparisons are written next to the golden images as
+    ``<name>.diff.png``.
+
+    Args:
+        names: Names of the presets to check.
+        golden_dir: Directory of the golden PNG files.
+        thresholds: Pass criteria; defaults to Thresholds().
+        jobs: Number of worker processes.
+        cache_dir: Directory of an ImageCache reused across runs, or None to always render.
+
+    Returns:
+        Mapping of preset name to the comparison, or None if the golden image is missing.
+    """
+    thresholds = thresholds or Thresholds()
+    results: dict[str, ImageDiff | None] = {}
+    for name, image in render_presets(names, jobs, cache_dir).items():
+        golden_path = golden_dir / f"{name}.png"
+        if not golden_path.exists():
+            results[name] = None
+            continue
+        diff = compare_images(image, np.asarray(Image.open(golden_path).convert("RGB")), thresholds.channel_tolerance)
+        if not diff.passed(thresholds):
+            Image.fromarray(diff.heatmap).save(golden_dir / f"{name}.diff.png")
+        results[name] = diff
+    return results
+
+
+def update_golden(
+    names: list[str], *, golden_dir: Path = GOLDEN_DIR, jobs: int | None = None, cache_dir: Path | None = None
+) -> None:
+    """Render presets and store them as the new golden images.
+
+    Args:
+        names: Names of the presets to render.
+        golden_dir: Directory of the golden PNG files.
+        jobs: Number of worker processes.
+        cache_dir: Directory of an ImageCache reused across runs, or None to always render.
+    """
+    golden_dir.mkdir(parents=True, exist_ok=True)
+    for name, image in render_presets(names, jobs, cache_dir).items():
+        Image.fromarray(image).save(golden_dir / f"{name}.png")
+
+
+def main() -> None:
+    """Check (or update) the golden images of the selected presets."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("presets", nargs="*", default=list(PRESETS), help="presets to check (default: all)")
+    parser.add_argument("--update", action="store_true", help="overwrite the golden images")
+    parser.add_argument("--golden-dir", type=Path, default=GOLDEN_DIR)
+    parser.add_argument("--jobs", type=int, default=None)
+    parser.add_argument(
+        "--allocations",
+        action="store_true",
+        help=f"check the peak bytes allocated per drawn frame against the budget of {ALLOCATION_BUDGET} instead",
+    )
+    parser.add_argument(
+        "--cache",
+        type=Path,
+        nargs="?",
+        const=DEFAULT_CACHE_DIR,
+        default=None,
+        metavar="DIR",
+        help=f"reuse images rendered by the same code and driver (default directory: {DEFAULT_CACHE_DIR})",
+    )
+    args = parser.parse_args()
+
+    unknown = set(args.presets) - PRESETS.keys()
+    if unknown:
+        parser.error(f"unknown presets: {', '.join(sorted(unknown))}")
+    if args.allocations:
+        sizes = measure_allocations(args.presets, jobs=args.jobs)
+        for name, size in sizes.items():
+            status = "ok" if size <= ALLOCATION_BUDGET else "FAIL"
+            print(f"{status:7} {name}: peak of {size} bytes allocated per frame")
+        sys.exit(0 if all(size <= ALLOCATION_BUDGET for size in sizes.values()) else 1)
+    if args.update:
+        update_golden(args.presets, golden_dir=args.golden_dir, jobs=args.jobs, cache_dir=args.cache)
+        return
+
+    thresholds = Thresholds()
+    failed = False
+    results = run(args.presets, golden_dir=args.golden_dir, thresholds=thresholds, jobs=args.jobs, cache_dir=args.cache)
+    for name, diff in results.items():
+        if diff is None:
+            print(f"MISSING {name}")
+            failed = True
+            continue
+        status = "ok" if diff.passed(thresholds) else "FAIL"
+        failed |= status == "FAIL"
+        print(
+            f"{status:7} {name}: max delta {diff.max_delta}, mismatched {diff.mismatch_fraction:.4%}, "
+            f"SSIM {diff.ssim:.4f}"
+        )
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
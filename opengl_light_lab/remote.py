@@ -0,0 +1,514 @@
+"""Remote control of a running lab over a local socket.
+
+The server speaks JSON-RPC 2.0 with one JSON object per line, over TCP bound
+to localhost or over a Unix domain socket. Methods:
+
+``get``
+    ``{"paths": ["camera.theta", ...]}`` returns the values of AppState
+    fields, including changes still waiting for the next frame. Without
+    paths the whole last rendered state is returned.
+``patch``
+    ``{"changes": {"camera.theta": 0.5, ...}}`` queues field changes. They
+    go through the UpdateCoalescer like control panel edits, so any number of
+    patches received between two frames is applied once, before the next
+    frame, and is undoable.
+``frame``
+    ``{"format": "png" | "rgb"}`` returns the first frame rendered after
+    all previously received patches, base64-encoded.
+``stats``
+    Returns the mean frame time and the counters of the frame profiler.
+``subscribe`` / ``unsubscribe``
+    ``{"every": n}`` starts ``stats`` notifications every n frames on the
+    connection.
+
+Networking runs on an asyncio event loop in a separate thread, so slow or
+chatty clients never block the GUI thread. Requests are handed to the GUI
+thread through a queue; a byte written to a socket pair watched by a
+QSocketNotifier wakes the Qt event loop once however many requests arrived,
+and the replies are handed back in one batch per wake-up. PNG encoding
+happens in a worker thread.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import contextlib
+import io
+import itertools
+import json
+import queue
+import socket
+import threading
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+import numpy as np
+from PIL import Image
+from PySide6 import QtCore
+
+from opengl_light_lab.app_state import parse_field, state_to_dict, value_to_json
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from pathlib import Path
+
+    from opengl_light_lab.gl_widget import GLWidget
+    from opengl_light_lab.update_coalescer import UpdateCoalescer
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+MAX_LINE = 1 << 20
+"""Longest accepted request line in bytes."""
+MAX_BACKLOG = 1 << 20
+"""Unsent bytes on a connection above which stats notifications are dropped."""
+
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+FRAME_FORMATS = ("png", "rgb")
+_DEFERRED = object()
+"""Result of a method whose response is sent later."""
+
+
+class RemoteError(Exception):
+    """Error returned by the server for a request.
+
+    Attributes:
+        code: JSON-RPC error code.
+    """
+
+    def __init__(self, code: int, message: str) -> None:
+        """Initialize the error.
+
+        Args:
+            code: JSON-RPC error code.
+            message: Description of the error.
+        """
+        super().__init__(message)
+        self.code = code
+
+
+@dataclass(eq=False)
+class _Connection:
+    """A client connection, owned by the event loop thread."""
+
+    writer: asyncio.StreamWriter
+    stats_every: int = 0
+    closed: bool = False
+
+    def send(self, message: dict[str, object]) -> None:
+        """Write a message unless the connection was closed."""
+        if not self.closed:
+            self.writer.write(json.dumps(message, separators=(",", ":")).encode() + b"\n")
+
+    @property
+    def backlog(self) -> int:
+        """Return the number of bytes waiting to be sent."""
+        return self.writer.transport.get_write_buffer_size()
+
+
+@dataclass
+class _FrameRequest:
+    """A frame request waiting for a frame rendered after a given paint."""
+
+    connection: _Connection
+    id: object
+    format: str
+    first_paint: int
+
+
+def _reply(request_id: object, result: object) -> dict[str, object]:
+    """Return a JSON-RPC success response."""
+    return {"jsonrpc": "2.0", "id": request_id, "result": result}
+
+
+def _error(request_id: object, code: int, message: str) -> dict[str, object]:
+    """Return a JSON-RPC error response."""
+    return {"jsonrpc": "2.0", "id": request_id, "error": {"code": code, "message": message}}
+
+
+def _encode_frame(image: np.ndarray, fmt: str) -> dict[str, object]:
+    """Return the result of a frame request for a top-down RGB image."""
+    if fmt == "png":
+        buffer = io.BytesIO()
+        Image.fromarray(image).save(buffer, format="PNG", compress_level=1)
+        data = buffer.getvalue()
+    else:
+        data = image.tobytes()
+    height, width = image.shape[:2]
+    return {"width": width, "height": height, "format": fmt, "data": base64.b64encode(data).decode("ascii")}
+
+
+class RemoteServer:
+    """JSON-RPC server controlling the AppState shown by a GLWidget.
+
+    Create, start and stop the server on the GUI thread.
+
+    Attributes:
+        requests: Number of requests handled on the GUI thread.
+    """
+
+    def __init__(
+        self,
+        gl: GLWidget,
+        updates: UpdateCoalescer,
+        *,
+        host: str = DEFAULT_HOST,
+        port: int = DEFAULT_PORT,
+        path: Path | None = None,
+    ) -> None:
+        """Initialize the server; it listens after start.
+
+        Args:
+            gl: The view rendering the controlled AppState.
+            updates: Coalescer receiving the patches, flushed by the view before each frame.
+            host: Interface to bind the TCP socket to.
+            port: TCP port, or 0 for any free port.
+            path: Unix socket path to listen on instead of TCP.
+        """
+        self.gl = gl
+        self.updates = updates
+        self.host, self.port, self.path = host, port, path
+        self.requests = 0
+        self._methods: dict[str, Callable[[_Connection, object, dict], object]] = {
+            "get": self._get,
+            "patch": self._patch,
+            "frame": self._frame,
+            "stats": self._stats,
+            "subscribe": self._subscribe,
+            "unsubscribe": self._unsubscribe,
+        }
+        self._inbox: queue.SimpleQueue[tuple[_Connection, dict]] = queue.SimpleQueue()
+        self._wake_pending = threading.Event()
+        self._wake_reader, self._wake_writer = socket.socketpair()
+        self._wake_reader.setblocking(False)
+        self._wake_writer.setblocking(False)
+        self._notifier = QtCore.QSocketNotifier(self._wake_reader.fileno(), QtCore.QSocketNotifier.Type.Read)
+        self._notifier.setEnabled(False)
+        self._notifier.activated.connect(self._process)
+        self._subscribers: set[_Connection] = set()
+        self._frame_requests: list[_FrameRequest] = []
+        self._paints = 0
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self._stopped: asyncio.Event | None = None
+        self._connections: set[_Connection] = set()
+        gl.add_paint_listener(self._on_paint)
+
+    @property
+    def address(self) -> str:
+        """Return the address the server listens on, for messages."""
+        return str(self.path) if self.path is not None else f"{self.host}:{self.port}"
+
+    def start(self) -> None:
+        """Start listening on the event loop thread; raises OSError if the socket cannot be bound."""
+        ready = threading.Event()
+        failure: list[BaseException] = []
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, args=(ready, failure), name="remote-control", daemon=True)
+        self._thread.start()
+        ready.wait()
+        if failure:
+            self._thread.join()
+            self._loop = self._thread = None
+            raise failure[0]
+        self._notifier.setEnabled(True)
+
+    def stop(self) -> None:
+        """Close all connections and stop the event loop thread."""
+        if self._loop is None or self._thread is None:
+            return
+        with contextlib.suppress(RuntimeError):
+            self._loop.call_soon_threadsafe(self._stopped.set)  # type: ignore[union-attr]
+        self._thread.join()
+        self._loop = self._thread = None
+        # A stopped server must not be woken up once its wake-up socket is closed and its descriptor reused
+        self._notifier.setEnabled(False)
+        self._subscribers.clear()
+        self._frame_requests.clear()
+        self._update_frame_listener()
+
+    def _run(self, ready: threading.Event, failure: list[BaseException]) -> None:
+        """Run the event loop thread until stop is called."""
+        loop = self._loop
+        asyncio.set_event_loop(loop)
+        try:
+            loop.run_until_complete(self._serve(ready))  # type: ignore[union-attr]
+        except OSError as e:
+            failure.append(e)
+            ready.set()
+        finally:
+            loop.close()  # type: ignore[union-attr]
+
+    async def _serve(self, ready: threading.Event) -> None:
+        """Accept connections until stopped."""
+        self._stopped = asyncio.Event()
+        if self.path is not None:
+            server = await asyncio.start_unix_server(self._handle, path=self.path, limit=MAX_LINE)
+        else:
+            server = await asyncio.start_server(self._handle, self.host, self.port, limit=MAX_LINE)
+            self.port = server.sockets[0].getsockname()[1]
+        ready.set()
+        async with server:
+            await self._stopped.wait()
+            server.close()
+            for connection in self._connections:
+                connection.writer.close()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Read the requests of a connection and queue them for the GUI thread."""
+        connection = _Connection(writer)
+        self._connections.add(connection)
+        try:
+            # Over-long lines raise ValueError
+            with contextlib.suppress(ConnectionError, ValueError):
+                while line := await reader.readline():
+                    try:
+                        request = json.loads(line)
+                    except ValueError as e:
+                        connection.send(_error(None, PARSE_ERROR, f"Parse error: {e}"))
+                        continue
+                    if not isinstance(request, dict) or not isinstance(request.get("method"), str):
+                        connection.send(_error(None, INVALID_REQUEST, "Invalid request"))
+                        continue
+                    self._inbox.put((connection, request))
+                    if not self._wake_pending.is_set():
+                        self._wake_pending.set()
+                        with contextlib.suppress(BlockingIOError):
+                            self._wake_writer.send(b"\0")
+        finally:
+            connection.closed = True
+            self._connections.discard(connection)
+            writer.close()
+
+    def _send(self, messages: list[tuple[_Connection, dict[str, object]]]) -> None:
+        """Hand messages to the event loop thread for sending."""
+        if messages and self._loop is not None:
+            with contextlib.suppress(RuntimeError):
+                self._loop.call_soon_threadsafe(self._write_all, messages)
+
+    @staticmethod
+    def _write_all(messages: list[tuple[_Connection, dict[str, object]]]) -> None:
+        """Write messages to their connections; runs on the event loop thread."""
+        for connection, message in messages:
+            connection.send(message)
+
+    def _process(self) -> None:
+        """Handle all queued requests on the GUI thread."""
+        self._wake_pending.clear()
+        with contextlib.suppress(BlockingIOError):
+            while self._wake_reader.recv(4096):
+                pass
+        outbox: list[tuple[_Connection, dict[str, object]]] = []
+        while True:
+            try:
+                connection, request = self._inbox.get_nowait()
+            except queue.Empty:
+                break
+            self.requests += 1
+            request_id = request.get("id")
+            try:
+                result = self._call(connection, request)
+            except RemoteError as e:
+                result, response = None, _error(request_id, e.code, str(e))
+            else:
+                response = _reply(request_id, result)
+            # Requests without an ID are notifications and get no response
+            if "id" in request and result is not _DEFERRED:
+                outbox.append((connection, response))
+        self._send(outbox)
+
+    def _call(self, connection: _Connection, request: dict) -> object:
+        """Run the method of a request and return its result.
+
+        Raises:
+            RemoteError: If the method does not exist or its parameters are invalid.
+        """
+        method = self._methods.get(request["method"])
+        if method is None:
+            raise RemoteError(METHOD_NOT_FOUND, f"Method not found: {request['method']}")
+        params = request.get("params", {})
+        if not isinstance(params, dict):
+            raise RemoteError(INVALID_PARAMS, "Params must be an object")
+        return method(connection, request.get("id"), params)
+
+    def _get(self, _connection: _Connection, _request_id: object, params: dict) -> object:
+        """Return AppState field values."""
+        paths = params.get("paths")
+        if paths is None:
+            return state_to_dict(self.gl.app_state)
+        if not isinstance(paths, list):
+            raise RemoteError(INVALID_PARAMS, "paths must be a list")
+        try:
+            return {path: value_to_json(self.updates.get(path)) for path in paths}
+        except (AttributeError, TypeError) as e:
+            raise RemoteError(INVALID_PARAMS, f"Unknown field: {e}") from e
+
+    def _patch(self, _connection: _Connection, _request_id: object, params: dict) -> object:
+        """Queue AppState changes for the next frame; all or none are applied."""
+        changes = params.get("changes")
+        if not isinstance(changes, dict):
+            raise RemoteError(INVALID_PARAMS, "changes must be an object")
+        try:
+            parsed = {path: parse_field(path, data) for path, data in changes.items()}
+        except KeyError as e:
+            raise RemoteError(INVALID_PARAMS, f"Unknown field: {e}") from e
+        except (TypeError, ValueError) as e:
+            raise RemoteError(INVALID_PARAMS, str(e)) from e
+        for path, value in parsed.items():
+            self.updates.set(path, value, group="remote")
+        return {"queued": len(parsed)}
+
+    def _frame(self, connection: _Connection, request_id: object, params: dict) -> object:
+        """Register a request for the next rendered frame."""
+        fmt = params.get("format", "png")
+        if fmt not in FRAME_FORMATS:
+            raise RemoteError(INVALID_PARAMS, f"format must be one of {', '.join(FRAME_FORMATS)}")
+        # Patches received so far are flushed at the start of the next paint
+        self._frame_requests.append(_FrameRequest(connection, request_id, fmt, self._paints))
+        self._update_frame_listener()
+        return _DEFERRED
+
+    def _stats(self, _connection: _Connection, _request_id: object, _params: dict) -> object:
+        """Return the frame profiler statistics."""
+        return self._stats_params()
+
+    def _subscribe(self, connection: _Connection, _request_id: object, params: dict) -> object:
+        """Start stats notifications on the connection."""
+        every = params.get("every", 1)
+        if not isinstance(every, int) or isinstance(every, bool) or every < 1:
+            raise RemoteError(INVALID_PARAMS, "every must be a positive integer")
+        connection.stats_every = every
+        self._subscribers.add(connection)
+        return {"every": every}
+
+    def _unsubscribe(self, connection: _Connection, _request_id: object, _params: dict) -> object:
+        """Stop stats notifications on the connection."""
+        self._subscribers.discard(connection)
+        return {"every": 0}
+
+    def _stats_params(self) -> dict[str, object]:
+        """Return the current profiler statistics as JSON-compatible data."""
+        profiler = self.gl.profiler
+        return {
+            "frame": self._paints,
+            "frame_ms": profiler.mean_frame_time * 1000,
+            "counters": dict(profiler.last_counters),
+        }
+
+    def _update_frame_listener(self) -> None:
+        """Receive frames from the view only while frame requests are waiting."""
+        self._frame_requests = [request for request in self._frame_requests if not request.connection.closed]
+        with contextlib.suppress(ValueError):
+            self.gl.remove_frame_listener(self._on_frame)
+        if self._frame_requests:
+            self.gl.add_frame_listener(self._on_frame)
+
+    def _on_frame(self, frame: np.ndarray) -> None:
+        """Answer the frame requests satisfied by a frame read back during the current paint."""
+        # Frames are read back one paint late: this one was rendered by the previous paint
+        rendered = self._paints - 1
+        ready = [request for request in self._frame_requests if request.first_paint <= rendered]
+        if not ready:
+            return
+        self._frame_requests = [request for request in self._frame_requests if request.first_paint > rendered]
+        image = np.array(frame)
+        if self._loop is not None:
+            with contextlib.suppress(RuntimeError):
+                self._loop.call_soon_threadsafe(self._loop.create_task, self._answer_frames(ready, image))
+        self._update_frame_listener()
+
+    async def _answer_frames(self, requests: list[_FrameRequest], image: np.ndarray) -> None:
+        """Encode a frame once per requested format and send it; runs on the event loop thread."""
+        loop = asyncio.get_running_loop()
+        results: dict[str, dict[str, object]] = {}
+        for request in requests:
+            if request.format not in results:
+                results[request.format] = await loop.run_in_executor(None, _encode_frame, image, request.format)
+            request.connection.send(_reply(request.id, results[request.format]))
+
+    def _on_paint(self) -> None:
+        """Count paints and send stats notifications to the subscribers."""
+        self._paints += 1
+        due = [
+            connection
+            for connection in self._subscribers
+            if self._paints % connection.stats_every == 0 and connection.backlog < MAX_BACKLOG
+        ]
+        self._subscribers = {connection for connection in self._subscribers if not connection.closed}
+        if due:
+            notification = {"jsonrpc": "2.0", "method": "stats", "params": self._stats_params()}
+            self._send([(connection, notification) for connection in due if not connection.closed])
+
+
+class RemoteClient:
+    """Blocking client of a RemoteServer, for scripts and tests.
+
+    Attributes:
+        notifications: Notifications received while waiting for responses, oldest first.
+    """
+
+    def __init__(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, *, path: Path | None = None) -> None:
+        """Connect to a server.
+
+        Args:
+            host: Host of the TCP server.
+            port: Port of the TCP server.
+            path: Unix socket path to connect to instead of TCP.
+        """
+        if path is not None:
+            self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._socket.connect(str(path))
+        else:
+            self._socket = socket.create_connection((host, port))
+        self._file = self._socket.makefile("rb")
+        self._ids = itertools.count(1)
+        self.notifications: list[dict[str, object]] = []
+
+    def call(self, method: str, **params: object) -> object:
+        """Call a method and wait for its result.
+
+        Args:
+            method: Method name.
+            **params: Method parameters.
+
+        Raises:
+            RemoteError: If the server returned an error.
+        """
+        request_id = next(self._ids)
+        message = {"jsonrpc": "2.0", "id": request_id, "method": method, "params": params}
+        self._socket.sendall(json.dumps(message).encode() + b"\n")
+        while True:
+            response = self.receive()
+            if response.get("id") == request_id:
+                break
+            self.notifications.append(response)
+        if "error" in response:
+            error = response["error"]
+            raise RemoteError(error["code"], error["message"])  # type: ignore[index]
+        return response["result"]
+
+    def receive(self) -> dict[str, object]:
+        """Wait for the next message from the server.
+
+        Raises:
+            ConnectionError: If the server closed the connection.
+        """
+        line = self._file.readline()
+        if not line:
+            msg = "Connection closed by the server"
+            raise ConnectionError(msg)
+        return json.loads(line)
+
+    def frame(self) -> np.ndarray:
+        """Return the next frame rendered after all previous patches, as a top-down RGB array."""
+        result = self.call("frame", format="rgb")
+        data = base64.b64decode(result["data"])  # type: ignore[index]
+        return np.frombuffer(data, dtype=np.uint8).reshape(result["height"], result["width"], 3)  # type: ignore[index]
+
+    def close(self) -> None:
+        """Close the connection."""
+        self._file.close()
+        self._socket.close()
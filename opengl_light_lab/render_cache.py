@@ -0,0 +1,252 @@
+"""Content-addressed on-disk cache of rendered images.
+
+Images are stored under a key hashing everything the picture depends on: the
+canonical form of the AppState, the image size and view window, the OpenGL
+renderer and the source code of this package. Rendering the same scene twice,
+in the same or another process, reads the image back instead of drawing it.
+
+The canonical form of a state leaves out the fields that are not drawn, such
+as the overlays, quantizes floats to a multiple of an epsilon, so that values
+differing only by rounding noise share a key, and identifies the texture and
+mesh files by a hash of their content rather than their path
+(procedural textures by their canonical URI). The cache is bounded in size and
+evicts the least recently used images first.
+"""
+
+from __future__ import annotations
+
+import functools
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import numpy as np
+from PIL import Image
+
+from opengl_light_lab.app_state import UNRENDERED_FIELDS, state_to_dict
+from opengl_light_lab.procedural_textures import canonical_uri, is_procedural
+
+if TYPE_CHECKING:
+    from opengl_light_lab.app_state import AppState
+
+DEFAULT_EPSILON = 1e-6
+"""Resolution of the float quantization of the state hash."""
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+DEFAULT_CACHE_DIR = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "opengl-light-lab" / "renders"
+EVICTION_TARGET = 0.9
+"""Fraction of the size limit the cache is trimmed to once the limit is exceeded."""
+KEY_LENGTH = 32
+
+_file_digests: dict[tuple[str, int, int], str] = {}
+
+
+def file_digest(path: str) -> str | None:
+    """Return the SHA-256 hash of a file's content, or None if it cannot be read.
+
+    Hashes are remembered per path, modification time and size, so a file is
+    read again only after it changes.
+
+    Args:
+        path: Path of the file.
+    """
+    try:
+        stat = Path(path).stat()
+        signature = (path, stat.st_mtime_ns, stat.st_size)
+        if signature not in _file_digests:
+            with Path(path).open("rb") as file:
+                _file_digests[signature] = hashlib.file_digest(file, "sha256").hexdigest()
+    except OSError:
+        return None
+    return _file_digests[signature]
+
+
+def _quantize(value: object, epsilon: float) -> object:
+    """Replace floats of JSON-compatible data with integer multiples of epsilon."""
+    if isinstance(value, float):
+        return round(value / epsilon)
+    if isinstance(value, list):
+        return [_quantize(v, epsilon) for v in value]
+    if isinstance(value, dict):
+        return {k: _quantize(v, epsilon) for k, v in value.items()}
+    return value
+
+
+def canonical_state(state: AppState, epsilon: float = DEFAULT_EPSILON) -> dict[str, object]:
+    """Return JSON-compatible data identifying the scene a state describes.
+
+    Args:
+        state: The application state.
+        epsilon: Floats are rounded to the nearest multiple of this value.
+    """
+    data = {
+        name: _quantize(value, epsilon) for name, value in state_to_dict(state).items() if name not in UNRENDERED_FIELDS
+    }
+    texture = state.current_texture
+    if texture is not None and is_procedural(texture):
+        try:
+            data["current_texture"] = canonical_uri(texture)
+        except ValueError:
+            # Invalid textures are not drawn, whatever their URI
+            data["current_texture"] = None
+    elif texture is not None:
+        # Missing textures are not drawn, whatever their path
+        data["current_texture"] = file_digest(texture)
+    if state.current_mesh is not None:
+        data["current_mesh"] = file_digest(state.current_mesh)
+    return data
+
+
+def _digest(data: object) -> str:
+    """Return the hash of JSON-compatible data."""
+    text = json.dumps(data, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(text.encode()).hexdigest()[:KEY_LENGTH]
+
+
+def state_hash(state: AppState, epsilon: float = DEFAULT_EPSILON) -> str:
+    """Return a stable hash of the scene a state describes, see canonical_state.
+
+    Args:
+        state: The application state.
+        epsilon: Resolution of the float quantization.
+    """
+    return _digest(canonical_state(state, epsilon))
+
+
+@functools.cache
+def code_digest() -> str:
+    """Return a hash of the package source code, so that cached images expire when the drawing code changes."""
+    digest = hashlib.sha256()
+    for path in sorted(Path(__file__).parent.glob("*.py")):
+        digest.update(path.name.encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def render_key(  # noqa: PLR0913
+    state: AppState,
+    width: int,
+    height: int,
+    *,
+    view: object = None,
+    renderer: str = "",
+    epsilon: float = DEFAULT_EPSILON,
+) -> str:
+    """Return the cache key of an image rendered from a state.
+
+    Args:
+        state: The application state.
+        width: Image width in pixels.
+        height: Image height in pixels.
+        view: Further JSON-compatible render parameters, e.g. the aspect ratio and view window.
+        renderer: Name of the OpenGL renderer drawing the image.
+        epsilon: Resolution of the float quantization of the state.
+    """
+    return _digest([canonical_state(state, epsilon), width, height, view, renderer, code_digest()])
+
+
+class ImageCache:
+    """Directory of rendered RGB images addressed by their render key, bounded in size.
+
+    Several processes may share the directory: images are written atomically
+    and every process trims the directory when its own writes exceed the limit.
+    Reading an image marks it as recently used by updating its modification time.
+
+    Attributes:
+        directory: The cache directory.
+        max_bytes: Size limit of the stored images.
+        epsilon: Resolution of the float quantization of the states.
+        hits: Number of images found in the cache.
+        misses: Number of images not found in the cache.
+    """
+
+    def __init__(
+        self,
+        directory: Path = DEFAULT_CACHE_DIR,
+        *,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        epsilon: float = DEFAULT_EPSILON,
+    ) -> None:
+        """Open the cache, creating its directory if needed.
+
+        Args:
+            directory: The cache directory.
+            max_bytes: Size limit of the stored images.
+            epsilon: Resolution of the float quantization of the states.
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.epsilon = epsilon
+        self.hits = 0
+        self.misses = 0
+        directory.mkdir(parents=True, exist_ok=True)
+        self._size = sum(size for _, size, _ in self._entries())
+
+    def _path(self, key: str) -> Path:
+        """Return the path of the image stored under a key."""
+        return self.directory / key[:2] / f"{key}.png"
+
+    def _entries(self) -> list[tuple[float, int, Path]]:
+        """Return the modification time, size and path of every stored image."""
+        entries = []
+        for path in self.directory.glob("*/*.png"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def key(self, state: AppState, width: int, height: int, *, view: object = None, renderer: str = "") -> str:
+        """Return the key of an image rendered from a state, see render_key."""
+        return render_key(state, width, height, view=view, renderer=renderer, epsilon=self.epsilon)
+
+    def get(self, key: str) -> np.ndarray | None:
+        """Return the image stored under a key, or None.
+
+        Args:
+            key: Render key of the image.
+        """
+        path = self._path(key)
+        try:
+            with Image.open(path) as image:
+                pixels = np.asarray(image.convert("RGB"))
+            os.utime(path)
+        except OSError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return pixels
+
+    def put(self, key: str, image: np.ndarray) -> None:
+        """Store an image under a key, evicting the least recently used images if the cache is full.
+
+        Args:
+            key: Render key of the image.
+            image: RGB image of shape (height, width, 3).
+        """
+        path = self._path(key)
+        path.parent.mkdir(exist_ok=True)
+        temporary = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        Image.fromarray(image).save(temporary, format="PNG", compress_level=1)
+        self._size += temporary.stat().st_size
+        temporary.replace(path)
+        if self._size > self.max_bytes:
+            self.evict()
+
+    def evict(self) -> None:
+        """Delete the least recently used images until the cache fits well within its limit."""
+        entries = sorted(self._entries())
+        self._size = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if self._size <= self.max_bytes * EVICTION_TARGET:
+                break
+            path.unlink(missing_ok=True)
+            self._size -= size
+
+    def clear(self) -> None:
+        """Delete all stored images."""
+        for _, _, path in self._entries():
+            path.unlink(missing_ok=True)
+        self._size = 0
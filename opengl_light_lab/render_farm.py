@@ -0,0 +1,447 @@
+"""Render farm: a directory-backed queue of AppState render jobs and a local worker pool.
+
+Every job is a JSON file that moves between subdirectories of the farm
+directory by atomic renames, so any number of worker processes, on one or
+several machines sharing the directory, can take jobs without a server:
+
+``pending/``
+    Jobs waiting to be rendered, named ``<rank>-<sequence>-<key>.json`` so
+    that sorting the names gives the order of higher priority first, then
+    submission order.
+``running/``
+    Jobs claimed by a worker. A worker claims a job by renaming it here; the
+    rename succeeds for exactly one worker.
+``done/`` and ``results/``
+    ``<key>.json`` metadata and the ``<key>.png`` image of finished jobs.
+``failed/``
+    Jobs whose attempts were exhausted, with their error messages.
+
+The key of a job is a hash of its canonical state (see render_cache.state_hash)
+and image size. Submitting a state already queued or rendered is a no-op, and
+a worker claiming a job whose image appeared in the meantime finishes it
+without rendering.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import dataclasses
+import hashlib
+import json
+import multiprocessing as mp
+import os
+import socket
+import time
+import traceback
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from PIL import Image
+
+from opengl_light_lab.app_state import AppState, state_from_dict, state_to_dict
+from opengl_light_lab.offscreen import OffscreenRenderer
+from opengl_light_lab.render_cache import state_hash
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+
+PENDING, RUNNING, DONE, FAILED, RESULTS = "pending", "running", "done", "failed", "results"
+MAX_PRIORITY = 999
+DEFAULT_SIZE = (640, 480)
+DEFAULT_MAX_ATTEMPTS = 3
+IDLE_POLL_INTERVAL = 0.5
+"""Seconds a worker waits before looking for new jobs when the queue is empty."""
+REPORT_INTERVAL = 2.0
+LISTING_TTL = 1.0
+"""Seconds a worker reuses its listing of the pending jobs before listing the directory again."""
+
+
+def job_key(state: AppState, width: int, height: int) -> str:
+    """Return the deduplication key of rendering a state at a size.
+
+    States differing only by float rounding noise or by the path of the same
+    texture file share a key.
+
+    Args:
+        state: The scene to render.
+        width: Image width in pixels.
+        height: Image height in pixels.
+    """
+    return hashlib.sha256(f"{state_hash(state)}:{width}x{height}".encode()).hexdigest()[:32]
+
+
+@dataclass
+class RenderJob:
+    """A render request stored in the queue.
+
+    Attributes:
+        key: Deduplication key, see job_key.
+        state: The scene as produced by state_to_dict.
+        width: Image width in pixels.
+        height: Image height in pixels.
+        priority: Jobs with a higher priority are rendered first (0 to MAX_PRIORITY).
+        max_attempts: Number of times the job is tried before it fails.
+        attempts: Number of failed attempts so far.
+        errors: Error messages of the failed attempts.
+        submitted: Submission time (seconds since the epoch).
+    """
+
+    key: str
+    state: dict[str, object]
+    width: int
+    height: int
+    priority: int = 0
+    max_attempts: int = DEFAULT_MAX_ATTEMPTS
+    attempts: int = 0
+    errors: list[str] = field(default_factory=list)
+    submitted: float = 0.0
+
+    @property
+    def file_name(self) -> str:
+        """Return the name of the job file in the pending directory."""
+        return f"{MAX_PRIORITY - self.priority:03d}-{int(self.submitted * 1e6):016d}-{self.key}.json"
+
+
+@dataclass
+class FarmStatus:
+    """Number of jobs in each stage of the queue.
+
+    Attributes:
+        pending: Jobs waiting for a worker.
+        running: Jobs claimed by workers.
+        done: Finished jobs.
+        failed: Jobs that exhausted their attempts.
+    """
+
+    pending: int
+    running: int
+    done: int
+    failed: int
+
+    @property
+    def total(self) -> int:
+        """Return the number of jobs in all stages."""
+        return self.pending + self.running + self.done + self.failed
+
+
+def _write_json(path: Path, data: object) -> None:
+    """Write a JSON file atomically, so readers never see a partial file."""
+    temporary = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    temporary.write_text(json.dumps(data), encoding="utf-8")
+    temporary.replace(path)
+
+
+def _job_files(directory: Path) -> list[Path]:
+    """Return the job files of a queue directory in name order, skipping temporary files."""
+    return sorted(path for path in directory.glob("*.json") if not path.name.startswith("."))
+
+
+def _key_of(path: Path) -> str:
+    """Return the job key from the name of a pending or running job file."""
+    return path.stem.split("@", 1)[0].rsplit("-", 1)[-1]
+
+
+class JobQueue:
+    """Render jobs stored in a farm directory, see the module docstring for the layout."""
+
+    def __init__(self, directory: Path) -> None:
+        """Open a farm directory, creating its subdirectories if needed.
+
+        Args:
+            directory: The farm directory.
+        """
+        self.directory = directory
+        self._listing: list[Path] = []
+        self._listed_at = 0.0
+        for stage in (PENDING, RUNNING, DONE, FAILED, RESULTS):
+            (directory / stage).mkdir(parents=True, exist_ok=True)
+
+    def _dir(self, stage: str) -> Path:
+        """Return the directory of a queue stage."""
+        return self.directory / stage
+
+    def result_path(self, key: str) -> Path:
+        """Return the path of the image rendered for a job key."""
+        return self._dir(RESULTS) / f"{key}.png"
+
+    def submit(
+        self,
+        states: Iterable[AppState],
+        *,
+        width: int,
+        height: int,
+        priority: int = 0,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+    ) -> list[str]:
+        """Queue render jobs, skipping states already queued or rendered at the same size.
+
+        Args:
+            states: Scenes to render.
+            width: Image width in pixels.
+            height: Image height in pixels.
+            priority: Priority of the jobs (0 to MAX_PRIORITY, higher first).
+            max_attempts: Number of times each job is tried before it fails.
+
+        Returns:
+            Keys of the jobs, in the order of the states, including the skipped ones.
+
+        Raises:
+            ValueError: If the priority is out of range.
+        """
+        if not 0 <= priority <= MAX_PRIORITY:
+            msg = f"Priority must be between 0 and {MAX_PRIORITY}, got {priority}"
+            raise ValueError(msg)
+        known = {_key_of(path) for stage in (PENDING, RUNNING) for path in _job_files(self._dir(stage))}
+        known.update(path.stem for path in self._dir(DONE).glob("*.json"))
+        keys = []
+        for state in states:
+            key = job_key(state, width, height)
+            keys.append(key)
+            if key in known:
+                continue
+            known.add(key)
+            job = RenderJob(key, state_to_dict(state), width, height, priority, max_attempts, submitted=time.time())
+            _write_json(self._dir(PENDING) / job.file_name, dataclasses.asdict(job))
+        return keys
+
+    def claim(self, worker: str) -> tuple[RenderJob, Path] | None:
+        """Take the first pending job.
+
+        Args:
+            worker: Name of the claiming worker, recorded in the running job file.
+
+        Returns:
+            The job and its file in the running directory, or None if no job is pending.
+        """
+        # Listing thousands of files per claim would dominate short jobs, so a listing is reused for a while
+        if time.monotonic() - self._listed_at > LISTING_TTL:
+            self._listing = []
+        for _ in range(2):
+            if not self._listing:
+                self._listing = _job_files(self._dir(PENDING))[::-1]
+                self._listed_at = time.monotonic()
+            while self._listing:
+                path = self._listing.pop()
+                claimed = self._dir(RUNNING) / f"{path.stem}@{worker}.json"
+                try:
+                    path.rename(claimed)
+                except FileNotFoundError:
+                    # Another worker was faster
+                    continue
+                # The modification time of a running job is its claim time, see requeue_stale
+                claimed.touch()
+                return RenderJob(**json.loads(claimed.read_text(encoding="utf-8"))), claimed
+        return None
+
+    def complete(self, job: RenderJob, claimed: Path, metadata: dict[str, object]) -> None:
+        """Record a rendered job; its image must already be stored at result_path.
+
+        Args:
+            job: The finished job.
+            claimed: Its file in the running directory.
+            metadata: Information about the rendering stored with the job.
+        """
+        _write_json(self._dir(DONE) / f"{job.key}.json", {**dataclasses.asdict(job), **metadata})
+        claimed.unlink(missing_ok=True)
+
+    def retry_or_fail(self, job: RenderJob, claimed: Path, error: str) -> bool:
+        """Return a failed job to the pending jobs, or move it to the failed ones after its last attempt.
+
+        Args:
+            job: The job that failed.
+            claimed: Its file in the running directory.
+            error: Description of the failure.
+
+        Returns:
+            True if the job will be retried.
+        """
+        job.attempts += 1
+        job.errors.append(error)
+        retry = job.attempts < job.max_attempts
+        target = self._dir(PENDING) / job.file_name if retry else self._dir(FAILED) / f"{job.key}.json"
+        _write_json(target, dataclasses.asdict(job))
+        claimed.unlink(missing_ok=True)
+        return retry
+
+    def requeue_stale(self, older_than: float) -> int:
+        """Return jobs claimed longer ago than a timeout to the pending jobs, e.g. after a worker crashed.
+
+        Args:
+            older_than: Seconds since the claim after which a running job is considered abandoned.
+
+        Returns:
+            Number of requeued jobs.
+        """
+        requeued = 0
+        deadline = time.time() - older_than
+        for path in _job_files(self._dir(RUNNING)):
+            with contextlib.suppress(FileNotFoundError):
+                if path.stat().st_mtime < deadline:
+                    job = RenderJob(**json.loads(path.read_text(encoding="utf-8")))
+                    self.retry_or_fail(job, path, "abandoned by its worker")
+                    requeued += 1
+        return requeued
+
+    def status(self) -> FarmStatus:
+        """Return the number of jobs in each stage."""
+        return FarmStatus(*(len(_job_files(self._dir(stage))) for stage in (PENDING, RUNNING, DONE, FAILED)))
+
+
+def _apply_state(renderer: OffscreenRenderer, data: dict[str, object]) -> None:
+    """Load a job state into the renderer's AppState."""
+    state = state_from_dict(data)
+    for f in dataclasses.fields(AppState):
+        setattr(renderer.app_state, f.name, getattr(state, f.name))
+    # Detail levels must not depend on the previously rendered job
+    renderer.scene.lod.reset()
+
+
+def work(directory: Path, *, worker: str | None = None, exit_when_idle: bool = True) -> int:
+    """Render jobs of a farm directory in the current process until the queue is empty.
+
+    Args:
+        directory: The farm directory.
+        worker: Name of the worker; defaults to ``<host>-<pid>``.
+        exit_when_idle: Whether to return when no job is pending, instead of waiting for more.
+
+    Returns:
+        Number of jobs this worker finished.
+    """
+    queue = JobQueue(directory)
+    worker = worker or f"{socket.gethostname()}-{os.getpid()}"
+    renderer: OffscreenRenderer | None = None
+    finished = 0
+    try:
+        while True:
+            claimed = queue.claim(worker)
+            if claimed is None:
+                if exit_when_idle:
+                    return finished
+                time.sleep(IDLE_POLL_INTERVAL)
+                continue
+            job, path = claimed
+            result = queue.result_path(job.key)
+            start = time.perf_counter()
+            try:
+                # An identical job may have been rendered since this one was submitted
+                if not result.exists():
+                    if renderer is None:
+                        renderer = OffscreenRenderer(AppState())
+                    _apply_state(renderer, job.state)
+                    image = renderer.render(job.width, job.height)
+                    temporary = result.with_name(f".{result.name}.{worker}.tmp")
+                    Image.fromarray(image).save(temporary, format="PNG")
+                    temporary.replace(result)
+                    render_time = time.perf_counter() - start
+                else:
+                    render_time = 0.0
+            except Exception:
+                queue.retry_or_fail(job, path, traceback.format_exc(limit=3))
+                continue
+            queue.complete(job, path, {"worker": worker, "render_time": render_time, "finished": time.time()})
+            finished += 1
+    finally:
+        if renderer is not None:
+            renderer.cleanup()
+
+
+def _work_in_process(directory: str, exit_when_idle: bool) -> int:
+    """Entry point of a worker process."""
+    return work(Path(directory), exit_when_idle=exit_when_idle)
+
+
+def run_pool(
+    directory: Path,
+    *,
+    jobs: int | None = None,
+    exit_when_idle: bool = True,
+    report: Callable[[FarmStatus, float], None] | None = None,
+) -> FarmStatus:
+    """Render the jobs of a farm directory with a pool of worker processes.
+
+    Each worker holds its own offscreen OpenGL context for its whole life.
+
+    Args:
+        directory: The farm directory.
+        jobs: Number of worker processes; defaults to the CPU count.
+        exit_when_idle: Whether the workers stop when no job is pending.
+        report: Called every REPORT_INTERVAL seconds with the queue status and
+            the throughput in jobs per second since the pool started.
+
+    Returns:
+        The queue status after the workers stopped.
+    """
+    queue = JobQueue(directory)
+    ctx = mp.get_context("spawn")
+    workers = [
+        ctx.Process(target=_work_in_process, args=(str(directory), exit_when_idle), daemon=True)
+        for _ in range(jobs or os.cpu_count() or 1)
+    ]
+    initial_done = queue.status().done
+    start = time.perf_counter()
+    for process in workers:
+        process.start()
+    try:
+        while any(process.is_alive() for process in workers):
+            for process in workers:
+                process.join(REPORT_INTERVAL / len(workers))
+            if report is not None:
+                status = queue.status()
+                report(status, (status.done - initial_done) / (time.perf_counter() - start))
+    finally:
+        for process in workers:
+            if process.is_alive():
+                process.terminate()
+    return queue.status()
+
+
+def _print_progress(status: FarmStatus, throughput: float) -> None:
+    """Print a progress line of the pool."""
+    remaining = status.pending + status.running
+    eta = f", {remaining / throughput:.0f} s left" if throughput > 0 else ""
+    print(
+        f"{status.done}/{status.total} done, {status.running} running, {status.failed} failed, "
+        f"{throughput:.1f} jobs/s{eta}",
+        flush=True,
+    )
+
+
+def main() -> None:
+    """Submit jobs to a farm directory, run workers or show the queue status."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("farm", type=Path, help="farm directory (may be shared between machines)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    submit = commands.add_parser("submit", help="queue the states of a JSON lines file")
+    submit.add_argument("states", type=Path, help="file with one state_to_dict JSON object per line")
+    submit.add_argument("--width", type=int, default=DEFAULT_SIZE[0])
+    submit.add_argument("--height", type=int, default=DEFAULT_SIZE[1])
+    submit.add_argument("--priority", type=int, default=0)
+    submit.add_argument("--max-attempts", type=int, default=DEFAULT_MAX_ATTEMPTS)
+    work_parser = commands.add_parser("work", help="render pending jobs with local worker processes")
+    work_parser.add_argument("--jobs", type=int, default=None, help="worker processes (default: CPU count)")
+    work_parser.add_argument("--keep-running", action="store_true", help="wait for new jobs instead of exiting")
+    commands.add_parser("status", help="show the number of jobs in each stage")
+    requeue = commands.add_parser("requeue", help="return abandoned running jobs to the queue")
+    requeue.add_argument("--older-than", type=float, default=600.0, help="seconds since the claim")
+    args = parser.parse_args()
+
+    queue = JobQueue(args.farm)
+    if args.command == "submit":
+        with args.states.open(encoding="utf-8") as lines:
+            states = [state_from_dict(json.loads(line)) for line in lines if line.strip()]
+        keys = queue.submit(
+            states, width=args.width, height=args.height, priority=args.priority, max_attempts=args.max_attempts
+        )
+        print(f"Submitted {len(keys)} jobs ({len(set(keys))} unique)")
+    elif args.command == "work":
+        run_pool(args.farm, jobs=args.jobs, exit_when_idle=not args.keep_running, report=_print_progress)
+    elif args.command == "requeue":
+        print(f"Requeued {queue.requeue_stale(args.older_than)} jobs")
+    status = queue.status()
+    print(f"pending {status.pending}, running {status.running}, done {status.done}, failed {status.failed}")
+
+
+if __name__ == "__main__":
+    main()
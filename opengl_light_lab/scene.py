@@ -0,0 +1,575 @@
+"""Scene rendering shared by the on-screen widget and the offscreen renderers.
+
+Rendering a frame allocates no memory in steady state: object matrices, light
+parameters and the draw order live in buffers created once and updated in
+place, so a running animation causes no garbage collector churn. The
+allocation tracing mode of the profiler (profiler.AllocationTracker) shows
+call sites that break this.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import ctypes
+import math
+from typing import TYPE_CHECKING
+
+import numpy as np
+from OpenGL.GL import (  # type: ignore
+    GL_AMBIENT,
+    GL_COLOR_BUFFER_BIT,
+    GL_CONSTANT_ATTENUATION,
+    GL_DEPTH_BUFFER_BIT,
+    GL_DEPTH_TEST,
+    GL_DIFFUSE,
+    GL_LEQUAL,
+    GL_LIGHT0,
+    GL_LIGHT_MODEL_LOCAL_VIEWER,
+    GL_LIGHT_MODEL_TWO_SIDE,
+    GL_LIGHTING,
+    GL_LIGHTING_BIT,
+    GL_LINEAR_ATTENUATION,
+    GL_MODELVIEW,
+    GL_NORMALIZE,
+    GL_POSITION,
+    GL_QUADRATIC_ATTENUATION,
+    GL_SMOOTH,
+    GL_SPECULAR,
+    GL_TEXTURE,
+    GL_TEXTURE_2D,
+    GL_VIEWPORT,
+    GLfloat,
+    GLint,
+    glBindTexture,
+    glClear,
+    glClearColor,
+    glColor3f,
+    glDepthFunc,
+    glDisable,
+    glEnable,
+    glLightf,
+    glLightModelf,
+    glLightModeli,
+    glLoadIdentity,
+    glMatrixMode,
+    glPopAttrib,
+    glPopMatrix,
+    glPushAttrib,
+    glPushMatrix,
+    glRotatef,
+    glScalef,
+    glShadeModel,
+    glTranslatef,
+    glViewport,
+)
+
+# Raw entry points: the PyOpenGL wrappers convert array arguments anew, allocating, on every call
+from OpenGL.raw.GL.VERSION.GL_1_1 import glGetIntegerv, glLightfv, glMultMatrixf  # type: ignore
+
+from opengl_light_lab.app_state import AppState, LightType, SceneObject
+from opengl_light_lab.camera import FULL_WINDOW, Camera
+from opengl_light_lab.culling import FrustumCuller
+from opengl_light_lab.gizmo import AxisGizmo
+from opengl_light_lab.lod import (
+    CYLINDER_LEVELS,
+    SPHERE_LEVELS,
+    LodSelector,
+    cylinder_mesh,
+    projected_diameter,
+    sphere_mesh,
+)
+from opengl_light_lab.materials import MaterialLibrary
+from opengl_light_lab.meshes import MeshManager
+from opengl_light_lab.primitives import CUBE_VERTICES, cylinder_vertices, draw_cube, draw_quad, draw_textured_cube
+from opengl_light_lab.shadows import ShadowMapper
+from opengl_light_lab.textures import TextureManager
+from opengl_light_lab.viewports import QUAD_VIEWPORTS
+
+if TYPE_CHECKING:
+    from collections.abc import Hashable, Iterator
+
+    from opengl_light_lab.app_state import Projection, Spherical
+    from opengl_light_lab.viewports import Viewport
+
+OBJECT_MESHES = {
+    SceneObject.RED_CYLINDER: cylinder_vertices(),
+    SceneObject.CUBE: CUBE_VERTICES,
+    SceneObject.GREEN_CYLINDER: cylinder_vertices(),
+}
+"""Object-space vertices of the scene objects, used for their bounds."""
+OBJECT_INDEX = {obj: index for index, obj in enumerate(SceneObject)}
+"""Position of each object in the per-object arrays."""
+OBJECT_AXES = {SceneObject.RED_CYLINDER: 1, SceneObject.CUBE: 0, SceneObject.GREEN_CYLINDER: 2}
+"""Axis (0 = X, 1 = Y, 2 = Z) each object spins around by the rotation angle."""
+OBJECT_OFFSETS = {SceneObject.RED_CYLINDER: -1.0, SceneObject.CUBE: 0.0, SceneObject.GREEN_CYLINDER: 1.0}
+"""X position of each object in multiples of the cube distance."""
+LIGHT_MARKER_RADIUS = 0.1
+FULL_REVOLUTION = 360.0
+ROTATION_SPEED = 20.0
+"""Auto-rotation speed of the objects in degrees per second."""
+
+
+class SceneRenderer:
+    """Draws the lab scene into the currently bound framebuffer.
+
+    Holds no windowing state, so the same scene code serves the GLWidget and
+    offscreen renderers. A current OpenGL context is required for all methods.
+    """
+
+    def __init__(self, app_state: AppState, *, background_loading: bool = False) -> None:
+        """Initialize the scene renderer.
+
+        Args:
+            app_state: The application state describing the scene.
+            background_loading: Whether meshes are loaded off the rendering
+                thread, drawing the scene cube until they are ready, instead
+                of before the frame that needs them.
+        """
+        self.app_state = app_state
+        self.camera = Camera(app_state)
+        self.culler = FrustumCuller([OBJECT_MESHES[obj] for obj in SceneObject])
+        self.lod = LodSelector()
+        self.shadows = ShadowMapper(self)
+        self.gizmo = AxisGizmo()
+        self.shadow_passes = 0
+        self.vertices_drawn = 0
+        self.objects_drawn = 0
+        self.objects_culled = 0
+        self._viewport_cameras: dict[str, tuple[Camera, LodSelector]] = {}
+        # Parts of the viewports inside the window last drawn, and the viewports, window and size they are for
+        self._layout: tuple[tuple[Viewport, tuple[int, int, int, int], tuple[float, float, float, float]], ...] = ()
+        self._layout_key: Hashable = None
+        self._shadowed = False
+        self._aspect = 1.0
+        self._window = FULL_WINDOW
+        self._view_height = 1.0
+        self.texture_manager = TextureManager()
+        self.mesh_manager = MeshManager(background=background_loading)
+        self.materials = MaterialLibrary.load()
+        self.materials.add_listener(self._on_material_changed)
+        self._applied_material: int | None = None
+        self._draw_orders: dict[tuple[bool, bool], tuple[tuple[int, SceneObject], ...]] = {}
+        # Object-to-world matrices, row-major for NumPy with a view per object, and column-major for OpenGL
+        # with the address of each, passed instead of the arrays, whose conversion allocates
+        self._matrices = np.tile(np.identity(4, dtype=np.float32), (len(SceneObject), 1, 1))
+        self._matrices_gl = self._matrices.copy()
+        self._matrices_transposed = self._matrices.transpose(0, 2, 1)
+        self._matrix_rows = {obj: self._matrices[index] for index, obj in enumerate(SceneObject)}
+        self._matrix_columns = {
+            obj: ctypes.c_void_p(self._matrices_gl[index].ctypes.data) for index, obj in enumerate(SceneObject)
+        }
+        self._matrices_key: tuple[float, float] | None = None
+        # Incremented whenever the objects move, for caches keyed on their position
+        self.objects_version = 0
+        # Last visibility mask per camera: objects and camera versions it was culled at, mask, drawn and culled counts
+        self._visibility: dict[Camera, tuple[int, int, np.ndarray, int, int]] = {}
+        # World-space bounding spheres as of the last cull, as Python numbers for the detail level selection
+        self._spheres = self._bounding_spheres()
+        self._light_position = (GLfloat * 4)()
+        self._light_diffuse = (GLfloat * 4)()
+        self._light_ambient = (GLfloat * 4)()
+        self._light_specular = (GLfloat * 4)()
+        self._viewport = (GLint * 4)()
+
+    def initialize(self) -> None:
+        """Initialize OpenGL state."""
+        glClearColor(0.15, 0.15, 0.18, 1.0)
+        glEnable(GL_DEPTH_TEST)
+        glDepthFunc(GL_LEQUAL)
+
+        glEnable(GL_LIGHTING)
+        glEnable(GL_LIGHT0)
+        glShadeModel(GL_SMOOTH)
+
+        glEnable(GL_NORMALIZE)
+
+        # Load texture and mesh if set
+        self.texture_manager.load_if_changed(self.app_state.current_texture)
+        self.mesh_manager.load_if_changed(self.app_state.current_mesh)
+
+    def set_projection(self, aspect: float, window: tuple[float, float, float, float] = FULL_WINDOW) -> None:
+        """Load the camera projection matrix.
+
+        Args:
+            aspect: Aspect ratio of the full image (width / height).
+            window: Sub-rectangle (x0, x1, y0, y1) of the view as fractions in
+                [0, 1], measured from the bottom-left corner. Used to render
+                a single tile of a larger image.
+        """
+        self._aspect, self._window = aspect, window
+        glGetIntegerv(GL_VIEWPORT, self._viewport)
+        self._view_height = self._viewport[3] / (window[3] - window[2])
+        self.camera.load_projection(aspect, window)
+        glMatrixMode(GL_MODELVIEW)
+        glLoadIdentity()
+
+    def render(self) -> None:
+        """Render the scene with the current projection and viewport.
+
+        In quad view, a render of the full view draws each of QUAD_VIEWPORTS
+        into its part of the current viewport instead.
+        """
+        # Check if texture or mesh needs to be loaded/updated
+        self.texture_manager.load_if_changed(self.app_state.current_texture)
+        self.mesh_manager.load_if_changed(self.app_state.current_mesh)
+
+        self._shadowed = self.app_state.shadows_enabled and self.app_state.lighting_enabled
+        self.shadow_passes = 0
+        if self._shadowed:
+            try:
+                self.shadow_passes = self.shadows.update()
+            except RuntimeError as e:
+                # Unsupported framebuffers or shaders; the frame is drawn without shadows
+                print(f"Shadows disabled: {e}")
+                self.shadows.delete()
+                self.app_state.shadows_enabled = self._shadowed = False
+
+        glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
+        self._applied_material = None
+        self.vertices_drawn = self.objects_drawn = self.objects_culled = 0
+        if self.app_state.quad_view:
+            self.render_viewports(QUAD_VIEWPORTS)
+        else:
+            self._draw_view()
+
+    def render_viewports(self, viewports: tuple[Viewport, ...]) -> None:
+        """Draw the scene once per viewport into its part of the current viewport.
+
+        The viewports divide the full view; if the projection shows a window
+        of it, such as a tile of a larger image, each viewport is drawn where
+        and as far as it overlaps the window. The framebuffer must already be
+        cleared; the viewport and projection are restored afterwards.
+
+        Args:
+            viewports: Viewports to draw.
+        """
+        glGetIntegerv(GL_VIEWPORT, self._viewport)
+        x, y, width, height = self._viewport
+        aspect, window = self._aspect, self._window
+        if self._layout_key != (viewports, window, width, height):
+            self._layout = self._clip_viewports(viewports, window, width, height)
+            self._layout_key = (viewports, window, width, height)
+        for viewport, (left, bottom, w, h), shown in self._layout:
+            glViewport(x + left, y + bottom, w, h)
+            # Not viewport_camera, whose generator would be allocated for every viewport of every frame
+            saved = self._look_through(viewport)
+            try:
+                self.set_projection(viewport.aspect(aspect), shown)
+                self._draw_view()
+            finally:
+                self._restore_camera(saved)
+        glViewport(x, y, width, height)
+        self.set_projection(aspect, window)
+
+    @staticmethod
+    def _clip_viewports(
+        viewports: tuple[Viewport, ...], window: tuple[float, float, float, float], width: int, height: int
+    ) -> tuple[tuple[Viewport, tuple[int, int, int, int], tuple[float, float, float, float]], ...]:
+        """Return the viewports overlapping a window with their parts inside it, see Viewport.clip.
+
+        Not inlined into render_viewports, where the closures of the generators
+        would allocate cells for their variables on every call.
+        """
+        clipped = ((viewport, viewport.clip(window, width, height)) for viewport in viewports)
+        return tuple((viewport, *part) for viewport, part in clipped if part is not None)
+
+    @contextlib.contextmanager
+    def viewport_camera(self, viewport: Viewport) -> Iterator[None]:
+        """Look through the camera of a viewport within the block.
+
+        The camera fields of the AppState are replaced by the viewport's ones
+        and restored on exit. Each viewport keeps its own matrix cache and
+        detail level state, so alternating between viewports costs no
+        recomputation.
+
+        Args:
+            viewport: The viewport to look through.
+        """
+        saved = self._look_through(viewport)
+        try:
+            yield
+        finally:
+            self._restore_camera(saved)
+
+    def _look_through(self, viewport: Viewport) -> tuple[Camera, LodSelector, Spherical, Projection, float]:
+        """Switch to the camera of a viewport and return what _restore_camera needs to switch back."""
+        state = self.app_state
+        saved = (self.camera, self.lod, state.camera, state.camera_projection, state.camera_ortho_half_height)
+        if viewport.name not in self._viewport_cameras:
+            self._viewport_cameras[viewport.name] = (Camera(state), LodSelector())
+        self.camera, self.lod = self._viewport_cameras[viewport.name]
+        if viewport.camera is not None:
+            state.camera = viewport.camera
+        if viewport.projection is not None:
+            state.camera_projection = viewport.projection
+            state.camera_ortho_half_height = viewport.ortho_half_height
+        return saved
+
+    def _restore_camera(self, saved: tuple[Camera, LodSelector, Spherical, Projection, float]) -> None:
+        """Switch back to the camera replaced by _look_through."""
+        state = self.app_state
+        self.camera, self.lod, state.camera, state.camera_projection, state.camera_ortho_half_height = saved
+
+    def _draw_view(self) -> None:
+        """Draw the scene through the current camera, projection and viewport."""
+        self.camera.load_view()
+
+        if self.app_state.depth_test:
+            glEnable(GL_DEPTH_TEST)
+        else:
+            glDisable(GL_DEPTH_TEST)
+
+        self.setup_light()
+
+        if self.app_state.lighting_enabled:
+            glEnable(GL_LIGHTING)
+        else:
+            glDisable(GL_LIGHTING)
+            glColor3f(0.5, 0.5, 0.5)
+
+        if self.app_state.lighting_enabled and self.app_state.show_light_position:
+            self.draw_light_marker()
+
+        if self.app_state.show_axis:
+            self.draw_axis()
+
+        if self._shadowed:
+            self.shadows.begin(self.camera.view_matrix())
+        visible, drawn, culled = self._cull()
+        for index, obj in self.draw_order():
+            if visible[index]:
+                self.draw_object(obj)
+        if self._shadowed:
+            self.shadows.end()
+        self.objects_drawn += drawn
+        self.objects_culled += culled
+
+    def _cull(self) -> tuple[np.ndarray, int, int]:
+        """Return the visibility mask of the objects through the current camera with the drawn and culled counts.
+
+        The objects are only tested again once they or the camera moved, so
+        that drawing an unchanged scene, in any viewport, allocates nothing.
+        """
+        matrices = self.object_matrices()
+        view_projection = self.camera.view_projection_matrix(self._aspect, self._window)
+        cached = self._visibility.get(self.camera)
+        if cached is not None:
+            objects_version, camera_version, visible, drawn, culled = cached
+            if objects_version == self.objects_version and camera_version == self.camera.version:
+                return visible, drawn, culled
+        visible = self.culler.cull(matrices, view_projection)
+        self._spheres = self._bounding_spheres()
+        self._visibility[self.camera] = (
+            self.objects_version,
+            self.camera.version,
+            visible,
+            self.culler.drawn,
+            self.culler.culled,
+        )
+        return visible, self.culler.drawn, self.culler.culled
+
+    def _bounding_spheres(self) -> list[tuple[list[float], float]]:
+        """Return the centers and radii of the world-space bounds of the culler."""
+        bounds = self.culler.world_bounds
+        return list(zip(bounds.center.tolist(), bounds.radius.tolist(), strict=True))
+
+    def object_matrices(self) -> np.ndarray:
+        """Return the object-to-world matrices of all objects at their current position, shape (objects, 4, 4).
+
+        The matrices are updated in place when the objects move and must not be modified.
+        """
+        state = self.app_state
+        key = (state.rotation_angle, state.cube_distance)
+        if key != self._matrices_key:
+            radians = math.radians(state.rotation_angle)
+            cos, sin = math.cos(radians), math.sin(radians)
+            for obj, matrix in self._matrix_rows.items():
+                # Rotation about a coordinate axis, as built by glRotatef, then the translation along X
+                axis = OBJECT_AXES[obj]
+                first, second = (axis + 1) % 3, (axis + 2) % 3
+                matrix[first, first] = matrix[second, second] = cos
+                matrix[first, second], matrix[second, first] = -sin, sin
+                matrix[0, 3] = OBJECT_OFFSETS[obj] * state.cube_distance
+            np.copyto(self._matrices_gl, self._matrices_transposed)
+            self._matrices_key = key
+            self.objects_version += 1
+        return self._matrices
+
+    def object_matrix(self, obj: SceneObject) -> np.ndarray:
+        """Return the object-to-world matrix of a scene object, see object_matrices."""
+        self.object_matrices()
+        return self._matrix_rows[obj]
+
+    def visible_objects(self) -> list[SceneObject]:
+        """Return the objects intersecting the view frustum of the current projection."""
+        visible, _drawn, _culled = self._cull()
+        return [obj for obj, keep in zip(SceneObject, visible, strict=True) if keep]
+
+    def draw_order(self) -> tuple[tuple[int, SceneObject], ...]:
+        """Return the objects with their indices, sorted so that objects sharing a material are drawn consecutively."""
+        key = (self.texture_manager.is_loaded, self.mesh_manager.is_loaded)
+        order = self._draw_orders.get(key)
+        if order is None:
+            order = tuple(sorted(enumerate(SceneObject), key=lambda item: self.object_material(item[1])))
+            self._draw_orders[key] = order
+        return order
+
+    def object_material(self, obj: SceneObject) -> int:
+        """Return the index of the material an object is drawn with in the library."""
+        # A mesh drawn in place of the cube has no texture coordinates
+        textured = self.texture_manager.is_loaded and not (obj == SceneObject.CUBE and self.mesh_manager.is_loaded)
+        return self.materials.for_object(obj, textured=textured)
+
+    def _on_material_changed(self, index: int) -> None:
+        """Make the next draw with an edited material set it again."""
+        if index == self._applied_material:
+            self._applied_material = None
+
+    def _apply_material(self, index: int) -> None:
+        """Set a material unless it is still the current one."""
+        if index != self._applied_material:
+            self.materials.apply(index)
+            self._applied_material = index
+
+    def draw_object(self, obj: SceneObject, *, shaded: bool = True) -> None:
+        """Draw one of the scene objects at its current position.
+
+        Args:
+            obj: The object to draw.
+            shaded: Whether to set up the material and texture; geometry only if False.
+        """
+        glPushMatrix()
+        self.object_matrices()
+        glMultMatrixf(self._matrix_columns[obj])
+        material = self.object_material(obj)
+        if shaded:
+            self._apply_material(material)
+        if obj != SceneObject.CUBE:
+            self._draw_cylinder(obj, inside=obj == SceneObject.RED_CYLINDER)
+        elif self.mesh_manager.is_loaded:
+            # The fitted mesh stays within the bounds of the cube used for culling and shadows
+            self.vertices_drawn += self.mesh_manager.vertex_count
+            self.mesh_manager.draw()
+        elif shaded and self.materials.texture_slot(material) == 0 and self.texture_manager.is_loaded:
+            self.vertices_drawn += len(CUBE_VERTICES)
+            glEnable(GL_TEXTURE_2D)
+            glBindTexture(GL_TEXTURE_2D, self.texture_manager.texture_id)
+            flip = self.texture_manager.top_down
+            if flip:
+                # Compressed textures keep the top row first; map t to 1 - t
+                glMatrixMode(GL_TEXTURE)
+                glTranslatef(0.0, 1.0, 0.0)
+                glScalef(1.0, -1.0, 1.0)
+                glMatrixMode(GL_MODELVIEW)
+            if self._shadowed:
+                self.shadows.set_textured(True)
+            draw_textured_cube()
+            if self._shadowed:
+                self.shadows.set_textured(False)
+            if flip:
+                glMatrixMode(GL_TEXTURE)
+                glLoadIdentity()
+                glMatrixMode(GL_MODELVIEW)
+            glBindTexture(GL_TEXTURE_2D, 0)
+            glDisable(GL_TEXTURE_2D)
+        else:
+            self.vertices_drawn += len(CUBE_VERTICES)
+            draw_cube()
+        glPopMatrix()
+
+    def _draw_cylinder(self, obj: SceneObject, *, inside: bool) -> None:
+        """Draw a cylinder object at the detail level matching its size on screen."""
+        center, radius = self._spheres[OBJECT_INDEX[obj]]
+        size = projected_diameter(self.app_state, center, radius, self._view_height)
+        mesh = cylinder_mesh(*CYLINDER_LEVELS[self.lod.select(obj, size)], inside=inside)
+        mesh.draw()
+        self.vertices_drawn += mesh.vertex_count
+
+    def draw_axis(self) -> None:
+        """Draw the coordinate axes, with tick marks and ground grid if enabled."""
+        self.gizmo.draw(self.app_state.axis_extent, ticks=self.app_state.show_axis_ticks, grid=self.app_state.show_grid)
+
+    def setup_light(self) -> None:
+        """Configure the OpenGL light source based on app state."""
+        # The parameter arrays are reused every frame
+        state = self.app_state
+        if state.light_type == LightType.POINT:
+            self._light_position[:3] = state.light_position
+            self._light_position[3] = 1.0
+        else:
+            self._light_position[:3] = state.light_direction
+            self._light_position[3] = 0.0
+        self._light_diffuse[:3] = state.light_diffuse
+        self._light_ambient[:3] = state.light_ambient
+        self._light_specular[:3] = state.light_specular
+        self._light_diffuse[3] = self._light_ambient[3] = self._light_specular[3] = 1.0
+
+        glLightfv(GL_LIGHT0, GL_POSITION, self._light_position)
+        glLightfv(GL_LIGHT0, GL_DIFFUSE, self._light_diffuse)
+        glLightfv(GL_LIGHT0, GL_AMBIENT, self._light_ambient)
+        glLightfv(GL_LIGHT0, GL_SPECULAR, self._light_specular)
+
+        # Attenuation: only for point light
+        if self.app_state.light_type == LightType.POINT:
+            glLightf(GL_LIGHT0, GL_CONSTANT_ATTENUATION, 0.0)
+            glLightf(GL_LIGHT0, GL_LINEAR_ATTENUATION, 0.0)
+            glLightf(GL_LIGHT0, GL_QUADRATIC_ATTENUATION, 0.0)
+            glLightf(GL_LIGHT0, self.app_state.light_attenuation_mode, self.app_state.light_attenuation_value)
+        else:
+            # No attenuation for directional
+            glLightf(GL_LIGHT0, GL_CONSTANT_ATTENUATION, 1.0)
+            glLightf(GL_LIGHT0, GL_LINEAR_ATTENUATION, 0.0)
+            glLightf(GL_LIGHT0, GL_QUADRATIC_ATTENUATION, 0.0)
+
+        glLightModelf(GL_LIGHT_MODEL_LOCAL_VIEWER, 1.0 if self.app_state.light_model_local_viewer else 0.0)
+        glLightModeli(GL_LIGHT_MODEL_TWO_SIDE, 1 if self.app_state.light_model_two_side else 0)
+
+    def draw_light_marker(self) -> None:
+        """Draw a visual marker for the light source position/direction."""
+        glPushAttrib(GL_LIGHTING_BIT)
+        glDisable(GL_LIGHTING)
+        if self.app_state.light_type == LightType.POINT:
+            glPushMatrix()
+            x, y, z = self.app_state.light_position
+            glTranslatef(x, y, z)
+            glColor3f(1.0, 1.0, 0.0)
+            size = projected_diameter(self.app_state, (x, y, z), LIGHT_MARKER_RADIUS, self._view_height)
+            mesh = sphere_mesh(LIGHT_MARKER_RADIUS, *SPHERE_LEVELS[self.lod.select("light_marker", size)])
+            mesh.draw()
+            self.vertices_drawn += mesh.vertex_count
+            glPopMatrix()
+        else:
+            self._draw_directional_light_sun()
+        glPopAttrib()
+
+    def _draw_directional_light_sun(self) -> None:
+        """Draw a 'sun' marker for directional light."""
+        dx, dy, dz = self.app_state.light_direction
+        length = math.hypot(dx, dy, dz)
+        if length < 0.001:
+            return
+
+        cam = self.app_state.camera
+        scale = cam.distance * 2.0 / length
+        sun_x, sun_y, sun_z = dx * scale, dy * scale, dz * scale
+
+        to_cam_x, to_cam_y, to_cam_z = cam.x - sun_x, cam.y - sun_y, cam.z - sun_z
+        dist_to_cam = math.hypot(to_cam_x, to_cam_y, to_cam_z)
+        yaw = math.atan2(to_cam_x, to_cam_z) if dist_to_cam > 0.001 else 0.0
+        pitch = math.asin(to_cam_y / dist_to_cam) if dist_to_cam > 0.001 else 0.0
+
+        glPushMatrix()
+        glTranslatef(sun_x, sun_y, sun_z)
+        glRotatef(yaw * 180.0 / math.pi, 0, 1, 0)
+        glRotatef(-pitch * 180.0 / math.pi, 1, 0, 0)
+
+        glColor3f(1.0, 1.0, 0.0)
+        draw_quad(0.3)
+        glPopMatrix()
+
+    def cleanup(self) -> None:
+        """Clean up OpenGL resources."""
+        self.texture_manager.cleanup()
+        self.mesh_manager.cleanup()
+        self.shadows.delete()
+        self.gizmo.delete()
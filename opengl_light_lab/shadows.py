@@ -0,0 +1,590 @@
+"""Shadow maps for the point and directional light.
+
+The directional light renders the scene depth once, through an orthographic
+frustum fitted to the world-space bounds of the objects. The point light
+renders the distance from the light into the six faces of a cube map. The
+maps are only re-rendered when the light, the objects or the map resolution
+change, so a static scene costs nothing beyond the lookup.
+
+Shadowed objects are drawn with a GLSL 1.20 shader that evaluates the
+fixed-function lighting of light 0 per fragment (materials, attenuation,
+light model) and scales its diffuse and specular terms by the shadow test.
+"""
+
+from __future__ import annotations
+
+import ctypes
+from typing import TYPE_CHECKING
+
+import numpy as np
+from OpenGL.GL import (  # type: ignore
+    GL_CLAMP_TO_BORDER,
+    GL_CLAMP_TO_EDGE,
+    GL_COLOR_ATTACHMENT0,
+    GL_COLOR_BUFFER_BIT,
+    GL_COMPARE_REF_TO_TEXTURE,
+    GL_DEPTH_ATTACHMENT,
+    GL_DEPTH_BUFFER_BIT,
+    GL_DEPTH_COMPONENT,
+    GL_DEPTH_COMPONENT24,
+    GL_DEPTH_TEST,
+    GL_ENABLE_BIT,
+    GL_FLOAT,
+    GL_FRAGMENT_SHADER,
+    GL_FRAMEBUFFER,
+    GL_FRAMEBUFFER_BINDING,
+    GL_FRAMEBUFFER_COMPLETE,
+    GL_LEQUAL,
+    GL_LIGHTING,
+    GL_LIGHTING_BIT,
+    GL_LINEAR,
+    GL_MODELVIEW,
+    GL_NEAREST,
+    GL_NONE,
+    GL_POLYGON_BIT,
+    GL_POLYGON_OFFSET_FILL,
+    GL_PROJECTION,
+    GL_R32F,
+    GL_RED,
+    GL_RENDERBUFFER,
+    GL_TEXTURE0,
+    GL_TEXTURE1,
+    GL_TEXTURE_2D,
+    GL_TEXTURE_BORDER_COLOR,
+    GL_TEXTURE_COMPARE_FUNC,
+    GL_TEXTURE_COMPARE_MODE,
+    GL_TEXTURE_CUBE_MAP,
+    GL_TEXTURE_CUBE_MAP_POSITIVE_X,
+    GL_TEXTURE_MAG_FILTER,
+    GL_TEXTURE_MIN_FILTER,
+    GL_TEXTURE_WRAP_R,
+    GL_TEXTURE_WRAP_S,
+    GL_TEXTURE_WRAP_T,
+    GL_VERTEX_SHADER,
+    GL_VIEWPORT_BIT,
+    GLfloat,
+    glActiveTexture,
+    glBindFramebuffer,
+    glBindRenderbuffer,
+    glBindTexture,
+    glCheckFramebufferStatus,
+    glClear,
+    glClearColor,
+    glDeleteFramebuffers,
+    glDeleteProgram,
+    glDeleteRenderbuffers,
+    glDeleteTextures,
+    glDisable,
+    glDrawBuffer,
+    glEnable,
+    glFramebufferRenderbuffer,
+    glFramebufferTexture2D,
+    glGenFramebuffers,
+    glGenRenderbuffers,
+    glGenTextures,
+    glGetIntegerv,
+    glGetUniformLocation,
+    glMatrixMode,
+    glPolygonOffset,
+    glPopAttrib,
+    glPopMatrix,
+    glPushAttrib,
+    glPushMatrix,
+    glReadBuffer,
+    glRenderbufferStorage,
+    glTexImage2D,
+    glTexParameterfv,
+    glTexParameteri,
+    glUniform1f,
+    glUniform1i,
+    glUniform3f,
+    glUseProgram,
+    glViewport,
+)
+from OpenGL.GL.shaders import compileProgram, compileShader  # type: ignore
+
+# Unwrapped: the matrices are passed from preallocated buffers without per-call conversion
+from OpenGL.raw.GL.VERSION.GL_1_1 import glLoadMatrixf  # type: ignore
+from OpenGL.raw.GL.VERSION.GL_2_0 import glUniformMatrix4fv  # type: ignore
+
+from opengl_light_lab.app_state import LightType, SceneObject
+from opengl_light_lab.camera import frustum_matrix, look_at, ortho_matrix
+
+if TYPE_CHECKING:
+    from collections.abc import Hashable
+
+    from opengl_light_lab.scene import SceneRenderer
+
+POINT_NEAR_PLANE = 0.05
+DISTANCE_BIAS = 0.02
+"""World-space distance a fragment must lie behind the nearest occluder to be shadowed (point light)."""
+POLYGON_OFFSET = (2.0, 4.0)
+"""Slope-scaled depth bias (factor, units) of the directional depth pass."""
+DEPTH_MARGIN = 0.1
+"""Extra room in front of and behind the scene in the light frustums."""
+
+# Face targets and up vectors of a cube map in GL_TEXTURE_CUBE_MAP_POSITIVE_X + i order
+CUBE_FACES = (
+    ((1.0, 0.0, 0.0), (0.0, -1.0, 0.0)),
+    ((-1.0, 0.0, 0.0), (0.0, -1.0, 0.0)),
+    ((0.0, 1.0, 0.0), (0.0, 0.0, 1.0)),
+    ((0.0, -1.0, 0.0), (0.0, 0.0, -1.0)),
+    ((0.0, 0.0, 1.0), (0.0, -1.0, 0.0)),
+    ((0.0, 0.0, -1.0), (0.0, -1.0, 0.0)),
+)
+CUBE_FACE_ROTATIONS = np.stack([
+    look_at(np.zeros(3), np.array(target), np.array(up))[:3, :3] for target, up in CUBE_FACES
+]).astype(np.float64)
+"""World-to-light rotations of the cube faces; the translation follows the light."""
+UNIFORMS = ("two_side", "local_viewer", "textured", "eye_to_world", "light_world", "distance_bias", "eye_to_shadow")
+"""Uniforms of the lighting programs set while drawing; their locations are looked up once."""
+# Maps clip space [-1, 1] to texture space [0, 1]
+TEXTURE_BIAS = np.array(
+    [[0.5, 0.0, 0.0, 0.5], [0.0, 0.5, 0.0, 0.5], [0.0, 0.0, 0.5, 0.5], [0.0, 0.0, 0.0, 1.0]], dtype=np.float64
+)
+
+DISTANCE_VERTEX_SHADER = """
+#version 120
+varying vec3 light_space_position;
+void main() {
+    light_space_position = (gl_ModelViewMatrix * gl_Vertex).xyz;
+    gl_Position = ftransform();
+}
+"""
+
+DISTANCE_FRAGMENT_SHADER = """
+#version 120
+varying vec3 light_space_position;
+void main() {
+    gl_FragColor = vec4(length(light_space_position));
+}
+"""
+
+LIGHTING_VERTEX_SHADER = """
+#version 120
+varying vec3 eye_position;
+varying vec3 eye_normal;
+void main() {
+    vec4 position = gl_ModelViewMatrix * gl_Vertex;
+    eye_position = position.xyz / position.w;
+    eye_normal = gl_NormalMatrix * gl_Normal;
+    gl_TexCoord[0] = gl_TextureMatrix[0] * gl_MultiTexCoord0;
+    gl_Position = ftransform();
+}
+"""
+
+LIGHTING_FRAGMENT_SHADER = """
+#version 120
+uniform bool two_side;
+uniform bool local_viewer;
+uniform bool textured;
+uniform sampler2D color_map;
+#ifdef POINT_LIGHT
+uniform samplerCube shadow_map;
+uniform mat4 eye_to_world;
+uniform vec3 light_world;
+uniform float distance_bias;
+#else
+uniform sampler2DShadow shadow_map;
+uniform mat4 eye_to_shadow;
+#endif
+varying vec3 eye_position;
+varying vec3 eye_normal;
+
+float light_visibility() {
+#ifdef POINT_LIGHT
+    vec3 from_light = (eye_to_world * vec4(eye_position, 1.0)).xyz - light_world;
+    float occluder = textureCube(shadow_map, from_light).r;
+    return length(from_light) - distance_bias > occluder ? 0.0 : 1.0;
+#else
+    return shadow2DProj(shadow_map, eye_to_shadow * vec4(eye_position, 1.0)).r;
+#endif
+}
+
+void main() {
+    bool back = two_side && !gl_FrontFacing;
+    vec3 normal = normalize(back ? -eye_normal : eye_normal);
+    gl_MaterialParameters material = gl_FrontMaterial;
+    if (back) {
+        material = gl_BackMaterial;
+    }
+
+    gl_LightSourceParameters light = gl_LightSource[0];
+    vec3 to_light = normalize(light.position.xyz);
+    float attenuation = 1.0;
+    if (light.position.w != 0.0) {
+        vec3 offset = light.position.xyz - eye_position;
+        float dist = length(offset);
+        to_light = offset / dist;
+        attenuation = 1.0 / (light.constantAttenuation + light.linearAttenuation * dist
+                             + light.quadraticAttenuation * dist * dist);
+    }
+    vec3 to_eye = local_viewer ? normalize(-eye_position) : vec3(0.0, 0.0, 1.0);
+
+    float n_dot_l = max(dot(normal, to_light), 0.0);
+    vec4 direct = light.diffuse * material.diffuse * n_dot_l;
+    if (n_dot_l > 0.0) {
+        float n_dot_h = max(dot(normal, normalize(to_light + to_eye)), 0.0);
+        float highlight = material.shininess > 0.0 ? pow(n_dot_h, material.shininess) : 1.0;
+        direct += light.specular * material.specular * highlight;
+    }
+    vec4 color = material.emission + gl_LightModel.ambient * material.ambient
+                 + attenuation * (light.ambient * material.ambient + light_visibility() * direct);
+    color = clamp(vec4(color.rgb, material.diffuse.a), 0.0, 1.0);
+    if (textured) {
+        color *= texture2D(color_map, gl_TexCoord[0].st);
+    }
+    gl_FragColor = color;
+}
+"""
+
+
+def _check_framebuffer(what: str) -> None:
+    """Raise if the bound framebuffer is incomplete.
+
+    Raises:
+        RuntimeError: If the framebuffer is incomplete.
+    """
+    status = glCheckFramebufferStatus(GL_FRAMEBUFFER)
+    if status != GL_FRAMEBUFFER_COMPLETE:
+        msg = f"{what} framebuffer is incomplete (status 0x{status:x})"
+        raise RuntimeError(msg)
+
+
+def _matrix_buffer() -> tuple[np.ndarray, ctypes.c_void_p]:
+    """Return a float32 buffer for matrices passed to OpenGL and its address, passed instead of the array."""
+    buffer = np.identity(4, dtype=np.float32)
+    return buffer, ctypes.c_void_p(buffer.ctypes.data)
+
+
+def _gl_matrix(matrix: np.ndarray, buffer: tuple[np.ndarray, ctypes.c_void_p]) -> ctypes.c_void_p:
+    """Copy a row-major matrix into a column-major matrix buffer and return the address of the buffer."""
+    out, address = buffer
+    np.copyto(out, matrix.T, casting="same_kind")
+    return address
+
+
+def _box_corners(box_min: np.ndarray, box_max: np.ndarray) -> np.ndarray:
+    """Return the 8 corners of each box, shape (n * 8, 3)."""
+    select = (np.arange(8)[:, None] >> np.arange(3)) & 1
+    return np.where(select[None], box_max[:, None, :], box_min[:, None, :]).reshape(-1, 3)
+
+
+def directional_light_matrix(direction: tuple[float, float, float], corners: np.ndarray) -> np.ndarray:
+    """Return the view-projection matrix of a directional light fitted to points.
+
+    Args:
+        direction: Direction towards the light, as in the light position with w = 0.
+        corners: World-space points the frustum must enclose, shape (n, 3).
+    """
+    toward_light = np.asarray(direction, dtype=np.float64)
+    toward_light /= np.linalg.norm(toward_light)
+    center = (corners.min(axis=0) + corners.max(axis=0)) / 2
+    radius = float(np.linalg.norm(corners - center, axis=1).max())
+    up = np.identity(3)[int(np.argmin(np.abs(toward_light)))]
+    view = look_at(center + toward_light * (radius + 1.0), center, up).astype(np.float64)
+    points = corners @ view[:3, :3].T + view[:3, 3]
+    low, high = points.min(axis=0), points.max(axis=0)
+    near, far = max(-high[2] - DEPTH_MARGIN, 0.0), -low[2] + DEPTH_MARGIN
+    projection = ortho_matrix(low[0], high[0], low[1], high[1], near, far).astype(np.float64)
+    return projection @ view
+
+
+def _lighting_program(light_type: LightType) -> int:
+    """Compile and validate the lighting program of a light type.
+
+    Raises:
+        RuntimeError: If the program does not compile, link or validate.
+    """
+    defines = "#define POINT_LIGHT\n" if light_type == LightType.POINT else ""
+    # The #version line must stay first, so the define goes right after it
+    version, body = LIGHTING_FRAGMENT_SHADER.strip().split("\n", 1)
+    # Validated only once the samplers are assigned to their texture units
+    program = compileProgram(
+        compileShader(LIGHTING_VERTEX_SHADER, GL_VERTEX_SHADER),
+        compileShader(f"{version}\n{defines}{body}", GL_FRAGMENT_SHADER),
+        validate=False,
+    )
+    glUseProgram(program)
+    glUniform1i(glGetUniformLocation(program, "color_map"), 0)
+    glUniform1i(glGetUniformLocation(program, "shadow_map"), 1)
+    glUseProgram(0)
+    try:
+        program.check_validate()
+    except RuntimeError:
+        glDeleteProgram(program)
+        raise
+    return program
+
+
+class ShadowMapper:
+    """Renders and applies the shadow map of the current light.
+
+    All methods require a current OpenGL context; the OpenGL objects are
+    created on the first update, which raises RuntimeError if the shadow
+    framebuffers are not supported.
+    """
+
+    def __init__(self, scene: SceneRenderer) -> None:
+        """Initialize the shadow mapper.
+
+        Args:
+            scene: Scene renderer drawing the shadow casting objects.
+        """
+        self.scene = scene
+        self.app_state = scene.app_state
+        self._programs: dict[LightType, int] = {}
+        self._distance_program = 0
+        self._fbo = 0
+        self._depth_texture = 0
+        self._cube_texture = 0
+        self._cube_depth_rb = 0
+        self._size = 0
+        self._key: Hashable = None
+        self._light_matrix = np.identity(4)
+        self._light_world = (0.0, 0.0, 0.0)
+        self._uniforms: dict[LightType, dict[str, int]] = {}
+        # Buffers reused by every frame
+        self._cube_views = np.tile(np.identity(4), (len(CUBE_FACES), 1, 1))
+        self._cube_views[:, :3, :3] = CUBE_FACE_ROTATIONS
+        self._eye_to_world = np.identity(4)
+        self._eye_to_world_of: np.ndarray | None = None
+        self._light_to_eye = np.identity(4)
+        self._eye_to_shadow = np.identity(4)
+        self._projection_gl = _matrix_buffer()
+        self._view_gl = _matrix_buffer()
+        self._uniform_gl = _matrix_buffer()
+
+    def _create_programs(self) -> None:
+        """Compile the shaders.
+
+        Raises:
+            RuntimeError: If a shader does not compile, link or validate.
+        """
+        programs: dict[LightType, int] = {}
+        try:
+            for light_type in LightType:
+                programs[light_type] = _lighting_program(light_type)
+            self._distance_program = compileProgram(
+                compileShader(DISTANCE_VERTEX_SHADER, GL_VERTEX_SHADER),
+                compileShader(DISTANCE_FRAGMENT_SHADER, GL_FRAGMENT_SHADER),
+            )
+        except RuntimeError:
+            # The next update starts over
+            for program in programs.values():
+                glDeleteProgram(program)
+            raise
+        self._programs = programs
+        self._uniforms = {
+            light_type: {name: glGetUniformLocation(program, name) for name in UNIFORMS}
+            for light_type, program in programs.items()
+        }
+        self._fbo = glGenFramebuffers(1)
+
+    def _allocate(self, size: int) -> None:
+        """(Re)allocate both shadow maps with the given resolution."""
+        self._delete_maps()
+        self._size = size
+
+        self._depth_texture = glGenTextures(1)
+        glBindTexture(GL_TEXTURE_2D, self._depth_texture)
+        glTexImage2D(GL_TEXTURE_2D, 0, GL_DEPTH_COMPONENT24, size, size, 0, GL_DEPTH_COMPONENT, GL_FLOAT, None)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_S, GL_CLAMP_TO_BORDER)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_T, GL_CLAMP_TO_BORDER)
+        glTexParameterfv(GL_TEXTURE_2D, GL_TEXTURE_BORDER_COLOR, (GLfloat * 4)(1.0, 1.0, 1.0, 1.0))
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_COMPARE_MODE, GL_COMPARE_REF_TO_TEXTURE)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_COMPARE_FUNC, GL_LEQUAL)
+        glBindTexture(GL_TEXTURE_2D, 0)
+
+        self._cube_texture = glGenTextures(1)
+        glBindTexture(GL_TEXTURE_CUBE_MAP, self._cube_texture)
+        for face in range(len(CUBE_FACES)):
+            glTexImage2D(GL_TEXTURE_CUBE_MAP_POSITIVE_X + face, 0, GL_R32F, size, size, 0, GL_RED, GL_FLOAT, None)
+        glTexParameteri(GL_TEXTURE_CUBE_MAP, GL_TEXTURE_MIN_FILTER, GL_NEAREST)
+        glTexParameteri(GL_TEXTURE_CUBE_MAP, GL_TEXTURE_MAG_FILTER, GL_NEAREST)
+        for wrap in (GL_TEXTURE_WRAP_S, GL_TEXTURE_WRAP_T, GL_TEXTURE_WRAP_R):
+            glTexParameteri(GL_TEXTURE_CUBE_MAP, wrap, GL_CLAMP_TO_EDGE)
+        glBindTexture(GL_TEXTURE_CUBE_MAP, 0)
+        self._cube_depth_rb = glGenRenderbuffers(1)
+        glBindRenderbuffer(GL_RENDERBUFFER, self._cube_depth_rb)
+        glRenderbufferStorage(GL_RENDERBUFFER, GL_DEPTH_COMPONENT24, size, size)
+        glBindRenderbuffer(GL_RENDERBUFFER, 0)
+
+        previous = int(glGetIntegerv(GL_FRAMEBUFFER_BINDING))
+        try:
+            glBindFramebuffer(GL_FRAMEBUFFER, self._fbo)
+            self._attach_depth_map()
+            _check_framebuffer("Directional shadow")
+            self._attach_cube_face(0)
+            _check_framebuffer("Point shadow")
+        finally:
+            glBindFramebuffer(GL_FRAMEBUFFER, previous)
+
+    def _attach_depth_map(self) -> None:
+        """Set up the bound framebuffer for the directional depth pass."""
+        glFramebufferTexture2D(GL_FRAMEBUFFER, GL_COLOR_ATTACHMENT0, GL_TEXTURE_2D, 0, 0)
+        glFramebufferRenderbuffer(GL_FRAMEBUFFER, GL_DEPTH_ATTACHMENT, GL_RENDERBUFFER, 0)
+        glFramebufferTexture2D(GL_FRAMEBUFFER, GL_DEPTH_ATTACHMENT, GL_TEXTURE_2D, self._depth_texture, 0)
+        glDrawBuffer(GL_NONE)
+        glReadBuffer(GL_NONE)
+
+    def _attach_cube_face(self, face: int) -> None:
+        """Set up the bound framebuffer for the distance pass of one cube face."""
+        glFramebufferTexture2D(GL_FRAMEBUFFER, GL_DEPTH_ATTACHMENT, GL_TEXTURE_2D, 0, 0)
+        glFramebufferRenderbuffer(GL_FRAMEBUFFER, GL_DEPTH_ATTACHMENT, GL_RENDERBUFFER, self._cube_depth_rb)
+        glFramebufferTexture2D(
+            GL_FRAMEBUFFER, GL_COLOR_ATTACHMENT0, GL_TEXTURE_CUBE_MAP_POSITIVE_X + face, self._cube_texture, 0
+        )
+        glDrawBuffer(GL_COLOR_ATTACHMENT0)
+        glReadBuffer(GL_COLOR_ATTACHMENT0)
+
+    def update(self) -> int:
+        """Re-render the shadow map of the current light if the light or the objects moved or changed.
+
+        Returns:
+            Number of passes rendered: 0 if the map was up to date, 1 for the
+            directional light and 6 for the point light.
+        """
+        state = self.app_state
+        matrices = self.scene.object_matrices()
+        is_point = state.light_type == LightType.POINT
+        light = state.light_position if is_point else state.light_direction
+        # The mesh version, not the path: a mesh loaded in the background replaces the cube later
+        key = (
+            state.light_type,
+            light,
+            state.shadow_map_size,
+            self.scene.mesh_manager.version,
+            self.scene.objects_version,
+        )
+        if key == self._key:
+            return 0
+
+        if not self._programs:
+            self._create_programs()
+        if self._size != state.shadow_map_size:
+            self._allocate(state.shadow_map_size)
+
+        bounds = self.scene.culler.bounds.transformed(matrices)
+        corners = _box_corners(bounds.box_min, bounds.box_max)
+        previous = int(glGetIntegerv(GL_FRAMEBUFFER_BINDING))
+        glPushAttrib(GL_ENABLE_BIT | GL_VIEWPORT_BIT | GL_COLOR_BUFFER_BIT | GL_POLYGON_BIT | GL_LIGHTING_BIT)
+        glMatrixMode(GL_PROJECTION)
+        glPushMatrix()
+        glMatrixMode(GL_MODELVIEW)
+        glPushMatrix()
+        try:
+            glBindFramebuffer(GL_FRAMEBUFFER, self._fbo)
+            glViewport(0, 0, self._size, self._size)
+            glEnable(GL_DEPTH_TEST)
+            glDisable(GL_LIGHTING)
+            if is_point:
+                passes = self._render_cube(np.asarray(light, dtype=np.float64), corners)
+            else:
+                passes = self._render_depth(light, corners)
+        finally:
+            glUseProgram(0)
+            glBindFramebuffer(GL_FRAMEBUFFER, previous)
+            glMatrixMode(GL_PROJECTION)
+            glPopMatrix()
+            glMatrixMode(GL_MODELVIEW)
+            glPopMatrix()
+            glPopAttrib()
+        self._key = key
+        return passes
+
+    def _draw_casters(self, projection: np.ndarray, view: np.ndarray) -> None:
+        """Draw the geometry of all objects with the given light matrices."""
+        glMatrixMode(GL_PROJECTION)
+        glLoadMatrixf(_gl_matrix(projection, self._projection_gl))
+        glMatrixMode(GL_MODELVIEW)
+        glLoadMatrixf(_gl_matrix(view, self._view_gl))
+        for obj in SceneObject:
+            self.scene.draw_object(obj, shaded=False)
+
+    def _render_depth(self, direction: tuple[float, float, float], corners: np.ndarray) -> int:
+        """Render the directional light depth map."""
+        self._light_matrix = directional_light_matrix(direction, corners)
+        self._attach_depth_map()
+        glClear(GL_DEPTH_BUFFER_BIT)
+        glEnable(GL_POLYGON_OFFSET_FILL)
+        glPolygonOffset(*POLYGON_OFFSET)
+        self._draw_casters(self._light_matrix, np.identity(4))
+        return 1
+
+    def _render_cube(self, light: np.ndarray, corners: np.ndarray) -> int:
+        """Render the point light distance cube map."""
+        self._light_world = (float(light[0]), float(light[1]), float(light[2]))
+        # Each face looks from the light along its axis: the rotation is fixed, the translation moves the light
+        self._cube_views[:, :3, 3] = -(CUBE_FACE_ROTATIONS @ light)
+        far = float(np.linalg.norm(corners - light, axis=1).max()) + DEPTH_MARGIN
+        projection = frustum_matrix(
+            -POINT_NEAR_PLANE, POINT_NEAR_PLANE, -POINT_NEAR_PLANE, POINT_NEAR_PLANE, POINT_NEAR_PLANE, far
+        )
+        glUseProgram(self._distance_program)
+        glClearColor(far, far, far, far)
+        for face, view in enumerate(self._cube_views):
+            self._attach_cube_face(face)
+            glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
+            self._draw_casters(projection, view)
+        return len(CUBE_FACES)
+
+    def begin(self, view: np.ndarray) -> None:
+        """Bind the shadow map and the lighting shader for drawing shadowed objects.
+
+        Args:
+            view: World-to-eye matrix of the camera the objects are drawn with.
+        """
+        state = self.app_state
+        glUseProgram(self._programs[state.light_type])
+        uniforms = self._uniforms[state.light_type]
+        glUniform1i(uniforms["two_side"], int(state.light_model_two_side))
+        glUniform1i(uniforms["local_viewer"], int(state.light_model_local_viewer))
+        glUniform1i(uniforms["textured"], 0)
+        # The camera returns the same array until it moves
+        if view is not self._eye_to_world_of:
+            self._eye_to_world[...] = np.linalg.inv(view.astype(np.float64))
+            self._eye_to_world_of = view
+        glActiveTexture(GL_TEXTURE1)
+        if state.light_type == LightType.POINT:
+            glBindTexture(GL_TEXTURE_CUBE_MAP, self._cube_texture)
+            glUniformMatrix4fv(uniforms["eye_to_world"], 1, False, _gl_matrix(self._eye_to_world, self._uniform_gl))
+            glUniform3f(uniforms["light_world"], *self._light_world)
+            glUniform1f(uniforms["distance_bias"], DISTANCE_BIAS)
+        else:
+            glBindTexture(GL_TEXTURE_2D, self._depth_texture)
+            np.matmul(self._light_matrix, self._eye_to_world, out=self._light_to_eye)
+            np.matmul(TEXTURE_BIAS, self._light_to_eye, out=self._eye_to_shadow)
+            glUniformMatrix4fv(uniforms["eye_to_shadow"], 1, False, _gl_matrix(self._eye_to_shadow, self._uniform_gl))
+        glActiveTexture(GL_TEXTURE0)
+
+    def set_textured(self, textured: bool) -> None:
+        """Tell the shader whether the object being drawn uses the texture on unit 0."""
+        glUniform1i(self._uniforms[self.app_state.light_type]["textured"], int(textured))
+
+    def end(self) -> None:
+        """Unbind the shadow map and return to the fixed-function pipeline."""
+        glUseProgram(0)
+        glActiveTexture(GL_TEXTURE1)
+        glBindTexture(GL_TEXTURE_2D, 0)
+        glBindTexture(GL_TEXTURE_CUBE_MAP, 0)
+        glActiveTexture(GL_TEXTURE0)
+
+    def _delete_maps(self) -> None:
+        """Free the shadow map textures."""
+        if self._size:
+            glDeleteTextures(2, [self._depth_texture, self._cube_texture])
+            glDeleteRenderbuffers(1, [self._cube_depth_rb])
+            self._size = 0
+        self._key = None
+
+    def delete(self) -> None:
+        """Free the OpenGL objects."""
+        self._delete_maps()
+        if self._programs:
+            for program in (*self._programs.values(), self._distance_program):
+                glDeleteProgram(program)
+            glDeleteFramebuffers(1, [self._fbo])
+            self._programs.clear()
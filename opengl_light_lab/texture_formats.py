@@ -0,0 +1,637 @@
+"""Block-compressed texture formats and their DDS and KTX2 containers.
+
+Block compression stores every 4x4 texel block in a fixed number of bytes
+that the GPU samples directly: BC1 uses 8 bytes per block (0.5 byte per
+texel, 6x smaller than RGB8), BC3 16 bytes (RGBA, 4x smaller than RGBA8).
+This module provides:
+
+- vectorized NumPy encoders (BC1 to BC5) and decoders of all formats but
+  BC6H and BC7, used by the offline pipeline (``compress-texture``) and as a
+  fallback on contexts without the compression extension,
+- readers and writers of DDS and KTX2 files holding a mipmap chain,
+- upload of compressed textures, or of their decoded RGBA8 texels if the
+  current context does not support the format.
+
+Compressed data is stored top-down, as in both containers; flipping it to
+the bottom-up row order of OpenGL would need decoding, so textures uploaded
+compressed report ``top_down`` and the texture coordinates are flipped instead.
+"""
+
+from __future__ import annotations
+
+import argparse
+import struct
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+from OpenGL.GL import (  # type: ignore
+    GL_COMPRESSED_RED_RGTC1,
+    GL_COMPRESSED_RG_RGTC2,
+    GL_COMPRESSED_RGB_BPTC_UNSIGNED_FLOAT,
+    GL_COMPRESSED_RGBA_BPTC_UNORM,
+    GL_EXTENSIONS,
+    GL_TEXTURE_2D,
+    GL_TEXTURE_MAX_LEVEL,
+    glCompressedTexImage2D,
+    glGetString,
+    glTexParameteri,
+)
+from OpenGL.GL.EXT.texture_compression_s3tc import (  # type: ignore
+    GL_COMPRESSED_RGB_S3TC_DXT1_EXT,
+    GL_COMPRESSED_RGBA_S3TC_DXT3_EXT,
+    GL_COMPRESSED_RGBA_S3TC_DXT5_EXT,
+)
+from PIL import Image
+
+BLOCK = 4
+"""Edge of a compressed block in texels."""
+COMPRESSED_SUFFIXES = (".dds", ".ktx2")
+
+
+@dataclass(frozen=True)
+class BlockFormat:
+    """A block compression format.
+
+    Attributes:
+        name: Format name, e.g. ``"BC1"``.
+        block_bytes: Size of a 4x4 block in bytes.
+        gl_format: OpenGL internal format of the compressed texture.
+        extension: OpenGL extension required to upload the format.
+        channels: Number of meaningful channels (decoded texels always have 4).
+    """
+
+    name: str
+    block_bytes: int
+    gl_format: int
+    extension: str
+    channels: int
+
+    def level_size(self, width: int, height: int) -> int:
+        """Return the size in bytes of an image of the given size."""
+        return -(-width // BLOCK) * -(-height // BLOCK) * self.block_bytes
+
+
+S3TC, RGTC, BPTC = (
+    "GL_EXT_texture_compression_s3tc",
+    "GL_ARB_texture_compression_rgtc",
+    "GL_ARB_texture_compression_bptc",
+)
+FORMATS = {
+    f.name: f
+    for f in (
+        BlockFormat("BC1", 8, GL_COMPRESSED_RGB_S3TC_DXT1_EXT, S3TC, 3),
+        BlockFormat("BC2", 16, GL_COMPRESSED_RGBA_S3TC_DXT3_EXT, S3TC, 4),
+        BlockFormat("BC3", 16, GL_COMPRESSED_RGBA_S3TC_DXT5_EXT, S3TC, 4),
+        BlockFormat("BC4", 8, GL_COMPRESSED_RED_RGTC1, RGTC, 1),
+        BlockFormat("BC5", 16, GL_COMPRESSED_RG_RGTC2, RGTC, 2),
+        BlockFormat("BC6H", 16, GL_COMPRESSED_RGB_BPTC_UNSIGNED_FLOAT, BPTC, 3),
+        BlockFormat("BC7", 16, GL_COMPRESSED_RGBA_BPTC_UNORM, BPTC, 4),
+    )
+}
+"""Supported block formats by name."""
+ENCODABLE = ("BC1", "BC2", "BC3", "BC4", "BC5")
+"""Formats the CPU encoder and decoder support."""
+
+
+@dataclass
+class CompressedTexture:
+    """A block-compressed image with its mipmap chain.
+
+    Attributes:
+        format: Block format of all levels.
+        width: Width of the base level in texels.
+        height: Height of the base level in texels.
+        levels: Compressed data of each level, base level first, rows top-down.
+    """
+
+    format: BlockFormat
+    width: int
+    height: int
+    levels: list[bytes]
+
+    def level_dimensions(self, level: int) -> tuple[int, int]:
+        """Return the width and height of a mipmap level."""
+        return max(self.width >> level, 1), max(self.height >> level, 1)
+
+    @property
+    def nbytes(self) -> int:
+        """Return the total size of the compressed data."""
+        return sum(len(data) for data in self.levels)
+
+
+# Encoding
+
+
+def _to_blocks(image: np.ndarray) -> np.ndarray:
+    """Split an image into 4x4 blocks, shape (blocks, 16, channels), padding by edge replication."""
+    height, width = image.shape[:2]
+    padded = np.pad(image, ((0, -height % BLOCK), (0, -width % BLOCK), (0, 0)), mode="edge")
+    rows, columns = padded.shape[0] // BLOCK, padded.shape[1] // BLOCK
+    blocks = padded.reshape(rows, BLOCK, columns, BLOCK, -1).swapaxes(1, 2)
+    return blocks.reshape(rows * columns, BLOCK * BLOCK, -1).astype(np.float32)
+
+
+def _from_blocks(texels: np.ndarray, width: int, height: int) -> np.ndarray:
+    """Assemble decoded blocks of shape (blocks, 16, channels) into an image of the given size."""
+    rows, columns = -(-height // BLOCK), -(-width // BLOCK)
+    image = texels.reshape(rows, columns, BLOCK, BLOCK, -1).swapaxes(1, 2)
+    return image.reshape(rows * BLOCK, columns * BLOCK, -1)[:height, :width]
+
+
+def _pack_565(rgb: np.ndarray) -> np.ndarray:
+    """Quantize RGB colors in [0, 255] to RGB565 integers."""
+    r, g, b = (
+        np.rint(np.clip(rgb[..., i], 0, 255) * scale / 255).astype(np.uint16) for i, scale in enumerate((31, 63, 31))
+    )
+    return (r << 11) | (g << 5) | b
+
+
+def _unpack_565(color: np.ndarray) -> np.ndarray:
+    """Expand RGB565 integers to RGB colors in [0, 255]."""
+    color = color.astype(np.int32)
+    r, g, b = (color >> 11) & 31, (color >> 5) & 63, color & 31
+    return np.stack([(r << 3) | (r >> 2), (g << 2) | (g >> 4), (b << 3) | (b >> 2)], axis=-1).astype(np.float32)
+
+
+def _nearest(values: np.ndarray, palette: np.ndarray) -> np.ndarray:
+    """Return the index of the nearest palette entry of every texel.
+
+    Args:
+        values: Texels of shape (blocks, 16, channels).
+        palette: Palettes of shape (blocks, entries, channels).
+    """
+    distance = ((values[:, :, None, :] - palette[:, None, :, :]) ** 2).sum(axis=-1)
+    return distance.argmin(axis=-1).astype(np.uint64)
+
+
+def _pack_indices(indices: np.ndarray, bits: int) -> np.ndarray:
+    """Pack the 16 indices of every block into one integer, first texel in the lowest bits."""
+    shifts = np.arange(BLOCK * BLOCK, dtype=np.uint64) * np.uint64(bits)
+    return np.bitwise_or.reduce(indices << shifts, axis=1)
+
+
+def _encode_color(rgb: np.ndarray) -> np.ndarray:
+    """Encode BC1 color blocks in four-color mode, shape (blocks,) of 64-bit integers.
+
+    The endpoints are the extremes of the texels along the principal axis of
+    the block colors, found by power iteration on their covariance.
+    """
+    mean = rgb.mean(axis=1, keepdims=True)
+    centered = rgb - mean
+    covariance = np.einsum("nki,nkj->nij", centered, centered)
+    axis = np.ones((len(rgb), 3), dtype=np.float32)
+    for _ in range(8):
+        axis = np.einsum("nij,nj->ni", covariance, axis)
+        axis /= np.maximum(np.linalg.norm(axis, axis=1, keepdims=True), 1e-12)
+    projection = np.einsum("nki,ni->nk", centered, axis)
+    high = mean[:, 0] + axis * projection.max(axis=1, keepdims=True)
+    low = mean[:, 0] + axis * projection.min(axis=1, keepdims=True)
+
+    color0, color1 = _pack_565(high), _pack_565(low)
+    swap = color0 < color1
+    color0, color1 = np.where(swap, color1, color0), np.where(swap, color0, color1)
+    end0, end1 = _unpack_565(color0), _unpack_565(color1)
+    palette = np.stack([end0, end1, (2 * end0 + end1) / 3, (end0 + 2 * end1) / 3], axis=1)
+    indices = _nearest(rgb, palette)
+    # Equal endpoints select the three-color mode of BC1, whose index 3 is black
+    indices[color0 == color1] = 0
+    return (
+        color0.astype(np.uint64)
+        | (color1.astype(np.uint64) << np.uint64(16))
+        | (_pack_indices(indices, 2) << np.uint64(32))
+    )
+
+
+def _encode_alpha(alpha: np.ndarray) -> np.ndarray:
+    """Encode BC4 blocks of a single channel in eight-value mode, shape (blocks,) of 64-bit integers."""
+    high, low = np.rint(alpha.max(axis=1)), np.rint(alpha.min(axis=1))
+    weights = np.array([0, 7, 1, 2, 3, 4, 5, 6], dtype=np.float32) / 7
+    palette = high[:, None] + (low - high)[:, None] * weights[None, :]
+    indices = _nearest(alpha[..., None], palette[..., None])
+    indices[high == low] = 0
+    return (
+        high.astype(np.uint64) | (low.astype(np.uint64) << np.uint64(8)) | (_pack_indices(indices, 3) << np.uint64(16))
+    )
+
+
+def _encode_explicit_alpha(alpha: np.ndarray) -> np.ndarray:
+    """Encode BC2 alpha blocks of 4-bit values, shape (blocks,) of 64-bit integers."""
+    return _pack_indices(np.rint(alpha * 15 / 255).astype(np.uint64), 4)
+
+
+def encode(image: np.ndarray, format_name: str) -> bytes:
+    """Compress an image.
+
+    Args:
+        image: Top-down uint8 image of shape (height, width, channels); grayscale,
+            RGB or RGBA. Missing channels read as opaque white.
+        format_name: One of ENCODABLE.
+
+    Returns:
+        The compressed blocks, rows of blocks top-down.
+
+    Raises:
+        ValueError: If the format has no CPU encoder.
+    """
+    if image.ndim == 2:
+        image = image[..., None]
+    rgba = np.full((*image.shape[:2], 4), 255, dtype=np.uint8)
+    if image.shape[2] <= 2:
+        # Luminance, with alpha if present
+        rgba[..., :3] = image[..., :1]
+        rgba[..., 3:] = image[..., 1:]
+    else:
+        rgba[..., : image.shape[2]] = image[..., :4]
+    blocks = _to_blocks(rgba)
+    if format_name == "BC1":
+        words = [_encode_color(blocks[..., :3])]
+    elif format_name == "BC2":
+        words = [_encode_explicit_alpha(blocks[..., 3]), _encode_color(blocks[..., :3])]
+    elif format_name == "BC3":
+        words = [_encode_alpha(blocks[..., 3]), _encode_color(blocks[..., :3])]
+    elif format_name == "BC4":
+        words = [_encode_alpha(blocks[..., 0])]
+    elif format_name == "BC5":
+        words = [_encode_alpha(blocks[..., 0]), _encode_alpha(blocks[..., 1])]
+    else:
+        msg = f"No CPU encoder for {format_name}; supported: {', '.join(ENCODABLE)}"
+        raise ValueError(msg)
+    return np.stack(words, axis=1).astype("<u8").tobytes()
+
+
+def _downsample(image: np.ndarray) -> np.ndarray:
+    """Return the next mipmap level of an image, with the floor of half its size, box filtered."""
+    height, width, channels = image.shape
+    size = (max(width // 2, 1), max(height // 2, 1))
+    halved = Image.fromarray(image[..., 0] if channels == 1 else image).resize(size, Image.Resampling.BOX)
+    return np.asarray(halved).reshape(size[1], size[0], channels)
+
+
+def compress(image: np.ndarray, format_name: str, *, mipmaps: bool = True) -> CompressedTexture:
+    """Compress an image and, optionally, its full mipmap chain.
+
+    Args:
+        image: Top-down uint8 image of shape (height, width, channels).
+        format_name: One of ENCODABLE.
+        mipmaps: Whether to add the downsampled levels down to 1x1.
+
+    Returns:
+        The compressed texture; unsupported formats raise ValueError.
+    """
+    if image.ndim == 2:
+        image = image[..., None]
+    height, width = image.shape[:2]
+    levels = [encode(image, format_name)]
+    while mipmaps and image.shape[:2] != (1, 1):
+        image = _downsample(image)
+        levels.append(encode(image, format_name))
+    return CompressedTexture(FORMATS[format_name], width, height, levels)
+
+
+# Decoding
+
+
+def _decode_color(words: np.ndarray, *, three_color_mode: bool) -> np.ndarray:
+    """Decode BC1 color blocks, shape (blocks, 16, 3)."""
+    color0, color1 = (words & 0xFFFF).astype(np.uint16), ((words >> np.uint64(16)) & 0xFFFF).astype(np.uint16)
+    end0, end1 = _unpack_565(color0), _unpack_565(color1)
+    four = np.stack([end0, end1, (2 * end0 + end1) / 3, (end0 + 2 * end1) / 3], axis=1)
+    if three_color_mode:
+        three = np.stack([end0, end1, (end0 + end1) / 2, np.zeros_like(end0)], axis=1)
+        four = np.where((color0 <= color1)[:, None, None], three, four)
+    shifts = np.arange(BLOCK * BLOCK, dtype=np.uint64) * np.uint64(2) + np.uint64(32)
+    indices = ((words[:, None] >> shifts) & np.uint64(3)).astype(np.intp)
+    return np.take_along_axis(four, indices[..., None], axis=1)
+
+
+def _decode_alpha(words: np.ndarray) -> np.ndarray:
+    """Decode BC4 blocks of a single channel, shape (blocks, 16)."""
+    high = (words & 0xFF).astype(np.float32)
+    low = ((words >> np.uint64(8)) & 0xFF).astype(np.float32)
+    eight = high[:, None] + (low - high)[:, None] * (np.array([0, 7, 1, 2, 3, 4, 5, 6], dtype=np.float32) / 7)
+    six = high[:, None] + (low - high)[:, None] * (np.array([0, 5, 1, 2, 3, 4, 0, 0], dtype=np.float32) / 5)
+    six[:, 6], six[:, 7] = 0.0, 255.0
+    palette = np.where((high > low)[:, None], eight, six)
+    shifts = np.arange(BLOCK * BLOCK, dtype=np.uint64) * np.uint64(3) + np.uint64(16)
+    indices = ((words[:, None] >> shifts) & np.uint64(7)).astype(np.intp)
+    return np.take_along_axis(palette, indices, axis=1)
+
+
+def decode(format_name: str, data: bytes, width: int, height: int) -> np.ndarray:
+    """Decompress an image.
+
+    Args:
+        format_name: One of ENCODABLE.
+        data: Compressed blocks, rows of blocks top-down.
+        width: Image width in texels.
+        height: Image height in texels.
+
+    Returns:
+        Top-down RGBA uint8 image of shape (height, width, 4).
+
+    Raises:
+        ValueError: If the format has no CPU decoder.
+    """
+    if format_name not in ENCODABLE:
+        msg = f"No CPU decoder for {format_name}; supported: {', '.join(ENCODABLE)}"
+        raise ValueError(msg)
+    fmt = FORMATS[format_name]
+    words = np.frombuffer(data, dtype="<u8", count=fmt.level_size(width, height) // 8)
+    words = words.reshape(-1, fmt.block_bytes // 8).astype(np.uint64)
+    texels = np.full((len(words), BLOCK * BLOCK, 4), 255.0, dtype=np.float32)
+    if format_name == "BC1":
+        texels[..., :3] = _decode_color(words[:, 0], three_color_mode=True)
+    elif format_name in {"BC2", "BC3"}:
+        texels[..., :3] = _decode_color(words[:, 1], three_color_mode=False)
+        if format_name == "BC2":
+            shifts = np.arange(BLOCK * BLOCK, dtype=np.uint64) * np.uint64(4)
+            texels[..., 3] = ((words[:, :1] >> shifts) & np.uint64(15)).astype(np.float32) * 17
+        else:
+            texels[..., 3] = _decode_alpha(words[:, 0])
+    else:
+        texels[..., 0] = _decode_alpha(words[:, 0])
+        texels[..., 1] = _decode_alpha(words[:, 1]) if format_name == "BC5" else 0.0
+        texels[..., 2] = 0.0
+    return _from_blocks(np.rint(texels).astype(np.uint8), width, height)
+
+
+# DDS container
+
+DDS_MAGIC = b"DDS "
+_DDS_HEADER = struct.Struct("<7I44x8I5I")
+_DDS_DX10_HEADER = struct.Struct("<5I")
+_DDSD_REQUIRED, _DDSD_MIPMAPCOUNT, _DDSD_LINEARSIZE = 0x1007, 0x20000, 0x80000
+_DDPF_FOURCC = 0x4
+_DDSCAPS_TEXTURE, _DDSCAPS_COMPLEX, _DDSCAPS_MIPMAP = 0x1000, 0x8, 0x400000
+_DDS_FOURCC = {"BC1": b"DXT1", "BC2": b"DXT3", "BC3": b"DXT5", "BC4": b"ATI1", "BC5": b"ATI2"}
+_DDS_FOURCC_ALIASES = {b"BC4U": "BC4", b"BC5U": "BC5"}
+_DXGI_FORMATS = {
+    71: "BC1", 72: "BC1", 74: "BC2", 75: "BC2", 77: "BC3", 78: "BC3", 80: "BC4", 83: "BC5",
+    95: "BC6H", 98: "BC7", 99: "BC7",
+}  # fmt: skip
+_DXGI_CODES = {"BC1": 71, "BC2": 74, "BC3": 77, "BC4": 80, "BC5": 83, "BC6H": 95, "BC7": 98}
+
+
+def _split_levels(fmt: BlockFormat, width: int, height: int, count: int, data: bytes) -> list[bytes]:
+    """Split consecutive mipmap levels, base level first.
+
+    Raises:
+        ValueError: If the data is shorter than the levels.
+    """
+    levels, offset = [], 0
+    for level in range(count):
+        size = fmt.level_size(max(width >> level, 1), max(height >> level, 1))
+        if offset + size > len(data):
+            msg = f"Truncated texture data: level {level} needs {size} bytes at offset {offset} of {len(data)}"
+            raise ValueError(msg)
+        levels.append(data[offset : offset + size])
+        offset += size
+    return levels
+
+
+def read_dds(data: bytes) -> CompressedTexture:
+    """Parse a block-compressed DDS file.
+
+    Args:
+        data: Content of the file.
+
+    Raises:
+        ValueError: If the data is not a DDS file of a supported block format.
+    """
+    if data[:4] != DDS_MAGIC or len(data) < 4 + _DDS_HEADER.size:
+        msg = "Not a DDS file"
+        raise ValueError(msg)
+    fields = _DDS_HEADER.unpack_from(data, 4)
+    height, width, mipmap_count = fields[2], fields[3], fields[6]
+    pixel_flags, four_cc = fields[8], struct.pack("<I", fields[9])
+    offset = 4 + _DDS_HEADER.size
+    if not pixel_flags & _DDPF_FOURCC:
+        msg = "Uncompressed DDS files are not supported"
+        raise ValueError(msg)
+    if four_cc == b"DX10":
+        dxgi_format = _DDS_DX10_HEADER.unpack_from(data, offset)[0]
+        offset += _DDS_DX10_HEADER.size
+        name = _DXGI_FORMATS.get(dxgi_format)
+    else:
+        name = {v: k for k, v in _DDS_FOURCC.items()}.get(four_cc) or _DDS_FOURCC_ALIASES.get(four_cc)
+    if name is None:
+        msg = f"Unsupported DDS format {four_cc!r}" + (f" (DXGI {dxgi_format})" if four_cc == b"DX10" else "")
+        raise ValueError(msg)
+    fmt = FORMATS[name]
+    levels = _split_levels(fmt, width, height, max(mipmap_count, 1), data[offset:])
+    return CompressedTexture(fmt, width, height, levels)
+
+
+def write_dds(texture: CompressedTexture) -> bytes:
+    """Serialize a texture as a DDS file; BC6H and BC7 use the DX10 header extension.
+
+    Args:
+        texture: The texture to write.
+    """
+    fmt = texture.format
+    four_cc = _DDS_FOURCC.get(fmt.name, b"DX10")
+    mipmapped = len(texture.levels) > 1
+    header = _DDS_HEADER.pack(
+        124,
+        _DDSD_REQUIRED | _DDSD_LINEARSIZE | (_DDSD_MIPMAPCOUNT if mipmapped else 0),
+        texture.height,
+        texture.width,
+        len(texture.levels[0]),
+        0,
+        len(texture.levels),
+        32,
+        _DDPF_FOURCC,
+        struct.unpack("<I", four_cc)[0],
+        *([0] * 5),
+        _DDSCAPS_TEXTURE | ((_DDSCAPS_COMPLEX | _DDSCAPS_MIPMAP) if mipmapped else 0),
+        *([0] * 4),
+    )
+    extension = _DDS_DX10_HEADER.pack(_DXGI_CODES[fmt.name], 3, 0, 1, 0) if four_cc == b"DX10" else b""
+    return DDS_MAGIC + header + extension + b"".join(texture.levels)
+
+
+# KTX2 container
+
+KTX2_IDENTIFIER = b"\xabKTX 20\xbb\r\n\x1a\n"
+_KTX2_HEADER = struct.Struct("<9I4I2Q")
+_KTX2_LEVEL = struct.Struct("<3Q")
+_VK_FORMATS = {
+    131: "BC1", 132: "BC1", 133: "BC1", 134: "BC1", 135: "BC2", 136: "BC2", 137: "BC3", 138: "BC3",
+    139: "BC4", 141: "BC5", 143: "BC6H", 145: "BC7", 146: "BC7",
+}  # fmt: skip
+_VK_CODES = {"BC1": 131, "BC2": 135, "BC3": 137, "BC4": 139, "BC5": 141, "BC6H": 143, "BC7": 145}
+# Data format descriptor: color model and (channel, bit offset, bit length) of every sample
+_KTX2_DFD_MODELS = {
+    "BC1": (128, ((0, 0, 64),)),
+    "BC2": (129, ((15, 0, 64), (0, 64, 64))),
+    "BC3": (130, ((15, 0, 64), (0, 64, 64))),
+    "BC4": (131, ((0, 0, 64),)),
+    "BC5": (132, ((0, 0, 64), (1, 64, 64))),
+    "BC7": (134, ((0, 0, 128),)),
+}
+
+
+def read_ktx2(data: bytes) -> CompressedTexture:
+    """Parse a block-compressed, non-supercompressed 2D KTX2 file.
+
+    Args:
+        data: Content of the file.
+
+    Raises:
+        ValueError: If the data is not a KTX2 file of a supported block format.
+    """
+    if data[:12] != KTX2_IDENTIFIER or len(data) < 12 + _KTX2_HEADER.size:
+        msg = "Not a KTX2 file"
+        raise ValueError(msg)
+    vk_format, _, width, height, depth, layers, faces, level_count, supercompression = _KTX2_HEADER.unpack_from(
+        data, 12
+    )[:9]
+    name = _VK_FORMATS.get(vk_format)
+    if name is None:
+        msg = f"Unsupported KTX2 format (VkFormat {vk_format})"
+        raise ValueError(msg)
+    if supercompression or depth or layers or faces != 1:
+        msg = "Only non-supercompressed 2D KTX2 textures are supported"
+        raise ValueError(msg)
+    level_index = 12 + _KTX2_HEADER.size
+    levels = [
+        data[offset : offset + length]
+        for offset, length, _ in _KTX2_LEVEL.iter_unpack(
+            data[level_index : level_index + max(level_count, 1) * _KTX2_LEVEL.size]
+        )
+    ]
+    fmt = FORMATS[name]
+    texture = CompressedTexture(fmt, width, height, levels)
+    for level, level_data in enumerate(levels):
+        if len(level_data) != fmt.level_size(*texture.level_dimensions(level)):
+            msg = f"Truncated KTX2 level {level}"
+            raise ValueError(msg)
+    return texture
+
+
+def _ktx2_descriptor(fmt: BlockFormat) -> bytes:
+    """Return the data format descriptor of a block format.
+
+    Raises:
+        ValueError: If the format has no descriptor.
+    """
+    if fmt.name not in _KTX2_DFD_MODELS:
+        msg = f"Writing {fmt.name} to KTX2 is not supported"
+        raise ValueError(msg)
+    model, samples = _KTX2_DFD_MODELS[fmt.name]
+    block_size = 24 + 16 * len(samples)
+    # Basic descriptor block: version 2, BT.709 primaries, linear transfer, 4x4x1x1 texel blocks
+    words = [0, 2 | (block_size << 16), model | (1 << 8) | (1 << 16), 3 | (3 << 8), fmt.block_bytes, 0]
+    for channel, bit_offset, bit_length in samples:
+        words += [bit_offset | ((bit_length - 1) << 16) | (channel << 24), 0, 0, 0xFFFFFFFF]
+    return struct.pack(f"<{1 + len(words)}I", 4 + block_size, *words)
+
+
+def write_ktx2(texture: CompressedTexture) -> bytes:
+    """Serialize a texture as a KTX2 file; levels are stored smallest first, as the format requires.
+
+    Args:
+        texture: The texture to write; BC6H is not supported.
+    """
+    fmt = texture.format
+    descriptor = _ktx2_descriptor(fmt)
+    level_index_offset = 12 + _KTX2_HEADER.size
+    descriptor_offset = level_index_offset + len(texture.levels) * _KTX2_LEVEL.size
+    offset = descriptor_offset + len(descriptor)
+    chunks, entries = [descriptor], [b""] * len(texture.levels)
+    for level in reversed(range(len(texture.levels))):
+        padding = -offset % fmt.block_bytes
+        chunks.append(b"\0" * padding)
+        offset += padding
+        data = texture.levels[level]
+        entries[level] = _KTX2_LEVEL.pack(offset, len(data), len(data))
+        chunks.append(data)
+        offset += len(data)
+    header = _KTX2_HEADER.pack(
+        _VK_CODES[fmt.name],
+        1,
+        texture.width,
+        texture.height,
+        0,
+        0,
+        1,
+        len(texture.levels),
+        0,
+        descriptor_offset,
+        len(descriptor),
+        0,
+        0,
+        0,
+        0,
+    )
+    return KTX2_IDENTIFIER + header + b"".join(entries) + b"".join(chunks)
+
+
+def load(path: Path) -> CompressedTexture:
+    """Read a DDS or KTX2 file; invalid files raise ValueError.
+
+    Args:
+        path: Path of the file.
+    """
+    data = path.read_bytes()
+    return read_ktx2(data) if data.startswith(KTX2_IDENTIFIER) else read_dds(data)
+
+
+def save(path: Path, texture: CompressedTexture) -> None:
+    """Write a texture to a ``.dds`` or ``.ktx2`` file, chosen by the suffix.
+
+    Args:
+        path: Path of the file.
+        texture: The texture to write.
+    """
+    path.write_bytes(write_ktx2(texture) if path.suffix.lower() == ".ktx2" else write_dds(texture))
+
+
+# Upload
+
+
+def supported_formats() -> set[str]:
+    """Return the names of the block formats the current context can sample."""
+    extensions = set((glGetString(GL_EXTENSIONS) or b"").decode(errors="replace").split())
+    return {name for name, fmt in FORMATS.items() if fmt.extension in extensions}
+
+
+def upload(texture: CompressedTexture) -> None:
+    """Upload the levels of a compressed texture into the bound GL_TEXTURE_2D.
+
+    Args:
+        texture: The texture; its format must be in supported_formats().
+    """
+    for level, data in enumerate(texture.levels):
+        width, height = texture.level_dimensions(level)
+        glCompressedTexImage2D(GL_TEXTURE_2D, level, texture.format.gl_format, width, height, 0, data)
+    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAX_LEVEL, len(texture.levels) - 1)
+
+
+def main() -> None:
+    """Compress an image into a DDS or KTX2 texture."""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("input", type=Path, help="image readable by Pillow, or a DDS/KTX2 texture to convert")
+    parser.add_argument("output", type=Path, help="output file, .dds or .ktx2")
+    parser.add_argument("--format", choices=ENCODABLE, default=None, help="default: BC3 with alpha, BC1 without")
+    parser.add_argument("--no-mipmaps", action="store_true", help="store the base level only")
+    args = parser.parse_args()
+
+    if args.input.suffix.lower() in COMPRESSED_SUFFIXES:
+        texture = load(args.input)
+    else:
+        with Image.open(args.input) as image:
+            alpha = "A" in image.getbands()
+            pixels = np.asarray(image.convert("RGBA" if alpha else "RGB"))
+        texture = compress(pixels, args.format or ("BC3" if alpha else "BC1"), mipmaps=not args.no_mipmaps)
+    save(args.output, texture)
+    raw = texture.width * texture.height * 4
+    print(
+        f"{args.output}: {texture.format.name} {texture.width}x{texture.height}, {len(texture.levels)} levels, "
+        f"{texture.nbytes} bytes ({raw / texture.nbytes:.1f}x smaller than the RGBA8 base level)"
+    )
+
+
+if __name__ == "__main__":
+    main()
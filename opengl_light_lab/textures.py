@@ -2,28 +2,51 @@
 
 from pathlib import Path
 
+import numpy as np
 from OpenGL.GL import (  # type: ignore
     GL_LINEAR,
+    GL_LINEAR_MIPMAP_LINEAR,
     GL_RGB,
+    GL_RGBA,
     GL_TEXTURE_2D,
     GL_TEXTURE_MAG_FILTER,
     GL_TEXTURE_MIN_FILTER,
+    GL_UNPACK_ALIGNMENT,
     GL_UNSIGNED_BYTE,
     glBindTexture,
     glDeleteTextures,
     glGenTextures,
+    glPixelStorei,
     glTexImage2D,
     glTexParameteri,
 )
 from PIL import Image
 
+from opengl_light_lab.procedural_textures import generate, is_procedural
+from opengl_light_lab.texture_formats import (
+    COMPRESSED_SUFFIXES,
+    CompressedTexture,
+    decode,
+    load,
+    supported_formats,
+    upload,
+)
+
 
 class TextureManager:
     """Manages OpenGL texture loading and lifecycle."""
 
-    def __init__(self) -> None:
+    def __init__(self, compressed_formats: set[str] | None = None) -> None:
+        """Initialize the manager without loading a texture.
+
+        Args:
+            compressed_formats: Block formats uploaded compressed; defaults to
+                those the context supports. Others are decoded to RGBA8.
+        """
         self._texture_id: int | None = None
         self._loaded_path: str | None = None
+        self._top_down = False
+        self.compressed_formats = compressed_formats
 
     @property
     def texture_id(self) -> int | None:
@@ -35,11 +58,18 @@ class TextureManager:
         """Return True if a texture is currently loaded."""
         return self._texture_id is not None
 
+    @property
+    def top_down(self) -> bool:
+        """Return True if the texture rows are stored top row first, so the t coordinate must be flipped."""
+        return self._top_down
+
     def load_if_changed(self, texture_path: str | None) -> bool:
         """Load texture if the path has changed.
 
         Args:
-            texture_path: Path to texture file, or None to unload.
+            texture_path: Path to an image file, a DDS or KTX2 texture (see
+                texture_formats), a procedural texture URI (see
+                procedural_textures), or None to unload.
 
         Returns:
             True if texture was loaded/changed, False otherwise.
@@ -53,12 +83,17 @@ class TextureManager:
         if texture_path is None:
             return True
 
-        path = Path(texture_path)
-        if not path.exists():
+        procedural = is_procedural(texture_path)
+        if not procedural and not Path(texture_path).exists():
             return False
 
         try:
-            self._load_from_file(path)
+            if procedural:
+                self._upload(generate(texture_path))
+            elif Path(texture_path).suffix.lower() in COMPRESSED_SUFFIXES:
+                self._upload_compressed(load(Path(texture_path)))
+            else:
+                self._upload(self._read_file(Path(texture_path)))
         except Exception as e:
             print(f"Failed to load texture: {e}")
             self._texture_id = None
@@ -66,24 +101,50 @@ class TextureManager:
         else:
             return True
 
-    def _load_from_file(self, path: Path) -> None:
-        """Load texture from file."""
-        img = Image.open(path).transpose(Image.Transpose.FLIP_TOP_BOTTOM)
-        img_data = img.convert("RGB").tobytes()
-        width, height = img.size
+    @staticmethod
+    def _read_file(path: Path) -> np.ndarray:
+        """Read an image file as a top-down RGB array."""
+        with Image.open(path) as img:
+            return np.asarray(img.convert("RGB"))
+
+    def _upload(self, image: np.ndarray) -> None:
+        """Create the texture from a top-down RGB or RGBA image."""
+        height, width, channels = image.shape
+        pixel_format = GL_RGBA if channels == 4 else GL_RGB
+        # OpenGL expects the bottom row first
+        img_data = np.ascontiguousarray(image[::-1])
 
         self._texture_id = glGenTextures(1)
         glBindTexture(GL_TEXTURE_2D, self._texture_id)
         glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
         glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
-        glTexImage2D(GL_TEXTURE_2D, 0, GL_RGB, width, height, 0, GL_RGB, GL_UNSIGNED_BYTE, img_data)
+        glPixelStorei(GL_UNPACK_ALIGNMENT, 1)
+        glTexImage2D(GL_TEXTURE_2D, 0, pixel_format, width, height, 0, pixel_format, GL_UNSIGNED_BYTE, img_data)
+        glBindTexture(GL_TEXTURE_2D, 0)
+
+    def _upload_compressed(self, texture: CompressedTexture) -> None:
+        """Create the texture from block-compressed data, or from its decoded base level if unsupported."""
+        if self.compressed_formats is None:
+            self.compressed_formats = supported_formats()
+        if texture.format.name not in self.compressed_formats:
+            self._upload(decode(texture.format.name, texture.levels[0], texture.width, texture.height))
+            return
+
+        self._texture_id = glGenTextures(1)
+        glBindTexture(GL_TEXTURE_2D, self._texture_id)
+        min_filter = GL_LINEAR_MIPMAP_LINEAR if len(texture.levels) > 1 else GL_LINEAR
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, min_filter)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
+        upload(texture)
         glBindTexture(GL_TEXTURE_2D, 0)
+        self._top_down = True
 
     def _unload(self) -> None:
         """Unload current texture if any."""
         if self._texture_id is not None:
             glDeleteTextures([self._texture_id])
             self._texture_id = None
+        self._top_down = False
 
     def cleanup(self) -> None:
         """Clean up OpenGL resources."""
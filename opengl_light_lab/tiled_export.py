@@ -0,0 +1,294 @@
+"""High-resolution image export by rendering the view in tiles.
+
+The view volume is split into sub-frustums, each rendered offscreen (optionally
+supersampled) and streamed band by band into the image file, so neither the
+framebuffer nor the process memory has to hold the full image.
+"""
+
+from __future__ import annotations
+
+import argparse
+import struct
+import zlib
+from pathlib import Path
+from typing import TYPE_CHECKING, Protocol
+
+import numpy as np
+
+from opengl_light_lab.app_state import AppState
+from opengl_light_lab.offscreen import OffscreenRenderer
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+DEFAULT_TILE_SIZE = 1024
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+PNG_FILTER_UP = 2
+TIFF_MAX_SIZE = 2**32 - 1
+
+
+class ImageStreamWriter(Protocol):
+    """Image encoder accepting the image as consecutive bands of rows."""
+
+    def write_rows(self, rows: np.ndarray) -> None:
+        """Append rows of shape (n, width, 3) to the image."""
+
+    def close(self) -> None:
+        """Finish the file."""
+
+
+class PngStreamWriter:
+    """Streaming RGB PNG encoder.
+
+    Rows are filtered with the PNG "Up" filter and compressed incrementally,
+    each band producing one IDAT chunk.
+    """
+
+    def __init__(self, path: Path, width: int, height: int, *, compress_level: int = 6) -> None:
+        """Open the file and write the PNG header.
+
+        Args:
+            path: Output file path.
+            width: Image width in pixels.
+            height: Image height in pixels.
+            compress_level: zlib compression level (0-9).
+        """
+        self.width = width
+        self.height = height
+        self._rows_written = 0
+        self._prev_row = np.zeros((width, 3), dtype=np.uint8)
+        self._compressor = zlib.compressobj(compress_level)
+        self._file = path.open("wb")
+        self._file.write(PNG_SIGNATURE)
+        self._write_chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+
+    def _write_chunk(self, kind: bytes, data: bytes) -> None:
+        """Write a single PNG chunk."""
+        self._file.write(struct.pack(">I", len(data)))
+        self._file.write(kind)
+        self._file.write(data)
+        self._file.write(struct.pack(">I", zlib.crc32(data, zlib.crc32(kind))))
+
+    def write_rows(self, rows: np.ndarray) -> None:
+        """Append rows of shape (n, width, 3) to the image.
+
+        Raises:
+            ValueError: If the rows do not fit the image.
+        """
+        if rows.shape[1:] != (self.width, 3) or self._rows_written + len(rows) > self.height:
+            msg = f"Rows of shape {rows.shape} do not fit a {self.width}x{self.height} image"
+            raise ValueError(msg)
+        previous = np.concatenate((self._prev_row[None], rows[:-1]))
+        filtered = np.empty((len(rows), self.width * 3 + 1), dtype=np.uint8)
+        filtered[:, 0] = PNG_FILTER_UP
+        filtered[:, 1:] = (rows - previous).reshape(len(rows), -1)
+        self._prev_row = rows[-1].copy()
+        self._rows_written += len(rows)
+        data = self._compressor.compress(filtered.tobytes())
+        if data:
+            self._write_chunk(b"IDAT", data)
+
+    def close(self) -> None:
+        """Flush the compressor and write the trailer."""
+        self._write_chunk(b"IDAT", self._compressor.flush())
+        self._write_chunk(b"IEND", b"")
+        self._file.close()
+
+
+class TiffStreamWriter:
+    """Streaming uncompressed RGB baseline TIFF encoder.
+
+    Each row is stored as one strip, so all offsets are known up front and the
+    header is written before the pixel data.
+    """
+
+    def __init__(self, path: Path, width: int, height: int) -> None:
+        """Open the file and write the TIFF header.
+
+        Args:
+            path: Output file path.
+            width: Image width in pixels.
+            height: Image height in pixels.
+
+        Raises:
+            ValueError: If the image does not fit into a classic TIFF file.
+        """
+        self.width = width
+        self.height = height
+        self._rows_written = 0
+        row_bytes = width * 3
+
+        entry_count = 10
+        bits_offset = 8 + 2 + entry_count * 12 + 4
+        offsets_offset = bits_offset + 6
+        counts_offset = offsets_offset + 4 * height
+        data_offset = counts_offset + 4 * height
+        if data_offset + row_bytes * height > TIFF_MAX_SIZE:
+            msg = f"Image {width}x{height} is too large for a TIFF file"
+            raise ValueError(msg)
+
+        entries = [
+            (256, 4, 1, width),  # ImageWidth
+            (257, 4, 1, height),  # ImageLength
+            (258, 3, 3, bits_offset),  # BitsPerSample
+            (259, 3, 1, 1),  # Compression: none
+            (262, 3, 1, 2),  # PhotometricInterpretation: RGB
+            (273, 4, height, offsets_offset),  # StripOffsets
+            (277, 3, 1, 3),  # SamplesPerPixel
+            (278, 4, 1, 1),  # RowsPerStrip
+            (279, 4, height, counts_offset),  # StripByteCounts
+            (284, 3, 1, 1),  # PlanarConfiguration: chunky
+        ]
+        if height == 1:
+            entries[5] = (273, 4, 1, data_offset)
+            entries[8] = (279, 4, 1, row_bytes)
+
+        self._file = path.open("wb")
+        self._file.write(b"II*\x00" + struct.pack("<I", 8))
+        self._file.write(struct.pack("<H", entry_count))
+        for tag, kind, count, value in entries:
+            # Single SHORT values are left-aligned in the 4-byte value field
+            packed = struct.pack("<HH", value, 0) if kind == 3 and count == 1 else struct.pack("<I", value)
+            self._file.write(struct.pack("<HHI", tag, kind, count) + packed)
+        self._file.write(struct.pack("<I", 0))
+        self._file.write(struct.pack("<HHH", 8, 8, 8))
+        self._file.write((data_offset + row_bytes * np.arange(height, dtype="<u4")).astype("<u4").tobytes())
+        self._file.write(np.full(height, row_bytes, dtype="<u4").tobytes())
+
+    def write_rows(self, rows: np.ndarray) -> None:
+        """Append rows of shape (n, width, 3) to the image.
+
+        Raises:
+            ValueError: If the rows do not fit the image.
+        """
+        if rows.shape[1:] != (self.width, 3) or self._rows_written + len(rows) > self.height:
+            msg = f"Rows of shape {rows.shape} do not fit a {self.width}x{self.height} image"
+            raise ValueError(msg)
+        self._file.write(np.ascontiguousarray(rows, dtype=np.uint8).tobytes())
+        self._rows_written += len(rows)
+
+    def close(self) -> None:
+        """Close the file."""
+        self._file.close()
+
+
+def open_image_writer(path: Path, width: int, height: int) -> ImageStreamWriter:
+    """Open a streaming image writer chosen by the file extension.
+
+    Args:
+        path: Output file path (.png, .tif or .tiff).
+        width: Image width in pixels.
+        height: Image height in pixels.
+
+    Raises:
+        ValueError: If the extension is not supported.
+    """
+    suffix = path.suffix.lower()
+    if suffix == ".png":
+        return PngStreamWriter(path, width, height)
+    if suffix in {".tif", ".tiff"}:
+        return TiffStreamWriter(path, width, height)
+    msg = f"Unsupported image format: {path.suffix}"
+    raise ValueError(msg)
+
+
+def downsample(image: np.ndarray, factor: int) -> np.ndarray:
+    """Box-filter an image by an integer factor.
+
+    Args:
+        image: Array of shape (height * factor, width * factor, channels).
+        factor: Supersampling factor.
+
+    Returns:
+        Array of shape (height, width, channels).
+    """
+    if factor == 1:
+        return image
+    h, w, c = image.shape[0] // factor, image.shape[1] // factor, image.shape[2]
+    blocks = image.reshape(h, factor, w, factor, c).astype(np.uint32).sum(axis=(1, 3))
+    return ((blocks + factor * factor // 2) // (factor * factor)).astype(np.uint8)
+
+
+class TiledRenderer:
+    """Renders images larger than the framebuffer limit tile by tile."""
+
+    def __init__(
+        self, renderer: OffscreenRenderer, *, tile_size: int = DEFAULT_TILE_SIZE, supersample: int = 1
+    ) -> None:
+        """Initialize the tiled renderer.
+
+        Args:
+            renderer: Offscreen renderer drawing the individual tiles.
+            tile_size: Requested tile edge in output pixels.
+            supersample: Number of rendered samples per output pixel along each axis.
+
+        Raises:
+            ValueError: If the supersampling factor is not positive.
+        """
+        if supersample < 1:
+            msg = f"Supersampling factor must be positive, got {supersample}"
+            raise ValueError(msg)
+        self.renderer = renderer
+        self.supersample = supersample
+        self.tile_size = max(1, min(tile_size, renderer.max_size // supersample))
+
+    def bands(self, width: int, height: int) -> Iterator[np.ndarray]:
+        """Render the image as horizontal bands, top to bottom.
+
+        Args:
+            width: Output image width in pixels.
+            height: Output image height in pixels.
+
+        Yields:
+            Arrays of shape (band_height, width, 3).
+        """
+        aspect = width / height
+        ss = self.supersample
+        for y in range(0, height, self.tile_size):
+            band_h = min(self.tile_size, height - y)
+            band = np.empty((band_h, width, 3), dtype=np.uint8)
+            # Window fractions are measured from the bottom edge
+            y0, y1 = 1.0 - (y + band_h) / height, 1.0 - y / height
+            for x in range(0, width, self.tile_size):
+                tile_w = min(self.tile_size, width - x)
+                window = (x / width, (x + tile_w) / width, y0, y1)
+                tile = self.renderer.render(tile_w * ss, band_h * ss, aspect=aspect, window=window)
+                band[:, x : x + tile_w] = downsample(tile, ss)
+            yield band
+
+    def render_to_file(self, path: Path, width: int, height: int) -> None:
+        """Render the image straight into a PNG or TIFF file.
+
+        Args:
+            path: Output file path.
+            width: Output image width in pixels.
+            height: Output image height in pixels.
+        """
+        writer = open_image_writer(path, width, height)
+        try:
+            for band in self.bands(width, height):
+                writer.write_rows(band)
+        finally:
+            writer.close()
+
+
+def main() -> None:
+    """Render the default scene into a high-resolution image."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("output", type=Path, help="output .png or .tif file")
+    parser.add_argument("--width", type=int, default=7680)
+    parser.add_argument("--height", type=int, default=4320)
+    parser.add_argument("--tile-size", type=int, default=DEFAULT_TILE_SIZE)
+    parser.add_argument("--supersample", type=int, default=1)
+    args = parser.parse_args()
+
+    renderer = OffscreenRenderer(AppState())
+    try:
+        tiled = TiledRenderer(renderer, tile_size=args.tile_size, supersample=args.supersample)
+        tiled.render_to_file(args.output, args.width, args.height)
+    finally:
+        renderer.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Per-frame batching of UI-originated AppState changes.
+
+A fast spinbox drag or wheel scroll emits many ``valueChanged`` signals between
+two frames. Writing each one into the AppState (and recomputing the projection
+for each) is wasted work, since only the last value is ever rendered. The
+coalescer keeps the latest pending value of every field and applies them all
+once per frame, right before the scene is drawn.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from opengl_light_lab.app_state import get_field, set_field
+
+if TYPE_CHECKING:
+    from opengl_light_lab.app_state import AppState
+    from opengl_light_lab.history import UndoHistory
+
+PROJECTION_FIELDS = frozenset({"camera_projection", "camera_perspective_fov", "camera_ortho_half_height"})
+"""AppState fields the projection matrix depends on."""
+
+
+class UpdateCoalescer:
+    """Collects AppState changes and applies them at most once per frame.
+
+    Attributes:
+        submitted: Number of changes submitted so far.
+        collapsed: Number of changes and explicit projection invalidations
+            superseded by a later one within the same frame.
+        last_submitted: Changes submitted between the last two flushes.
+        last_collapsed: Changes collapsed between the last two flushes.
+    """
+
+    def __init__(self, app_state: AppState, history: UndoHistory | None = None) -> None:
+        """Initialize the coalescer.
+
+        Args:
+            app_state: The application state receiving the changes.
+            history: Undo history recording the applied changes, or None to
+                write the fields directly.
+        """
+        self.app_state = app_state
+        self.history = history
+        self.submitted = 0
+        self.collapsed = 0
+        self.last_submitted = 0
+        self.last_collapsed = 0
+        self._flushed = (0, 0)
+        self._pending: dict[str, tuple[object, str | None]] = {}
+        self._projection_dirty = False
+
+    @property
+    def has_pending(self) -> bool:
+        """Return True if changes are waiting for the next flush."""
+        return bool(self._pending)
+
+    def set(self, path: str, value: object, *, group: str | None = None) -> None:
+        """Queue a change of an AppState field for the next frame.
+
+        Args:
+            path: Dotted field path, e.g. ``"camera.theta"``.
+            value: New value of the field; replaces a pending value of the same field.
+            group: Undo coalescing key passed on to the history.
+        """
+        self.submitted += 1
+        if path in self._pending:
+            self.collapsed += 1
+            # Re-insert so fields are applied in the order of their last change
+            del self._pending[path]
+        self._pending[path] = (value, group)
+        if path in PROJECTION_FIELDS:
+            self._projection_dirty = True
+
+    def get(self, path: str) -> object:
+        """Return the pending value of a field, or its current value if none is pending.
+
+        Args:
+            path: Dotted field path.
+        """
+        if path in self._pending:
+            return self._pending[path][0]
+        return get_field(self.app_state, path)
+
+    def invalidate_projection(self) -> None:
+        """Request a recomputation of the projection matrix on the next frame."""
+        if self._projection_dirty:
+            self.collapsed += 1
+        self._projection_dirty = True
+
+    def flush(self) -> bool:
+        """Apply all pending changes.
+
+        Returns:
+            True if the projection matrix has to be recomputed.
+        """
+        pending, self._pending = self._pending, {}
+        for path, (value, group) in pending.items():
+            if self.history is not None:
+                self.history.set(path, value, group=group)
+            else:
+                set_field(self.app_state, path, value)
+        projection_dirty, self._projection_dirty = self._projection_dirty, False
+        submitted, collapsed = self._flushed
+        self.last_submitted, self.last_collapsed = self.submitted - submitted, self.collapsed - collapsed
+        self._flushed = (self.submitted, self.collapsed)
+        return projection_dirty
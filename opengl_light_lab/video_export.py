@@ -0,0 +1,309 @@
+"""Export of the auto-rotating scene as an animation or frame sequence.
+
+Frames are rendered offscreen at a fixed frame rate with the rotation angle
+derived from the frame index, so every export is reproducible. Frames are read
+back asynchronously, copied into a shared-memory ring buffer and handed to a
+background encoder process through a bounded queue, so readback and encoding
+overlap with rendering. The encoder streams the frames to disk, so the memory
+of an export does not grow with its length.
+"""
+
+from __future__ import annotations
+
+import argparse
+import copy
+import multiprocessing as mp
+import queue
+import struct
+import time
+import zlib
+from dataclasses import dataclass
+from multiprocessing.shared_memory import SharedMemory
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import numpy as np
+from PIL import Image
+
+from opengl_light_lab.app_state import AppState
+from opengl_light_lab.offscreen import OffscreenRenderer
+from opengl_light_lab.scene import FULL_REVOLUTION, ROTATION_SPEED
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from multiprocessing.queues import Queue
+    from typing import BinaryIO
+
+DEFAULT_FPS = 30.0
+DEFAULT_QUEUE_SIZE = 8
+ENCODER_POLL_INTERVAL = 1.0
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+APNG_COMPRESS_LEVEL = 6
+
+
+@dataclass
+class ExportStats:
+    """End-to-end statistics of an export.
+
+    Attributes:
+        frames: Number of exported frames.
+        seconds: Wall-clock time from the first render to the finished file.
+    """
+
+    frames: int
+    seconds: float
+
+    @property
+    def fps(self) -> float:
+        """Return the end-to-end throughput in frames per second."""
+        return self.frames / self.seconds if self.seconds > 0 else 0.0
+
+
+def rotation_angle_at(frame: int, fps: float, start_angle: float = 0.0) -> float:
+    """Return the deterministic rotation angle of a frame.
+
+    Args:
+        frame: Frame index.
+        fps: Frame rate of the export.
+        start_angle: Rotation angle of the first frame in degrees.
+    """
+    return (start_angle + ROTATION_SPEED * frame / fps) % FULL_REVOLUTION
+
+
+def frame_count_for(duration: float, fps: float) -> int:
+    """Return the number of frames covering the given duration."""
+    return max(1, round(duration * fps))
+
+
+class ApngWriter:
+    """Writes an animated PNG frame by frame without keeping the frames in memory.
+
+    Every frame is stored in full (no frame difference regions) as 8-bit RGB
+    rows without filtering. The frame count in the animation control chunk is
+    written when the file is closed.
+    """
+
+    def __init__(self, file: BinaryIO, width: int, height: int, fps: float) -> None:
+        """Write the header of the animation.
+
+        Args:
+            file: Seekable binary file the animation is written to.
+            width: Frame width in pixels.
+            height: Frame height in pixels.
+            fps: Frame rate of the animation.
+        """
+        self._file = file
+        self._size = (width, height)
+        self._delay = (max(1, round(1000.0 / fps)), 1000)
+        self._frames = 0
+        self._sequence = 0
+        file.write(PNG_SIGNATURE)
+        self._chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+        self._actl_offset = file.tell()
+        self._chunk(b"acTL", struct.pack(">II", 0, 0))
+
+    def _chunk(self, kind: bytes, data: bytes) -> None:
+        """Write a PNG chunk."""
+        self._file.write(struct.pack(">I", len(data)) + kind + data)
+        self._file.write(struct.pack(">I", zlib.crc32(kind + data)))
+
+    def _next_sequence(self) -> bytes:
+        """Return the next sequence number of the animation chunks."""
+        self._sequence += 1
+        return struct.pack(">I", self._sequence - 1)
+
+    def write(self, frame: np.ndarray) -> None:
+        """Append a frame.
+
+        Args:
+            frame: RGB image of shape (height, width, 3) and dtype uint8.
+
+        Raises:
+            ValueError: If the frame size differs from the animation size.
+        """
+        width, height = self._size
+        if frame.shape != (height, width, 3):
+            msg = f"Frame shape {frame.shape} differs from the animation size {width}x{height}"
+            raise ValueError(msg)
+        control = struct.pack(">IIIIHHBB", width, height, 0, 0, *self._delay, 0, 0)
+        self._chunk(b"fcTL", self._next_sequence() + control)
+        # Each row starts with its filter type, 0 (none)
+        rows = np.zeros((height, width * 3 + 1), dtype=np.uint8)
+        rows[:, 1:] = frame.reshape(height, width * 3)
+        data = zlib.compress(rows.tobytes(), APNG_COMPRESS_LEVEL)
+        if self._frames == 0:
+            self._chunk(b"IDAT", data)
+        else:
+            self._chunk(b"fdAT", self._next_sequence() + data)
+        self._frames += 1
+
+    def close(self) -> None:
+        """Finish the file and write the frame count."""
+        self._chunk(b"IEND", b"")
+        end = self._file.tell()
+        self._file.seek(self._actl_offset)
+        self._chunk(b"acTL", struct.pack(">II", self._frames, 0))
+        self._file.seek(end)
+
+
+def _iter_frames(
+    shm: SharedMemory, shape: tuple[int, int, int], filled: Queue[int | None], free: Queue[int]
+) -> Iterator[Image.Image]:
+    """Yield frames from the ring buffer as they arrive, releasing their slots."""
+    frame_bytes = shape[0] * shape[1] * shape[2]
+    while (slot := filled.get()) is not None:
+        view = np.ndarray(shape, dtype=np.uint8, buffer=shm.buf, offset=slot * frame_bytes)
+        image = Image.fromarray(view.copy())
+        free.put(slot)
+        yield image
+
+
+def _encode(  # noqa: PLR0913, PLR0917
+    output: str, shm_name: str, shape: tuple[int, int, int], filled: Queue[int | None], free: Queue[int], fps: float
+) -> None:
+    """Encoder process entry point.
+
+    Writes a GIF or APNG for ``.gif``/``.png``/``.apng`` outputs, otherwise a
+    directory of numbered PNG files. Frames are written as they arrive.
+    """
+    shm = SharedMemory(name=shm_name)
+    try:
+        frames = _iter_frames(shm, shape, filled, free)
+        path = Path(output)
+        if path.suffix.lower() == ".gif":
+            first = next(frames, None)
+            if first is None:
+                return
+            # The GIF writer consumes the appended frames one by one
+            first.save(path, format="GIF", save_all=True, append_images=frames, duration=1000.0 / fps, loop=0)
+        elif path.suffix.lower() in {".png", ".apng"}:
+            # Pillow's APNG writer holds all frames until the end, so the animation is written directly
+            with path.open("wb") as file:
+                writer = ApngWriter(file, shape[1], shape[0], fps)
+                for frame in frames:
+                    writer.write(np.asarray(frame))
+                writer.close()
+        else:
+            path.mkdir(parents=True, exist_ok=True)
+            for index, frame in enumerate(frames):
+                frame.save(path / f"frame_{index:05d}.png", compress_level=1)
+    finally:
+        shm.close()
+
+
+def _acquire_slot(free: Queue[int], encoder: mp.process.BaseProcess) -> int:
+    """Wait for a free ring buffer slot while watching the encoder process.
+
+    Raises:
+        RuntimeError: If the encoder process exits prematurely.
+    """
+    while True:
+        try:
+            return free.get(timeout=ENCODER_POLL_INTERVAL)
+        except queue.Empty:
+            if not encoder.is_alive():
+                msg = f"Encoder process exited prematurely with exit code {encoder.exitcode}"
+                raise RuntimeError(msg) from None
+
+
+def export_animation(  # noqa: PLR0913
+    app_state: AppState,
+    output: Path,
+    *,
+    width: int,
+    height: int,
+    fps: float = DEFAULT_FPS,
+    frames: int | None = None,
+    queue_size: int = DEFAULT_QUEUE_SIZE,
+) -> ExportStats:
+    """Render the rotating scene offscreen and encode it in a background process.
+
+    Args:
+        app_state: Scene to render; it is copied and left unchanged.
+        output: Output ``.gif``/``.png``/``.apng`` file, or a directory for a PNG sequence.
+        width: Frame width in pixels.
+        height: Frame height in pixels.
+        fps: Frame rate of the animation.
+        frames: Number of frames; defaults to one full revolution.
+        queue_size: Number of frames buffered between the renderer and the encoder.
+
+    Returns:
+        End-to-end export statistics.
+
+    Raises:
+        RuntimeError: If the encoder process fails.
+    """
+    state = copy.deepcopy(app_state)
+    start_angle = state.rotation_angle
+    if frames is None:
+        frames = frame_count_for(FULL_REVOLUTION / ROTATION_SPEED, fps)
+
+    shape = (height, width, 3)
+    frame_bytes = height * width * 3
+    ctx = mp.get_context("spawn")
+    filled: Queue[int | None] = ctx.Queue()
+    free: Queue[int] = ctx.Queue()
+    for slot in range(queue_size):
+        free.put(slot)
+
+    shm = SharedMemory(create=True, size=frame_bytes * queue_size)
+    encoder = ctx.Process(target=_encode, args=(str(output), shm.name, shape, filled, free, fps), daemon=True)
+    renderer = OffscreenRenderer(state)
+    try:
+        encoder.start()
+        start = time.perf_counter()
+
+        def submit(image: np.ndarray) -> None:
+            slot = _acquire_slot(free, encoder)
+            np.ndarray(shape, dtype=np.uint8, buffer=shm.buf, offset=slot * frame_bytes)[:] = image
+            filled.put(slot)
+
+        # Readback of frame N overlaps with rendering of frame N + 1
+        for frame in range(frames):
+            state.rotation_angle = rotation_angle_at(frame, fps, start_angle)
+            image = renderer.render_async(width, height)
+            if image is not None:
+                submit(image)
+        for image in renderer.flush():
+            submit(image)
+        filled.put(None)
+        encoder.join()
+        elapsed = time.perf_counter() - start
+    finally:
+        renderer.cleanup()
+        if encoder.is_alive():
+            encoder.terminate()
+        shm.close()
+        shm.unlink()
+
+    if encoder.exitcode != 0:
+        msg = f"Encoder process failed with exit code {encoder.exitcode}"
+        raise RuntimeError(msg)
+    return ExportStats(frames, elapsed)
+
+
+def main() -> None:
+    """Export one revolution of the default scene."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("output", type=Path, help="output .gif/.png/.apng file or directory for a PNG sequence")
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--height", type=int, default=480)
+    parser.add_argument("--fps", type=float, default=DEFAULT_FPS)
+    parser.add_argument("--frames", type=int, default=None, help="number of frames (default: one revolution)")
+    parser.add_argument("--queue-size", type=int, default=DEFAULT_QUEUE_SIZE)
+    args = parser.parse_args()
+
+    stats = export_animation(
+        AppState(),
+        args.output,
+        width=args.width,
+        height=args.height,
+        fps=args.fps,
+        frames=args.frames,
+        queue_size=args.queue_size,
+    )
+    print(f"Exported {stats.frames} frames in {stats.seconds:.2f} s ({stats.fps:.1f} fps)")
+
+
+if __name__ == "__main__":
+    main()
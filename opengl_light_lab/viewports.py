@@ -0,0 +1,133 @@
+"""Several cameras rendered side by side into one view.
+
+A viewport is a rectangle of the view with its own camera. All viewports are
+drawn by the same SceneRenderer in the same context, so geometry, textures,
+shadow maps and shaders are uploaded once and shared; switching viewports
+only changes the viewport rectangle and the camera matrices.
+"""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+
+from opengl_light_lab.app_state import Projection, Spherical
+
+ORTHO_VIEW_DISTANCE = 10.0
+"""Distance of the fixed orthographic cameras from the origin."""
+ORTHO_VIEW_HALF_HEIGHT = 2.0
+"""Half-height of the view volume of the fixed orthographic cameras."""
+
+
+@dataclass(frozen=True)
+class Viewport:
+    """A camera drawn into a rectangle of the view.
+
+    Attributes:
+        name: Label of the viewport.
+        rect: Rectangle (x0, x1, y0, y1) as fractions in [0, 1] of the view,
+            measured from the bottom-left corner.
+        camera: Fixed camera position, or None to use the AppState camera.
+        projection: Fixed projection type, or None to use the AppState projection.
+        ortho_half_height: Half-height of the view volume if the projection is fixed.
+    """
+
+    name: str
+    rect: tuple[float, float, float, float]
+    camera: Spherical | None = None
+    projection: Projection | None = None
+    ortho_half_height: float = ORTHO_VIEW_HALF_HEIGHT
+
+    def aspect(self, view_aspect: float) -> float:
+        """Return the aspect ratio of the viewport in a view of the given aspect ratio."""
+        x0, x1, y0, y1 = self.rect
+        return view_aspect * (x1 - x0) / (y1 - y0)
+
+    def pixels(self, width: int, height: int) -> tuple[int, int, int, int]:
+        """Return the viewport rectangle (x, y, width, height) in pixels of a view.
+
+        Neighbouring viewports share their edges, so no pixel is covered twice.
+
+        Args:
+            width: View width in pixels.
+            height: View height in pixels.
+        """
+        x0, x1, y0, y1 = self.rect
+        left, bottom = round(width * x0), round(height * y0)
+        return left, bottom, max(round(width * x1) - left, 1), max(round(height * y1) - bottom, 1)
+
+    def clip(
+        self, window: tuple[float, float, float, float], width: int, height: int
+    ) -> tuple[tuple[int, int, int, int], tuple[float, float, float, float]] | None:
+        """Return the part of the viewport inside a window of the view.
+
+        The viewport edges are rounded to pixels of the full view as in
+        pixels, so that the windows of a view rendered in tiles fit together.
+
+        Args:
+            window: Sub-rectangle (x0, x1, y0, y1) of the view as fractions
+                in [0, 1], see SceneRenderer.set_projection.
+            width: Window width in pixels.
+            height: Window height in pixels.
+
+        Returns:
+            The rectangle (x, y, width, height) of the viewport in pixels of
+            the window and the window of the viewport's own view it shows, or
+            None if the viewport lies outside the window.
+        """
+        x0, x1, y0, y1 = self.rect
+        horizontal = _clip_span(x0, x1, window[0], window[1], width)
+        vertical = _clip_span(y0, y1, window[2], window[3], height)
+        if horizontal is None or vertical is None:
+            return None
+        (left, w, shown_x0, shown_x1), (bottom, h, shown_y0, shown_y1) = horizontal, vertical
+        return (left, bottom, w, h), (shown_x0, shown_x1, shown_y0, shown_y1)
+
+
+def _clip_span(
+    start: float, end: float, window_start: float, window_end: float, size: int
+) -> tuple[int, int, float, float] | None:
+    """Clip a span of a viewport to a window along one axis, see Viewport.clip.
+
+    Returns:
+        The offset and length of the clipped span in pixels of the window and
+        the part of the viewport it shows as fractions, or None if it is empty.
+    """
+    # A whole number of pixels, so that the rounding of the edges does not depend on the window
+    view_size = round(size / (window_end - window_start))
+    first, last, origin = round(view_size * start), round(view_size * end), round(view_size * window_start)
+    clip_first, clip_last = max(first, origin), min(last, origin + size)
+    if clip_first >= clip_last:
+        return None
+    return (
+        clip_first - origin,
+        clip_last - clip_first,
+        (clip_first - first) / (last - first),
+        (clip_last - first) / (last - first),
+    )
+
+
+QUAD_VIEWPORTS = (
+    Viewport(
+        "Top", (0.0, 0.5, 0.5, 1.0), Spherical(ORTHO_VIEW_DISTANCE, math.pi / 2, math.pi / 2), Projection.ORTHOGONAL
+    ),
+    Viewport("Front", (0.5, 1.0, 0.5, 1.0), Spherical(ORTHO_VIEW_DISTANCE, 0.0, math.pi / 2), Projection.ORTHOGONAL),
+    Viewport("Right", (0.0, 0.5, 0.0, 0.5), Spherical(ORTHO_VIEW_DISTANCE, 0.0, 0.0), Projection.ORTHOGONAL),
+    Viewport("Perspective", (0.5, 1.0, 0.0, 0.5)),
+)
+"""Top, front and right orthographic views and the interactive camera, in a 2x2 grid."""
+
+
+def viewport_at(viewports: tuple[Viewport, ...], x: float, y: float) -> Viewport | None:
+    """Return the viewport containing a point of the view.
+
+    Args:
+        viewports: Viewports to search.
+        x: Point x as a fraction of the view width from the left.
+        y: Point y as a fraction of the view height from the bottom.
+    """
+    for viewport in viewports:
+        x0, x1, y0, y1 = viewport.rect
+        if x0 <= x < x1 and y0 <= y < y1:
+            return viewport
+    return None
@@ -0,0 +1 @@
+"""Tests of opengl_light_lab."""
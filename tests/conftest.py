@@ -0,0 +1,32 @@
+"""Fixtures drawing with OpenGL, skipped where no OpenGL context can be created."""
+
+from __future__ import annotations
+
+import os
+
+import pytest
+from PySide6 import QtCore, QtWidgets
+
+from opengl_light_lab.app_state import AppState
+from opengl_light_lab.offscreen import OffscreenRenderer
+
+
+@pytest.fixture(scope="session")
+def gui_application() -> QtWidgets.QApplication:
+    """Return the Qt application of the tests that draw, shared by all of them."""
+    app = QtCore.QCoreApplication.instance()
+    if app is not None and not isinstance(app, QtWidgets.QApplication):
+        pytest.skip("A Qt application without widgets is already running")
+    # Without a display the default platform plugin aborts instead of failing to create the context
+    if not os.environ.get("DISPLAY") and not os.environ.get("WAYLAND_DISPLAY"):
+        os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    return app or QtWidgets.QApplication([])  # type: ignore[return-value]
+
+
+@pytest.fixture(scope="module")
+def renderer(gui_application: QtWidgets.QApplication) -> OffscreenRenderer:  # noqa: ARG001
+    """Return an offscreen renderer of a default scene, shared by the tests of a module."""
+    try:
+        return OffscreenRenderer(AppState())
+    except RuntimeError as e:
+        pytest.skip(str(e))
@@ -0,0 +1,55 @@
+"""Memory allocated by drawing the unchanged presets, traced with tracemalloc.
+
+Skipped where no OpenGL context can be created, see conftest.py.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+from typing import TYPE_CHECKING
+
+import pytest
+
+from opengl_light_lab.app_state import AppState
+from opengl_light_lab.gl_widget import GLWidget
+from opengl_light_lab.regression import ALLOCATION_BUDGET, IMAGE_SIZE, PRESETS, allocation_peak
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from PySide6 import QtWidgets
+
+    from opengl_light_lab.offscreen import OffscreenRenderer
+
+
+@pytest.fixture
+def widget(gui_application: QtWidgets.QApplication) -> Iterator[GLWidget]:
+    """Return a shown view of a scene that does not rotate, with its context current."""
+    widget = GLWidget(None, AppState(auto_rotate=False))
+    # Frames are painted by the test only
+    widget.timer.stop()
+    widget.resize(*IMAGE_SIZE)
+    widget.show()
+    gui_application.processEvents()
+    if not widget.isValid():
+        widget.close()
+        pytest.skip("No OpenGL context for widgets on this platform")
+    widget.makeCurrent()
+    yield widget
+    widget.doneCurrent()
+    widget.close()
+
+
+@pytest.mark.parametrize("name", sorted(PRESETS))
+def test_unchanged_frame_allocates_next_to_nothing(renderer: OffscreenRenderer, name: str) -> None:
+    state = PRESETS[name]()
+    for f in dataclasses.fields(AppState):
+        setattr(renderer.app_state, f.name, getattr(state, f.name))
+    renderer.scene.lod.reset()
+    assert allocation_peak(lambda: renderer.draw(*IMAGE_SIZE)) <= ALLOCATION_BUDGET
+
+
+def test_unchanged_paint_allocates_next_to_nothing(widget: GLWidget) -> None:
+    assert allocation_peak(widget.paintGL) <= ALLOCATION_BUDGET
+    # The frames were restored from the frame cache, the path an unchanged view takes
+    assert widget.profiler.last_counters["cached frames"] == 1
@@ -0,0 +1,83 @@
+"""Frames copied into the FrameCache and restored from it, and their keys.
+
+The cache tests are skipped where no OpenGL context can be created, see conftest.py.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+import pytest
+from OpenGL.GL import GL_COLOR_BUFFER_BIT, GL_RGB, GL_UNSIGNED_BYTE, glClear, glClearColor, glReadPixels  # type: ignore
+
+from opengl_light_lab.app_state import AppState
+from opengl_light_lab.frame_cache import FrameCache, FrameKey
+from opengl_light_lab.offscreen import Framebuffer
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from opengl_light_lab.offscreen import OffscreenRenderer
+
+SIZE = 16
+
+
+@pytest.fixture
+def framebuffer(renderer: OffscreenRenderer) -> Iterator[Framebuffer]:
+    """Return a bound framebuffer standing in for the framebuffer of a view."""
+    renderer.context.make_current()
+    framebuffer = Framebuffer(SIZE, SIZE)
+    framebuffer.bind()
+    yield framebuffer
+    Framebuffer.release()
+    framebuffer.delete()
+
+
+def _fill(red: float) -> None:
+    """Clear the bound framebuffer to a color with the given red component."""
+    glClearColor(red, 0.0, 0.0, 1.0)
+    glClear(GL_COLOR_BUFFER_BIT)
+
+
+def _red() -> int:
+    """Return the red component of the first pixel of the bound framebuffer."""
+    pixels = np.frombuffer(glReadPixels(0, 0, 1, 1, GL_RGB, GL_UNSIGNED_BYTE), dtype=np.uint8)
+    return int(pixels[0])
+
+
+def test_frame_is_copied_once_unchanged_for_a_frame(framebuffer: Framebuffer) -> None:
+    cache = FrameCache()
+    _fill(1.0)
+    cache.store(1, framebuffer.fbo, SIZE, SIZE)
+    assert not cache.restore(1, framebuffer.fbo)
+    cache.store(1, framebuffer.fbo, SIZE, SIZE)
+    _fill(0.0)
+    assert cache.restore(1, framebuffer.fbo)
+    assert _red() == 255
+    cache.delete()
+
+
+def test_changing_frames_are_not_copied(framebuffer: Framebuffer) -> None:
+    cache = FrameCache()
+    for key in range(3):
+        _fill(key / 2)
+        cache.store(key, framebuffer.fbo, SIZE, SIZE)
+        assert not cache.restore(key, framebuffer.fbo)
+    cache.delete()
+
+
+def test_key_changes_with_the_rendered_state_and_size_only() -> None:
+    state = AppState()
+    key = FrameKey(state)
+    first = key.update(SIZE, SIZE)
+    assert key.update(SIZE, SIZE) == first
+    state.show_help = not state.show_help
+    assert key.update(SIZE, SIZE) == first
+    state.camera.theta += 0.1
+    second = key.update(SIZE, SIZE)
+    assert second != first
+    state.light_diffuse = (0.5, 0.5, 0.5)
+    third = key.update(SIZE, SIZE)
+    assert third != second
+    assert key.update(SIZE + 1, SIZE) != third
@@ -0,0 +1,139 @@
+"""Vertex positions and triangles read from OBJ, PLY and STL files."""
+
+from __future__ import annotations
+
+import struct
+from typing import TYPE_CHECKING
+
+import numpy as np
+import pytest
+
+from opengl_light_lab.mesh_io import read_obj, read_ply, read_stl
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+SQUARE = np.array([[0, 0, 0], [1, 0, 0], [1, 1, 0], [0, 1, 0]], dtype=np.float32)
+SQUARE_TRIANGLES = [[0, 1, 2], [0, 2, 3]]
+"""The quad of SQUARE split into a triangle fan."""
+
+
+def _write(tmp_path: Path, name: str, content: bytes) -> Path:
+    """Write a file into the temporary directory and return its path."""
+    path = tmp_path / name
+    path.write_bytes(content)
+    return path
+
+
+def test_obj_quad_with_comments_and_references(tmp_path: Path) -> None:
+    path = _write(
+        tmp_path,
+        "square.obj",
+        b"# a square\n"
+        b"o square\n"
+        b"v 0 0 0\nv 1 0 0 # right\nv 1 1 0 1.0\nv 0 1 0\n"
+        b"vt 0 0\nvn 0 0 1\n"
+        b"f 1/1/1 2/1/1 3//1 4\n",
+    )
+    positions, triangles = read_obj(path)
+    np.testing.assert_array_equal(positions, SQUARE)
+    np.testing.assert_array_equal(triangles, SQUARE_TRIANGLES)
+
+
+def test_obj_negative_indices_count_back_from_the_face(tmp_path: Path) -> None:
+    path = _write(tmp_path, "relative.obj", b"v 0 0 0\nv 1 0 0\nv 1 1 0\nf -3 -2 -1\nv 0 1 0\nf -4 -2 -1\n")
+    _, triangles = read_obj(path)
+    np.testing.assert_array_equal(triangles, [[0, 1, 2], [0, 2, 3]])
+
+
+@pytest.mark.parametrize(
+    "content",
+    [b"v 0 0 0\nv 1 0 0\nv 1 1 0\nf 1 2 4\n", b"v 0 0 0\nv 1 0 0\nf 1 2\n", b"v 0 0\n", b"v 0 0 0\nf 0 1 2\n"],
+)
+def test_malformed_obj_raises_value_error(tmp_path: Path, content: bytes) -> None:
+    with pytest.raises(ValueError, match=r"\S"):
+        read_obj(_write(tmp_path, "malformed.obj", content))
+
+
+def _ply_header(file_format: str, index_type: str = "int") -> bytes:
+    """Return the header of a PLY file of the square, with a vertex color and a face flag."""
+    return (
+        f"ply\nformat {file_format} 1.0\ncomment a square\n"
+        "element vertex 4\nproperty float x\nproperty float y\nproperty float z\nproperty uchar red\n"
+        f"element face 1\nproperty list uchar {index_type} vertex_indices\nproperty uchar flags\n"
+        "end_header\n"
+    ).encode()
+
+
+def test_ascii_ply_quad(tmp_path: Path) -> None:
+    data = b"0 0 0 255\n1 0 0 255\n\n1 1 0 255\n0 1 0 255\n4 0 1 2 3 7\n"
+    positions, triangles = read_ply(_write(tmp_path, "square.ply", _ply_header("ascii") + data))
+    np.testing.assert_array_equal(positions, SQUARE)
+    np.testing.assert_array_equal(triangles, SQUARE_TRIANGLES)
+
+
+@pytest.mark.parametrize(("file_format", "endian"), [("binary_little_endian", "<"), ("binary_big_endian", ">")])
+def test_binary_ply_quad(tmp_path: Path, file_format: str, endian: str) -> None:
+    vertices = b"".join(struct.pack(f"{endian}3fB", *vertex, 255) for vertex in SQUARE.tolist())
+    face = struct.pack(f"{endian}B4IB", 4, 0, 1, 2, 3, 7)
+    path = _write(tmp_path, "square.ply", _ply_header(file_format, "uint") + vertices + face)
+    positions, triangles = read_ply(path)
+    np.testing.assert_array_equal(positions, SQUARE)
+    np.testing.assert_array_equal(triangles, SQUARE_TRIANGLES)
+
+
+def test_binary_ply_faces_of_different_sizes(tmp_path: Path) -> None:
+    header = _ply_header("binary_little_endian").replace(b"element face 1", b"element face 2")
+    vertices = b"".join(struct.pack("<3fB", *vertex, 255) for vertex in SQUARE.tolist())
+    faces = struct.pack("<B3iB", 3, 0, 1, 2, 0) + struct.pack("<B4iB", 4, 0, 1, 2, 3, 0)
+    _, triangles = read_ply(_write(tmp_path, "faces.ply", header + vertices + faces))
+    np.testing.assert_array_equal(triangles, [[0, 1, 2], *SQUARE_TRIANGLES])
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        _ply_header("ascii") + b"0 0 0 255\n1 0 0 255\n1 1 0 255\n0 1 0 255\n4 0 1 2 9 7\n",
+        _ply_header("ascii") + b"0 0 0 255\n1 0 0 255\n",
+        _ply_header("binary_little_endian") + b"\0" * 10,
+        _ply_header("ascii").replace(b"format ascii", b"format binary"),
+        b"ply\nproperty float x\nend_header\n",
+    ],
+)
+def test_malformed_ply_raises_value_error(tmp_path: Path, content: bytes) -> None:
+    with pytest.raises(ValueError, match=r"\S"):
+        read_ply(_write(tmp_path, "malformed.ply", content))
+
+
+def test_ascii_stl(tmp_path: Path) -> None:
+    facet = "facet normal 0 0 1\nouter loop\n{}endloop\nendfacet\n"
+    loops = [SQUARE[[0, 1, 2]], SQUARE[[0, 2, 3]]]
+    content = "solid square 2\n"
+    for loop in loops:
+        content += facet.format("".join(f"vertex {x} {y} {z}\n" for x, y, z in loop.tolist()))
+    content += "endsolid square 2\n"
+    positions, triangles = read_stl(_write(tmp_path, "square.stl", content.encode()))
+    np.testing.assert_array_equal(positions, np.concatenate(loops))
+    np.testing.assert_array_equal(triangles, [[0, 1, 2], [3, 4, 5]])
+
+
+def test_binary_stl_with_a_solid_header(tmp_path: Path) -> None:
+    loops = [SQUARE[[0, 1, 2]], SQUARE[[0, 2, 3]]]
+    facets = b"".join(struct.pack("<12fH", 0, 0, 1, *loop.reshape(-1).tolist(), 0) for loop in loops)
+    # Binary files starting with "solid" are told apart by their size
+    header = b"solid exported as binary".ljust(80) + struct.pack("<I", len(loops))
+    positions, triangles = read_stl(_write(tmp_path, "square.stl", header + facets))
+    np.testing.assert_array_equal(positions, np.concatenate(loops))
+    np.testing.assert_array_equal(triangles, [[0, 1, 2], [3, 4, 5]])
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        b"solid broken\nfacet normal 0 0 1\nouter loop\nvertex 0 0 0\nvertex 1 0\nendloop\nendfacet\nendsolid\n",
+        b"binary".ljust(80) + struct.pack("<I", 1) + b"\0" * 30,
+    ],
+)
+def test_malformed_stl_raises_value_error(tmp_path: Path, content: bytes) -> None:
+    with pytest.raises(ValueError, match=r"\S"):
+        read_stl(_write(tmp_path, "malformed.stl", content))
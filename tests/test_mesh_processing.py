@@ -0,0 +1,44 @@
+"""Simplification of flat meshes, where all collapses cost the same."""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from opengl_light_lab import mesh_processing
+from opengl_light_lab.mesh_processing import simplify
+
+MAX_PASSES = 12
+"""Passes a tenfold reduction may take; a pass removes a large fraction of the remaining triangles."""
+
+
+def _planar_grid(cells: int) -> tuple[np.ndarray, np.ndarray]:
+    """Return a flat square grid of cells x cells quads, two triangles each."""
+    x, y = np.meshgrid(np.arange(cells + 1.0), np.arange(cells + 1.0))
+    positions = np.stack([x.ravel(), y.ravel(), np.zeros(x.size)], axis=1)
+    corners = (np.arange(cells)[:, None] * (cells + 1) + np.arange(cells)).ravel()
+    triangles = np.concatenate([
+        np.stack([corners, corners + 1, corners + cells + 2], axis=1),
+        np.stack([corners, corners + cells + 2, corners + cells + 1], axis=1),
+    ])
+    return positions, triangles
+
+
+@pytest.mark.parametrize("cells", [40, 100])
+def test_planar_grid_simplifies_in_few_passes(monkeypatch: pytest.MonkeyPatch, cells: int) -> None:
+    passes = 0
+    # Every pass chooses its collapses with a new _Collapses
+    collapses = mesh_processing._Collapses  # noqa: SLF001
+
+    def counted(*args: np.ndarray) -> object:
+        nonlocal passes
+        passes += 1
+        return collapses(*args)
+
+    monkeypatch.setattr(mesh_processing, "_Collapses", counted)
+    positions, triangles = _planar_grid(cells)
+    target = len(triangles) // 10
+    simplified, remaining = simplify(positions, triangles, target)
+    assert passes <= MAX_PASSES
+    assert len(remaining) <= target + 1
+    np.testing.assert_allclose(simplified[:, 2], 0, atol=1e-6)
@@ -0,0 +1,42 @@
+"""Meshes that fail to load leave the MeshManager without a mesh instead of raising."""
+
+from __future__ import annotations
+
+import time
+from typing import TYPE_CHECKING
+
+import pytest
+
+from opengl_light_lab import meshes
+from opengl_light_lab.meshes import MeshManager
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+TIMEOUT = 10.0
+"""Seconds a mesh may take to load in the background."""
+
+
+def _fail(*_args: object, **_kwargs: object) -> None:
+    """Stand in for load_mesh on a file that breaks the parser in an unforeseen way."""
+    msg = "index 7 is out of bounds"
+    raise IndexError(msg)
+
+
+@pytest.mark.parametrize("background", [False, True])
+def test_unexpected_load_error_leaves_the_mesh_unloaded(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, background: bool
+) -> None:
+    path = tmp_path / "broken.obj"
+    path.write_bytes(b"f 1 2 3\n")
+    monkeypatch.setattr(meshes, "load_mesh", _fail)
+    manager = MeshManager(cache_dir=None, background=background)
+    manager.load_if_changed(str(path))
+    deadline = time.monotonic() + TIMEOUT
+    while manager.is_loading and time.monotonic() < deadline:
+        time.sleep(0.01)
+        manager.load_if_changed(str(path))
+    assert not manager.is_loading
+    assert not manager.is_loaded
+    # The file is not read again every frame
+    assert not manager.load_if_changed(str(path))
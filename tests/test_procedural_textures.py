@@ -0,0 +1,41 @@
+"""Argument checking of procedural texture URIs."""
+
+from __future__ import annotations
+
+import pytest
+
+from opengl_light_lab.procedural_textures import canonical_uri, generate
+
+
+@pytest.mark.parametrize(
+    "uri",
+    [
+        "proc://checker?squares=0",
+        "proc://uv_grid?cells=0",
+        "proc://noise?scale=0",
+        "proc://noise?octaves=0",
+        "proc://noise?octaves=40",
+        "proc://noise?size=64&scale=8&octaves=5",
+        "proc://noise?persistence=nan",
+        "proc://brick?rows=0",
+        "proc://brick?mortar=-0.1",
+        "proc://normal_test?bumps=600",
+        "proc://checker?size=0",
+        "proc://checker?size=9000",
+        "proc://checker?squares=many",
+        "proc://checker?tiles=4",
+        "proc://marble",
+    ],
+)
+def test_invalid_uri_raises_value_error(uri: str) -> None:
+    with pytest.raises(ValueError, match=r"\S"):
+        generate(uri)
+
+
+@pytest.mark.parametrize(
+    "uri",
+    ["proc://checker?size=16&squares=16", "proc://noise?size=64&scale=8&octaves=4", "proc://brick?size=16&rows=1"],
+)
+def test_counts_up_to_the_size_are_accepted(uri: str) -> None:
+    size = int(canonical_uri(uri).split("size=")[1].split("&")[0])
+    assert generate(uri).shape == (size, size, 3)
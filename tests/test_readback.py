@@ -0,0 +1,43 @@
+"""Frames read back through pixel buffer objects.
+
+Skipped where no OpenGL context can be created, see conftest.py.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import pytest
+
+from opengl_light_lab import readback
+from opengl_light_lab.offscreen import Framebuffer
+from opengl_light_lab.readback import PixelReadback
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from opengl_light_lab.offscreen import OffscreenRenderer
+
+SIZE = 16
+
+
+@pytest.fixture
+def pixel_readback(renderer: OffscreenRenderer) -> Iterator[PixelReadback]:
+    """Return a readback through two pixel buffers of a bound framebuffer."""
+    renderer.context.make_current()
+    framebuffer = Framebuffer(SIZE, SIZE)
+    framebuffer.bind()
+    pixel_readback = PixelReadback(SIZE, SIZE, buffer_count=2, use_pbo=True)
+    yield pixel_readback
+    pixel_readback.delete()
+    Framebuffer.release()
+    framebuffer.delete()
+
+
+def test_unmappable_buffer_raises(pixel_readback: PixelReadback, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(readback, "glMapBufferRange", lambda *_: None)
+    assert pixel_readback.read() is None
+    with pytest.raises(RuntimeError, match="cannot be mapped"):
+        pixel_readback.read()
+    # The buffer was not mapped, so it is not unmapped either
+    pixel_readback.delete()
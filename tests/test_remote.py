@@ -0,0 +1,157 @@
+"""RemoteServer and RemoteClient talking over a local socket.
+
+The view is a stand-in for GLWidget that flushes the updates and notifies
+the listeners the way paintGL does, with a synthetic frame, so the protocol
+is tested without an OpenGL context.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+import pytest
+from PySide6 import QtCore
+
+from opengl_light_lab.app_state import AppState
+from opengl_light_lab.profiler import FrameProfiler
+from opengl_light_lab.remote import INVALID_PARAMS, METHOD_NOT_FOUND, RemoteClient, RemoteError, RemoteServer
+from opengl_light_lab.update_coalescer import UpdateCoalescer
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
+
+TIMEOUT = 10.0
+"""Seconds a client call may take."""
+FRAME_SHAPE = (6, 8, 3)
+
+
+class _View:
+    """Paints like GLWidget without drawing: the frame is filled with the cube distance."""
+
+    def __init__(self, app_state: AppState, updates: UpdateCoalescer) -> None:
+        self.app_state = app_state
+        self.updates = updates
+        self.profiler = FrameProfiler()
+        self._frame_listeners: list[Callable[[np.ndarray], None]] = []
+        self._paint_listeners: list[Callable[[], None]] = []
+
+    def add_frame_listener(self, callback: Callable[[np.ndarray], None]) -> None:
+        self._frame_listeners.append(callback)
+
+    def remove_frame_listener(self, callback: Callable[[np.ndarray], None]) -> None:
+        self._frame_listeners.remove(callback)
+
+    def add_paint_listener(self, callback: Callable[[], None]) -> None:
+        self._paint_listeners.append(callback)
+
+    def paint(self) -> None:
+        self.profiler.begin_frame()
+        self.updates.flush()
+        self.profiler.count("objects drawn", 3)
+        self.profiler.end_frame()
+        frame = np.full(FRAME_SHAPE, round(self.app_state.cube_distance * 10), dtype=np.uint8)
+        for callback in list(self._frame_listeners):
+            callback(frame)
+        for callback in list(self._paint_listeners):
+            callback()
+
+
+@pytest.fixture(scope="session")
+def application() -> QtCore.QCoreApplication:
+    """Return the Qt application running the socket notifiers, shared by all tests."""
+    return QtCore.QCoreApplication.instance() or QtCore.QCoreApplication([])
+
+
+@pytest.fixture
+def view(application: QtCore.QCoreApplication) -> Iterator[_View]:  # noqa: ARG001
+    """Return a view controlled by a started server."""
+    state = AppState()
+    updates = UpdateCoalescer(state)
+    view = _View(state, updates)
+    server = RemoteServer(view, updates, port=0)  # type: ignore[arg-type]
+    server.start()
+    view.port = server.port  # type: ignore[attr-defined]
+    yield view
+    server.stop()
+
+
+@pytest.fixture
+def client(view: _View) -> Iterator[RemoteClient]:
+    """Return a client connected to the server of the view."""
+    client = RemoteClient(port=view.port)  # type: ignore[attr-defined]
+    yield client
+    client.close()
+
+
+def _serve(view: _View, call: Callable[[], object]) -> Any:  # noqa: ANN401
+    """Run a blocking client call in a thread while the GUI thread handles requests and paints."""
+    outcome: list[object] = []
+
+    def run() -> None:
+        try:
+            outcome.append(call())
+        except Exception as e:
+            outcome.append(e)
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    deadline = time.monotonic() + TIMEOUT
+    while thread.is_alive() and time.monotonic() < deadline:
+        QtCore.QCoreApplication.processEvents()
+        view.paint()
+        thread.join(0.005)
+    assert outcome, "the server did not answer in time"
+    if isinstance(outcome[0], Exception):
+        raise outcome[0]
+    return outcome[0]
+
+
+def test_patch_is_applied_before_the_next_frame(view: _View, client: RemoteClient) -> None:
+    result = _serve(view, lambda: client.call("patch", changes={"cube_distance": 2.5, "camera.theta": 0.2}))
+    assert result == {"queued": 2}
+    frame = _serve(view, client.frame)
+    assert frame.shape == FRAME_SHAPE
+    assert (frame == 25).all()
+    assert view.app_state.cube_distance == 2.5
+    assert view.app_state.camera.theta == 0.2
+    assert _serve(view, lambda: client.call("get", paths=["cube_distance"])) == {"cube_distance": 2.5}
+
+
+@pytest.mark.parametrize(
+    "changes",
+    [
+        {"axis_extent": 10**7},
+        {"shadow_map_size": -5},
+        {"shadow_map_size": 10**9},
+        {"light_attenuation_mode": 5},
+        {"camera.distance": -1.0},
+        {"camera_perspective_fov": float("nan")},
+        {"camera": {"distance": float("inf"), "theta": 0.0, "phi": 0.0}},
+        {"light_diffuse": [1.0, 2.0, 0.0]},
+        {"show_axis": 1},
+        {"no_such_field": 1},
+    ],
+)
+def test_invalid_patch_is_rejected_entirely(view: _View, client: RemoteClient, changes: dict[str, object]) -> None:
+    with pytest.raises(RemoteError) as error:
+        _serve(view, lambda: client.call("patch", changes={"cube_distance": 2.5, **changes}))
+    assert error.value.code == INVALID_PARAMS
+    _serve(view, lambda: client.call("stats"))
+    assert view.app_state == AppState()
+
+
+def test_unknown_method(view: _View, client: RemoteClient) -> None:
+    with pytest.raises(RemoteError) as error:
+        _serve(view, lambda: client.call("render"))
+    assert error.value.code == METHOD_NOT_FOUND
+
+
+def test_stats_notifications(view: _View, client: RemoteClient) -> None:
+    assert _serve(view, lambda: client.call("subscribe", every=2)) == {"every": 2}
+    notification = _serve(view, client.receive)
+    assert notification["method"] == "stats"
+    assert notification["params"]["counters"]["objects drawn"] == 3  # type: ignore[index]
+    assert notification["params"]["frame"] % 2 == 0  # type: ignore[index]
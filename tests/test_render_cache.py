@@ -0,0 +1,57 @@
+"""States that describe the same scene share a render cache key."""
+
+from __future__ import annotations
+
+import shutil
+from typing import TYPE_CHECKING
+
+import pytest
+
+from opengl_light_lab.app_state import UNRENDERED_FIELDS, AppState, SceneObject
+from opengl_light_lab.render_cache import DEFAULT_EPSILON, render_key
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+SIZE = (64, 48)
+UNRENDERED_VALUES = {
+    "auto_rotate": False,
+    "profile_allocations": True,
+    "selected_object": SceneObject.CUBE,
+    "show_help": False,
+    "show_profiler": True,
+}
+
+
+def test_every_unrendered_field_is_covered() -> None:
+    assert set(UNRENDERED_VALUES) == UNRENDERED_FIELDS
+
+
+@pytest.mark.parametrize("name", sorted(UNRENDERED_VALUES))
+def test_unrendered_fields_keep_the_key(name: str) -> None:
+    state = AppState()
+    assert getattr(state, name) != UNRENDERED_VALUES[name]
+    changed = AppState(**{name: UNRENDERED_VALUES[name]})
+    assert render_key(changed, *SIZE) == render_key(state, *SIZE)
+
+
+def test_float_noise_below_epsilon_keeps_the_key() -> None:
+    state = AppState()
+    noisy = AppState(
+        light_position=tuple(v + DEFAULT_EPSILON / 10 for v in state.light_position),
+        rotation_angle=state.rotation_angle - DEFAULT_EPSILON / 10,
+    )
+    assert render_key(noisy, *SIZE) == render_key(state, *SIZE)
+    moved = AppState(rotation_angle=state.rotation_angle + 10 * DEFAULT_EPSILON)
+    assert render_key(moved, *SIZE) != render_key(state, *SIZE)
+
+
+def test_renamed_texture_copy_keeps_the_key(tmp_path: Path) -> None:
+    original = tmp_path / "wood.png"
+    original.write_bytes(b"texture content")
+    copy = tmp_path / "renamed.png"
+    shutil.copyfile(original, copy)
+    key = render_key(AppState(current_texture=str(original)), *SIZE)
+    assert render_key(AppState(current_texture=str(copy)), *SIZE) == key
+    copy.write_bytes(b"other content")
+    assert render_key(AppState(current_texture=str(copy)), *SIZE) != key
@@ -0,0 +1,39 @@
+"""Scene state kept in sync with resources loaded in the background.
+
+Skipped where no OpenGL context can be created, see conftest.py.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from opengl_light_lab.offscreen import OffscreenRenderer
+
+SIZE = (64, 48)
+TIMEOUT = 10.0
+"""Seconds a mesh may take to load in the background."""
+TETRAHEDRON = b"v 0 0 0\nv 1 0 0\nv 0 1 0\nv 0 0 1\nf 1 3 2\nf 1 2 4\nf 1 4 3\nf 2 3 4\n"
+
+
+def test_shadow_map_follows_a_mesh_loaded_in_the_background(renderer: OffscreenRenderer, tmp_path: Path) -> None:
+    path = tmp_path / "tetrahedron.obj"
+    path.write_bytes(TETRAHEDRON)
+    meshes = renderer.scene.mesh_manager
+    meshes.background, meshes.cache_dir = True, None
+    renderer.app_state.shadows_enabled = True
+    renderer.draw(*SIZE)
+    renderer.app_state.current_mesh = str(path)
+    # The shadow map of the cube is drawn while the mesh loads
+    renderer.draw(*SIZE)
+    deadline = time.monotonic() + TIMEOUT
+    while meshes.is_loading and time.monotonic() < deadline:
+        time.sleep(0.01)
+        renderer.draw(*SIZE)
+    assert meshes.is_loaded
+    assert renderer.scene.shadow_passes > 0
+    renderer.draw(*SIZE)
+    assert renderer.scene.shadow_passes == 0
@@ -0,0 +1,34 @@
+"""Images rendered in tiles match the image rendered at once.
+
+Skipped where no OpenGL context can be created, see conftest.py.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+import pytest
+
+from opengl_light_lab.tiled_export import TiledRenderer
+
+if TYPE_CHECKING:
+    from opengl_light_lab.offscreen import OffscreenRenderer
+
+TOLERANCE = 8
+"""Channel difference up to which pixels match; tile seams round a few edges differently."""
+MAX_MISMATCH = 0.001
+"""Fraction of pixels that may differ by more than TOLERANCE."""
+
+
+@pytest.mark.parametrize("quad_view", [False, True])
+@pytest.mark.parametrize(("width", "height", "tile_size"), [(200, 150, 64), (257, 193, 50)])
+def test_tiles_match_the_whole_image(
+    renderer: OffscreenRenderer, quad_view: bool, width: int, height: int, tile_size: int
+) -> None:
+    renderer.app_state.quad_view = quad_view
+    whole = renderer.render(width, height).astype(np.int16)
+    tiled = np.concatenate(list(TiledRenderer(renderer, tile_size=tile_size).bands(width, height)))
+    assert tiled.shape == whole.shape
+    mismatch = (np.abs(whole - tiled) > TOLERANCE).any(axis=2).mean()
+    assert mismatch <= MAX_MISMATCH